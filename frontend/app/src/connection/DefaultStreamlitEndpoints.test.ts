@@ -19,7 +19,10 @@ import MockAdapter from "axios-mock-adapter"
 
 import { BaseUriParts, buildHttpUri, ForwardMsg } from "@streamlit/lib"
 
-import { DefaultStreamlitEndpoints } from "./DefaultStreamlitEndpoints"
+import {
+  DefaultStreamlitEndpoints,
+  UPLOAD_CHUNK_SIZE,
+} from "./DefaultStreamlitEndpoints"
 
 const MOCK_SERVER_URI = {
   host: "streamlit.mock",
@@ -247,6 +250,42 @@ describe("DefaultStreamlitEndpoints", () => {
       })
     })
 
+    it("uploads large files in chunks, retrying failed chunks", async () => {
+      const url =
+        "http://streamlit.mock:80/mock/base/path/_stcore/upload_file/file_3"
+      axiosMock.onPut(url).replyOnce(503).onPut(url).reply(() => [204])
+      spyRequest.mockClear()
+
+      const size = UPLOAD_CHUNK_SIZE * 2 + 1
+      const largeFile = new File([new Uint8Array(size)], "large.bin")
+      const mockOnUploadProgress = jest.fn()
+
+      await expect(
+        endpoints.uploadFileUploaderFile(
+          "/_stcore/upload_file/file_3",
+          largeFile,
+          "mockSessionId",
+          mockOnUploadProgress
+        )
+      ).resolves.toBeUndefined()
+
+      const contentRanges = spyRequest.mock.calls.map(
+        ([config]) => (config.headers as Record<string, string>)["Content-Range"]
+      )
+      expect(contentRanges).toHaveLength(4)
+      expect(new Set(contentRanges)).toEqual(
+        new Set([
+          `bytes 0-${UPLOAD_CHUNK_SIZE - 1}/${size}`,
+          `bytes ${UPLOAD_CHUNK_SIZE}-${UPLOAD_CHUNK_SIZE * 2 - 1}/${size}`,
+          `bytes ${UPLOAD_CHUNK_SIZE * 2}-${UPLOAD_CHUNK_SIZE * 2}/${size}`,
+        ])
+      )
+      expect(mockOnUploadProgress).toHaveBeenLastCalledWith({
+        loaded: size,
+        total: size,
+      })
+    })
+
     it("errors on bad status", async () => {
       axiosMock
         .onPut("http://streamlit.mock:80/mock/base/path/_stcore/upload_file")
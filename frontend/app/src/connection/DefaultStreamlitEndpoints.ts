@@ -36,6 +36,15 @@ const UPLOAD_FILE_ENDPOINT = "/_stcore/upload_file"
 const COMPONENT_ENDPOINT_BASE = "/component"
 const FORWARD_MSG_CACHE_ENDPOINT = "/_stcore/message"
 
+/**
+ * Files larger than this are uploaded to the Streamlit server in chunks of
+ * this size, several at a time. A chunk that fails is sent again, so a flaky
+ * connection doesn't restart the whole upload.
+ */
+export const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+const MAX_PARALLEL_UPLOAD_CHUNKS = 4
+const MAX_UPLOAD_CHUNK_ATTEMPTS = 3
+
 /** Default Streamlit server implementation of the StreamlitEndpoints interface. */
 export class DefaultStreamlitEndpoints implements StreamlitEndpoints {
   private readonly getServerUri: () => BaseUriParts | undefined
@@ -117,24 +126,126 @@ export class DefaultStreamlitEndpoints implements StreamlitEndpoints {
     onUploadProgress?: (progressEvent: any) => void,
     cancelToken?: CancelToken
   ): Promise<void> {
+    if (
+      fileUploadUrl.startsWith(UPLOAD_FILE_ENDPOINT) &&
+      file.size > UPLOAD_CHUNK_SIZE
+    ) {
+      return this.uploadFileInChunks(
+        fileUploadUrl,
+        file,
+        onUploadProgress,
+        cancelToken
+      )
+    }
+
     const form = new FormData()
     form.append(file.name, file)
 
-    const headers: Record<string, string> = {}
-    if (this.jwtHeader !== undefined) {
-      headers[this.jwtHeader.jwtHeaderName] = this.jwtHeader.jwtHeaderValue
-    }
-
     return this.csrfRequest<number>(this.buildFileUploadURL(fileUploadUrl), {
       cancelToken,
       method: "PUT",
       data: form,
       responseType: "text",
-      headers,
+      headers: this.buildUploadHeaders(),
       onUploadProgress,
     }).then(() => undefined) // If the request succeeds, we don't care about the response body
   }
 
+  /**
+   * Upload a file to the Streamlit server in chunks, each sent as its own
+   * PUT request with a Content-Range header. The server assembles the file
+   * once it has received all of them.
+   */
+  private async uploadFileInChunks(
+    fileUploadUrl: string,
+    file: File,
+    onUploadProgress?: (progressEvent: any) => void,
+    cancelToken?: CancelToken
+  ): Promise<void> {
+    const url = this.buildFileUploadURL(fileUploadUrl)
+    const numChunks = Math.ceil(file.size / UPLOAD_CHUNK_SIZE)
+    const loadedPerChunk = new Array<number>(numChunks).fill(0)
+    let nextChunk = 0
+    let failed = false
+
+    const reportProgress = (): void => {
+      onUploadProgress?.({
+        loaded: loadedPerChunk.reduce((total, loaded) => total + loaded, 0),
+        total: file.size,
+      })
+    }
+
+    const uploadChunk = async (index: number): Promise<void> => {
+      const start = index * UPLOAD_CHUNK_SIZE
+      const end = Math.min(start + UPLOAD_CHUNK_SIZE, file.size)
+      const form = new FormData()
+      form.append(
+        file.name,
+        new File([file.slice(start, end)], file.name, { type: file.type })
+      )
+      const headers = this.buildUploadHeaders()
+      headers["Content-Range"] = `bytes ${start}-${end - 1}/${file.size}`
+
+      for (let attempt = 1; ; attempt++) {
+        try {
+          await this.csrfRequest<number>(url, {
+            cancelToken,
+            method: "PUT",
+            data: form,
+            responseType: "text",
+            headers,
+            onUploadProgress: (event: any) => {
+              // The request body is a little larger than the chunk.
+              loadedPerChunk[index] = Math.min(event.loaded, end - start)
+              reportProgress()
+            },
+          })
+          loadedPerChunk[index] = end - start
+          reportProgress()
+          return
+        } catch (e) {
+          // Only retry chunks that failed because of the connection or
+          // the server, rather than because they were rejected.
+          const status = axios.isAxiosError(e) ? e.response?.status : undefined
+          if (
+            axios.isCancel(e) ||
+            attempt >= MAX_UPLOAD_CHUNK_ATTEMPTS ||
+            (status !== undefined && status < 500)
+          ) {
+            throw e
+          }
+          loadedPerChunk[index] = 0
+        }
+      }
+    }
+
+    const uploadNextChunks = async (): Promise<void> => {
+      while (!failed && nextChunk < numChunks) {
+        try {
+          await uploadChunk(nextChunk++)
+        } catch (e) {
+          failed = true
+          throw e
+        }
+      }
+    }
+
+    await Promise.all(
+      Array.from(
+        { length: Math.min(MAX_PARALLEL_UPLOAD_CHUNKS, numChunks) },
+        uploadNextChunks
+      )
+    )
+  }
+
+  private buildUploadHeaders(): Record<string, string> {
+    const headers: Record<string, string> = {}
+    if (this.jwtHeader !== undefined) {
+      headers[this.jwtHeader.jwtHeaderName] = this.jwtHeader.jwtHeaderValue
+    }
+    return headers
+  }
+
   /**
    * Send an HTTP DELETE request to the given URL.
    */
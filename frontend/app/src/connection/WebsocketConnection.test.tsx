@@ -31,6 +31,7 @@ import {
   Args,
   CORS_ERROR_MESSAGE_DOCUMENTATION_LINK,
   doInitPings,
+  splitWebsocketFrame,
   StyledBashCode,
   WebsocketConnection,
 } from "@streamlit/app/src/connection/WebsocketConnection"
@@ -712,3 +713,46 @@ describe("WebsocketConnection auth token handling", () => {
     expect(resetHostAuthToken).toHaveBeenCalledTimes(1)
   })
 })
+
+describe("splitWebsocketFrame", () => {
+  /** Create a batched frame containing the given messages. */
+  function createBatchFrame(messages: number[][]): ArrayBuffer {
+    const length = messages.reduce((sum, msg) => sum + 4 + msg.length, 1)
+    const frame = new Uint8Array(length)
+    const view = new DataView(frame.buffer)
+    let offset = 1
+    for (const msg of messages) {
+      view.setUint32(offset, msg.length, true)
+      frame.set(msg, offset + 4)
+      offset += 4 + msg.length
+    }
+    return frame.buffer
+  }
+
+  it("returns a single message as-is", () => {
+    const frame = new Uint8Array([10, 2, 1, 2]).buffer
+    expect(splitWebsocketFrame(frame)).toEqual([new Uint8Array(frame)])
+  })
+
+  it("returns an empty message as-is", () => {
+    expect(splitWebsocketFrame(new ArrayBuffer(0))).toEqual([
+      new Uint8Array(0),
+    ])
+  })
+
+  it("splits a batched frame into its messages", () => {
+    const frame = createBatchFrame([[10, 2, 1, 2], [], [18, 1, 3]])
+    expect(splitWebsocketFrame(frame)).toEqual([
+      new Uint8Array([10, 2, 1, 2]),
+      new Uint8Array([]),
+      new Uint8Array([18, 1, 3]),
+    ])
+  })
+
+  it("throws on a truncated batched frame", () => {
+    const frame = createBatchFrame([[10, 2, 1, 2]]).slice(0, 6)
+    expect(() => splitWebsocketFrame(frame)).toThrow(
+      "Truncated batched Websocket frame"
+    )
+  })
+})
@@ -79,6 +79,12 @@ const PING_TIMEOUT_MS = 15 * 1000
  */
 const WEBSOCKET_TIMEOUT_MS = 15 * 1000
 
+/**
+ * First byte of Websocket frames that contain several ForwardMsgs.
+ * See splitWebsocketFrame.
+ */
+const BATCH_FRAME_MARKER = 0
+
 /**
  * If the ping retrieves a 403 status code a message will be displayed.
  * This constant is the link to the documentation.
@@ -443,11 +449,22 @@ export class WebsocketConnection {
 
     this.websocket.onmessage = (event: MessageEvent) => {
       if (checkWebsocket()) {
-        this.handleMessage(event.data).catch(reason => {
+        const onError = (reason: unknown): void => {
           const err = `Failed to process a Websocket message (${reason})`
           logError(LOG, err)
           this.stepFsm("FATAL_ERROR", err)
-        })
+        }
+
+        let encodedMsgs: Uint8Array[]
+        try {
+          encodedMsgs = splitWebsocketFrame(event.data)
+        } catch (reason) {
+          onError(reason)
+          return
+        }
+        for (const encodedMsg of encodedMsgs) {
+          this.handleMessage(encodedMsg).catch(onError)
+        }
       }
     }
 
@@ -554,21 +571,20 @@ export class WebsocketConnection {
     this.cache.incrementRunCount(maxMessageAge)
   }
 
-  private async handleMessage(data: ArrayBuffer): Promise<void> {
+  private async handleMessage(encodedMsg: Uint8Array): Promise<void> {
     // Assign this message an index.
     const messageIndex = this.nextMessageIndex
     this.nextMessageIndex += 1
 
     PerformanceEvents.record({ name: "BeginHandleMessage", messageIndex })
 
-    const encodedMsg = new Uint8Array(data)
     const msg = ForwardMsg.decode(encodedMsg)
 
     PerformanceEvents.record({
       name: "DecodedMessage",
       messageIndex,
       messageType: msg.type,
-      len: data.byteLength,
+      len: encodedMsg.byteLength,
     })
 
     this.messageQueue[messageIndex] = await this.cache.processMessagePayload(
@@ -596,6 +612,38 @@ export class WebsocketConnection {
   }
 }
 
+/**
+ * Split a Websocket frame into the encoded ForwardMsgs it contains.
+ *
+ * Most frames contain a single encoded ForwardMsg. If the server batches
+ * messages, a frame may instead contain several of them: such frames start
+ * with a 0 byte (which an encoded ForwardMsg never starts with), followed by
+ * each message prefixed with its length as a little-endian uint32.
+ */
+export function splitWebsocketFrame(data: ArrayBuffer): Uint8Array[] {
+  const bytes = new Uint8Array(data)
+  if (bytes.byteLength === 0 || bytes[0] !== BATCH_FRAME_MARKER) {
+    return [bytes]
+  }
+
+  const view = new DataView(data)
+  const messages = []
+  let offset = 1
+  while (offset < bytes.byteLength) {
+    if (offset + 4 > bytes.byteLength) {
+      throw new Error("Truncated batched Websocket frame")
+    }
+    const length = view.getUint32(offset, true)
+    offset += 4
+    if (offset + length > bytes.byteLength) {
+      throw new Error("Truncated batched Websocket frame")
+    }
+    messages.push(bytes.subarray(offset, offset + length))
+    offset += length
+  }
+  return messages
+}
+
 export const StyledBashCode = styled.code({
   "&::before": {
     content: '"$"',
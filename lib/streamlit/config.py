@@ -386,6 +386,33 @@ _create_option(
     type_=int,
 )
 
+_create_option(
+    "global.maxCachedMessagesSize",
+    description="""
+        Max size, in megabytes, of the ForwardMsgs cached in backend memory.
+        When it's exceeded, the least recently used messages are evicted from
+        the cache, and sent again in full to the sessions that need them.
+
+        0 means no limit.
+    """,
+    default_val=0,
+    type_=int,
+)
+
+_create_option(
+    "global.maxSharedPayloadsSize",
+    description="""
+        Max size, in megabytes, of the serialized elements of cached functions
+        that are kept in backend memory, to be replayed in all sessions without
+        serializing them again. When it's exceeded, the least recently used
+        elements are evicted.
+
+        0 means elements are serialized again for each session.
+    """,
+    default_val=100,
+    type_=int,
+)
+
 _create_option(
     "global.storeCachedForwardMessagesInMemory",
     description="""
@@ -399,6 +426,84 @@ _create_option(
 )
 
 
+_create_option(
+    "global.maxPersistedCacheSize",
+    description="""
+        Max size, in megabytes, of the data persisted to disk by
+        `st.cache_data(persist="disk")`, across all cached functions.
+
+        When the limit is exceeded, the least recently used entries are
+        removed from disk. Set to 0 to disable the limit.
+    """,
+    default_val=0,
+    type_=int,
+)
+
+
+_create_option(
+    "global.dataCacheStorage",
+    description="""
+        Where `st.cache_data` stores cached values.
+
+        Allowed values:
+        * "local"  : Values are kept in the memory of the server process, and
+                     written to the `.streamlit/cache` folder for functions that
+                     use `persist="disk"`.
+        * "sqlite" : Values are stored in the SQLite database at
+                     `global.dataCacheStoragePath`, which can be shared by
+                     several Streamlit processes on the same machine, so a value
+                     computed by one process is reused by all of them. Values are
+                     kept across restarts, regardless of `persist`. Each process
+                     still keeps the values it has read in memory.
+    """,
+    default_val="local",
+    type_=str,
+)
+
+
+_create_option(
+    "global.dataCacheArrowSerialization",
+    description="""
+        If True, pandas DataFrames, PyArrow Tables and Polars DataFrames returned
+        by `st.cache_data` functions are serialized with Arrow IPC instead of
+        pickle, which is much cheaper for large dataframes.
+
+        pandas DataFrames that can't be converted to Arrow without losing
+        information (e.g. with non-string column names, `attrs`, an index
+        frequency, or object columns that don't only contain strings) are still
+        pickled.
+    """,
+    default_val=False,
+    type_=bool,
+)
+
+_create_option(
+    "global.dataCacheArrowCompression",
+    description="""
+        Compression of the Arrow IPC streams written when
+        `global.dataCacheArrowSerialization` is True.
+
+        Allowed values:
+        * "none" : No compression. Cached dataframes are read without copying
+                   them when memory-mapped from disk.
+        * "lz4"  : LZ4 compression.
+        * "zstd" : Zstandard compression.
+    """,
+    default_val="none",
+    type_=str,
+)
+
+
+@_create_option("global.dataCacheStoragePath", type_=str)
+def _global_data_cache_storage_path() -> str:
+    """Path of the SQLite database used when `global.dataCacheStorage` is
+    "sqlite". Use the same path for every process that should share cached values.
+
+    Default: "~/.streamlit/cache/cache_data.sqlite"
+    """
+    return file_util.get_streamlit_file_path("cache", "cache_data.sqlite")
+
+
 # Config Section: Logger #
 _create_section("logger", "Settings to customize Streamlit log messages.")
 
@@ -576,6 +681,46 @@ _create_option(
     type_=str,
 )
 
+_create_option(
+    "runner.maxConcurrentCacheComputations",
+    description="""
+        The maximum number of values that `st.cache_data` and `st.cache_resource`
+        compute at the same time, across all sessions. Sessions that need to
+        compute a value while the limit is reached wait for a running
+        computation to finish. Sessions waiting for a value that another
+        session is already computing don't count towards the limit.
+
+        Set to 0 to not limit the number of concurrent computations.
+    """,
+    default_val=0,
+    type_=int,
+)
+
+_create_option(
+    "runner.processPoolSize",
+    description="""
+        Number of worker processes that run the app's scripts. Each session
+        is assigned to one of them, which holds its Session State, so that
+        sessions running CPU-heavy code don't slow down the server and the
+        sessions assigned to other processes.
+
+        Each process has its own st.cache_data and st.cache_resource caches.
+        Processes write `persist="disk"` entries to the same folder, but don't
+        know about each other's entries, so `max_entries` and
+        `global.maxPersistedCacheSize` are only enforced per process. Set
+        `global.dataCacheStorage` to "sqlite" to share st.cache_data values
+        and limits between processes.
+
+        st.context.headers and st.context.cookies are empty in scripts run by
+        these processes, and changes to the modules the app imports don't
+        trigger reruns.
+
+        Set to 0 to run scripts in threads of the server process.
+    """,
+    default_val=0,
+    type_=int,
+)
+
 # Config Section: Server #
 
 _create_section("server", "Settings for the Streamlit server")
@@ -683,6 +828,25 @@ _create_option(
     type_=int,
 )
 
+_create_option(
+    "server.numWorkers",
+    description="""
+        Number of server processes serving the app, to use more than one CPU
+        core. Only supported on Linux and macOS, and when listening on a TCP
+        port.
+
+        Each browser is served by one of the processes, chosen from its IP
+        address. Processes don't share sessions, st.cache_resource objects, or
+        in-memory st.cache_data entries, and `max_entries` and
+        `global.maxPersistedCacheSize` of `persist="disk"` entries are only
+        enforced per process. If the server is behind a reverse
+        proxy, connections all come from the proxy's address and are served
+        by a single process: run several servers behind the proxy instead.
+    """,
+    default_val=1,
+    type_=int,
+)
+
 _create_option(
     "server.scriptHealthCheckEnabled",
     visibility="hidden",
@@ -746,6 +910,32 @@ _create_option(
     type_=int,
 )
 
+_create_option(
+    "server.uploadSpoolSize",
+    description="""
+        Files uploaded with the file_uploader that are larger than this size,
+        in megabytes, are stored in temporary files on disk rather than in
+        memory.
+
+        Set to -1 to keep all uploaded files in memory.
+    """,
+    default_val=1,
+    type_=int,
+)
+
+_create_option(
+    "server.mediaFileMemoryBudget",
+    description="""
+        Max total size, in megabytes, of the media files (images, audio,
+        video and download button data) kept in memory. Media files beyond
+        it are stored in temporary files on disk.
+
+        Set to -1 to keep all media files in memory.
+    """,
+    default_val=100,
+    type_=int,
+)
+
 _create_option(
     "server.maxMessageSize",
     description="""
@@ -777,6 +967,83 @@ _create_option(
     type_=bool,
 )
 
+_create_option(
+    "server.websocketCompressionLevel",
+    description="""
+        Compression level of websocket messages, from 1 (fastest) to 9
+        (smallest), if websocket compression is enabled.
+    """,
+    default_val=6,
+    type_=int,
+)
+
+_create_option(
+    "server.websocketCompressionMemLevel",
+    description="""
+        Amount of memory used to compress the websocket messages of each
+        connection, from 1 (least memory, slowest) to 9 (most memory, fastest),
+        if websocket compression is enabled.
+    """,
+    default_val=8,
+    type_=int,
+)
+
+_create_option(
+    "server.websocketCompressionMinSize",
+    description="""
+        Only compress websocket messages that are greater than or equal to
+        this size, in bytes, if websocket compression is enabled.
+
+        Compressing small messages costs more CPU time than the few bytes it
+        saves.
+    """,
+    default_val=1024,
+    type_=int,
+)
+
+_create_option(
+    "server.batchWebsocketMessages",
+    description="""
+        Send all the messages that are ready for a session in a single
+        websocket frame, instead of one frame per message.
+
+        This reduces the per-message overhead of apps that send many elements
+        at once, or of servers with many connected sessions.
+    """,
+    default_val=False,
+    type_=bool,
+)
+
+_create_option(
+    "server.websocketHighWaterMark",
+    description="""
+        Max size, in kilobytes, of the messages written to a browser's
+        websocket connection that haven't been sent yet.
+
+        Once a connection has more than this buffered, the server stops writing
+        to it until everything buffered has been sent. Meanwhile, updates to
+        the same elements are combined, so that a slow browser only receives
+        their latest version. Set to 0 to wait for every write to be sent
+        before writing the next messages.
+    """,
+    default_val=1024,
+    type_=int,
+)
+
+_create_option(
+    "server.serializeMessagesInThreadPool",
+    description="""
+        Hash and serialize outgoing messages in a thread pool, instead of on
+        the server's event loop.
+
+        Serializing a large message (e.g. a big dataframe) can take tens of
+        milliseconds, which delays the messages of all other sessions when it's
+        done on the event loop.
+    """,
+    default_val=False,
+    type_=bool,
+)
+
 _create_option(
     "server.enableStaticServing",
     description="""
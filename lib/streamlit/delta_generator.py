@@ -420,6 +420,7 @@ class DeltaGenerator(
         element_proto: Message,
         add_rows_metadata: AddRowsMetadata | None = None,
         user_key: str | None = None,
+        payload_hash: str | None = None,
     ) -> DeltaGenerator:
         """Create NewElement delta, fill it, and enqueue it.
 
@@ -433,6 +434,9 @@ class DeltaGenerator(
             Metadata for the add_rows method
         user_key : str or None
             A custom key for the element provided by the user.
+        payload_hash : str or None
+            The hash of the message's payload, if it's already known (e.g. for
+            elements replayed from a cached function).
 
         Returns
         -------
@@ -458,6 +462,8 @@ class DeltaGenerator(
         msg = ForwardMsg_pb2.ForwardMsg()
         msg_el_proto = getattr(msg.delta.new_element, delta_type)
         msg_el_proto.CopyFrom(element_proto)
+        if payload_hash is not None:
+            msg.hash = payload_hash
 
         # Only enqueue message and fill in metadata if there's a container.
         msg_was_enqueued = False
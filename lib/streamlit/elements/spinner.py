@@ -16,7 +16,7 @@ from __future__ import annotations
 
 import contextlib
 import threading
-from typing import Iterator
+from typing import Callable, Iterator
 
 import streamlit as st
 from streamlit.runtime.scriptrunner import add_script_run_ctx
@@ -41,6 +41,20 @@ def spinner(text: str = "In progress...", *, _cache: bool = False) -> Iterator[N
     >>>     time.sleep(5)
     >>> st.success("Done!")
 
+    """
+    with updatable_spinner(text, cache=_cache):
+        yield
+
+
+@contextlib.contextmanager
+def updatable_spinner(
+    text: str, *, cache: bool = False
+) -> Iterator[Callable[[str], None]]:
+    """Like `spinner`, but yields a function that changes the spinner's text.
+
+    Changing the text of a spinner that is already displayed enqueues a new
+    message. When done from the script thread, this is a yield point of the
+    script: it raises if the script was asked to stop or rerun.
     """
     from streamlit.proto.Spinner_pb2 import Spinner as SpinnerProto
     from streamlit.string_util import clean_text
@@ -51,22 +65,35 @@ def spinner(text: str = "In progress...", *, _cache: bool = False) -> Iterator[N
     # flickering if this spinner runs too quickly.
     DELAY_SECS = 0.5
     display_message = True
+    message_displayed = False
     display_message_lock = threading.Lock()
 
+    def enqueue_message():
+        nonlocal message_displayed
+        spinner_proto = SpinnerProto()
+        spinner_proto.text = clean_text(text)
+        spinner_proto.cache = cache
+        message._enqueue("spinner", spinner_proto)
+        message_displayed = True
+
     try:
 
         def set_message():
             with display_message_lock:
                 if display_message:
-                    spinner_proto = SpinnerProto()
-                    spinner_proto.text = clean_text(text)
-                    spinner_proto.cache = _cache
-                    message._enqueue("spinner", spinner_proto)
+                    enqueue_message()
+
+        def set_text(new_text: str) -> None:
+            nonlocal text
+            with display_message_lock:
+                text = new_text
+                if display_message and message_displayed:
+                    enqueue_message()
 
         add_script_run_ctx(threading.Timer(DELAY_SECS, set_message)).start()
 
         # Yield control back to the context.
-        yield
+        yield set_text
     finally:
         if display_message_lock:
             with display_message_lock:
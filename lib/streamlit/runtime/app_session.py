@@ -49,6 +49,10 @@ if TYPE_CHECKING:
     from streamlit.proto.PagesChanged_pb2 import PagesChanged
     from streamlit.runtime.script_data import ScriptData
     from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.scriptrunner.script_process_pool import (
+        RemoteScriptRunner,
+        ScriptProcessPool,
+    )
     from streamlit.runtime.state import SessionState
     from streamlit.runtime.uploaded_file_manager import UploadedFileManager
     from streamlit.source_util import PageHash, PageInfo
@@ -84,7 +88,7 @@ class AppSession:
         script_data: ScriptData,
         uploaded_file_manager: UploadedFileManager,
         script_cache: ScriptCache,
-        message_enqueued_callback: Callable[[], None] | None,
+        message_enqueued_callback: Callable[[str], None] | None,
         user_info: dict[str, str | None],
         session_id_override: str | None = None,
     ) -> None:
@@ -104,7 +108,8 @@ class AppSession:
             on each rerun.
 
         message_enqueued_callback
-            After enqueuing a message, this callable notification will be invoked.
+            After enqueuing a message, this callable notification will be invoked
+            with the session's ID.
 
         user_info
             A dict that contains information about the current user. For now,
@@ -155,7 +160,7 @@ class AppSession:
 
         self._run_on_save = config.get_option("server.runOnSave")
 
-        self._scriptrunner: ScriptRunner | None = None
+        self._scriptrunner: ScriptRunner | RemoteScriptRunner | None = None
 
         # This needs to be lazily imported to avoid a dependency cycle.
         from streamlit.runtime.state import SessionState
@@ -253,6 +258,10 @@ class AppSession:
             # *after* this is called.
             self.request_script_stop()
 
+            process_pool = _get_script_process_pool()
+            if process_pool is not None:
+                process_pool.close_session(self.id)
+
             self._state = AppSessionState.SHUTDOWN_REQUESTED
 
             # Disconnect all file watchers if we haven't already, although we will have
@@ -277,7 +286,7 @@ class AppSession:
 
         self._browser_queue.enqueue(msg)
         if self._message_enqueued_callback:
-            self._message_enqueued_callback()
+            self._message_enqueued_callback(self.id)
 
     def handle_backmsg(self, msg: BackMsg) -> None:
         """Process a BackMsg."""
@@ -401,18 +410,29 @@ class AppSession:
             self._scriptrunner.request_stop()
 
     def _create_scriptrunner(self, initial_rerun_data: RerunData) -> None:
-        """Create and run a new ScriptRunner with the given RerunData."""
-        self._scriptrunner = ScriptRunner(
-            session_id=self.id,
-            main_script_path=self._script_data.main_script_path,
-            session_state=self._session_state,
-            uploaded_file_mgr=self._uploaded_file_mgr,
-            script_cache=self._script_cache,
-            initial_rerun_data=initial_rerun_data,
-            user_info=self._user_info,
-            fragment_storage=self._fragment_storage,
-            pages_manager=self._pages_manager,
-        )
+        """Create and run a new ScriptRunner with the given RerunData.
+
+        If the app's scripts run in a pool of processes, the ScriptRunner runs
+        in the process this session is assigned to, which holds its
+        SessionState.
+        """
+        process_pool = _get_script_process_pool()
+        if process_pool is not None:
+            self._scriptrunner = process_pool.create_script_runner(
+                self.id, initial_rerun_data, self._user_info, self._session_state
+            )
+        else:
+            self._scriptrunner = ScriptRunner(
+                session_id=self.id,
+                main_script_path=self._script_data.main_script_path,
+                session_state=self._session_state,
+                uploaded_file_mgr=self._uploaded_file_mgr,
+                script_cache=self._script_cache,
+                initial_rerun_data=initial_rerun_data,
+                user_info=self._user_info,
+                fragment_storage=self._fragment_storage,
+                pages_manager=self._pages_manager,
+            )
         self._scriptrunner.on_event.connect(self._on_scriptrunner_event)
         self._scriptrunner.start()
 
@@ -439,6 +459,9 @@ class AppSession:
         appropriate.
         """
         self._script_cache.clear()
+        process_pool = _get_script_process_pool()
+        if process_pool is not None:
+            process_pool.clear_script_caches()
 
         if filepath is not None and not self._should_rerun_on_file_change(filepath):
             return
@@ -475,7 +498,7 @@ class AppSession:
 
     def _on_scriptrunner_event(
         self,
-        sender: ScriptRunner | None,
+        sender: ScriptRunner | RemoteScriptRunner | None,
         event: ScriptRunnerEvent,
         forward_msg: ForwardMsg | None = None,
         exception: BaseException | None = None,
@@ -505,7 +528,7 @@ class AppSession:
 
     def _handle_scriptrunner_event_on_event_loop(
         self,
-        sender: ScriptRunner | None,
+        sender: ScriptRunner | RemoteScriptRunner | None,
         event: ScriptRunnerEvent,
         forward_msg: ForwardMsg | None = None,
         exception: BaseException | None = None,
@@ -520,7 +543,7 @@ class AppSession:
 
         Parameters
         ----------
-        sender : ScriptRunner | None
+        sender : ScriptRunner | RemoteScriptRunner | None
             The ScriptRunner that emitted the event. (This may be set to
             None when called from `handle_backmsg_exception`, if no
             ScriptRunner was active when the backmsg exception was raised.)
@@ -807,6 +830,10 @@ class AppSession:
         caching.cache_resource.clear()
         self._session_state.clear()
 
+        process_pool = _get_script_process_pool()
+        if process_pool is not None:
+            process_pool.clear_caches(self.id)
+
     def _handle_app_heartbeat_request(self) -> None:
         """Handle an incoming app heartbeat.
 
@@ -864,6 +891,15 @@ class AppSession:
             page_proto.icon = page_info["icon"]
 
 
+def _get_script_process_pool() -> ScriptProcessPool | None:
+    """Return the pool of processes running the app's scripts, or None if
+    they run in threads of this process.
+    """
+    if not runtime.exists():
+        return None
+    return runtime.get_instance().script_process_pool
+
+
 # Config.ToolbarMode.ValueType does not exist at runtime (only in the pyi stubs), so
 # we need to use quotes.
 # This field will be available at runtime as of protobuf 3.20.1, but
@@ -16,6 +16,8 @@
 
 from __future__ import annotations
 
+import copy as copy_module
+import math
 import pickle
 import threading
 import types
@@ -31,18 +33,24 @@ from typing import (
     overload,
 )
 
+from cachetools import TTLCache
 from typing_extensions import TypeAlias
 
 import streamlit as st
 from streamlit import runtime
 from streamlit.errors import StreamlitAPIException
 from streamlit.logger import get_logger
+from streamlit.runtime.caching import cache_utils, hashing, serialization
 from streamlit.runtime.caching.cache_errors import CacheError, CacheKeyNotFoundError
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.cache_utils import (
     Cache,
     CachedFuncInfo,
+    CacheRefreshType,
+    StalenessTracker,
+    get_stale_ttl_seconds,
     make_cached_func_wrapper,
+    validate_refresh_params,
 )
 from streamlit.runtime.caching.cached_message_replay import (
     CachedMessageReplayContext,
@@ -79,6 +87,10 @@ CACHE_DATA_MESSAGE_REPLAY_CTX = CachedMessageReplayContext(CacheType.DATA)
 # The cache persistence options we support: "disk" or None
 CachePersistType: TypeAlias = Union[Literal["disk"], None]
 
+# How cached values are copied before being returned to callers:
+# "deep" (unpickle every hit), "shallow" (copy.copy of a kept object), or "none".
+CacheCopyType: TypeAlias = Literal["deep", "shallow", "none"]
+
 
 class CachedDataFuncInfo(CachedFuncInfo):
     """Implements the CachedFuncInfo interface for @st.cache_data"""
@@ -91,6 +103,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
         max_entries: int | None,
         ttl: float | timedelta | str | None,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
     ):
         super().__init__(
             func,
@@ -100,6 +115,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
         self.persist = persist
         self.max_entries = max_entries
         self.ttl = ttl
+        self.copy = copy
+        self.refresh = refresh
+        self.max_staleness = max_staleness
 
         self.validate_params()
 
@@ -123,6 +141,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
             max_entries=self.max_entries,
             ttl=self.ttl,
             display_name=self.display_name,
+            copy=self.copy,
+            refresh=self.refresh,
+            max_staleness=self.max_staleness,
         )
 
     def validate_params(self) -> None:
@@ -154,6 +175,9 @@ class DataCaches(CacheStatsProvider):
         max_entries: int | None,
         ttl: int | float | timedelta | str | None,
         display_name: str,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
     ) -> DataCache:
         """Return the mem cache for the given key.
 
@@ -161,6 +185,9 @@ class DataCaches(CacheStatsProvider):
         """
 
         ttl_seconds = time_to_seconds(ttl, coerce_none_to_inf=False)
+        # Values refreshed in the background are kept in the storage until
+        # they've been stale for `max_staleness`.
+        stale_ttl_seconds = get_stale_ttl_seconds(ttl_seconds, refresh, max_staleness)
 
         # Get the existing cache, if it exists, and validate that its params
         # haven't changed.
@@ -169,8 +196,11 @@ class DataCaches(CacheStatsProvider):
             if (
                 cache is not None
                 and cache.ttl_seconds == ttl_seconds
+                and cache.refresh == refresh
+                and cache.stale_ttl_seconds == stale_ttl_seconds
                 and cache.max_entries == max_entries
                 and cache.persist == persist
+                and cache.copy == copy
             ):
                 return cache
 
@@ -199,7 +229,7 @@ class DataCaches(CacheStatsProvider):
             cache_context = self.create_cache_storage_context(
                 function_key=key,
                 function_name=display_name,
-                ttl_seconds=ttl_seconds,
+                ttl_seconds=stale_ttl_seconds,
                 max_entries=max_entries,
                 persist=persist,
             )
@@ -213,6 +243,9 @@ class DataCaches(CacheStatsProvider):
                 max_entries=max_entries,
                 ttl_seconds=ttl_seconds,
                 display_name=display_name,
+                copy=copy,
+                refresh=refresh,
+                stale_ttl_seconds=stale_ttl_seconds,
             )
             self._function_caches[key] = cache
             return cache
@@ -353,6 +386,9 @@ class CacheDataAPI:
         persist: CachePersistType | bool = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
     ) -> Callable[[F], F]: ...
 
     def __call__(
@@ -365,6 +401,9 @@ class CacheDataAPI:
         persist: CachePersistType | bool = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
     ):
         return self._decorator(
             func,
@@ -374,6 +413,9 @@ class CacheDataAPI:
             show_spinner=show_spinner,
             experimental_allow_widgets=experimental_allow_widgets,
             hash_funcs=hash_funcs,
+            copy=copy,
+            refresh=refresh,
+            max_staleness=max_staleness,
         )
 
     def _decorator(
@@ -386,6 +428,9 @@ class CacheDataAPI:
         persist: CachePersistType | bool,
         experimental_allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
     ):
         """Decorator to cache functions that return data (e.g. dataframe transforms, database queries, ML inference).
 
@@ -416,7 +461,7 @@ class CacheDataAPI:
               <https://docs.python.org/3/library/datetime.html#timedelta-objects>`_,
               e.g. ``timedelta(days=1)``.
 
-            Note that ``ttl`` will be ignored if ``persist="disk"`` or ``persist=True``.
+            If ``persist="disk"``, expired entries are also removed from disk.
 
         max_entries : int or None
             The maximum number of entries to keep in the cache, or None
@@ -431,7 +476,10 @@ class CacheDataAPI:
         persist : "disk", bool, or None
             Optional location to persist cached data to. Passing "disk" (or True)
             will persist the cached data to the local disk. None (or False) will disable
-            persistence. The default is None.
+            persistence. The default is None. The ``ttl`` and ``max_entries``
+            limits also apply to persisted data, and the total size of all
+            persisted data can be capped with the ``global.maxPersistedCacheSize``
+            config option.
 
         experimental_allow_widgets : bool
             Allow widgets to be used in the cached function. Defaults to False.
@@ -444,6 +492,49 @@ class CacheDataAPI:
             the provided function to generate a hash for it. See below for an example
             of how this can be used.
 
+        copy : "deep", "shallow", or "none"
+            How the cached value is copied before it is returned to the caller.
+            Can be one of:
+
+            * ``"deep"`` (default): every call unpickles the cached value, so
+              each caller gets its own, independent copy of the data.
+            * ``"shallow"``: the unpickled value is kept in memory, and every
+              call returns a copy of it made with Python's ``copy.copy``. This
+              is much faster than unpickling, but mutating nested objects of
+              the returned value affects the cached value (pandas DataFrames
+              and NumPy arrays are copied in full by ``copy.copy``, so they are
+              safe to mutate).
+            * ``"none"``: the unpickled value is kept in memory and returned
+              as-is, like with ``st.cache_resource``. This is the fastest
+              option, but callers must not mutate the returned value. In
+              return, the value is only hashed once when it's passed to other
+              cached functions.
+
+            The value is still pickled when it's written to the cache, so it
+            must be pickleable regardless of this option.
+
+        refresh : "blocking" or "background"
+            What happens when the ``ttl`` of a cached entry expires. Can be
+            one of:
+
+            * ``"blocking"`` (default): the entry is removed from the cache,
+              and the next call recomputes it.
+            * ``"background"``: calls keep returning the expired entry while it
+              is recomputed on a background thread. This keeps slow functions
+              (e.g. long-running database queries) from blocking the user that
+              happens to call them after their ``ttl`` expired. If the function
+              calls Streamlit commands, the expired entry is recomputed by the
+              next call instead, like with ``"blocking"``.
+
+            This has no effect if ``ttl`` is None.
+
+        max_staleness : float, timedelta, str, or None
+            How long an entry whose ``ttl`` expired is still returned while
+            it's recomputed, if ``refresh="background"``. Older entries are
+            removed from the cache, and the next call recomputes them. Accepts
+            the same values as ``ttl``. If None (default), expired entries are
+            returned no matter how old they are.
+
         .. deprecated::
             The cached widget replay functionality was removed in 1.38. Please
             remove the ``experimental_allow_widgets`` parameter from your
@@ -554,6 +645,14 @@ class CacheDataAPI:
                 f"Unsupported persist option '{persist}'. Valid values are 'disk' or None."
             )
 
+        if copy not in ("deep", "shallow", "none"):
+            raise StreamlitAPIException(
+                f"Unsupported copy option '{copy}'. "
+                "Valid values are 'deep', 'shallow', or 'none'."
+            )
+
+        validate_refresh_params(refresh, max_staleness)
+
         if experimental_allow_widgets:
             show_widget_replay_deprecation("cache_data")
 
@@ -566,6 +665,9 @@ class CacheDataAPI:
                     max_entries=max_entries,
                     ttl=ttl,
                     hash_funcs=hash_funcs,
+                    copy=copy,
+                    refresh=refresh,
+                    max_staleness=max_staleness,
                 )
             )
 
@@ -580,6 +682,9 @@ class CacheDataAPI:
                 max_entries=max_entries,
                 ttl=ttl,
                 hash_funcs=hash_funcs,
+                copy=copy,
+                refresh=refresh,
+                max_staleness=max_staleness,
             )
         )
 
@@ -590,7 +695,16 @@ class CacheDataAPI:
 
 
 class DataCache(Cache):
-    """Manages cached values for a single st.cache_data function."""
+    """Manages cached values for a single st.cache_data function.
+
+    Unless `copy` is "deep", the unpickled results are also kept in memory, so
+    that cache hits only have to copy them (if at all) instead of unpickling
+    them from the storage again.
+
+    If `refresh` is "background", values are kept in the storage for
+    `stale_ttl_seconds`, and refreshed in the background once they're older
+    than `ttl_seconds`.
+    """
 
     def __init__(
         self,
@@ -600,14 +714,39 @@ class DataCache(Cache):
         max_entries: int | None,
         ttl_seconds: float | None,
         display_name: str,
+        copy: CacheCopyType = "deep",
+        refresh: CacheRefreshType = "blocking",
+        stale_ttl_seconds: float | None = None,
     ):
-        super().__init__()
+        staleness = None
+        if refresh == "background" and ttl_seconds is not None:
+            staleness = StalenessTracker(
+                ttl_seconds=ttl_seconds,
+                stale_ttl_seconds=(
+                    stale_ttl_seconds if stale_ttl_seconds is not None else math.inf
+                ),
+                max_entries=max_entries if max_entries is not None else math.inf,
+            )
+        super().__init__(staleness)
         self.key = key
         self.display_name = display_name
         self.storage = storage
         self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self.stale_ttl_seconds = stale_ttl_seconds if staleness else ttl_seconds
         self.max_entries = max_entries
         self.persist = persist
+        self.copy = copy
+        self._live_results: TTLCache[str, CachedResult] = TTLCache(
+            maxsize=max_entries if max_entries is not None else math.inf,
+            ttl=(
+                self.stale_ttl_seconds
+                if self.stale_ttl_seconds is not None
+                else math.inf
+            ),
+            timer=cache_utils.TTLCACHE_TIMER,
+        )
+        self._live_results_lock = threading.Lock()
 
     def get_stats(self) -> list[CacheStat]:
         if isinstance(self.storage, CacheStatsProvider):
@@ -619,6 +758,12 @@ class DataCache(Cache):
         if the value doesn't exist, and `CacheError` if the value exists but can't
         be unpickled.
         """
+        if self.copy != "deep":
+            with self._live_results_lock:
+                live_result = self._live_results.get(key)
+            if live_result is not None:
+                return self._copy_result(live_result)
+
         try:
             pickled_entry = self.storage.get(key)
         except CacheStorageKeyNotFoundError as e:
@@ -627,16 +772,21 @@ class DataCache(Cache):
             raise CacheError(str(e)) from e
 
         try:
-            entry = pickle.loads(pickled_entry)
+            entry = serialization.loads(pickled_entry)
             if not isinstance(entry, CachedResult):
                 # Loaded an old cache file format, remove it and let the caller
                 # rerun the function.
                 self.storage.delete(key)
                 raise CacheKeyNotFoundError()
-            return entry
         except pickle.UnpicklingError as exc:
             raise CacheError(f"Failed to unpickle {key}") from exc
 
+        if self.copy != "deep":
+            with self._live_results_lock:
+                self._live_results[key] = entry
+            return self._copy_result(entry)
+        return entry
+
     @gather_metrics("_cache_data_object")
     def write_result(self, key: str, value: Any, messages: list[MsgData]) -> None:
         """Write a value and associated messages to the cache.
@@ -646,12 +796,39 @@ class DataCache(Cache):
             main_id = st._main.id
             sidebar_id = st.sidebar.id
             entry = CachedResult(value, messages, main_id, sidebar_id)
-            pickled_entry = pickle.dumps(entry)
+            pickled_entry = serialization.dumps(entry)
         except (pickle.PicklingError, TypeError) as exc:
             raise CacheError(f"Failed to pickle {key}") from exc
         self.storage.set(key, pickled_entry)
 
+        if self.copy != "deep":
+            with self._live_results_lock:
+                # The caller gets `value` itself, so keep a copy of it.
+                self._live_results[key] = self._copy_result(entry)
+
+    def _copy_result(self, result: CachedResult) -> CachedResult:
+        """Return the result with its value copied according to `self.copy`."""
+        if self.copy == "none":
+            # Callers must not mutate the value, so it only needs to be hashed
+            # once when it's passed to other cached functions.
+            hashing.immutable_value_hashes.register(result.value)
+            return result
+        if self.copy != "shallow":
+            return result
+        return CachedResult(
+            copy_module.copy(result.value),
+            result.messages,
+            result.main_id,
+            result.sidebar_id,
+        )
+
     def _clear(self, key: str | None = None) -> None:
+        with self._live_results_lock:
+            if not key:
+                self._live_results.clear()
+            else:
+                self._live_results.pop(key, None)
+
         if not key:
             self.storage.clear()
         else:
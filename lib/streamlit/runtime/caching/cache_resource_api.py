@@ -19,6 +19,7 @@ from __future__ import annotations
 import math
 import threading
 import types
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Any, Callable, Final, TypeVar, cast, overload
 
 from cachetools import TTLCache
@@ -32,7 +33,11 @@ from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.cache_utils import (
     Cache,
     CachedFuncInfo,
+    CacheRefreshType,
+    StalenessTracker,
+    get_stale_ttl_seconds,
     make_cached_func_wrapper,
+    validate_refresh_params,
 )
 from streamlit.runtime.caching.cached_message_replay import (
     CachedMessageReplayContext,
@@ -56,6 +61,25 @@ CACHE_RESOURCE_MESSAGE_REPLAY_CTX = CachedMessageReplayContext(CacheType.RESOURC
 
 ValidateFunc: TypeAlias = Callable[[Any], bool]
 
+SizeofFunc: TypeAlias = Callable[[Any], int]
+
+# How long estimating the size of a cached resource may take before giving up,
+# and leaving the resource out of the cache stats, see `sizing.estimate_size`.
+_SIZE_ESTIMATE_TIMEOUT_SECS: Final = 1.0
+
+_sizing_executor: ThreadPoolExecutor | None = None
+_sizing_executor_lock = threading.Lock()
+
+
+def _get_sizing_executor() -> ThreadPoolExecutor:
+    global _sizing_executor
+    with _sizing_executor_lock:
+        if _sizing_executor is None:
+            _sizing_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="CacheResourceSizer"
+            )
+        return _sizing_executor
+
 
 def _equal_validate_funcs(a: ValidateFunc | None, b: ValidateFunc | None) -> bool:
     """True if the two validate functions are equal for the purposes of
@@ -80,6 +104,9 @@ class ResourceCaches(CacheStatsProvider):
         max_entries: int | float | None,
         ttl: float | timedelta | str | None,
         validate: ValidateFunc | None,
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
+        sizeof: SizeofFunc | None = None,
     ) -> ResourceCache:
         """Return the mem cache for the given key.
 
@@ -89,6 +116,15 @@ class ResourceCaches(CacheStatsProvider):
             max_entries = math.inf
 
         ttl_seconds = time_to_seconds(ttl)
+        # Values refreshed in the background are kept until they've been stale
+        # for `max_staleness`.
+        stale_ttl_seconds = get_stale_ttl_seconds(
+            None if math.isinf(ttl_seconds) else ttl_seconds,
+            refresh,
+            max_staleness,
+        )
+        if stale_ttl_seconds is None:
+            stale_ttl_seconds = math.inf
 
         # Get the existing cache, if it exists, and validate that its params
         # haven't changed.
@@ -97,8 +133,11 @@ class ResourceCaches(CacheStatsProvider):
             if (
                 cache is not None
                 and cache.ttl_seconds == ttl_seconds
+                and cache.refresh == refresh
+                and cache.stale_ttl_seconds == stale_ttl_seconds
                 and cache.max_entries == max_entries
                 and _equal_validate_funcs(cache.validate, validate)
+                and (cache.sizeof is None) == (sizeof is None)
             ):
                 return cache
 
@@ -110,6 +149,9 @@ class ResourceCaches(CacheStatsProvider):
                 max_entries=max_entries,
                 ttl_seconds=ttl_seconds,
                 validate=validate,
+                refresh=refresh,
+                stale_ttl_seconds=stale_ttl_seconds,
+                sizeof=sizeof,
             )
             self._function_caches[key] = cache
             return cache
@@ -151,6 +193,9 @@ class CachedResourceFuncInfo(CachedFuncInfo):
         ttl: float | timedelta | str | None,
         validate: ValidateFunc | None,
         hash_funcs: HashFuncsDict | None = None,
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
+        sizeof: SizeofFunc | None = None,
     ):
         super().__init__(
             func,
@@ -160,6 +205,9 @@ class CachedResourceFuncInfo(CachedFuncInfo):
         self.max_entries = max_entries
         self.ttl = ttl
         self.validate = validate
+        self.refresh = refresh
+        self.max_staleness = max_staleness
+        self.sizeof = sizeof
 
     @property
     def cache_type(self) -> CacheType:
@@ -181,6 +229,9 @@ class CachedResourceFuncInfo(CachedFuncInfo):
             max_entries=self.max_entries,
             ttl=self.ttl,
             validate=self.validate,
+            refresh=self.refresh,
+            max_staleness=self.max_staleness,
+            sizeof=self.sizeof,
         )
 
 
@@ -222,6 +273,9 @@ class CacheResourceAPI:
         validate: ValidateFunc | None = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
+        sizeof: SizeofFunc | None = None,
     ) -> Callable[[F], F]: ...
 
     def __call__(
@@ -234,6 +288,9 @@ class CacheResourceAPI:
         validate: ValidateFunc | None = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
+        sizeof: SizeofFunc | None = None,
     ):
         return self._decorator(
             func,
@@ -243,6 +300,9 @@ class CacheResourceAPI:
             validate=validate,
             experimental_allow_widgets=experimental_allow_widgets,
             hash_funcs=hash_funcs,
+            refresh=refresh,
+            max_staleness=max_staleness,
+            sizeof=sizeof,
         )
 
     def _decorator(
@@ -255,6 +315,9 @@ class CacheResourceAPI:
         validate: ValidateFunc | None,
         experimental_allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        refresh: CacheRefreshType = "blocking",
+        max_staleness: float | timedelta | str | None = None,
+        sizeof: SizeofFunc | None = None,
     ):
         """Decorator to cache functions that return global resources (e.g. database connections, ML models).
 
@@ -316,6 +379,36 @@ class CacheResourceAPI:
             the provided function to generate a hash for it. See below for an example
             of how this can be used.
 
+        refresh : "blocking" or "background"
+            What happens when the ``ttl`` of a cached entry expires. Can be
+            one of:
+
+            * ``"blocking"`` (default): the entry is removed from the cache,
+              and the next call recomputes it.
+            * ``"background"``: calls keep returning the expired entry while it
+              is recomputed on a background thread. If the function calls
+              Streamlit commands, the expired entry is recomputed by the next
+              call instead, like with ``"blocking"``.
+
+            This has no effect if ``ttl`` is None.
+
+        max_staleness : float, timedelta, str, or None
+            How long an entry whose ``ttl`` expired is still returned while
+            it's recomputed, if ``refresh="background"``. Older entries are
+            removed from the cache, and the next call recomputes them. Accepts
+            the same values as ``ttl``. If None (default), expired entries are
+            returned no matter how old they are.
+
+        sizeof : callable or None
+            A function that returns the size in bytes of a cached resource.
+            Streamlit reports this size in its cache memory usage stats. The
+            size is computed once, in a background thread, when the resource
+            is cached. If None (default), Streamlit estimates the size by
+            walking all objects the resource references. For very large
+            resources (e.g. ML models) this may take too long, in which case
+            the resource is left out of the stats. Pass ``sizeof`` to report
+            the size of such resources.
+
         .. deprecated::
             The cached widget replay functionality was removed in 1.38. Please
             remove the ``experimental_allow_widgets`` parameter from your
@@ -404,6 +497,8 @@ class CacheResourceAPI:
         ... def get_person_name(person: Person):
         ...     return person.name
         """
+        validate_refresh_params(refresh, max_staleness)
+
         if experimental_allow_widgets:
             show_widget_replay_deprecation("cache_resource")
 
@@ -418,6 +513,9 @@ class CacheResourceAPI:
                     ttl=ttl,
                     validate=validate,
                     hash_funcs=hash_funcs,
+                    refresh=refresh,
+                    max_staleness=max_staleness,
+                    sizeof=sizeof,
                 )
             )
 
@@ -429,6 +527,9 @@ class CacheResourceAPI:
                 ttl=ttl,
                 validate=validate,
                 hash_funcs=hash_funcs,
+                refresh=refresh,
+                max_staleness=max_staleness,
+                sizeof=sizeof,
             )
         )
 
@@ -439,7 +540,14 @@ class CacheResourceAPI:
 
 
 class ResourceCache(Cache):
-    """Manages cached values for a single st.cache_resource function."""
+    """Manages cached values for a single st.cache_resource function.
+
+    If `refresh` is "background", values are kept for `stale_ttl_seconds`, and
+    refreshed in the background once they're older than `ttl_seconds`.
+
+    The size of each entry is computed once, in a background thread, when it's
+    written, so that gathering stats doesn't have to walk the cached objects.
+    """
 
     def __init__(
         self,
@@ -448,15 +556,33 @@ class ResourceCache(Cache):
         ttl_seconds: float,
         validate: ValidateFunc | None,
         display_name: str,
+        refresh: CacheRefreshType = "blocking",
+        stale_ttl_seconds: float = math.inf,
+        sizeof: SizeofFunc | None = None,
     ):
-        super().__init__()
+        staleness = None
+        if refresh == "background" and not math.isinf(ttl_seconds):
+            staleness = StalenessTracker(
+                ttl_seconds=ttl_seconds,
+                stale_ttl_seconds=stale_ttl_seconds,
+                max_entries=max_entries,
+            )
+        super().__init__(staleness)
         self.key = key
         self.display_name = display_name
+        self.refresh = refresh
+        self.stale_ttl_seconds = stale_ttl_seconds if staleness else ttl_seconds
+        self._ttl_seconds = ttl_seconds
         self._mem_cache: TTLCache[str, CachedResult] = TTLCache(
-            maxsize=max_entries, ttl=ttl_seconds, timer=cache_utils.TTLCACHE_TIMER
+            maxsize=max_entries,
+            ttl=self.stale_ttl_seconds,
+            timer=cache_utils.TTLCACHE_TIMER,
         )
         self._mem_cache_lock = threading.Lock()
         self.validate = validate
+        self.sizeof = sizeof
+        # The sizes of the entries, once they've been computed.
+        self._entry_sizes: dict[str, int] = {}
 
     @property
     def max_entries(self) -> float:
@@ -464,7 +590,7 @@ class ResourceCache(Cache):
 
     @property
     def ttl_seconds(self) -> float:
-        return self._mem_cache.ttl
+        return self._ttl_seconds
 
     def read_result(self, key: str) -> CachedResult:
         """Read a value and associated messages from the cache.
@@ -490,31 +616,62 @@ class ResourceCache(Cache):
         main_id = st._main.id
         sidebar_id = st.sidebar.id
 
+        entry = CachedResult(value, messages, main_id, sidebar_id)
         with self._mem_cache_lock:
-            self._mem_cache[key] = CachedResult(value, messages, main_id, sidebar_id)
+            self._mem_cache[key] = entry
+            self._entry_sizes.pop(key, None)
+        _get_sizing_executor().submit(self._compute_entry_size, key, entry)
+
+    def _compute_entry_size(self, key: str, entry: CachedResult) -> None:
+        size: int | None
+        try:
+            if self.sizeof is not None:
+                size = self.sizeof(entry.value)
+            else:
+                from streamlit.runtime.caching.sizing import estimate_size
+
+                size = estimate_size(entry, _SIZE_ESTIMATE_TIMEOUT_SECS)
+        except Exception:
+            _LOGGER.warning(
+                "Failed to compute the size of a cached %s value",
+                self.display_name,
+                exc_info=True,
+            )
+            return
+        if size is None:
+            # The size is unknown, the entry is left out of the stats.
+            return
+
+        with self._mem_cache_lock:
+            # The entry may have been replaced or removed in the meantime.
+            if self._mem_cache.get(key) is entry:
+                self._entry_sizes[key] = size
 
     def _clear(self, key: str | None = None) -> None:
         with self._mem_cache_lock:
             if key is None:
                 self._mem_cache.clear()
-            elif key in self._mem_cache:
-                del self._mem_cache[key]
+                self._entry_sizes.clear()
+            else:
+                self._mem_cache.pop(key, None)
+                self._entry_sizes.pop(key, None)
 
     def get_stats(self) -> list[CacheStat]:
-        # Shallow clone our cache. Computing item sizes is potentially
-        # expensive, and we want to minimize the time we spend holding
-        # the lock.
+        """Return the stats of the entries whose size has been computed."""
         with self._mem_cache_lock:
-            cache_entries = list(self._mem_cache.values())
-
-        # Lazy-load vendored package to prevent import of numpy
-        from streamlit.vendor.pympler.asizeof import asizeof
+            # Forget the sizes of expired and evicted entries.
+            self._entry_sizes = {
+                key: size
+                for key, size in self._entry_sizes.items()
+                if key in self._mem_cache
+            }
+            sizes = list(self._entry_sizes.values())
 
         return [
             CacheStat(
                 category_name="st_cache_resource",
                 cache_name=self.display_name,
-                byte_length=asizeof(entry),
+                byte_length=size,
             )
-            for entry in cache_entries
+            for size in sizes
         ]
@@ -17,18 +17,25 @@
 from __future__ import annotations
 
 import contextlib
+import copy
 import functools
 import hashlib
 import inspect
+import math
 import threading
 import time
 from abc import abstractmethod
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Callable, Final
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterator, Literal
 
-from streamlit import type_util
+from cachetools import TTLCache
+from typing_extensions import TypeAlias
+
+from streamlit import config, type_util
 from streamlit.dataframe_util import is_unevaluated_data_object
-from streamlit.elements.spinner import spinner
+from streamlit.elements.spinner import updatable_spinner
+from streamlit.errors import StreamlitAPIException
 from streamlit.logger import get_logger
 from streamlit.runtime.caching.cache_errors import (
     CacheError,
@@ -46,9 +53,12 @@ from streamlit.runtime.caching.cached_message_replay import (
     replay_cached_messages,
 )
 from streamlit.runtime.caching.hashing import HashFuncsDict, update_hash
+from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+from streamlit.time_util import time_to_seconds
 from streamlit.util import HASHLIB_KWARGS
 
 if TYPE_CHECKING:
+    from datetime import timedelta
     from types import FunctionType
 
     from streamlit.runtime.caching.cache_type import CacheType
@@ -59,13 +69,213 @@ _LOGGER: Final = get_logger(__name__)
 # is exposed here as a constant so that it can be patched in unit tests.
 TTLCACHE_TIMER = time.monotonic
 
+# How often a thread that waits for a value (or for a computation slot) wakes
+# up to handle stop and rerun requests of its script, rather than staying
+# blocked until the value is computed, and to update its spinner.
+COMPUTE_WAIT_INTERVAL_SECS = 1.0
+
+
+def _acquire_interruptibly(
+    lock: threading.Lock | threading.Semaphore,
+    on_waiting: Callable[[float], None],
+) -> None:
+    """Acquire the lock or semaphore, waking up every COMPUTE_WAIT_INTERVAL_SECS
+    to handle stop and rerun requests of the current script run, which raise
+    to abandon the wait, and to call `on_waiting` with the number of seconds
+    waited so far.
+    """
+    if lock.acquire(blocking=False):
+        return
+    start = time.monotonic()
+    while not lock.acquire(timeout=COMPUTE_WAIT_INTERVAL_SECS):
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            ctx.session_state.yield_to_script_runner()
+        on_waiting(time.monotonic() - start)
+
+
+class _ComputationSlots:
+    """Limits the number of cached values that are computed at the same time,
+    across all sessions, to `runner.maxConcurrentCacheComputations`.
+
+    A slot is taken by the outermost cached function call that computes a
+    value. Cached functions called while computing it share its slot. A thread
+    gives its slot back while it waits for a value that another thread is
+    computing, so that threads holding slots never wait for each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._max_slots = 0
+        self._semaphore: threading.Semaphore | None = None
+        self._local = threading.local()
+
+    def _get_semaphore(self) -> threading.Semaphore | None:
+        max_slots = config.get_option("runner.maxConcurrentCacheComputations")
+        with self._lock:
+            if max_slots != self._max_slots:
+                self._max_slots = max_slots
+                self._semaphore = (
+                    threading.Semaphore(max_slots) if max_slots > 0 else None
+                )
+            return self._semaphore
+
+    @property
+    def _held(self) -> threading.Semaphore | None:
+        """The semaphore the current thread holds a slot of, if any."""
+        held: threading.Semaphore | None = getattr(self._local, "semaphore", None)
+        return held
+
+    @contextlib.contextmanager
+    def computing(self, on_waiting: Callable[[float], None]) -> Iterator[None]:
+        """Hold a slot while computing a value, waiting for one if needed."""
+        if getattr(self._local, "depth", 0) > 0:
+            # A cached function called by the function holding the slot.
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        semaphore = self._get_semaphore()
+        if semaphore is not None:
+            _acquire_interruptibly(semaphore, on_waiting)
+        self._local.semaphore = semaphore
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            if semaphore is not None and self._held is semaphore:
+                semaphore.release()
+            self._local.semaphore = None
+
+    @contextlib.contextmanager
+    def released(self, on_waiting: Callable[[float], None]) -> Iterator[None]:
+        """Give the current thread's slot (if any) back while waiting."""
+        semaphore = self._held
+        if semaphore is None:
+            yield
+            return
+
+        semaphore.release()
+        self._local.semaphore = None
+        # If the wait raises, the slot stays released: `computing` only releases
+        # the slot the thread still holds.
+        yield
+        _acquire_interruptibly(semaphore, on_waiting)
+        self._local.semaphore = semaphore
+
+
+_computation_slots = _ComputationSlots()
+
+# How values are refreshed once their ttl has expired: "blocking" (the next
+# caller recomputes the value) or "background" (callers get the expired value
+# while it's recomputed on a worker thread).
+CacheRefreshType: TypeAlias = Literal["blocking", "background"]
+
+
+def validate_refresh_params(
+    refresh: str, max_staleness: float | timedelta | str | None
+) -> None:
+    """Raise a StreamlitAPIException if the refresh params of a cache decorator
+    are invalid.
+    """
+    if refresh not in ("blocking", "background"):
+        raise StreamlitAPIException(
+            f"Unsupported refresh option '{refresh}'. "
+            "Valid values are 'blocking' or 'background'."
+        )
+    if max_staleness is not None and refresh != "background":
+        raise StreamlitAPIException(
+            '`max_staleness` can only be used together with `refresh="background"`.'
+        )
+
+
+def get_stale_ttl_seconds(
+    ttl_seconds: float | None,
+    refresh: CacheRefreshType,
+    max_staleness: float | timedelta | str | None,
+) -> float | None:
+    """Return how long values have to be kept in the storage of a cache: `ttl`
+    plus, if values are refreshed in the background, `max_staleness`.
+    """
+    if ttl_seconds is None or refresh != "background":
+        return ttl_seconds
+    stale_ttl_seconds = ttl_seconds + time_to_seconds(max_staleness)
+    return None if math.isinf(stale_ttl_seconds) else stale_ttl_seconds
+
+
+class StalenessTracker:
+    """Keeps track of when the values of a cache with `refresh="background"`
+    were computed, and of the values that are being refreshed.
+
+    Values whose computation time isn't known (e.g. values read from a
+    persistent storage after a server restart) are considered stale.
+    """
+
+    def __init__(
+        self, ttl_seconds: float, stale_ttl_seconds: float, max_entries: float
+    ):
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._computed_at: TTLCache[str, float] = TTLCache(
+            maxsize=max_entries, ttl=stale_ttl_seconds, timer=TTLCACHE_TIMER
+        )
+        self._refreshing: set[str] = set()
+
+    def is_stale(self, value_key: str) -> bool:
+        with self._lock:
+            computed_at = self._computed_at.get(value_key)
+        return (
+            computed_at is None or TTLCACHE_TIMER() - computed_at >= self._ttl_seconds
+        )
+
+    def mark_fresh(self, value_key: str) -> None:
+        with self._lock:
+            self._computed_at[value_key] = TTLCACHE_TIMER()
+
+    def start_refresh(self, value_key: str) -> bool:
+        """Return False if the value is already being refreshed."""
+        with self._lock:
+            if value_key in self._refreshing:
+                return False
+            self._refreshing.add(value_key)
+            return True
+
+    def end_refresh(self, value_key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(value_key)
+
+    def clear(self, value_key: str | None = None) -> None:
+        with self._lock:
+            if not value_key:
+                self._computed_at.clear()
+            else:
+                self._computed_at.pop(value_key, None)
+
+
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(thread_name_prefix="CacheRefresher")
+        return _refresh_executor
+
 
 class Cache:
     """Function cache interface. Caches persist across script runs."""
 
-    def __init__(self):
+    def __init__(self, staleness: StalenessTracker | None = None):
         self._value_locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
         self._value_locks_lock = threading.Lock()
+        # Set for caches whose expired values are refreshed in the background.
+        self.staleness = staleness
 
     @abstractmethod
     def read_result(self, value_key: str) -> CachedResult:
@@ -107,6 +317,8 @@ class Cache:
                 self._value_locks.clear()
             elif key in self._value_locks:
                 del self._value_locks[key]
+        if self.staleness is not None:
+            self.staleness.clear(key)
         self._clear(key=key)
 
     @abstractmethod
@@ -184,6 +396,10 @@ class BoundCachedFunc:
             self._cached_func.clear()
 
 
+def _is_stale(cache: Cache, value_key: str) -> bool:
+    return cache.staleness is not None and cache.staleness.is_stale(value_key)
+
+
 class CachedFunc:
     def __init__(self, info: CachedFuncInfo):
         self._info = info
@@ -213,13 +429,20 @@ class CachedFunc:
             message = self._info.show_spinner
 
         if self._info.show_spinner or isinstance(self._info.show_spinner, str):
-            with spinner(message, _cache=True):
-                return self._get_or_create_cached_value(args, kwargs)
+            with updatable_spinner(message, cache=True) as set_spinner_text:
+
+                def on_waiting(reason: str, waited_secs: float) -> None:
+                    set_spinner_text(f"{message} ({reason}, {waited_secs:.0f}s)")
+
+                return self._get_or_create_cached_value(args, kwargs, on_waiting)
         else:
             return self._get_or_create_cached_value(args, kwargs)
 
     def _get_or_create_cached_value(
-        self, func_args: tuple[Any, ...], func_kwargs: dict[str, Any]
+        self,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+        on_waiting: Callable[[str, float], None] | None = None,
     ) -> Any:
         # Retrieve the function's cache object. We must do this "just-in-time"
         # (as opposed to in the constructor), because caches can be invalidated
@@ -238,8 +461,19 @@ class CachedFunc:
 
         with contextlib.suppress(CacheKeyNotFoundError):
             cached_result = cache.read_result(value_key)
-            return self._handle_cache_hit(cached_result)
-        return self._handle_cache_miss(cache, value_key, func_args, func_kwargs)
+            if not _is_stale(cache, value_key):
+                return self._handle_cache_hit(cached_result)
+            if not cached_result.messages and self._refresh_in_background(
+                cache, value_key, func_args, func_kwargs
+            ):
+                # Serve the stale value while it's refreshed on a worker thread.
+                return self._handle_cache_hit(cached_result)
+            # Functions that call Streamlit commands, or whose arguments can't
+            # be copied, are refreshed in the foreground, see
+            # `_refresh_in_background`.
+        return self._handle_cache_miss(
+            cache, value_key, func_args, func_kwargs, on_waiting
+        )
 
     def _handle_cache_hit(self, result: CachedResult) -> Any:
         """Handle a cache hit: replay the result's cached messages, and return its value."""
@@ -256,6 +490,7 @@ class CachedFunc:
         value_key: str,
         func_args: tuple[Any, ...],
         func_kwargs: dict[str, Any],
+        on_waiting: Callable[[str, float], None] | None = None,
     ) -> Any:
         """Handle a cache miss: compute a new cached value, write it back to the cache,
         and return that newly-computed value.
@@ -278,52 +513,155 @@ class CachedFunc:
         #   This means that the happy path ("cache entry exists") is a wee bit faster because
         #   no lock is acquired. But the unhappy path ("cache entry needs to be recomputed") is
         #   a wee bit slower, because we do two lookups for the entry.
+        #
+        # - Threads waiting for a lock wake up periodically to handle stop and
+        #   rerun requests of their script, and to update their spinner.
+        #
+        # - The number of values computed at the same time can be limited with
+        #   `runner.maxConcurrentCacheComputations`, see `_ComputationSlots`.
+
+        def wait_status(reason: str) -> Callable[[float], None]:
+            if on_waiting is None:
+                return lambda waited_secs: None
+            return functools.partial(on_waiting, reason)
+
+        value_lock = cache.compute_value_lock(value_key)
+        with contextlib.ExitStack() as stack:
+            with _computation_slots.released(wait_status("waiting for a free slot")):
+                _acquire_interruptibly(
+                    value_lock, wait_status("computed by another session")
+                )
+                stack.callback(value_lock.release)
 
-        with cache.compute_value_lock(value_key):
             # We've acquired the lock - but another thread may have acquired it first
             # and already computed the value. So we need to test for a cache hit again,
             # before computing.
             try:
                 cached_result = cache.read_result(value_key)
-                # Another thread computed the value before us. Early exit!
-                return self._handle_cache_hit(cached_result)
+                if not _is_stale(cache, value_key):
+                    # Another thread computed the value before us. Early exit!
+                    return self._handle_cache_hit(cached_result)
             except CacheKeyNotFoundError:
                 # No cache hit -> we will call the cached function
                 # below.
                 pass
 
             # We acquired the lock before any other thread. Compute the value!
-            with self._info.cached_message_replay_ctx.calling_cached_function(
-                self._info.func
-            ):
-                computed_value = self._info.func(*func_args, **func_kwargs)
+            return self._compute_value(
+                cache,
+                value_key,
+                func_args,
+                func_kwargs,
+                wait_status("waiting for a free slot"),
+            )
 
-            # We've computed our value, and now we need to write it back to the cache
-            # along with any "replay messages" that were generated during value computation.
-            messages = self._info.cached_message_replay_ctx._most_recent_messages
-            try:
-                cache.write_result(value_key, computed_value, messages)
-                return computed_value
-            except (CacheError, RuntimeError) as ex:
-                # An exception was thrown while we tried to write to the cache. Report
-                # it to the user. (We catch `RuntimeError` here because it will be
-                # raised by Apache Spark if we do not collect dataframe before
-                # using `st.cache_data`.)
-                if is_unevaluated_data_object(computed_value):
-                    # If the returned value is an unevaluated dataframe, raise an error.
-                    # Unevaluated dataframes are not yet in the local memory, which also
-                    # means they cannot be properly cached (serialized).
-                    raise UnevaluatedDataFrameError(
-                        f"The function {get_cached_func_name_md(self._info.func)} is "
-                        "decorated with `st.cache_data` but it returns an unevaluated "
-                        f"data object of type `{type_util.get_fqn_type(computed_value)}`. "
-                        "Please convert the object to a serializable format "
-                        "(e.g. Pandas DataFrame) before returning it, so "
-                        "`st.cache_data` can serialize and cache it."
-                    ) from ex
-                raise UnserializableReturnValueError(
-                    return_value=computed_value, func=self._info.func
-                )
+    def _refresh_in_background(
+        self,
+        cache: Cache,
+        value_key: str,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+    ) -> bool:
+        """Recompute a stale value on a worker thread, unless it's already being
+        refreshed. Return False if the value must be recomputed in the
+        foreground instead.
+
+        The worker thread has no script run context: Streamlit commands called
+        by the function don't display anything, and the messages they produce
+        can't be replayed correctly. That's why stale values of functions that
+        call Streamlit commands are recomputed in the foreground instead.
+
+        The worker is given deep copies of the arguments, since the script may
+        mutate them after the call, and the value computed from them is stored
+        under the key of their current content.
+        """
+        assert cache.staleness is not None
+        if not cache.staleness.start_refresh(value_key):
+            return True
+        try:
+            func_args, func_kwargs = copy.deepcopy((func_args, func_kwargs))
+        except Exception:
+            _LOGGER.debug(
+                "Failed to copy the arguments of %s, refreshing in the foreground.",
+                self._info.func.__qualname__,
+                exc_info=True,
+            )
+            cache.staleness.end_refresh(value_key)
+            return False
+        _get_refresh_executor().submit(
+            self._refresh, cache, value_key, func_args, func_kwargs
+        )
+        return True
+
+    def _refresh(
+        self,
+        cache: Cache,
+        value_key: str,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+    ) -> None:
+        assert cache.staleness is not None
+        try:
+            with cache.compute_value_lock(value_key):
+                # The value may have been recomputed while we waited for the lock.
+                if cache.staleness.is_stale(value_key):
+                    self._compute_value(
+                        cache, value_key, func_args, func_kwargs, lambda _: None
+                    )
+        except Exception:
+            _LOGGER.exception(
+                "Failed to refresh a cached value of %s, keeping the stale value.",
+                self._info.func.__qualname__,
+            )
+        finally:
+            cache.staleness.end_refresh(value_key)
+
+    def _compute_value(
+        self,
+        cache: Cache,
+        value_key: str,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+        on_waiting_for_slot: Callable[[float], None],
+    ) -> Any:
+        """Call the cached function, and write the value it returns to the cache.
+        The caller must hold the value's compute_value_lock.
+        """
+        with _computation_slots.computing(
+            on_waiting_for_slot
+        ), self._info.cached_message_replay_ctx.calling_cached_function(
+            self._info.func
+        ):
+            computed_value = self._info.func(*func_args, **func_kwargs)
+
+        # We've computed our value, and now we need to write it back to the cache
+        # along with any "replay messages" that were generated during value computation.
+        messages = self._info.cached_message_replay_ctx._most_recent_messages
+        try:
+            cache.write_result(value_key, computed_value, messages)
+            if cache.staleness is not None:
+                cache.staleness.mark_fresh(value_key)
+            return computed_value
+        except (CacheError, RuntimeError) as ex:
+            # An exception was thrown while we tried to write to the cache. Report
+            # it to the user. (We catch `RuntimeError` here because it will be
+            # raised by Apache Spark if we do not collect dataframe before
+            # using `st.cache_data`.)
+            if is_unevaluated_data_object(computed_value):
+                # If the returned value is an unevaluated dataframe, raise an error.
+                # Unevaluated dataframes are not yet in the local memory, which also
+                # means they cannot be properly cached (serialized).
+                raise UnevaluatedDataFrameError(
+                    f"The function {get_cached_func_name_md(self._info.func)} is "
+                    "decorated with `st.cache_data` but it returns an unevaluated "
+                    f"data object of type `{type_util.get_fqn_type(computed_value)}`. "
+                    "Please convert the object to a serializable format "
+                    "(e.g. Pandas DataFrame) before returning it, so "
+                    "`st.cache_data` can serialize and cache it."
+                ) from ex
+            raise UnserializableReturnValueError(
+                return_value=computed_value, func=self._info.func
+            )
 
     def clear(self, *args, **kwargs):
         """Clear the cached function's associated cache.
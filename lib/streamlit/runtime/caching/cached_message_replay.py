@@ -22,7 +22,12 @@ from typing import TYPE_CHECKING, Any, Iterator, Literal, Union
 import streamlit as st
 from streamlit import runtime, util
 from streamlit.deprecation_util import show_deprecation_warning
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime.caching.cache_errors import CacheReplayClosureError
+from streamlit.runtime.forward_msg_cache import (
+    get_payload_store,
+    serialize_msg_payload,
+)
 from streamlit.runtime.scriptrunner_utils.script_run_context import (
     in_cached_function,
 )
@@ -50,6 +55,10 @@ class ElementMsgData:
     replaying that element's function call.
 
     media_data is filled in iff this is a media element (image, audio, video).
+
+    payload_hash is the hash of the payload of the ForwardMsg that displays the
+    element, whose serialized form may be in the ForwardMsgPayloadStore. It's
+    None for elements cached by older Streamlit versions.
     """
 
     delta_type: str
@@ -57,6 +66,7 @@ class ElementMsgData:
     id_of_dg_called_on: str
     returned_dgs_id: str
     media_data: list[MediaMsgData] | None = None
+    payload_hash: str | None = None
 
 
 @dataclass(frozen=True)
@@ -181,6 +191,7 @@ class CachedMessageReplayContext(threading.local):
                 id_to_save,
                 returned_dg_id,
                 media_data,
+                payload_hash=_store_element_payload(delta_type, element_proto),
             )
             for msgs in self._cached_message_stack:
                 msgs.append(element_msg_data)
@@ -226,6 +237,17 @@ class CachedMessageReplayContext(threading.local):
         self._media_data.append(MediaMsgData(image_data, mimetype, image_id))
 
 
+def _store_element_payload(delta_type: str, element_proto: Message) -> str:
+    """Serialize the payload of the ForwardMsg that displays an element, store
+    it in the ForwardMsgPayloadStore, and return its hash.
+
+    This must match the message built by `DeltaGenerator._enqueue`.
+    """
+    msg = ForwardMsg()
+    getattr(msg.delta.new_element, delta_type).CopyFrom(element_proto)
+    return get_payload_store().add_payload(serialize_msg_payload(msg))
+
+
 def replay_cached_messages(
     result: CachedResult, cache_type: CacheType, cached_func: FunctionType
 ) -> None:
@@ -261,7 +283,9 @@ def replay_cached_messages(
                             data.media, data.mimetype, data.media_id
                         )
                 dg = returned_dgs[msg.id_of_dg_called_on]
-                maybe_dg = dg._enqueue(msg.delta_type, msg.message)
+                maybe_dg = dg._enqueue(
+                    msg.delta_type, msg.message, payload_hash=msg.payload_hash
+                )
                 if isinstance(maybe_dg, DeltaGenerator):
                     returned_dgs[msg.returned_dgs_id] = maybe_dg
             elif isinstance(msg, BlockMsgData):
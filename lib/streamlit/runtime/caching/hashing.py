@@ -31,9 +31,20 @@ import tempfile
 import threading
 import uuid
 import weakref
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from types import MappingProxyType
-from typing import Any, Callable, Dict, Final, Pattern, Type, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Pattern,
+    Type,
+    Union,
+    cast,
+)
 
 from typing_extensions import TypeAlias
 
@@ -44,13 +55,23 @@ from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 from streamlit.util import HASHLIB_KWARGS
 
-# If a dataframe has more than this many rows, we consider it large and hash a sample.
-_PANDAS_ROWS_LARGE: Final = 100000
-_PANDAS_SAMPLE_SIZE: Final = 10000
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+# The memory of DataFrame columns, NumPy arrays and Arrow tables is hashed in
+# full, in chunks of this size, with BLAKE2b. The chunk digests of larger
+# buffers are combined into a single digest, so the result doesn't depend on
+# threading. The algorithm must not depend on which packages are installed,
+# since hashes are persisted and shared between processes (e.g. with
+# persist="disk" and the SQLite cache storage).
+_BUFFER_HASH_CHUNK_SIZE: Final = 4 * 1024 * 1024
 
-# Similar to dataframes, we also sample large numpy arrays.
-_NP_SIZE_LARGE: Final = 1000000
-_NP_SAMPLE_SIZE: Final = 100000
+# If there is at least this much memory to hash, its chunks are hashed in
+# parallel. (hashlib releases the GIL while hashing large buffers.)
+_PARALLEL_BUFFER_HASH_MIN_SIZE: Final = 2 * _BUFFER_HASH_CHUNK_SIZE
+_MAX_BUFFER_HASH_THREADS: Final = min(8, os.cpu_count() or 1)
 
 HashFuncsDict: TypeAlias = Dict[Union[str, Type[Any]], Callable[[Any], Any]]
 
@@ -227,6 +248,179 @@ class _HashStacks:
 hash_stacks = _HashStacks()
 
 
+class _ImmutableValueHashes:
+    """Hashes of values that are never mutated, keyed by the values' identity.
+
+    Values are registered when they're handed out by a cache that forbids
+    mutating them (e.g. `st.cache_data(copy="none")`). Such a value is only
+    hashed the first time it's passed to a cached function, in this or any
+    later script run. Entries are dropped when their value is garbage
+    collected, so a recycled `id` can't return a stale hash.
+
+    Values that don't support weak references (e.g. lists and dicts) can't be
+    registered, and are hashed every time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[weakref.ref[Any], bytes | None]] = {}
+
+    def __repr__(self) -> str:
+        return util.repr_(self)
+
+    def register(self, value: Any) -> None:
+        """Mark the value as never being mutated."""
+        key = id(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is value:
+                return
+
+            def on_collected(ref: weakref.ref[Any]) -> None:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] is ref:
+                        del self._entries[key]
+
+            try:
+                ref = weakref.ref(value, on_collected)
+            except TypeError:
+                return
+            self._entries[key] = (ref, None)
+
+    def get(self, value: Any) -> bytes | None:
+        """Return the hash of a registered value, if it was already computed."""
+        entry = self._entries.get(id(value))
+        if entry is None or entry[0]() is not value:
+            return None
+        return entry[1]
+
+    def set(self, value: Any, value_hash: bytes) -> None:
+        """Store the hash of a value, if the value is registered."""
+        key = id(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is value:
+                self._entries[key] = (entry[0], value_hash)
+
+
+immutable_value_hashes = _ImmutableValueHashes()
+
+
+_buffer_hash_executor: ThreadPoolExecutor | None = None
+_buffer_hash_executor_lock = threading.Lock()
+
+
+def _get_buffer_hash_executor() -> ThreadPoolExecutor:
+    global _buffer_hash_executor
+    with _buffer_hash_executor_lock:
+        if _buffer_hash_executor is None:
+            _buffer_hash_executor = ThreadPoolExecutor(
+                max_workers=_MAX_BUFFER_HASH_THREADS,
+                thread_name_prefix="CacheBufferHasher",
+            )
+        return _buffer_hash_executor
+
+
+def _new_buffer_hasher() -> hashlib.blake2b:
+    return hashlib.blake2b(digest_size=16, **HASHLIB_KWARGS)
+
+
+def _buffer_digest(buffer: memoryview) -> bytes:
+    h = _new_buffer_hasher()
+    h.update(buffer)
+    return h.digest()
+
+
+def _hash_buffers(buffers: list[memoryview]) -> list[bytes]:
+    """Return a digest of the contents of each buffer.
+
+    Large buffers are split into chunks, and the chunks of all buffers are
+    hashed in parallel if there are enough of them.
+    """
+    chunks: list[memoryview] = []
+    chunk_counts: list[int] = []
+    for buffer in buffers:
+        buffer_chunks = [
+            buffer[start : start + _BUFFER_HASH_CHUNK_SIZE]
+            for start in range(0, buffer.nbytes, _BUFFER_HASH_CHUNK_SIZE)
+        ] or [buffer]
+        chunks.extend(buffer_chunks)
+        chunk_counts.append(len(buffer_chunks))
+
+    total_size = sum(chunk.nbytes for chunk in chunks)
+    if (
+        len(chunks) > 1
+        and total_size >= _PARALLEL_BUFFER_HASH_MIN_SIZE
+        and _MAX_BUFFER_HASH_THREADS > 1
+    ):
+        chunk_digests = iter(_get_buffer_hash_executor().map(_buffer_digest, chunks))
+    else:
+        chunk_digests = map(_buffer_digest, chunks)
+
+    digests = []
+    for chunk_count in chunk_counts:
+        if chunk_count == 1:
+            digests.append(next(chunk_digests))
+            continue
+        h = _new_buffer_hasher()
+        for _ in range(chunk_count):
+            h.update(next(chunk_digests))
+        digests.append(h.digest())
+    return digests
+
+
+def _numpy_buffer(arr: np.ndarray[Any, Any]) -> memoryview:
+    """Return the memory of an array without an object dtype, as bytes. The
+    array is only copied if it isn't contiguous.
+    """
+    import numpy as np
+
+    return np.ascontiguousarray(arr).reshape(-1).view(np.uint8).data
+
+
+def _hash_pandas_values(objs: list[pd.Series | pd.Index]) -> list[bytes]:
+    """Return a digest of the values of each Series or Index, ignoring
+    Series indexes.
+
+    Values with a NumPy dtype are hashed straight from memory. Others (e.g.
+    strings, categoricals, or nullable integers) are hashed with
+    `pd.util.hash_pandas_object`.
+
+    Raises
+    ------
+    TypeError
+        Raised if the values contain unhashable objects.
+    """
+    import numpy as np
+    import pandas as pd
+
+    buffers = []
+    for obj in objs:
+        if isinstance(obj, pd.RangeIndex):
+            buffers.append(memoryview(b"%d:%d:%d" % (obj.start, obj.stop, obj.step)))
+        elif isinstance(obj.dtype, np.dtype) and not obj.dtype.hasobject:
+            buffers.append(_numpy_buffer(obj.to_numpy()))
+        else:
+            if isinstance(obj, pd.Series):
+                hashes = pd.util.hash_pandas_object(obj, index=False)
+            else:
+                hashes = pd.util.hash_pandas_object(obj)
+            buffers.append(_numpy_buffer(hashes.to_numpy()))
+    return _hash_buffers(buffers)
+
+
+def _arrow_ipc_buffer(column: pa.ChunkedArray) -> memoryview:
+    """Return an Arrow column serialized in the IPC stream format."""
+    import pyarrow as pa
+
+    table = pa.table([column], names=["column"])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return memoryview(sink.getvalue())
+
+
 def _int_to_bytes(i: int) -> bytes:
     num_bytes = (i.bit_length() + 8) // 8
     return i.to_bytes(num_bytes, "little", signed=True)
@@ -314,6 +508,13 @@ class _CacheFuncHasher:
             if key in self._hashes:
                 return self._hashes[key]
 
+        # Values that are never mutated are only hashed once. (Unless they're
+        # hashed with user-provided hash funcs, which may give other results.)
+        if not self._hash_funcs:
+            value_hash = immutable_value_hashes.get(obj)
+            if value_hash is not None:
+                return value_hash
+
         # Break recursive cycles.
         if obj in hash_stacks.current:
             return _CYCLE_PLACEHOLDER
@@ -331,6 +532,9 @@ class _CacheFuncHasher:
             if key[1] is not NoResult:
                 self._hashes[key] = b
 
+            if not self._hash_funcs:
+                immutable_value_hashes.set(obj, b)
+
         finally:
             # In case an UnhashableTypeError (or other) error is thrown, clean up the
             # stack so we don't get false positives in future hashing calls
@@ -418,12 +622,11 @@ class _CacheFuncHasher:
             obj = cast(pd.Series, obj)
             self.update(h, obj.size)
             self.update(h, obj.dtype.name)
-
-            if len(obj) >= _PANDAS_ROWS_LARGE:
-                obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
+            self.update(h, obj.index.dtype.name)
 
             try:
-                self.update(h, pd.util.hash_pandas_object(obj).values.tobytes())
+                for digest in _hash_pandas_values([obj.index, obj]):
+                    self.update(h, digest)
                 return h.digest()
             except TypeError:
                 # Use pickle if pandas cannot hash the object for example if
@@ -435,16 +638,16 @@ class _CacheFuncHasher:
 
             obj = cast(pd.DataFrame, obj)
             self.update(h, obj.shape)
+            self.update(h, obj.index.dtype.name)
 
-            if len(obj) >= _PANDAS_ROWS_LARGE:
-                obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
             try:
                 column_hash_bytes = self.to_bytes(
                     pd.util.hash_pandas_object(obj.dtypes)
                 )
                 self.update(h, column_hash_bytes)
-                values_hash_bytes = self.to_bytes(pd.util.hash_pandas_object(obj))
-                self.update(h, values_hash_bytes)
+                columns = [column for _, column in obj.items()]
+                for digest in _hash_pandas_values([obj.index, *columns]):
+                    self.update(h, digest)
                 return h.digest()
             except TypeError:
                 # Use pickle if pandas cannot hash the object for example if
@@ -460,14 +663,37 @@ class _CacheFuncHasher:
             self.update(h, obj.shape)
             self.update(h, str(obj.dtype))
 
-            if obj.size >= _NP_SIZE_LARGE:
-                import numpy as np
-
-                state = np.random.RandomState(0)
-                obj = state.choice(obj.flat, size=_NP_SAMPLE_SIZE)
+            if obj.dtype.hasobject:
+                # The memory of object arrays only holds pointers.
+                self.update(h, obj.tolist())
+            else:
+                self.update(h, _hash_buffers([_numpy_buffer(obj)])[0])
+            return h.digest()
 
-            self.update(h, obj.tobytes())
+        elif type_util.is_type(obj, "pyarrow.lib.Table"):
+            import pyarrow as pa
+
+            obj = cast(pa.Table, obj)
+            self.update(h, str(obj.schema))
+            self.update(h, obj.num_rows)
+
+            buffers = []
+            for column in obj.columns:
+                if "dictionary<" in str(column.type):
+                    # The buffers of dictionary arrays don't include their
+                    # dictionary, so hash the column's serialized form instead.
+                    buffers.append(_arrow_ipc_buffer(column))
+                    continue
+                for chunk in column.chunks:
+                    buffers.append(memoryview(b"%d:%d" % (chunk.offset, len(chunk))))
+                    buffers.extend(
+                        memoryview(buffer) if buffer is not None else memoryview(b"")
+                        for buffer in chunk.buffers()
+                    )
+            for digest in _hash_buffers(buffers):
+                self.update(h, digest)
             return h.digest()
+
         elif type_util.is_type(obj, "PIL.Image.Image"):
             import numpy as np
             from PIL.Image import Image
@@ -475,7 +701,7 @@ class _CacheFuncHasher:
             obj = cast(Image, obj)
 
             # we don't just hash the results of obj.tobytes() because we want to use
-            # the sampling logic for numpy data
+            # the buffer hashing logic for numpy data
             np_array = np.frombuffer(obj.tobytes(), dtype="uint8")
             return self.to_bytes(np_array)
 
@@ -0,0 +1,266 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serialization of st.cache_data entries.
+
+Entries are pickled with protocol 5. Large buffers exposed through the
+`PickleBuffer` protocol (e.g. NumPy arrays, and the pandas and PyArrow objects
+built on top of them) are stored *out-of-band*, after the pickle stream, in a
+simple framed layout:
+
+    magic | buffer count | (offset, length) table | pickle | buffer | buffer | ...
+
+Every section starts at a 64-byte aligned offset. When the serialized entry is
+backed by a writable buffer (e.g. a copy-on-write memory-mapped cache file),
+the out-of-band buffers are handed to `pickle.loads` as zero-copy slices of it.
+
+Entries without large buffers are stored as plain pickles, which also keeps
+entries written by older Streamlit versions readable.
+
+If `global.dataCacheArrowSerialization` is enabled, pandas DataFrames, PyArrow
+Tables and Polars DataFrames found in an entry are pickled as Arrow IPC streams
+(optionally compressed with `global.dataCacheArrowCompression`) instead. Their
+IPC streams are large buffers like any other, so uncompressed streams are read
+back without copying them.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+import struct
+from typing import TYPE_CHECKING, Any, Final
+
+from streamlit import config, dataframe_util
+from streamlit.dataframe_util import DataFormat
+from streamlit.logger import get_logger
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+_LOGGER: Final = get_logger(__name__)
+
+# Marks an entry that uses the framed out-of-band layout. A pickle stream can't
+# start with a NUL byte, so this never collides with plain pickles.
+_OUT_OF_BAND_MAGIC: Final = b"\x00STOOB1\x00"
+
+# Buffers smaller than this are kept in-band: framing them separately isn't
+# worth it.
+_MIN_OUT_OF_BAND_BUFFER_SIZE: Final = 64 * 1024
+
+_ALIGNMENT: Final = 64
+
+_COUNT_FORMAT: Final = "<Q"
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value, storing its large buffers out-of-band.
+
+    Raises
+    ------
+    pickle.PicklingError, TypeError
+        Raised if the value can't be pickled.
+    """
+    buffers: list[pickle.PickleBuffer] = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        # Returning a truthy value serializes the buffer in-band.
+        if buffer.raw().nbytes < _MIN_OUT_OF_BAND_BUFFER_SIZE:
+            return True
+        buffers.append(buffer)
+        return False
+
+    if config.get_option("global.dataCacheArrowSerialization"):
+        file = io.BytesIO()
+        _ArrowPickler(
+            file,
+            compression=_get_arrow_compression(),
+            buffer_callback=buffer_callback,
+        ).dump(value)
+        main = file.getvalue()
+    else:
+        main = pickle.dumps(value, protocol=5, buffer_callback=buffer_callback)
+
+    if not buffers:
+        return main
+
+    sections = [memoryview(main)] + [buffer.raw() for buffer in buffers]
+    table_format = f"<{2 * len(sections)}Q"
+    offset = _align(
+        len(_OUT_OF_BAND_MAGIC)
+        + struct.calcsize(_COUNT_FORMAT)
+        + struct.calcsize(table_format)
+    )
+    table: list[int] = []
+    for section in sections:
+        table.extend((offset, section.nbytes))
+        offset = _align(offset + section.nbytes)
+
+    parts: list[bytes | memoryview] = [
+        _OUT_OF_BAND_MAGIC,
+        struct.pack(_COUNT_FORMAT, len(buffers)),
+        struct.pack(table_format, *table),
+    ]
+    position = sum(len(part) for part in parts)
+    for section_offset, section in zip(table[::2], sections):
+        parts.append(b"\x00" * (section_offset - position))
+        parts.append(section)
+        position = section_offset + section.nbytes
+    return b"".join(parts)
+
+
+def loads(data: bytes | memoryview) -> Any:
+    """Deserialize a value that was serialized with `dumps`.
+
+    If `data` is writable, out-of-band buffers are not copied: the deserialized
+    value shares memory with `data`.
+
+    Raises
+    ------
+    pickle.UnpicklingError
+        Raised if the data can't be unpickled.
+    """
+    view = memoryview(data)
+    if view[: len(_OUT_OF_BAND_MAGIC)].tobytes() != _OUT_OF_BAND_MAGIC:
+        return pickle.loads(view)
+
+    try:
+        position = len(_OUT_OF_BAND_MAGIC)
+        (buffer_count,) = struct.unpack_from(_COUNT_FORMAT, view, position)
+        position += struct.calcsize(_COUNT_FORMAT)
+        table = struct.unpack_from(f"<{2 * (buffer_count + 1)}Q", view, position)
+    except struct.error as ex:
+        raise pickle.UnpicklingError("Truncated out-of-band cache entry") from ex
+
+    sections = []
+    for offset, length in zip(table[::2], table[1::2]):
+        if offset + length > view.nbytes:
+            raise pickle.UnpicklingError("Truncated out-of-band cache entry")
+        sections.append(view[offset : offset + length])
+
+    main, buffers = sections[0], sections[1:]
+    if view.readonly:
+        # Values unpickled from read-only buffers would be read-only themselves,
+        # but callers are free to mutate the values they get from the cache.
+        buffers = [memoryview(bytearray(buffer)) for buffer in buffers]
+    return pickle.loads(main, buffers=buffers)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+# The top-level packages of the dataframe types we serialize with Arrow IPC.
+_ARROW_SERIALIZABLE_PACKAGES: Final = ("pandas", "pyarrow", "polars")
+
+_ARROW_COMPRESSIONS: Final = ("none", "lz4", "zstd")
+
+
+class _ArrowPickler(pickle.Pickler):
+    """Pickler that serializes dataframes as Arrow IPC streams."""
+
+    def __init__(self, file: io.BytesIO, compression: str | None, **kwargs: Any):
+        super().__init__(file, protocol=5, **kwargs)
+        self._compression = compression
+
+    def reducer_override(self, obj: Any) -> Any:
+        # This is called for every object that isn't a builtin scalar or
+        # container, so bail out as cheaply as possible.
+        if type(obj).__module__.partition(".")[0] not in _ARROW_SERIALIZABLE_PACKAGES:
+            return NotImplemented
+
+        table = _to_arrow_table(obj)
+        if table is None:
+            return NotImplemented
+
+        import pyarrow as pa
+
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=self._compression)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        data_format = dataframe_util.determine_data_format(obj)
+        return load_arrow_ipc, (pickle.PickleBuffer(sink.getvalue()), data_format.name)
+
+
+def load_arrow_ipc(buffer: Any, data_format: str) -> Any:
+    """Load a dataframe pickled by _ArrowPickler.
+
+    This is referenced by name in pickled cache entries: don't rename it.
+    """
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(pa.py_buffer(buffer)).read_all()
+    if data_format == DataFormat.PANDAS_DATAFRAME.name:
+        return table.to_pandas()
+    if data_format == DataFormat.POLARS_DATAFRAME.name:
+        import polars as pl  # type: ignore[import-not-found]
+
+        return pl.from_arrow(table)
+    return table
+
+
+def _to_arrow_table(obj: Any) -> pa.Table | None:
+    """Convert a dataframe to an Arrow table, if it can be done without losing
+    information. Return None otherwise.
+    """
+    data_format = dataframe_util.determine_data_format(obj)
+
+    if data_format == DataFormat.PYARROW_TABLE:
+        return obj
+
+    if data_format == DataFormat.POLARS_DATAFRAME:
+        return obj.to_arrow()
+
+    if data_format == DataFormat.PANDAS_DATAFRAME:
+        import pandas as pd
+        import pyarrow as pa
+
+        if (
+            type(obj) is not pd.DataFrame
+            or obj.attrs
+            or getattr(obj.index, "freq", None) is not None
+        ):
+            # Subclasses, attrs and index frequencies don't survive the conversion.
+            return None
+        if not obj.columns.is_unique or not all(
+            isinstance(column, str) for column in obj.columns
+        ):
+            return None
+        for column in obj.columns:
+            series = obj[column]
+            # Object columns only roundtrip if they contain nothing but strings.
+            if series.dtype == object and (
+                pd.api.types.infer_dtype(series, skipna=False) != "string"
+            ):
+                return None
+        try:
+            return pa.Table.from_pandas(obj)
+        except (pa.ArrowException, ValueError, TypeError) as ex:
+            _LOGGER.debug("Pickling dataframe, Arrow conversion failed: %s", ex)
+            return None
+
+    return None
+
+
+def _get_arrow_compression() -> str | None:
+    compression = config.get_option("global.dataCacheArrowCompression")
+    if compression not in _ARROW_COMPRESSIONS:
+        _LOGGER.warning(
+            'Unknown global.dataCacheArrowCompression value "%s", '
+            "Arrow IPC streams will not be compressed.",
+            compression,
+        )
+        return None
+    return None if compression == "none" else compression
@@ -0,0 +1,75 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Estimates the memory used by cached objects, for cache stats.
+
+This imports the vendored pympler package, which imports numpy: import this
+module lazily.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Final
+
+from streamlit.logger import get_logger
+from streamlit.vendor.pympler.asizeof import Asizer
+
+_LOGGER: Final = get_logger(__name__)
+
+# How many objects are sized between two checks of the deadline.
+_DEADLINE_CHECK_INTERVAL: Final = 1000
+
+
+class _DeadlineExceeded(Exception):
+    pass
+
+
+class _DeadlineAsizer(Asizer):
+    """Asizer that gives up once a deadline has passed."""
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self._deadline = deadline
+        self._sized_count = 0
+
+    def _sizer(self, obj, pid, deep, sized):
+        self._sized_count += 1
+        if (
+            self._sized_count % _DEADLINE_CHECK_INTERVAL == 0
+            and time.monotonic() > self._deadline
+        ):
+            # Not a RuntimeError, which Asizer swallows.
+            raise _DeadlineExceeded()
+        return super()._sizer(obj, pid, deep, sized)
+
+
+def estimate_size(obj: Any, timeout_secs: float) -> int | None:
+    """Return the size of an object, including the objects it references.
+
+    Walking the objects referenced by large objects (e.g. ML models) can take
+    seconds. If it takes longer than `timeout_secs`, the size is unknown and
+    None is returned, rather than a shallow size that would be way off.
+    """
+    asizer = _DeadlineAsizer(time.monotonic() + timeout_secs)
+    try:
+        size: int = asizer.asizeof(obj)
+        return size
+    except _DeadlineExceeded:
+        _LOGGER.debug(
+            "Sizing a %s took longer than %ss, its size is unknown.",
+            type(obj).__name__,
+            timeout_secs,
+        )
+        return None
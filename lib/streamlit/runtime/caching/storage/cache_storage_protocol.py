@@ -126,9 +126,13 @@ class CacheStorage(Protocol):
     """
 
     @abstractmethod
-    def get(self, key: str) -> bytes:
+    def get(self, key: str) -> bytes | memoryview:
         """Returns the stored value for the key.
 
+        The value can be returned as a memoryview, e.g. of a memory-mapped file,
+        to avoid copying it. Memoryviews are not kept in the in-memory cache layer,
+        so the storage is asked for the value again on every read.
+
         Raises
         ------
         CacheStorageKeyNotFoundError
@@ -78,16 +78,20 @@ class InMemoryCacheStorageWrapper(CacheStorage):
     def max_entries(self) -> float:
         return float(self._max_entries) if self._max_entries is not None else math.inf
 
-    def get(self, key: str) -> bytes:
+    def get(self, key: str) -> bytes | memoryview:
         """
         Returns the stored value for the key or raise CacheStorageKeyNotFoundError if
         the key is not found
         """
         try:
-            entry_bytes = self._read_from_mem_cache(key)
+            entry_bytes: bytes | memoryview = self._read_from_mem_cache(key)
         except CacheStorageKeyNotFoundError:
             entry_bytes = self._persist_storage.get(key)
-            self._write_to_mem_cache(key, entry_bytes)
+            # Memory-mapped values are already kept in memory by the OS page
+            # cache. Every read maps them again, so that each caller gets its own
+            # copy-on-write view of them.
+            if not isinstance(entry_bytes, memoryview):
+                self._write_to_mem_cache(key, entry_bytes)
         return entry_bytes
 
     def set(self, key: str, value: bytes) -> None:
@@ -128,7 +132,7 @@ class InMemoryCacheStorageWrapper(CacheStorage):
     def _read_from_mem_cache(self, key: str) -> bytes:
         with self._mem_cache_lock:
             if key in self._mem_cache:
-                entry = bytes(self._mem_cache[key])
+                entry: bytes = self._mem_cache[key]
                 _LOGGER.debug("Memory cache HIT: %s", key)
                 return entry
 
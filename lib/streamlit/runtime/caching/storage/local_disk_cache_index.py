@@ -0,0 +1,428 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declares the LocalDiskCacheIndex class, which keeps track of the size,
+creation time and last access time of every file in the disk cache folder.
+
+LocalDiskCacheStorage instances consult the index to enforce `ttl`, `max_entries`
+and the global `global.maxPersistedCacheSize` budget without having to read
+(let alone unpickle) the cached values. The index is persisted next to the
+cached files, so the bookkeeping survives server restarts.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Final
+
+from streamlit.logger import get_logger
+
+_LOGGER: Final = get_logger(__name__)
+
+# Name of the index file stored in the cache folder. Its extension differs
+# from the cached files' extension, so it is never mistaken for a cache entry.
+_INDEX_FILE_NAME: Final = "index.json"
+
+# Bump this if the index format changes. Index files with a different version
+# are discarded and rebuilt from the cache folder contents.
+_INDEX_FORMAT_VERSION: Final = 1
+
+# Changes to the index are written to disk at most this often, rather than
+# on every change, since the whole index is rewritten each time.
+_FLUSH_DELAY_SECONDS: Final = 5.0
+
+# The timer function used to timestamp index entries. Entries have to outlive
+# the server process, so this is wall-clock time rather than
+# `cache_utils.TTLCACHE_TIMER`. Exposed as a constant so that it can be patched
+# in unit tests.
+DISK_CACHE_TIMER = time.time
+
+
+@dataclass
+class LocalDiskCacheIndexEntry:
+    """Bookkeeping for a single file in the disk cache folder."""
+
+    size: int
+    created_at: float
+    last_accessed_at: float
+
+    def is_expired(self, ttl_seconds: float) -> bool:
+        return DISK_CACHE_TIMER() - self.created_at > ttl_seconds
+
+
+@dataclass
+class _PrefixGroup:
+    """The entries whose file names share a prefix."""
+
+    # File names, in least-recently-used order.
+    file_names: OrderedDict[str, None] = field(default_factory=OrderedDict)
+    # (created_at, file_name) of the entries, as a heap. Items of entries that
+    # were since replaced or removed are skipped when they're popped.
+    creation_heap: list[tuple[float, str]] = field(default_factory=list)
+
+
+def _get_prefix(file_name: str) -> str:
+    """Return the prefix that groups a file with the other files of its
+    function: its name up to and including the last "-".
+    """
+    return file_name[: file_name.rfind("-") + 1]
+
+
+class LocalDiskCacheIndex:
+    """Index of the files in a disk cache folder.
+
+    Entries are kept in least-recently-used order, both globally and per file
+    name prefix, and per prefix in a heap by creation time, so evicting
+    entries is a matter of popping from the front of these, without scanning
+    the whole index.
+
+    Changes are kept in memory, and written to the index file a few seconds
+    later, or when `flush` is called. If the process exits in between, the
+    index is brought back in sync with the cache folder when it's next loaded.
+
+    Notes
+    -----
+    Threading: all methods are thread safe. The index only performs file
+    operations for its own index file and for evicted entries; reading and
+    writing the cached values is the responsibility of the caller.
+
+    Processes: every process has its own index, and replaces the index file
+    with its own entries. Entries written by other processes are only adopted
+    when the index is loaded, so limits aren't enforced across processes.
+    """
+
+    def __init__(self, cache_dir: str, file_extension: str):
+        self._cache_dir = cache_dir
+        self._file_extension = file_extension
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, LocalDiskCacheIndexEntry] = OrderedDict()
+        self._groups: dict[str, _PrefixGroup] = {}
+        self._total_bytes = 0
+        self._loaded = False
+        self._dirty = False
+        self._flush_timer: threading.Timer | None = None
+        # Whether an index file exists on disk, as far as we know.
+        self._persisted = False
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self._cache_dir, _INDEX_FILE_NAME)
+
+    def lookup(self, file_name: str) -> LocalDiskCacheIndexEntry | None:
+        """Return the entry for the given file, and mark it as most recently used.
+        Return None if the file is not in the index.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(file_name)
+            if entry is not None:
+                entry.last_accessed_at = DISK_CACHE_TIMER()
+                self._entries.move_to_end(file_name)
+                self._groups[_get_prefix(file_name)].file_names.move_to_end(file_name)
+                self._mark_dirty()
+            return entry
+
+    def record(self, file_name: str, size: int) -> None:
+        """Add (or replace) the entry for a file that was just written."""
+        with self._lock:
+            self._ensure_loaded()
+            now = DISK_CACHE_TIMER()
+            self._remove_entry(file_name)
+            self._add_entry(
+                file_name,
+                LocalDiskCacheIndexEntry(
+                    size=size, created_at=now, last_accessed_at=now
+                ),
+            )
+            self._mark_dirty()
+
+    def discard(self, file_name: str) -> None:
+        """Remove the entry for the given file from the index. The file itself
+        is not touched.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._remove_entry(file_name) is not None:
+                self._mark_dirty()
+
+    def discard_prefix(self, prefix: str) -> None:
+        """Remove all entries of the files starting with the given prefix,
+        which ends with their last "-". The files themselves are not touched.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            group = self._groups.get(prefix)
+            if group is None:
+                return
+            for file_name in list(group.file_names):
+                self._remove_entry(file_name)
+            self._mark_dirty()
+
+    def reset(self) -> None:
+        """Forget all entries. Called after the whole cache folder was removed."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._total_bytes = 0
+            self._loaded = True
+            self._dirty = False
+            self._persisted = False
+
+    def evict(
+        self,
+        prefix: str,
+        ttl_seconds: float,
+        max_entries: float,
+        max_total_bytes: float,
+    ) -> list[str]:
+        """Remove files from the cache folder until the limits are met.
+
+        Entries starting with `prefix`, which ends with their last "-", that
+        are older than `ttl_seconds` are removed first; then least recently
+        used entries starting with `prefix` are removed while there are more
+        than `max_entries` of them; then least recently used entries of *any*
+        prefix are removed while the total size of the cache folder exceeds
+        `max_total_bytes`.
+
+        Returns the names of the removed files.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            evicted: list[str] = []
+
+            group = self._groups.get(prefix)
+            if group is not None:
+                expiry = DISK_CACHE_TIMER() - ttl_seconds
+                while group.creation_heap and group.creation_heap[0][0] < expiry:
+                    created_at, file_name = heapq.heappop(group.creation_heap)
+                    entry = self._entries.get(file_name)
+                    if entry is not None and entry.created_at == created_at:
+                        self._remove_entry(file_name)
+                        evicted.append(file_name)
+
+                while len(group.file_names) > max_entries:
+                    file_name = next(iter(group.file_names))
+                    self._remove_entry(file_name)
+                    evicted.append(file_name)
+
+            while self._total_bytes > max_total_bytes and self._entries:
+                file_name = next(iter(self._entries))
+                self._remove_entry(file_name)
+                evicted.append(file_name)
+
+            for file_name in evicted:
+                self._remove_file(file_name)
+
+            if evicted:
+                _LOGGER.debug("Evicted from disk cache: %s", evicted)
+                self._mark_dirty()
+            return evicted
+
+    def flush(self) -> None:
+        """Write the index to disk, if it has unsaved changes."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._flush()
+
+    def _add_entry(self, file_name: str, entry: LocalDiskCacheIndexEntry) -> None:
+        """Add an entry as the most recently used one."""
+        self._entries[file_name] = entry
+        group = self._groups.setdefault(_get_prefix(file_name), _PrefixGroup())
+        group.file_names[file_name] = None
+        heapq.heappush(group.creation_heap, (entry.created_at, file_name))
+        # Drop the items of replaced and removed entries once they outnumber
+        # the others, so that the heap doesn't grow without bounds when
+        # entries never expire.
+        if len(group.creation_heap) > 2 * len(group.file_names) + 16:
+            group.creation_heap = [
+                (self._entries[name].created_at, name) for name in group.file_names
+            ]
+            heapq.heapify(group.creation_heap)
+        self._total_bytes += entry.size
+
+    def _remove_entry(self, file_name: str) -> LocalDiskCacheIndexEntry | None:
+        entry = self._entries.pop(file_name, None)
+        if entry is None:
+            return None
+        prefix = _get_prefix(file_name)
+        group = self._groups[prefix]
+        del group.file_names[file_name]
+        if not group.file_names:
+            del self._groups[prefix]
+        self._total_bytes -= entry.size
+        return entry
+
+    def _mark_dirty(self) -> None:
+        """Schedule writing the index to disk."""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(_FLUSH_DELAY_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported index version {data.get('version')}")
+            entries = [
+                (file_name, LocalDiskCacheIndexEntry(*values))
+                for file_name, values in data["entries"].items()
+            ]
+            self._persisted = True
+        except FileNotFoundError:
+            entries = []
+        except Exception as ex:
+            _LOGGER.warning("Rebuilding unreadable disk cache index: %s", ex)
+            entries = []
+            self._dirty = True
+
+        entries.sort(key=lambda item: item[1].last_accessed_at)
+        entries = self._reconcile(entries)
+        for file_name, entry in entries:
+            self._add_entry(file_name, entry)
+        if self._dirty:
+            self._mark_dirty()
+
+    def _reconcile(
+        self, entries: list[tuple[str, LocalDiskCacheIndexEntry]]
+    ) -> list[tuple[str, LocalDiskCacheIndexEntry]]:
+        """Bring loaded entries, in least-recently-used order, in sync with the
+        contents of the cache folder: forget entries whose files are gone, and
+        adopt files that the index doesn't know about (e.g. files written
+        before the index existed).
+        """
+        try:
+            dir_entries = {
+                dir_entry.name: dir_entry
+                for dir_entry in os.scandir(self._cache_dir)
+                if dir_entry.is_file()
+                and dir_entry.name.endswith(f".{self._file_extension}")
+            }
+        except OSError:
+            dir_entries = {}
+
+        kept = [(f, entry) for f, entry in entries if f in dir_entries]
+        if len(kept) != len(entries):
+            self._dirty = True
+
+        indexed = {file_name for file_name, _ in kept}
+        adopted = []
+        for file_name, dir_entry in dir_entries.items():
+            if file_name in indexed:
+                continue
+            try:
+                stat = dir_entry.stat()
+            except OSError:
+                continue
+            adopted.append(
+                (
+                    file_name,
+                    LocalDiskCacheIndexEntry(
+                        size=stat.st_size,
+                        created_at=stat.st_mtime,
+                        last_accessed_at=stat.st_mtime,
+                    ),
+                )
+            )
+
+        if adopted:
+            # Files we know nothing about are the first candidates for eviction.
+            adopted.sort(key=lambda item: item[1].last_accessed_at)
+            self._dirty = True
+        return adopted + kept
+
+    def _remove_file(self, file_name: str) -> None:
+        try:
+            os.remove(os.path.join(self._cache_dir, file_name))
+        except FileNotFoundError:
+            pass
+        except Exception as ex:
+            _LOGGER.exception(
+                "Unable to remove a file from the disk cache", exc_info=ex
+            )
+
+    def _flush(self) -> None:
+        if not self._dirty:
+            return
+
+        if not self._entries:
+            if self._persisted:
+                try:
+                    os.remove(self._index_path)
+                except FileNotFoundError:
+                    pass
+                except Exception as ex:
+                    _LOGGER.debug("Unable to remove the disk cache index: %s", ex)
+                    return
+                self._persisted = False
+            self._dirty = False
+            return
+
+        data = {
+            "version": _INDEX_FORMAT_VERSION,
+            "entries": {
+                file_name: [entry.size, entry.created_at, entry.last_accessed_at]
+                for file_name, entry in self._entries.items()
+            },
+        }
+        # Write to a temporary file that then replaces the index, so that
+        # readers never see a partially written index.
+        tmp_path = f"{self._index_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if not os.path.isdir(self._cache_dir):
+                # Nothing has been written to the cache folder (yet), so there's
+                # nothing to index on disk either.
+                return
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._index_path)
+        except Exception as ex:
+            _LOGGER.debug("Unable to write the disk cache index: %s", ex)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._persisted = True
+        self._dirty = False
+
+
+_indexes: dict[str, LocalDiskCacheIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_disk_cache_index(
+    cache_dir: str, file_extension: str
+) -> LocalDiskCacheIndex:
+    """Return the process-wide index for the given cache folder."""
+    with _indexes_lock:
+        index = _indexes.get(cache_dir)
+        if index is None:
+            index = LocalDiskCacheIndex(cache_dir, file_extension)
+            _indexes[cache_dir] = index
+        return index
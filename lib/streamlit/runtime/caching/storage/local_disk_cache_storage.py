@@ -31,7 +31,9 @@ if the context is not valid.
 
 - LocalDiskCacheStorage : each instance of this is able to get, set, delete, and clear
 entries from disk for a single `@st.cache_data` decorated function if `persist="disk"`
-is used in CacheStorageContext.
+is used in CacheStorageContext. It enforces `ttl` and `max_entries` on disk, as well
+as the global `global.maxPersistedCacheSize` budget, with the help of
+LocalDiskCacheIndex.
 
 
     ┌───────────────────────────────┐
@@ -58,12 +60,15 @@ is used in CacheStorageContext.
 
 from __future__ import annotations
 
+import io
 import math
+import mmap
 import os
 import shutil
-from typing import Final
+import uuid
+from typing import BinaryIO, Final
 
-from streamlit import errors
+from streamlit import config, errors
 from streamlit.file_util import get_streamlit_file_path, streamlit_read, streamlit_write
 from streamlit.logger import get_logger
 from streamlit.runtime.caching.storage.cache_storage_protocol import (
@@ -76,6 +81,10 @@ from streamlit.runtime.caching.storage.cache_storage_protocol import (
 from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
     InMemoryCacheStorageWrapper,
 )
+from streamlit.runtime.caching.storage.local_disk_cache_index import (
+    LocalDiskCacheIndex,
+    get_local_disk_cache_index,
+)
 
 _LOGGER: Final = get_logger(__name__)
 
@@ -88,6 +97,12 @@ _CACHE_DIR_NAME: Final = "cache"
 # (`@st.cache_data` was originally called `@st.memo`)
 _CACHED_FILE_EXTENSION: Final = "memo"
 
+# The suffix of cache files that are still being written.
+_TEMP_FILE_SUFFIX: Final = ".tmp"
+
+# Cache files at least this large are memory-mapped instead of read into memory.
+_MIN_MEMORY_MAPPED_FILE_SIZE: Final = 1024 * 1024
+
 
 class LocalDiskCacheStorageManager(CacheStorageManager):
     def create(self, context: CacheStorageContext) -> CacheStorage:
@@ -101,18 +116,12 @@ class LocalDiskCacheStorageManager(CacheStorageManager):
         cache_path = get_cache_folder_path()
         if os.path.isdir(cache_path):
             shutil.rmtree(cache_path)
+        _get_index().reset()
 
     def check_context(self, context: CacheStorageContext) -> None:
-        if (
-            context.persist == "disk"
-            and context.ttl_seconds is not None
-            and not math.isinf(context.ttl_seconds)
-        ):
-            _LOGGER.warning(
-                f"The cached function '{context.function_display_name}' has a TTL "
-                "that will be ignored. Persistent cached functions currently don't "
-                "support TTL."
-            )
+        # Persisted entries honor `ttl` and `max_entries` with the help of
+        # LocalDiskCacheIndex, so there's no context to warn about.
+        pass
 
 
 class LocalDiskCacheStorage(CacheStorage):
@@ -134,46 +143,80 @@ class LocalDiskCacheStorage(CacheStorage):
     def max_entries(self) -> float:
         return float(self._max_entries) if self._max_entries is not None else math.inf
 
-    def get(self, key: str) -> bytes:
+    def get(self, key: str) -> bytes | memoryview:
         """
         Returns the stored value for the key if persisted,
-        raise CacheStorageKeyNotFoundError if not found, or not configured
+        raise CacheStorageKeyNotFoundError if not found, expired, or not configured
         with persist="disk"
+
+        Large values are returned as a memoryview of a copy-on-write memory map
+        of the cache file, instead of being read into memory.
         """
         if self.persist == "disk":
+            file_name = self._get_cache_file_name(key)
+            index = _get_index()
+            index_entry = index.lookup(file_name)
+            if index_entry is not None and index_entry.is_expired(self.ttl_seconds):
+                # Remove the stale entry without reading it.
+                self.delete(key)
+                raise CacheStorageKeyNotFoundError("Key expired in disk cache")
+
             path = self._get_cache_file_path(key)
             try:
                 with streamlit_read(path, binary=True) as input:
-                    value = input.read()
+                    value = _map_or_read(input)
                     _LOGGER.debug("Disk cache HIT: %s", key)
-                    return bytes(value)
             except FileNotFoundError:
+                if index_entry is not None:
+                    index.discard(file_name)
                 raise CacheStorageKeyNotFoundError("Key not found in disk cache")
             except Exception as ex:
                 _LOGGER.error(ex)
                 raise CacheStorageError("Unable to read from cache") from ex
+
+            if index_entry is None:
+                # The file was written without us knowing about it (e.g. by
+                # another process), start tracking it from now on.
+                index.record(file_name, len(value))
+            return value
         else:
             raise CacheStorageKeyNotFoundError(
                 f"Local disk cache storage is disabled (persist={self.persist})"
             )
 
     def set(self, key: str, value: bytes) -> None:
-        """Sets the value for a given key"""
+        """Sets the value for a given key, and evicts expired and least recently
+        used entries if the storage exceeds its limits.
+        """
         if self.persist == "disk":
             path = self._get_cache_file_path(key)
+            # Write to a temporary file that then replaces the cache file, so
+            # that values memory-mapped from the previous file (in this or
+            # another process) keep the old content instead of being truncated.
+            temp_path = f"{path}.{uuid.uuid4().hex}{_TEMP_FILE_SUFFIX}"
             try:
-                with streamlit_write(path, binary=True) as output:
+                with streamlit_write(temp_path, binary=True) as output:
                     output.write(value)
-            except errors.Error as e:
+                os.replace(temp_path, path)
+            except (errors.Error, OSError) as e:
                 _LOGGER.debug(e)
-                # Clean up file so we don't leave zero byte files.
+                # Clean up file so we don't leave partially written files.
                 try:
-                    os.remove(path)
+                    os.remove(temp_path)
                 except (FileNotFoundError, OSError):
                     # If we can't remove the file, it's not a big deal.
                     pass
                 raise CacheStorageError("Unable to write to cache") from e
 
+            index = _get_index()
+            index.record(self._get_cache_file_name(key), len(value))
+            index.evict(
+                prefix=f"{self.function_key}-",
+                ttl_seconds=self.ttl_seconds,
+                max_entries=self.max_entries,
+                max_total_bytes=_get_max_persisted_cache_bytes(),
+            )
+
     def delete(self, key: str) -> None:
         """Delete a cache file from disk. If the file does not exist on disk,
         return silently. If another exception occurs, log it. Does not throw.
@@ -189,6 +232,7 @@ class LocalDiskCacheStorage(CacheStorage):
                 _LOGGER.exception(
                     "Unable to remove a file from the disk cache", exc_info=ex
                 )
+            _get_index().discard(self._get_cache_file_name(key))
 
     def clear(self) -> None:
         """Delete all keys for the current storage"""
@@ -201,23 +245,54 @@ class LocalDiskCacheStorage(CacheStorage):
             for file_name in os.listdir(cache_dir):
                 if self._is_cache_file(file_name):
                     os.remove(os.path.join(cache_dir, file_name))
+        _get_index().discard_prefix(f"{self.function_key}-")
 
     def close(self) -> None:
-        """Dummy implementation of close, we don't need to actually "close" anything"""
+        """Write pending last-access times to the disk cache index"""
+        if self.persist == "disk":
+            _get_index().flush()
+
+    def _get_cache_file_name(self, value_key: str) -> str:
+        """Return the name of the disk cache file for the given value."""
+        return f"{self.function_key}-{value_key}.{_CACHED_FILE_EXTENSION}"
 
     def _get_cache_file_path(self, value_key: str) -> str:
         """Return the path of the disk cache file for the given value."""
         cache_dir = get_cache_folder_path()
-        return os.path.join(
-            cache_dir, f"{self.function_key}-{value_key}.{_CACHED_FILE_EXTENSION}"
-        )
+        return os.path.join(cache_dir, self._get_cache_file_name(value_key))
 
     def _is_cache_file(self, fname: str) -> bool:
-        """Return true if the given file name is a cache file for this storage."""
+        """Return true if the given file name is a cache file for this storage,
+        or a temporary file left behind while writing one.
+        """
         return fname.startswith(f"{self.function_key}-") and fname.endswith(
-            f".{_CACHED_FILE_EXTENSION}"
+            (f".{_CACHED_FILE_EXTENSION}", _TEMP_FILE_SUFFIX)
         )
 
 
 def get_cache_folder_path() -> str:
     return get_streamlit_file_path(_CACHE_DIR_NAME)
+
+
+def _map_or_read(input: BinaryIO) -> bytes | memoryview:
+    """Return the contents of a cache file, memory-mapped if the file is large.
+
+    The map is created with ACCESS_COPY: its pages are shared with the OS page
+    cache (and so with every other reader of the file), and only copied when
+    written to, so values unpickled from it can be mutated without affecting
+    the file or other readers.
+    """
+    if isinstance(input, io.BufferedReader):
+        fileno = input.fileno()
+        if os.fstat(fileno).st_size >= _MIN_MEMORY_MAPPED_FILE_SIZE:
+            return memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_COPY))
+    return bytes(input.read())
+
+
+def _get_index() -> LocalDiskCacheIndex:
+    return get_local_disk_cache_index(get_cache_folder_path(), _CACHED_FILE_EXTENSION)
+
+
+def _get_max_persisted_cache_bytes() -> float:
+    max_size_mb = config.get_option("global.maxPersistedCacheSize")
+    return max_size_mb * 1024 * 1024 if max_size_mb > 0 else math.inf
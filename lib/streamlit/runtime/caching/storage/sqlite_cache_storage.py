@@ -0,0 +1,292 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declares the SqliteCacheStorageManager class, which is used to create
+SqliteCacheStorage instances wrapped by InMemoryCacheStorageWrapper.
+
+Declares the SqliteCacheStorage class, which is used to store cached values in a
+SQLite database that can be shared by several Streamlit server processes, e.g.
+multiple `streamlit run` processes behind a load balancer. A value computed by
+one process is then read from the database by the others instead of being
+computed again.
+
+How these classes work together
+-------------------------------
+
+- SqliteCacheStorageManager : each instance of this owns the connections to a
+single database file, is able to create SqliteCacheStorage instances wrapped by
+InMemoryCacheStorageWrapper, and to clear all entries from the database.
+
+- SqliteCacheStorage : each instance of this is able to get, set, delete, and clear
+entries of a single `@st.cache_data` decorated function in the database. It
+enforces `ttl` and `max_entries` on the database rows, regardless of `persist`.
+
+Concurrency between processes is handled by SQLite's file locking. The database
+uses write-ahead logging, so readers don't block each other or the writer. The
+database file must live on a local filesystem (or one with working POSIX locks):
+SQLite locking is not reliable on most network filesystems.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Final
+
+from streamlit.logger import get_logger
+from streamlit.runtime.caching.storage.cache_storage_protocol import (
+    CacheStorage,
+    CacheStorageContext,
+    CacheStorageError,
+    CacheStorageKeyNotFoundError,
+    CacheStorageManager,
+)
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+
+_LOGGER: Final = get_logger(__name__)
+
+# How long to wait for another process to release the database lock, in seconds.
+_BUSY_TIMEOUT_SECONDS: Final = 30.0
+
+# The timer function used to timestamp rows. Rows are shared between processes,
+# so this is wall-clock time rather than `cache_utils.TTLCACHE_TIMER`. Exposed as
+# a constant so that it can be patched in unit tests.
+SQLITE_CACHE_TIMER = time.time
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS cache_data (
+    function_key TEXT NOT NULL,
+    value_key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (function_key, value_key)
+)
+"""
+
+
+class SqliteCacheStorageManager(CacheStorageManager):
+    """Creates cache storages backed by a single, possibly shared, SQLite file.
+
+    Every thread gets its own connection to the database, since SQLite connections
+    can't be shared between threads.
+
+    Managers can be pickled, e.g. to be sent to script worker processes. Only
+    the database path is kept: unpickled managers open their own connections.
+    """
+
+    def __init__(self, database_path: str):
+        self._database_path = database_path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_created = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"database_path": self._database_path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._database_path = state["database_path"]
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_created = False
+
+    @property
+    def database_path(self) -> str:
+        return self._database_path
+
+    def create(self, context: CacheStorageContext) -> CacheStorage:
+        """Creates a new cache storage instance wrapped with in-memory cache layer"""
+        persist_storage = SqliteCacheStorage(context, manager=self)
+        return InMemoryCacheStorageWrapper(
+            persist_storage=persist_storage, context=context
+        )
+
+    def clear_all(self) -> None:
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM cache_data")
+
+    def check_context(self, context: CacheStorageContext) -> None:
+        pass
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the current thread's connection to the database, opening it
+        (and creating the database) if needed.
+
+        Raises
+        ------
+        CacheStorageError
+            Raised if the database can't be opened.
+        """
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        try:
+            os.makedirs(os.path.dirname(self._database_path), exist_ok=True)
+            # We manage transactions ourselves, see `transaction`.
+            connection = sqlite3.connect(
+                self._database_path,
+                timeout=_BUSY_TIMEOUT_SECONDS,
+                isolation_level=None,
+            )
+            with self._schema_lock:
+                if not self._schema_created:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(_SCHEMA)
+                    self._schema_created = True
+        except (OSError, sqlite3.Error) as ex:
+            _LOGGER.error(ex)
+            raise CacheStorageError("Unable to open the cache database") from ex
+
+        self._local.connection = connection
+        return connection
+
+    def transaction(self) -> _Transaction:
+        """Return a context manager that runs a write transaction on the current
+        thread's connection.
+        """
+        return _Transaction(self)
+
+
+class _Transaction:
+    """Context manager for a write transaction.
+
+    The transaction takes the database write lock upfront (`BEGIN IMMEDIATE`),
+    so that concurrent writers wait for the lock instead of failing halfway
+    through the transaction. SQLite errors are re-raised as CacheStorageError.
+    """
+
+    def __init__(self, manager: SqliteCacheStorageManager):
+        self._manager = manager
+        self._connection: sqlite3.Connection | None = None
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._connection = self._manager.connection()
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as ex:
+            _LOGGER.error(ex)
+            raise CacheStorageError("Unable to write to cache") from ex
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        assert self._connection is not None
+        try:
+            if exc_type is None:
+                self._connection.execute("COMMIT")
+            else:
+                self._connection.execute("ROLLBACK")
+        except sqlite3.Error as ex:
+            _LOGGER.error(ex)
+            raise CacheStorageError("Unable to write to cache") from ex
+
+        if isinstance(exc_value, sqlite3.Error):
+            _LOGGER.error(exc_value)
+            raise CacheStorageError("Unable to write to cache") from exc_value
+
+
+class SqliteCacheStorage(CacheStorage):
+    """Cache storage that keeps the values of a single `@st.cache_data` function
+    in a SQLite database.
+    """
+
+    def __init__(
+        self, context: CacheStorageContext, manager: SqliteCacheStorageManager
+    ):
+        self.function_key = context.function_key
+        self._ttl_seconds = context.ttl_seconds
+        self._max_entries = context.max_entries
+        self._manager = manager
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds if self._ttl_seconds is not None else math.inf
+
+    @property
+    def max_entries(self) -> float:
+        return float(self._max_entries) if self._max_entries is not None else math.inf
+
+    def get(self, key: str) -> bytes:
+        """Returns the stored value for the key, raise CacheStorageKeyNotFoundError
+        if not found or expired.
+        """
+        try:
+            row = (
+                self._manager.connection()
+                .execute(
+                    "SELECT value, created_at FROM cache_data "
+                    "WHERE function_key = ? AND value_key = ?",
+                    (self.function_key, key),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as ex:
+            _LOGGER.error(ex)
+            raise CacheStorageError("Unable to read from cache") from ex
+
+        if row is None:
+            raise CacheStorageKeyNotFoundError("Key not found in sqlite cache")
+
+        value, created_at = row
+        if SQLITE_CACHE_TIMER() - created_at > self.ttl_seconds:
+            raise CacheStorageKeyNotFoundError("Key expired in sqlite cache")
+
+        _LOGGER.debug("Sqlite cache HIT: %s", key)
+        return bytes(value)
+
+    def set(self, key: str, value: bytes) -> None:
+        """Sets the value for a given key, and removes the function's expired and
+        oldest entries if the storage exceeds its limits.
+        """
+        now = SQLITE_CACHE_TIMER()
+        with self._manager.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_data "
+                "(function_key, value_key, value, created_at) VALUES (?, ?, ?, ?)",
+                (self.function_key, key, value, now),
+            )
+            if not math.isinf(self.ttl_seconds):
+                connection.execute(
+                    "DELETE FROM cache_data WHERE function_key = ? AND created_at < ?",
+                    (self.function_key, now - self.ttl_seconds),
+                )
+            if not math.isinf(self.max_entries):
+                connection.execute(
+                    "DELETE FROM cache_data WHERE function_key = ? AND value_key NOT IN "
+                    "(SELECT value_key FROM cache_data WHERE function_key = ? "
+                    "ORDER BY created_at DESC LIMIT ?)",
+                    (self.function_key, self.function_key, int(self.max_entries)),
+                )
+
+    def delete(self, key: str) -> None:
+        """Delete a given key"""
+        with self._manager.transaction() as connection:
+            connection.execute(
+                "DELETE FROM cache_data WHERE function_key = ? AND value_key = ?",
+                (self.function_key, key),
+            )
+
+    def clear(self) -> None:
+        """Delete all keys for the current storage"""
+        with self._manager.transaction() as connection:
+            connection.execute(
+                "DELETE FROM cache_data WHERE function_key = ?", (self.function_key,)
+            )
+
+    def close(self) -> None:
+        """Dummy implementation of close, connections are owned by the manager"""
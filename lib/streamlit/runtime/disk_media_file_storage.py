@@ -0,0 +1,248 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""MediaFileStorage implementation that stores files in memory up to a budget,
+and on disk beyond it.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import tempfile
+import weakref
+from typing import Final, NamedTuple, Union
+
+from streamlit.logger import get_logger
+from streamlit.runtime.media_file_storage import (
+    MediaFileKind,
+    MediaFileStorage,
+    MediaFileStorageError,
+)
+from streamlit.runtime.memory_media_file_storage import (
+    MemoryFile,
+    _calculate_file_id,
+    get_extension_for_mimetype,
+)
+from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+
+_LOGGER: Final = get_logger(__name__)
+
+
+class DiskFile(NamedTuple):
+    """A MediaFile stored on disk.
+
+    The file is either a temporary file owned by the storage, or, if
+    `mtime_ns` is set, a file of the app that the storage only refers to.
+    """
+
+    path: str
+    content_size: int
+    mimetype: str
+    kind: MediaFileKind
+    filename: str | None
+    # The modification time of a file the storage refers to, when it was added.
+    mtime_ns: int | None = None
+
+    @property
+    def content(self) -> bytes:
+        """Read the file's content into memory."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def is_modified(self) -> bool:
+        """Return True if the file was modified, or deleted, since it was
+        added, so its content no longer matches its ID.
+        """
+        if self.mtime_ns is None:
+            return False
+        try:
+            file_stat = os.stat(self.path)
+        except OSError:
+            return True
+        return (file_stat.st_size, file_stat.st_mtime_ns) != (
+            self.content_size,
+            self.mtime_ns,
+        )
+
+
+MediaFile = Union[MemoryFile, DiskFile]
+
+
+class DiskMediaFileStorage(MediaFileStorage, CacheStatsProvider):
+    """Stores media files in memory until their total size reaches a budget,
+    and in temporary files on disk after that.
+
+    Files added by path aren't read or copied. They're identified by their
+    path, size and modification time, and served from where they are.
+
+    The MediaFileHandler serves files on disk in chunks, so the server's
+    memory usage doesn't grow with their size.
+    """
+
+    def __init__(
+        self, media_endpoint: str, memory_budget: int, directory: str | None = None
+    ):
+        """Create a new DiskMediaFileStorage instance
+
+        Parameters
+        ----------
+        media_endpoint
+            The name of the local endpoint that media is served from.
+            This endpoint should start with a forward-slash (e.g. "/media").
+        memory_budget
+            The max total size, in bytes, of the files stored in memory.
+        directory
+            The directory to store files in. If None, a temporary directory
+            is created, and deleted along with the storage.
+        """
+        self._files_by_id: dict[str, MediaFile] = {}
+        self._media_endpoint = media_endpoint
+        self._memory_budget = memory_budget
+        self._memory_size = 0
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="streamlit-media-")
+            weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+        self._directory = directory
+
+    def load_and_get_id(
+        self,
+        path_or_data: str | bytes,
+        mimetype: str,
+        kind: MediaFileKind,
+        filename: str | None = None,
+    ) -> str:
+        """Add a file to the manager and return its ID."""
+        if isinstance(path_or_data, str):
+            return self._add_path_and_get_id(path_or_data, mimetype, kind, filename)
+
+        file_data = path_or_data
+
+        # Because our file_ids are stable, if we already have a file with the
+        # given ID, we don't need to create a new one.
+        file_id = _calculate_file_id(file_data, mimetype, filename)
+        if file_id in self._files_by_id:
+            return file_id
+
+        media_file: MediaFile
+        if self._memory_size + len(file_data) <= self._memory_budget:
+            _LOGGER.debug("Adding media file %s", file_id)
+            media_file = MemoryFile(
+                content=file_data, mimetype=mimetype, kind=kind, filename=filename
+            )
+            self._memory_size += len(file_data)
+        else:
+            _LOGGER.debug("Adding media file %s on disk", file_id)
+            path = os.path.join(self._directory, file_id)
+            try:
+                with open(path, "wb") as f:
+                    f.write(file_data)
+            except OSError as ex:
+                raise MediaFileStorageError(f"Error writing '{path}'") from ex
+            media_file = DiskFile(
+                path=path,
+                content_size=len(file_data),
+                mimetype=mimetype,
+                kind=kind,
+                filename=filename,
+            )
+
+        self._files_by_id[file_id] = media_file
+        return file_id
+
+    def _add_path_and_get_id(
+        self, path: str, mimetype: str, kind: MediaFileKind, filename: str | None
+    ) -> str:
+        """Add a file by reference to its path, without reading it, and return
+        its ID. Raise MediaFileStorageError if it isn't a readable file.
+        """
+        absolute_path = os.path.abspath(path)
+        try:
+            file_stat = os.stat(absolute_path)
+        except OSError as ex:
+            raise MediaFileStorageError(f"Error opening '{path}'") from ex
+        if not stat.S_ISREG(file_stat.st_mode) or not os.access(absolute_path, os.R_OK):
+            raise MediaFileStorageError(f"Error opening '{path}'")
+
+        # The ID changes whenever the file is modified, so that URLs of media
+        # files always refer to the same content.
+        file_key = f"{absolute_path}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}"
+        file_id = _calculate_file_id(file_key.encode(), mimetype, filename)
+        if file_id not in self._files_by_id:
+            _LOGGER.debug("Adding media file %s at %s", file_id, absolute_path)
+            self._files_by_id[file_id] = DiskFile(
+                path=absolute_path,
+                content_size=file_stat.st_size,
+                mimetype=mimetype,
+                kind=kind,
+                filename=filename,
+                mtime_ns=file_stat.st_mtime_ns,
+            )
+        return file_id
+
+    def get_file(self, filename: str) -> MediaFile:
+        """Return the MemoryFile or DiskFile with the given filename. Filenames
+        are of the form "file_id.extension". (Note that this is *not* the
+        optional user-specified filename for download files.)
+
+        Raises a MediaFileStorageError if no such file exists.
+        """
+        file_id = os.path.splitext(filename)[0]
+        try:
+            return self._files_by_id[file_id]
+        except KeyError as e:
+            raise MediaFileStorageError(
+                f"Bad filename '{filename}'. (No media file with id '{file_id}')"
+            ) from e
+
+    def get_url(self, file_id: str) -> str:
+        """Get a URL for a given media file. Raise a MediaFileStorageError if
+        no such file exists.
+        """
+        media_file = self.get_file(file_id)
+        extension = get_extension_for_mimetype(media_file.mimetype)
+        return f"{self._media_endpoint}/{file_id}{extension}"
+
+    def delete_file(self, file_id: str) -> None:
+        """Delete the file with the given ID."""
+        media_file = self._files_by_id.pop(file_id, None)
+        if isinstance(media_file, MemoryFile):
+            self._memory_size -= media_file.content_size
+        elif isinstance(media_file, DiskFile) and media_file.mtime_ns is None:
+            try:
+                os.remove(media_file.path)
+            except OSError:
+                # On Windows, a file can't be deleted while it's being
+                # served. It's deleted along with the storage's directory.
+                _LOGGER.debug(
+                    "Failed to delete media file %s", media_file.path, exc_info=True
+                )
+
+    def get_stats(self) -> list[CacheStat]:
+        # We operate on a copy of our dict, to avoid race conditions
+        # with other threads that may be manipulating the cache.
+        files_by_id = self._files_by_id.copy()
+
+        # Only files in memory are reported, as stats are about memory usage.
+        stats: list[CacheStat] = [
+            CacheStat(
+                category_name="st_disk_media_file_storage",
+                cache_name="",
+                byte_length=file.content_size,
+            )
+            for file in files_by_id.values()
+            if isinstance(file, MemoryFile)
+        ]
+        return group_stats(stats)
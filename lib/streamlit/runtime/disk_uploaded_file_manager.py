@@ -0,0 +1,112 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import weakref
+from typing import IO, TYPE_CHECKING, Final
+
+from streamlit.logger import get_logger
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+
+if TYPE_CHECKING:
+    from streamlit.runtime.uploaded_file_manager import UploadedFileRec
+
+_LOGGER: Final = get_logger(__name__)
+
+
+class DiskUploadedFileManager(MemoryUploadedFileManager):
+    """Holds files uploaded by users of the running Streamlit app, storing
+    files larger than `spool_size` bytes in temporary files on disk.
+
+    The upload handler streams large files to files created with
+    `create_file`, and adds them with an UploadedFileRec whose `path` is set.
+    The manager then owns these files, and deletes them when they're removed.
+
+    This class can be used safely from multiple threads simultaneously.
+    """
+
+    def __init__(
+        self, upload_endpoint: str, spool_size: int, directory: str | None = None
+    ):
+        """Create a DiskUploadedFileManager.
+
+        Parameters
+        ----------
+        upload_endpoint
+            The URL prefix files are uploaded to.
+        spool_size
+            Uploaded files larger than this size, in bytes, are stored on disk.
+        directory
+            The directory to store files in. If None, a temporary directory
+            is created, and deleted along with the manager.
+        """
+        super().__init__(upload_endpoint)
+        self.spool_size = spool_size
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="streamlit-uploads-")
+            weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+        self._directory = directory
+
+    def create_file(self) -> tuple[str, IO[bytes]]:
+        """Create an empty file to store an uploaded file in.
+
+        Safe to call from any thread.
+
+        Returns
+        -------
+        tuple[str, IO[bytes]]
+            The file's path, and the file opened for writing. The caller must
+            either add the file to the manager, or delete it.
+        """
+        fd, path = tempfile.mkstemp(suffix=".upload", dir=self._directory)
+        return path, os.fdopen(fd, "wb")
+
+    def add_file(self, session_id: str, file: UploadedFileRec) -> None:
+        """Add a file, replacing and deleting any file with the same ID.
+
+        Safe to call from any thread.
+        """
+        replaced = self.file_storage[session_id].get(file.file_id)
+        super().add_file(session_id, file)
+        if replaced is not None and replaced.path != file.path:
+            _delete_file(replaced)
+
+    def remove_file(self, session_id, file_id):
+        """Remove file with given file_id associated with a given session."""
+        file = self.file_storage[session_id].pop(file_id, None)
+        if file is not None:
+            _delete_file(file)
+
+    def remove_session_files(self, session_id: str) -> None:
+        """Remove all files associated with a given session."""
+        for file in self.file_storage.pop(session_id, {}).values():
+            _delete_file(file)
+        self.on_session_files_removed.send(session_id)
+
+
+def _delete_file(file: UploadedFileRec) -> None:
+    if file.path is None:
+        return
+    try:
+        os.remove(file.path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        # On Windows, a file can't be deleted while a script has it mapped.
+        # It's deleted along with the manager's directory instead.
+        _LOGGER.debug("Failed to delete uploaded file %s", file.path, exc_info=True)
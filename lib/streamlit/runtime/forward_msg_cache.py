@@ -15,21 +15,57 @@
 from __future__ import annotations
 
 import hashlib
+import threading
+from collections import OrderedDict
 from typing import TYPE_CHECKING, Final, MutableMapping
 from weakref import WeakKeyDictionary
 
 from streamlit import config, util
 from streamlit.logger import get_logger
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
-from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.stats import (
+    CacheStat,
+    CacheStatsProvider,
+    MetricsProvider,
+    MetricStat,
+    group_stats,
+)
 from streamlit.util import HASHLIB_KWARGS
 
 if TYPE_CHECKING:
     from streamlit.runtime.app_session import AppSession
+    from streamlit.runtime.runtime_util import SerializedForwardMsg
 
 _LOGGER: Final = get_logger(__name__)
 
 
+def serialize_msg_payload(msg: ForwardMsg) -> bytes:
+    """Serialize a ForwardMsg without its hash and metadata.
+
+    A message's hash is computed from its payload, so that messages with the
+    same contents have the same hash regardless of where they're displayed.
+    """
+    # Move the message's hash and metadata aside.
+    metadata = msg.metadata
+    msg_hash = msg.hash
+    msg.ClearField("metadata")
+    msg.ClearField("hash")
+    try:
+        payload: bytes = msg.SerializeToString()
+        return payload
+    finally:
+        msg.metadata.CopyFrom(metadata)
+        msg.hash = msg_hash
+
+
+def compute_payload_hash(payload: bytes) -> str:
+    """Compute the hash of a ForwardMsg from its serialized payload."""
+    # MD5 is good enough for what we need, which is uniqueness.
+    hasher = hashlib.md5(**HASHLIB_KWARGS)
+    hasher.update(payload)
+    return hasher.hexdigest()
+
+
 def populate_hash_if_needed(msg: ForwardMsg) -> str:
     """Computes and assigns the unique hash for a ForwardMsg.
 
@@ -48,18 +84,7 @@ def populate_hash_if_needed(msg: ForwardMsg) -> str:
 
     """
     if msg.hash == "":
-        # Move the message's metadata aside. It's not part of the
-        # hash calculation.
-        metadata = msg.metadata
-        msg.ClearField("metadata")
-
-        # MD5 is good enough for what we need, which is uniqueness.
-        hasher = hashlib.md5(**HASHLIB_KWARGS)
-        hasher.update(msg.SerializeToString())
-        msg.hash = hasher.hexdigest()
-
-        # Restore metadata.
-        msg.metadata.CopyFrom(metadata)
+        msg.hash = compute_payload_hash(serialize_msg_payload(msg))
 
     return msg.hash
 
@@ -88,13 +113,17 @@ def create_reference_msg(msg: ForwardMsg) -> ForwardMsg:
     return ref_msg
 
 
-class ForwardMsgCache(CacheStatsProvider):
+class ForwardMsgCache(CacheStatsProvider, MetricsProvider):
     """A cache of ForwardMsgs.
 
     Large ForwardMsgs (e.g. those containing big DataFrame payloads) are
-    stored in this cache. The server can choose to send a ForwardMsg's hash,
-    rather than the message itself, to a client. Clients can then
-    request messages from this cache via another endpoint.
+    stored in this cache, in their serialized form. The server can choose to
+    send a ForwardMsg's hash, rather than the message itself, to a client.
+    Clients can then request messages from this cache via another endpoint.
+
+    Entries are removed once no session references them anymore. If the
+    `global.maxCachedMessagesSize` config option is set, the least recently
+    used entries are also evicted when the cached messages exceed that size.
 
     This cache is *not* thread safe. It's intended to only be accessed by
     the server thread.
@@ -104,13 +133,15 @@ class ForwardMsgCache(CacheStatsProvider):
     class Entry:
         """Cache entry.
 
-        Stores the cached message, and the set of AppSessions
+        Stores the cached serialized message, and the set of AppSessions
         that we've sent the cached message to.
 
         """
 
-        def __init__(self, msg: ForwardMsg | None):
-            self.msg = msg
+        def __init__(self, data: bytes | None, size: int):
+            self.data = data
+            # The size of the serialized message, even if it isn't stored.
+            self.size = size
             self._session_script_run_counts: MutableMapping[AppSession, int] = (
                 WeakKeyDictionary()
             )
@@ -118,6 +149,10 @@ class ForwardMsgCache(CacheStatsProvider):
         def __repr__(self) -> str:
             return util.repr_(self)
 
+        @property
+        def stored_size(self) -> int:
+            return len(self.data) if self.data is not None else 0
+
         def add_session_ref(self, session: AppSession, script_run_count: int) -> None:
             """Adds a reference to a AppSession that has referenced
             this Entry's message.
@@ -153,6 +188,9 @@ class ForwardMsgCache(CacheStatsProvider):
         def remove_session_ref(self, session: AppSession) -> None:
             del self._session_script_run_counts[session]
 
+        def get_sessions(self) -> list[AppSession]:
+            return list(self._session_script_run_counts.keys())
+
         def has_refs(self) -> bool:
             """True if this Entry has references from any AppSession.
 
@@ -161,13 +199,32 @@ class ForwardMsgCache(CacheStatsProvider):
             return len(self._session_script_run_counts) > 0
 
     def __init__(self):
-        self._entries: dict[str, ForwardMsgCache.Entry] = {}
+        # Entries, from the least to the most recently used.
+        self._entries: OrderedDict[str, ForwardMsgCache.Entry] = OrderedDict()
+        # The hashes of the entries referenced by each session, so that a
+        # session's references can be removed without going through all
+        # entries.
+        self._session_hashes: MutableMapping[AppSession, set[str]] = WeakKeyDictionary()
+        self._stored_bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._saved_bytes = 0
+        self._evictions = 0
 
     def __repr__(self) -> str:
         return util.repr_(self)
 
+    @property
+    def hit_ratio(self) -> float:
+        """The share of cacheable messages that were sent as references to
+        cached messages, rather than in full.
+        """
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
     def add_message(
-        self, msg: ForwardMsg, session: AppSession, script_run_count: int
+        self, msg: SerializedForwardMsg, session: AppSession, script_run_count: int
     ) -> None:
         """Add a ForwardMsg to the cache.
 
@@ -177,24 +234,31 @@ class ForwardMsgCache(CacheStatsProvider):
 
         Parameters
         ----------
-        msg : ForwardMsg
+        msg : SerializedForwardMsg
         session : AppSession
         script_run_count : int
             The number of times the session's script has run
 
         """
-        populate_hash_if_needed(msg)
-        entry = self._entries.get(msg.hash, None)
+        msg_hash = populate_hash_if_needed(msg.msg)
+        entry = self._entries.get(msg_hash, None)
         if entry is None:
             if config.get_option("global.storeCachedForwardMessagesInMemory"):
-                entry = ForwardMsgCache.Entry(msg)
+                entry = ForwardMsgCache.Entry(msg.data, len(msg.data))
             else:
-                entry = ForwardMsgCache.Entry(None)
-            self._entries[msg.hash] = entry
+                entry = ForwardMsgCache.Entry(None, len(msg.data))
+            self._entries[msg_hash] = entry
+            self._stored_bytes += entry.stored_size
+        else:
+            self._entries.move_to_end(msg_hash)
         entry.add_session_ref(session, script_run_count)
+        self._session_hashes.setdefault(session, set()).add(msg_hash)
+
+        self._evict_least_recently_used()
 
-    def get_message(self, hash: str) -> ForwardMsg | None:
-        """Return the message with the given ID if it exists in the cache.
+    def get_message(self, hash: str) -> bytes | None:
+        """Return the serialized message with the given ID if it exists in the
+        cache.
 
         Parameters
         ----------
@@ -203,25 +267,39 @@ class ForwardMsgCache(CacheStatsProvider):
 
         Returns
         -------
-        ForwardMsg | None
+        bytes | None
 
         """
         entry = self._entries.get(hash, None)
-        return entry.msg if entry else None
+        if entry is None:
+            return None
+        self._entries.move_to_end(hash)
+        return entry.data
 
     def has_message_reference(
         self, msg: ForwardMsg, session: AppSession, script_run_count: int
     ) -> bool:
-        """Return True if a session has a reference to a message."""
+        """Return True if a session has a reference to a message.
+
+        This is called for each cacheable message sent to a session, and
+        counts towards the cache's hit ratio.
+        """
         populate_hash_if_needed(msg)
 
         entry = self._entries.get(msg.hash, None)
-        if entry is None or not entry.has_session_ref(session):
+        if (
+            entry is None
+            or not entry.has_session_ref(session)
+            # Ensure we're not expired
+            or entry.get_session_ref_age(session, script_run_count)
+            > int(config.get_option("global.maxCachedMessageAge"))
+        ):
+            self._misses += 1
             return False
 
-        # Ensure we're not expired
-        age = entry.get_session_ref_age(session, script_run_count)
-        return age <= int(config.get_option("global.maxCachedMessageAge"))
+        self._hits += 1
+        self._saved_bytes += entry.size
+        return True
 
     def remove_refs_for_session(self, session: AppSession) -> None:
         """Remove refs for all entries for the given session.
@@ -232,17 +310,13 @@ class ForwardMsgCache(CacheStatsProvider):
         ----------
         session : AppSession
         """
-
-        # Operate on a copy of our entries dict.
-        # We may be deleting from it.
-        for msg_hash, entry in self._entries.copy().items():
-            if entry.has_session_ref(session):
-                entry.remove_session_ref(session)
-
+        for msg_hash in self._session_hashes.pop(session, set()):
+            entry = self._entries[msg_hash]
+            entry.remove_session_ref(session)
             if not entry.has_refs():
                 # The entry has no more references. Remove it from
                 # the cache completely.
-                del self._entries[msg_hash]
+                self._remove_entry(msg_hash)
 
     def remove_expired_entries_for_session(
         self, session: AppSession, script_run_count: int
@@ -259,13 +333,11 @@ class ForwardMsgCache(CacheStatsProvider):
 
         """
         max_age = config.get_option("global.maxCachedMessageAge")
+        session_hashes = self._session_hashes.get(session, set())
 
-        # Operate on a copy of our entries dict.
-        # We may be deleting from it.
-        for msg_hash, entry in self._entries.copy().items():
-            if not entry.has_session_ref(session):
-                continue
-
+        # Operate on a copy of the session's hashes. We may be deleting from it.
+        for msg_hash in list(session_hashes):
+            entry = self._entries[msg_hash]
             age = entry.get_session_ref_age(session, script_run_count)
             if age > max_age:
                 _LOGGER.debug(
@@ -275,22 +347,159 @@ class ForwardMsgCache(CacheStatsProvider):
                     age,
                 )
                 entry.remove_session_ref(session)
+                session_hashes.discard(msg_hash)
                 if not entry.has_refs():
                     # The entry has no more references. Remove it from
                     # the cache completely.
-                    del self._entries[msg_hash]
+                    self._remove_entry(msg_hash)
 
     def clear(self) -> None:
         """Remove all entries from the cache"""
         self._entries.clear()
+        self._session_hashes.clear()
+        self._stored_bytes = 0
+
+    def _remove_entry(self, msg_hash: str) -> None:
+        entry = self._entries.pop(msg_hash)
+        self._stored_bytes -= entry.stored_size
+        for session in entry.get_sessions():
+            session_hashes = self._session_hashes.get(session)
+            if session_hashes is not None:
+                session_hashes.discard(msg_hash)
+
+    def _evict_least_recently_used(self) -> None:
+        max_size = config.get_option("global.maxCachedMessagesSize") * int(1e6)
+        if max_size <= 0:
+            return
+
+        while self._stored_bytes > max_size:
+            msg_hash = next(iter(self._entries))
+            _LOGGER.debug("Evicting cached message (hash=%s)", msg_hash)
+            self._remove_entry(msg_hash)
+            self._evictions += 1
 
     def get_stats(self) -> list[CacheStat]:
         stats: list[CacheStat] = [
             CacheStat(
                 category_name="ForwardMessageCache",
                 cache_name="",
-                byte_length=entry.msg.ByteSize() if entry.msg is not None else 0,
+                byte_length=entry.stored_size,
             )
             for _, entry in self._entries.items()
         ]
         return group_stats(stats)
+
+    def get_metrics(self) -> list[MetricStat]:
+        return [
+            MetricStat(
+                family_name="forward_msg_cache_lookups",
+                metric_type="counter",
+                help="Cacheable messages sent as a reference (hit) or in full (miss).",
+                value=self._hits,
+                labels=(("result", "hit"),),
+            ),
+            MetricStat(
+                family_name="forward_msg_cache_lookups",
+                metric_type="counter",
+                help="Cacheable messages sent as a reference (hit) or in full (miss).",
+                value=self._misses,
+                labels=(("result", "miss"),),
+            ),
+            MetricStat(
+                family_name="forward_msg_cache_hit_ratio",
+                metric_type="gauge",
+                help="Share of cacheable messages sent as a reference.",
+                value=self.hit_ratio,
+            ),
+            MetricStat(
+                family_name="forward_msg_cache_saved_bytes",
+                metric_type="counter",
+                help="Bytes not sent because messages were sent as a reference.",
+                value=self._saved_bytes,
+            ),
+            MetricStat(
+                family_name="forward_msg_cache_evictions",
+                metric_type="counter",
+                help="Cached messages evicted to stay under the cache's size limit.",
+                value=self._evictions,
+            ),
+        ]
+
+
+class ForwardMsgPayloadStore(CacheStatsProvider):
+    """A process-wide store of serialized ForwardMsg payloads, by hash.
+
+    The elements replayed from the results of `st.cache_data` and
+    `st.cache_resource` functions are identical in every session that replays
+    them. Their payload is serialized and hashed once, when the function runs,
+    and the Runtime looks it up here instead of serializing it again for each
+    session.
+
+    Only payloads of cacheable size (see `global.minCachedMessageSize`) are
+    stored. The least recently used payloads are evicted when the stored
+    payloads exceed `global.maxSharedPayloadsSize`.
+
+    This store is thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._payloads: OrderedDict[str, bytes] = OrderedDict()
+        self._stored_bytes = 0
+
+    def __repr__(self) -> str:
+        return util.repr_(self)
+
+    def add_payload(self, payload: bytes) -> str:
+        """Store a payload if it's worth storing, and return its hash."""
+        payload_hash = compute_payload_hash(payload)
+        max_size = config.get_option("global.maxSharedPayloadsSize") * 1024 * 1024
+        min_size = int(config.get_option("global.minCachedMessageSize"))
+        if not min_size <= len(payload) <= max_size:
+            return payload_hash
+
+        with self._lock:
+            if payload_hash in self._payloads:
+                self._payloads.move_to_end(payload_hash)
+                return payload_hash
+
+            self._payloads[payload_hash] = payload
+            self._stored_bytes += len(payload)
+            while self._stored_bytes > max_size:
+                _, evicted_payload = self._payloads.popitem(last=False)
+                self._stored_bytes -= len(evicted_payload)
+        return payload_hash
+
+    def get_payload(self, payload_hash: str) -> bytes | None:
+        """Return the stored payload with the given hash, if any."""
+        with self._lock:
+            payload = self._payloads.get(payload_hash)
+            if payload is not None:
+                self._payloads.move_to_end(payload_hash)
+            return payload
+
+    def clear(self) -> None:
+        """Remove all payloads from the store."""
+        with self._lock:
+            self._payloads.clear()
+            self._stored_bytes = 0
+
+    def get_stats(self) -> list[CacheStat]:
+        with self._lock:
+            if not self._payloads:
+                return []
+            return [
+                CacheStat(
+                    category_name="ForwardMessagePayloadStore",
+                    cache_name="",
+                    byte_length=self._stored_bytes,
+                )
+            ]
+
+
+_payload_store = ForwardMsgPayloadStore()
+
+
+def get_payload_store() -> ForwardMsgPayloadStore:
+    """Return the process-wide ForwardMsgPayloadStore."""
+    return _payload_store
@@ -91,26 +91,40 @@ class MediaFileManager:
             collections.defaultdict(dict)
         )
 
+        # Dict of [file_id -> number of (session ID, coordinates) pairs that
+        # refer to the file]. Files with no references aren't in it.
+        self._ref_counts: collections.Counter[str] = collections.Counter()
+
+        # The IDs of files that no session refers to, which will be removed
+        # by `remove_orphaned_files`. Keeping track of them as references are
+        # removed, rather than finding them in `remove_orphaned_files`, keeps
+        # the time spent holding the lock proportional to the files removed.
+        self._orphaned_file_ids: set[str] = set()
+
         # MediaFileManager is used from multiple threads, so all operations
         # need to be protected with a Lock. (This is not an RLock, which
         # means taking it multiple times from the same thread will deadlock.)
         self._lock = threading.Lock()
 
-    def _get_inactive_file_ids(self) -> set[str]:
-        """Compute the set of files that are stored in the manager, but are
-        not referenced by any active session. These are files that can be
-        safely deleted.
+    def _add_ref(self, file_id: str) -> None:
+        """Add a reference to the given file.
 
         Thread safety: callers must hold `self._lock`.
         """
-        # Get the set of all our file IDs.
-        file_ids = set(self._file_metadata.keys())
+        self._ref_counts[file_id] += 1
+        self._orphaned_file_ids.discard(file_id)
 
-        # Subtract all IDs that are in use by each session
-        for session_file_ids_by_coord in self._files_by_session_and_coord.values():
-            file_ids.difference_update(session_file_ids_by_coord.values())
+    def _remove_ref(self, file_id: str) -> None:
+        """Remove a reference to the given file, which is orphaned if it was
+        the last one.
 
-        return file_ids
+        Thread safety: callers must hold `self._lock`.
+        """
+        self._ref_counts[file_id] -= 1
+        if self._ref_counts[file_id] <= 0:
+            del self._ref_counts[file_id]
+            if file_id in self._file_metadata:
+                self._orphaned_file_ids.add(file_id)
 
     def remove_orphaned_files(self) -> None:
         """Remove all files that are no longer referenced by any active session.
@@ -120,7 +134,9 @@ class MediaFileManager:
         _LOGGER.debug("Removing orphaned files...")
 
         with self._lock:
-            for file_id in self._get_inactive_file_ids():
+            # Downloadable files stay orphaned until the next call, in case
+            # they're still being downloaded.
+            for file_id in list(self._orphaned_file_ids):
                 file = self._file_metadata[file_id]
                 if file.kind == MediaFileKind.MEDIA:
                     self._delete_file(file_id)
@@ -139,6 +155,7 @@ class MediaFileManager:
         _LOGGER.debug("Deleting File: %s", file_id)
         self._storage.delete_file(file_id)
         del self._file_metadata[file_id]
+        self._orphaned_file_ids.discard(file_id)
 
     def clear_session_refs(self, session_id: str | None = None) -> None:
         """Remove the given session's file references.
@@ -156,8 +173,9 @@ class MediaFileManager:
         _LOGGER.debug("Disconnecting files for session with ID %s", session_id)
 
         with self._lock:
-            if session_id in self._files_by_session_and_coord:
-                del self._files_by_session_and_coord[session_id]
+            file_ids_by_coord = self._files_by_session_and_coord.pop(session_id, {})
+            for file_id in file_ids_by_coord.values():
+                self._remove_ref(file_id)
 
         _LOGGER.debug(
             "Sessions still active: %r", self._files_by_session_and_coord.keys()
@@ -229,6 +247,11 @@ class MediaFileManager:
             metadata = MediaFileMetadata(kind=kind)
 
             self._file_metadata[file_id] = metadata
-            self._files_by_session_and_coord[session_id][coordinates] = file_id
+            file_ids_by_coord = self._files_by_session_and_coord[session_id]
+            replaced_file_id = file_ids_by_coord.get(coordinates)
+            file_ids_by_coord[coordinates] = file_id
+            self._add_ref(file_id)
+            if replaced_file_id is not None:
+                self._remove_ref(replaced_file_id)
 
             return self._storage.get_url(file_id)
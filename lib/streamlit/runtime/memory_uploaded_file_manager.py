@@ -18,6 +18,8 @@ import uuid
 from collections import defaultdict
 from typing import Sequence
 
+from blinker import Signal
+
 from streamlit import util
 from streamlit.runtime.stats import CacheStat, group_stats
 from streamlit.runtime.uploaded_file_manager import (
@@ -35,6 +37,16 @@ class MemoryUploadedFileManager(UploadedFileManager):
     def __init__(self, upload_endpoint: str):
         self.file_storage: dict[str, dict[str, UploadedFileRec]] = defaultdict(dict)
         self.endpoint = upload_endpoint
+        self.on_session_files_removed = Signal(
+            doc="""Emitted when a session's files are removed, which happens
+            when the session is closed.
+
+            Parameters
+            ----------
+            session_id : str
+                The ID of the session whose files were removed.
+            """
+        )
 
     def get_files(
         self, session_id: str, file_ids: Sequence[str]
@@ -67,6 +79,7 @@ class MemoryUploadedFileManager(UploadedFileManager):
     def remove_session_files(self, session_id: str) -> None:
         """Remove all files associated with a given session."""
         self.file_storage.pop(session_id, None)
+        self.on_session_files_removed.send(session_id)
 
     def __repr__(self) -> str:
         return util.repr_(self)
@@ -15,8 +15,12 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import threading
 import time
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Awaitable, Final, NamedTuple
@@ -36,13 +40,17 @@ from streamlit.runtime.caching.storage.local_disk_cache_storage import (
 from streamlit.runtime.forward_msg_cache import (
     ForwardMsgCache,
     create_reference_msg,
-    populate_hash_if_needed,
+    get_payload_store,
 )
 from streamlit.runtime.media_file_manager import MediaFileManager
 from streamlit.runtime.memory_session_storage import MemorySessionStorage
-from streamlit.runtime.runtime_util import is_cacheable_msg
+from streamlit.runtime.runtime_util import (
+    SerializedForwardMsg,
+    prepare_forward_msg,
+)
 from streamlit.runtime.script_data import ScriptData
 from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.scriptrunner.script_process_pool import ScriptProcessPool
 from streamlit.runtime.session_manager import (
     ActiveSessionInfo,
     SessionClient,
@@ -54,7 +62,7 @@ from streamlit.runtime.state import (
     SCRIPT_RUN_WITHOUT_ERRORS_KEY,
     SessionStateStatProvider,
 )
-from streamlit.runtime.stats import StatsManager
+from streamlit.runtime.stats import MetricsProvider, MetricStat, StatsManager
 from streamlit.runtime.websocket_session_manager import WebsocketSessionManager
 
 if TYPE_CHECKING:
@@ -69,6 +77,29 @@ SCRIPT_RUN_CHECK_TIMEOUT: Final = 60
 
 _LOGGER: Final = get_logger(__name__)
 
+# The max number of messages sent to a session per pass of the Runtime loop.
+# Messages beyond that are sent in the next pass, after the other sessions'
+# messages, so that a session sending lots of messages doesn't delay the others.
+_MAX_MESSAGES_PER_SESSION_PASS: Final = 100
+
+
+_serialization_executor: ThreadPoolExecutor | None = None
+_serialization_executor_lock = threading.Lock()
+
+
+def _get_serialization_executor() -> ThreadPoolExecutor:
+    global _serialization_executor
+    with _serialization_executor_lock:
+        if _serialization_executor is None:
+            _serialization_executor = ThreadPoolExecutor(
+                thread_name_prefix="ForwardMsgSerializer"
+            )
+        return _serialization_executor
+
+
+def _prepare_forward_msgs(msgs: list[ForwardMsg]) -> list[SerializedForwardMsg]:
+    return [prepare_forward_msg(msg) for msg in msgs]
+
 
 class RuntimeStoppedError(Exception):
     """Raised by operations on a Runtime instance that is stopped."""
@@ -139,7 +170,8 @@ class AsyncObjects(NamedTuple):
     # Set when a client connects; cleared when we have no connected clients.
     has_connection: asyncio.Event
 
-    # Set after a ForwardMsg is enqueued; cleared when we flush ForwardMsgs.
+    # Set after a session is marked ready to send; cleared when we flush
+    # ForwardMsgs.
     need_send_data: asyncio.Event
 
     # Completed when the Runtime has started.
@@ -149,6 +181,40 @@ class AsyncObjects(NamedTuple):
     stopped: asyncio.Future[None]
 
 
+class _OutboundBacklogMetricsProvider(MetricsProvider):
+    """Reports the messages waiting to be sent to each active session."""
+
+    def __init__(
+        self, session_mgr: SessionManager, send_buffers: dict[str, deque[ForwardMsg]]
+    ):
+        self._session_mgr = session_mgr
+        self._send_buffers = send_buffers
+
+    def get_metrics(self) -> list[MetricStat]:
+        metrics: list[MetricStat] = []
+        for session_info in self._session_mgr.list_active_sessions():
+            labels = (("session_id", session_info.session.id),)
+            metrics.append(
+                MetricStat(
+                    family_name="session_outbound_buffered_bytes",
+                    metric_type="gauge",
+                    help="Bytes written to a session's connection that haven't been sent yet.",
+                    value=session_info.client.buffered_bytes,
+                    labels=labels,
+                )
+            )
+            metrics.append(
+                MetricStat(
+                    family_name="session_outbound_pending_messages",
+                    metric_type="gauge",
+                    help="Messages flushed from a session's queue that haven't been written to its connection yet.",
+                    value=len(self._send_buffers.get(session_info.session.id, ())),
+                    labels=labels,
+                )
+            )
+        return metrics
+
+
 class Runtime:
     _instance: Runtime | None = None
 
@@ -202,11 +268,24 @@ class Runtime:
         # Initialize managers
         self._component_registry = config.component_registry
         self._message_cache = ForwardMsgCache()
+        # Messages flushed from sessions' queues that haven't been sent yet,
+        # by session ID.
+        self._send_buffers: dict[str, deque[ForwardMsg]] = {}
+        # IDs of the sessions that may have messages to send, in the order
+        # they became ready (the values are unused).
+        self._ready_session_ids: dict[str, None] = {}
+        # Writes that sessions' clients haven't completed yet, by session ID.
+        # We don't send more messages to a session until its write completes.
+        self._pending_writes: dict[str, asyncio.Future[None]] = {}
         self._uploaded_file_mgr = config.uploaded_file_manager
         self._media_file_mgr = MediaFileManager(storage=config.media_file_storage)
         self._cache_storage_manager = config.cache_storage_manager
         self._script_cache = ScriptCache()
 
+        self._script_process_pool = self._create_script_process_pool(
+            config.media_file_storage
+        )
+
         self._session_mgr = config.session_manager_class(
             session_storage=config.session_storage,
             uploaded_file_manager=self._uploaded_file_mgr,
@@ -218,8 +297,34 @@ class Runtime:
         self._stats_mgr.register_provider(get_data_cache_stats_provider())
         self._stats_mgr.register_provider(get_resource_cache_stats_provider())
         self._stats_mgr.register_provider(self._message_cache)
+        self._stats_mgr.register_provider(get_payload_store())
+        self._stats_mgr.register_metrics_provider(self._message_cache)
+        self._stats_mgr.register_metrics_provider(
+            _OutboundBacklogMetricsProvider(self._session_mgr, self._send_buffers)
+        )
         self._stats_mgr.register_provider(self._uploaded_file_mgr)
-        self._stats_mgr.register_provider(SessionStateStatProvider(self._session_mgr))
+        if self._script_process_pool is not None:
+            # Sessions' SessionStates are held by the workers running them.
+            self._stats_mgr.register_provider(self._script_process_pool)
+        else:
+            self._stats_mgr.register_provider(
+                SessionStateStatProvider(self._session_mgr)
+            )
+
+    def _create_script_process_pool(
+        self, media_file_storage: MediaFileStorage
+    ) -> ScriptProcessPool | None:
+        num_processes = config.get_option("runner.processPoolSize")
+        if num_processes <= 0:
+            return None
+        return ScriptProcessPool(
+            num_processes,
+            main_script_path=self._main_script_path,
+            media_file_storage=media_file_storage,
+            uploaded_file_mgr=self._uploaded_file_mgr,
+            component_registry=self._component_registry,
+            cache_storage_manager=self._cache_storage_manager,
+        )
 
     @property
     def state(self) -> RuntimeState:
@@ -249,6 +354,13 @@ class Runtime:
     def stats_mgr(self) -> StatsManager:
         return self._stats_mgr
 
+    @property
+    def script_process_pool(self) -> ScriptProcessPool | None:
+        """The pool of processes running the app's scripts, or None if they
+        run in threads of this process (see `runner.processPoolSize`).
+        """
+        return self._script_process_pool
+
     @property
     def stopped(self) -> Awaitable[None]:
         """A Future that completes when the Runtime's run loop has exited."""
@@ -296,6 +408,9 @@ class Runtime:
         )
         self._async_objs = async_objs
 
+        if self._script_process_pool is not None:
+            self._script_process_pool.start()
+
         self._loop_coroutine_task = asyncio.create_task(
             self._loop_coroutine(), name="Runtime.loop_coroutine"
         )
@@ -391,6 +506,11 @@ class Runtime:
         self._set_state(RuntimeState.ONE_OR_MORE_SESSIONS_CONNECTED)
         self._get_async_objs().has_connection.set()
 
+        # A reconnected session may have enqueued messages while it was
+        # disconnected, and its previous client's writes don't matter anymore.
+        self._pending_writes.pop(session_id, None)
+        self._mark_session_ready(session_id)
+
         return session_id
 
     def create_session(
@@ -438,6 +558,7 @@ class Runtime:
         if session_info:
             self._message_cache.remove_refs_for_session(session_info.session)
             self._session_mgr.close_session(session_id)
+        self._forget_pending_output(session_id)
         self._on_session_disconnected()
 
     def disconnect_session(self, session_id: str) -> None:
@@ -470,6 +591,7 @@ class Runtime:
             # that will be useful once the browser tab reconnects.
             self._message_cache.remove_refs_for_session(session_info.session)
             self._session_mgr.disconnect_session(session_id)
+        self._forget_pending_output(session_id)
         self._on_session_disconnected()
 
     def handle_backmsg(self, session_id: str, msg: BackMsg) -> None:
@@ -628,23 +750,10 @@ class Runtime:
                         task.cancel()
                 elif self._state == RuntimeState.ONE_OR_MORE_SESSIONS_CONNECTED:
                     async_objs.need_send_data.clear()
-
-                    for active_session_info in self._session_mgr.list_active_sessions():
-                        msg_list = active_session_info.session.flush_browser_queue()
-                        for msg in msg_list:
-                            try:
-                                self._send_message(active_session_info, msg)
-                            except SessionClientDisconnectedError:
-                                self._session_mgr.disconnect_session(
-                                    active_session_info.session.id
-                                )
-
-                            # Yield for a tick after sending a message.
-                            await asyncio.sleep(0)
-
-                    # Yield for a few milliseconds between session message
-                    # flushing.
-                    await asyncio.sleep(0.01)
+                    if await self._flush_sessions():
+                        # Some sessions have messages left to send: don't wait
+                        # for new messages before sending them.
+                        async_objs.need_send_data.set()
                 else:
                     # Break out of the thread loop if we encounter any other state.
                     break
@@ -671,6 +780,9 @@ class Runtime:
                 # is no longer so tightly coupled to a browser tab.
                 self._session_mgr.close_session(session_info.session.id)
 
+            if self._script_process_pool is not None:
+                self._script_process_pool.stop()
+
             self._set_state(RuntimeState.STOPPED)
             async_objs.stopped.set_result(None)
 
@@ -683,8 +795,129 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
 """
             )
 
-    def _send_message(self, session_info: ActiveSessionInfo, msg: ForwardMsg) -> None:
-        """Send a message to a client.
+    async def _flush_sessions(self) -> bool:
+        """Send the messages enqueued by ready sessions to their clients.
+
+        Only sessions that enqueued messages since the last flush, or that
+        still have messages to send, are visited. Sessions whose client hasn't
+        completed its previous write are skipped: their messages stay in their
+        queue, where deltas keep being composed, and the session is marked
+        ready again when the write completes.
+
+        At most `_MAX_MESSAGES_PER_SESSION_PASS` messages are sent to each
+        session, and we yield to the eventloop after each session. If
+        `server.batchWebsocketMessages` is set, the messages of a session are
+        written to its client all at once. If
+        `server.serializeMessagesInThreadPool` is set, messages are hashed and
+        serialized in a thread pool, and the eventloop only writes them.
+
+        Returns True if some sessions are ready to send more messages.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        batch_messages = config.get_option("server.batchWebsocketMessages")
+        serialize_in_pool = config.get_option("server.serializeMessagesInThreadPool")
+
+        ready_session_ids = list(self._ready_session_ids)
+        self._ready_session_ids.clear()
+
+        for session_id in ready_session_ids:
+            if session_id in self._pending_writes:
+                continue
+
+            session_info = self._session_mgr.get_active_session_info(session_id)
+            if session_info is None:
+                # Buffers of sessions that are no longer active are dropped.
+                self._send_buffers.pop(session_id, None)
+                continue
+
+            buffer = self._send_buffers.pop(session_id, deque())
+            buffer.extend(session_info.session.flush_browser_queue())
+            if not buffer:
+                continue
+
+            msgs = [
+                buffer.popleft()
+                for _ in range(min(len(buffer), _MAX_MESSAGES_PER_SESSION_PASS))
+            ]
+            if serialize_in_pool:
+                client = session_info.client
+                serialized_msgs = await asyncio.get_running_loop().run_in_executor(
+                    _get_serialization_executor(), _prepare_forward_msgs, msgs
+                )
+                current_session_info = self._session_mgr.get_active_session_info(
+                    session_id
+                )
+                if current_session_info is None:
+                    # The session was disconnected while we were waiting, and
+                    # its pending output was dropped.
+                    continue
+                if current_session_info.client is not client:
+                    # The session reconnected while we were waiting: send its
+                    # messages to its new client in the next pass.
+                    buffer.extendleft(reversed(msgs))
+                    self._send_buffers[session_id] = buffer
+                    self._mark_session_ready(session_id)
+                    continue
+            else:
+                serialized_msgs = _prepare_forward_msgs(msgs)
+
+            write: asyncio.Future[None] | None = None
+            try:
+                msgs_to_send = [
+                    self._prepare_message(session_info, msg) for msg in serialized_msgs
+                ]
+                if batch_messages:
+                    write = session_info.client.write_serialized_forward_msgs(
+                        msgs_to_send
+                    )
+                else:
+                    for msg_to_send in msgs_to_send:
+                        write = session_info.client.write_serialized_forward_msgs(
+                            [msg_to_send]
+                        )
+            except SessionClientDisconnectedError:
+                self._session_mgr.disconnect_session(session_id)
+            else:
+                if buffer:
+                    self._send_buffers[session_id] = buffer
+                    self._ready_session_ids[session_id] = None
+                if asyncio.isfuture(write) and not write.done():
+                    self._pending_writes[session_id] = write
+                    write.add_done_callback(
+                        functools.partial(self._on_write_done, session_id)
+                    )
+
+            # Yield for a tick after sending a session's messages.
+            await asyncio.sleep(0)
+
+        return bool(self._ready_session_ids)
+
+    def _on_write_done(self, session_id: str, write: asyncio.Future[None]) -> None:
+        """Callback called when a write to a session's client completes.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        if self._pending_writes.get(session_id) is not write:
+            # The session was disconnected or reconnected in the meantime.
+            return
+        del self._pending_writes[session_id]
+        if not write.cancelled() and write.exception() is not None:
+            # The client is gone. It's disconnected when its connection is
+            # closed, or when we next write to it.
+            _LOGGER.debug(
+                "Write to session %s failed: %s", session_id, write.exception()
+            )
+        self._mark_session_ready(session_id)
+
+    def _prepare_message(
+        self, session_info: ActiveSessionInfo, msg: SerializedForwardMsg
+    ) -> SerializedForwardMsg:
+        """Return the message to send to a client in place of the given message.
 
         If the client is likely to have already cached the message, we may
         instead send a "reference" message that contains only the hash of the
@@ -694,30 +927,31 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
         ----------
         session_info : ActiveSessionInfo
             The ActiveSessionInfo associated with websocket
-        msg : ForwardMsg
-            The message to send to the client
+        msg : SerializedForwardMsg
+            The message to send to the client, prepared with
+            `runtime_util.prepare_forward_msg`
 
         Notes
         -----
         Threading: UNSAFE. Must be called on the eventloop thread.
         """
-        msg.metadata.cacheable = is_cacheable_msg(msg)
         msg_to_send = msg
-        if msg.metadata.cacheable:
-            populate_hash_if_needed(msg)
-
+        if msg.msg.metadata.cacheable:
             if self._message_cache.has_message_reference(
-                msg, session_info.session, session_info.script_run_count
+                msg.msg, session_info.session, session_info.script_run_count
             ):
                 # This session has probably cached this message. Send
-                # a reference instead.
-                _LOGGER.debug("Sending cached message ref (hash=%s)", msg.hash)
-                msg_to_send = create_reference_msg(msg)
+                # a reference instead. Reference messages are tiny, so we
+                # serialize them here.
+                _LOGGER.debug("Sending cached message ref (hash=%s)", msg.msg.hash)
+                msg_to_send = SerializedForwardMsg.from_msg(
+                    create_reference_msg(msg.msg)
+                )
 
             # Cache the message so it can be referenced in the future.
             # If the message is already cached, this will reset its
             # age.
-            _LOGGER.debug("Caching message (hash=%s)", msg.hash)
+            _LOGGER.debug("Caching message (hash=%s)", msg.msg.hash)
             self._message_cache.add_message(
                 msg, session_info.session, session_info.script_run_count
             )
@@ -725,8 +959,8 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
         # If this was a `script_finished` message, we increment the
         # script_run_count for this session, and update the cache
         if (
-            msg.WhichOneof("type") == "script_finished"
-            and msg.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY
+            msg.msg.WhichOneof("type") == "script_finished"
+            and msg.msg.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY
         ):
             _LOGGER.debug(
                 "Script run finished successfully; "
@@ -739,20 +973,42 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
                 session_info.session, session_info.script_run_count
             )
 
-        # Ship it off!
-        session_info.client.write_forward_msg(msg_to_send)
+        return msg_to_send
+
+    def _forget_pending_output(self, session_id: str) -> None:
+        """Drop the messages and the write we were waiting for of a session
+        that is no longer active.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        self._send_buffers.pop(session_id, None)
+        self._pending_writes.pop(session_id, None)
 
-    def _enqueued_some_message(self) -> None:
+    def _enqueued_some_message(self, session_id: str) -> None:
         """Callback called by AppSession after the AppSession has enqueued a
-        message. Sets the "needs_send_data" event, which causes our core
-        loop to wake up and flush client message queues.
+        message. Marks the session as ready to send, which causes our core
+        loop to wake up and flush its message queue.
 
         Notes
         -----
         Threading: SAFE. May be called on any thread.
         """
-        async_objs = self._get_async_objs()
-        async_objs.eventloop.call_soon_threadsafe(async_objs.need_send_data.set)
+        self._get_async_objs().eventloop.call_soon_threadsafe(
+            self._mark_session_ready, session_id
+        )
+
+    def _mark_session_ready(self, session_id: str) -> None:
+        """Add a session to the sessions to visit in the next flush, and set
+        the "needs_send_data" event.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        self._ready_session_ids[session_id] = None
+        self._get_async_objs().need_send_data.set()
 
     def _get_async_objs(self) -> AsyncObjects:
         """Return our AsyncObjects instance. If the Runtime hasn't been
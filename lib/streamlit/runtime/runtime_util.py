@@ -16,14 +16,28 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
 
 from streamlit import config
 from streamlit.errors import MarkdownFormattedException, StreamlitAPIException
-from streamlit.runtime.forward_msg_cache import populate_hash_if_needed
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import (
+    compute_payload_hash,
+    get_payload_store,
+    serialize_msg_payload,
+)
 
 if TYPE_CHECKING:
-    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from collections.abc import Iterable
+
+# First byte of websocket frames that contain several ForwardMsgs. A serialized
+# ForwardMsg never starts with a NUL byte (which would be an invalid field
+# number), so the frontend can tell both kinds of frames apart.
+_BATCH_FRAME_MARKER: Final = b"\x00"
+
+_BATCH_LENGTH_FORMAT: Final = "<I"
 
 
 class MessageSizeError(MarkdownFormattedException):
@@ -60,10 +74,13 @@ class BadDurationStringError(StreamlitAPIException):
         )
 
 
+# Message types that never get cached.
+_UNCACHEABLE_MSG_TYPES: Final = frozenset({"ref_hash", "initialize"})
+
+
 def is_cacheable_msg(msg: ForwardMsg) -> bool:
     """True if the given message qualifies for caching."""
-    if msg.WhichOneof("type") in {"ref_hash", "initialize"}:
-        # Some message types never get cached
+    if msg.WhichOneof("type") in _UNCACHEABLE_MSG_TYPES:
         return False
     return msg.ByteSize() >= int(config.get_option("global.minCachedMessageSize"))
 
@@ -74,18 +91,114 @@ def serialize_forward_msg(msg: ForwardMsg) -> bytes:
     If the message is too large, it will be converted to an exception message
     instead.
     """
-    populate_hash_if_needed(msg)
-    msg_str = msg.SerializeToString()
+    return SerializedForwardMsg.from_msg(msg).data
+
+
+@dataclass(frozen=True)
+class SerializedForwardMsg:
+    """A ForwardMsg, along with its serialized form.
+
+    The serialized form is what gets sent to the client: it must not be used
+    for a message that was modified after being serialized.
+
+    It's the message's payload (see `forward_msg_cache.serialize_msg_payload`),
+    which its hash is computed from, followed by its hash and metadata. The
+    fields of concatenated protobuf messages are merged when parsed, so this
+    is equivalent to serializing the whole message, but the payload only needs
+    to be serialized once.
+    """
 
-    if len(msg_str) > get_max_message_size_bytes():
-        import streamlit.elements.exception as exception
+    msg: ForwardMsg
+    data: bytes
 
-        # Overwrite the offending ForwardMsg.delta with an error to display.
-        # This assumes that the size limit wasn't exceeded due to metadata.
-        exception.marshall(msg.delta.new_element.exception, MessageSizeError(msg_str))
-        msg_str = msg.SerializeToString()
+    @classmethod
+    def from_msg(cls, msg: ForwardMsg) -> SerializedForwardMsg:
+        return cls.from_payload(msg, serialize_msg_payload(msg))
 
-    return msg_str
+    @classmethod
+    def from_payload(cls, msg: ForwardMsg, payload: bytes) -> SerializedForwardMsg:
+        """Serialize a ForwardMsg whose payload was already serialized, and
+        populate its hash if needed.
+        """
+        if msg.hash == "":
+            msg.hash = compute_payload_hash(payload)
+
+        if len(payload) > get_max_message_size_bytes():
+            import streamlit.elements.exception as exception
+
+            # Overwrite the offending ForwardMsg.delta with an error to display.
+            # This assumes that the size limit wasn't exceeded due to metadata.
+            exception.marshall(
+                msg.delta.new_element.exception, MessageSizeError(payload)
+            )
+            payload = serialize_msg_payload(msg)
+
+        envelope = ForwardMsg()
+        envelope.hash = msg.hash
+        envelope.metadata.CopyFrom(msg.metadata)
+        return cls(msg, payload + envelope.SerializeToString())
+
+
+def prepare_forward_msg(msg: ForwardMsg) -> SerializedForwardMsg:
+    """Set the metadata the Runtime needs to send a ForwardMsg (whether it's
+    cacheable, and its hash), and serialize it.
+
+    This is the CPU-heavy part of sending large messages, so it can be done off
+    the eventloop thread. The message must not be used by other threads
+    meanwhile.
+
+    If the message's hash was set beforehand (e.g. for elements replayed from
+    a cached function), its payload is taken from the ForwardMsgPayloadStore
+    when it's stored there.
+    """
+    payload = get_payload_store().get_payload(msg.hash) if msg.hash else None
+    if payload is None:
+        payload = serialize_msg_payload(msg)
+    # Like is_cacheable_msg, using the payload size that we already know.
+    min_cached_size = int(config.get_option("global.minCachedMessageSize"))
+    msg.metadata.cacheable = (
+        msg.WhichOneof("type") not in _UNCACHEABLE_MSG_TYPES
+        and len(payload) >= min_cached_size
+    )
+    return SerializedForwardMsg.from_payload(msg, payload)
+
+
+def pack_forward_msg_frames(msg_strs: Iterable[bytes]) -> list[bytes]:
+    """Pack serialized ForwardMsgs into as few websocket frames as possible.
+
+    Each frame either contains a single serialized ForwardMsg, or starts with
+    `_BATCH_FRAME_MARKER` followed by several serialized ForwardMsgs, each
+    prefixed with its length as a little-endian uint32. Frames are kept under
+    the max message size, unless they contain a single message.
+    """
+    max_frame_size = get_max_message_size_bytes()
+    length_size = struct.calcsize(_BATCH_LENGTH_FORMAT)
+
+    batches: list[list[bytes]] = []
+    batch: list[bytes] = []
+    batch_size = len(_BATCH_FRAME_MARKER)
+    for msg_str in msg_strs:
+        msg_size = length_size + len(msg_str)
+        if batch and batch_size + msg_size > max_frame_size:
+            batches.append(batch)
+            batch = []
+            batch_size = len(_BATCH_FRAME_MARKER)
+        batch.append(msg_str)
+        batch_size += msg_size
+    if batch:
+        batches.append(batch)
+
+    frames = []
+    for batch in batches:
+        if len(batch) == 1:
+            frames.append(batch[0])
+            continue
+        parts = [_BATCH_FRAME_MARKER]
+        for msg_str in batch:
+            parts.append(struct.pack(_BATCH_LENGTH_FORMAT, len(msg_str)))
+            parts.append(msg_str)
+        frames.append(b"".join(parts))
+    return frames
 
 
 # This needs to be initialized lazily to avoid calling config.get_option() and
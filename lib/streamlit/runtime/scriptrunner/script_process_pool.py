@@ -0,0 +1,1046 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs app scripts in a pool of worker processes.
+
+By default, the app's scripts run in ScriptRunner threads of the server
+process, so a session running CPU-heavy code slows down the server's event
+loop, and all the other sessions with it. If `runner.processPoolSize` is set,
+each session is assigned to one of that many worker processes instead. The
+worker holds the session's SessionState and runs its scripts, and streams the
+ForwardMsgs they enqueue back to the server process over a pipe.
+
+In the server process, a RemoteScriptRunner stands in for each ScriptRunner: it
+forwards rerun and stop requests to the session's worker, and emits the events
+of the ScriptRunners that handle them. Workers store media files, read
+uploaded files and register custom components through the server process, so
+that these are served as usual.
+
+Each worker has its own st.cache_data and st.cache_resource caches, and its own
+copy of the modules the app imports.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import multiprocessing
+import pickle
+import sys
+import threading
+import types
+import uuid
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Final, Sequence
+
+from blinker import Signal
+
+from streamlit import config, util
+from streamlit.components.lib.local_component_registry import LocalComponentRegistry
+from streamlit.config_option import ConfigOption
+from streamlit.logger import get_logger
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorage
+from streamlit.runtime.scriptrunner.script_runner import ScriptRunner, ScriptRunnerEvent
+from streamlit.runtime.state import SCRIPT_RUN_WITHOUT_ERRORS_KEY
+from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.uploaded_file_manager import (
+    UploadedFileManager,
+    UploadedFileRec,
+    UploadFileUrlInfo,
+)
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+    from streamlit.components.types.base_component_registry import (
+        BaseComponentRegistry,
+    )
+    from streamlit.components.types.base_custom_component import (
+        BaseCustomComponent,
+    )
+    from streamlit.runtime.caching.storage import CacheStorageManager
+    from streamlit.runtime.fragment import FragmentStorage
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.runtime.state import SessionState
+
+_LOGGER: Final = get_logger(__name__)
+
+# Workers are started with "spawn" rather than "fork": the server process runs
+# threads, which can't be forked safely.
+_MP_CONTEXT: Final = multiprocessing.get_context("spawn")
+
+# How long stopping the pool waits for each worker to exit, in seconds, before
+# terminating it.
+_STOP_TIMEOUT_SECONDS: Final = 5.0
+
+# The `where_defined` of the config options the server process sets in workers.
+_DEFINED_BY_SERVER_PROCESS: Final = "server process"
+
+
+class RemoteScriptRunner:
+    """Stands in for a ScriptRunner running in one of the pool's workers.
+
+    It has the same interface as ScriptRunner, and emits the same events. Its
+    events are emitted on the thread that reads its worker's messages.
+
+    The session's SessionState is held by the worker. Whether the script ran
+    without errors, which the runtime's script health check reads, is copied
+    to the SessionState of the server process after each run.
+    """
+
+    def __init__(
+        self,
+        worker: _Worker,
+        session_id: str,
+        initial_rerun_data: RerunData,
+        user_info: dict[str, str | None],
+        session_state: SessionState,
+    ):
+        self._worker = worker
+        self._session_id = session_id
+        self._initial_rerun_data = initial_rerun_data
+        self._user_info = user_info
+        self._session_state = session_state
+        self._runner_id = str(uuid.uuid4())
+
+        self._lock = threading.Lock()
+        # The sequence number of the last rerun request sent to the worker.
+        # The worker sends it back when its ScriptRunner is done handling
+        # requests, which tells us whether a later request is still pending.
+        self._rerun_seq = 0
+        self._stop_requested = False
+        self._shut_down = False
+        self._client_state = ClientState()
+
+        self.on_event = Signal(
+            doc="""Emitted when a ScriptRunnerEvent occurs.
+
+            See ScriptRunner.on_event.
+            """
+        )
+
+    def __repr__(self) -> str:
+        return util.repr_(self)
+
+    @property
+    def runner_id(self) -> str:
+        return self._runner_id
+
+    def start(self) -> None:
+        """Send the initial rerun request to the worker."""
+        self._worker.register_runner(self)
+        self.request_rerun(self._initial_rerun_data)
+
+    def request_stop(self) -> None:
+        """Request that the worker's ScriptRunner stop running the script and
+        shut down.
+
+        Safe to call from any thread.
+        """
+        with self._lock:
+            if self._stop_requested or self._shut_down:
+                return
+            self._stop_requested = True
+            self._worker.send(("stop", self._runner_id))
+
+    def request_rerun(self, rerun_data: RerunData) -> bool:
+        """Request that the worker rerun the script.
+
+        If this runner has been stopped, this request can't be honored:
+        return False.
+
+        Safe to call from any thread.
+        """
+        with self._lock:
+            if self._stop_requested or self._shut_down:
+                return False
+            self._rerun_seq += 1
+            self._client_state.query_string = rerun_data.query_string
+            self._worker.send(
+                (
+                    "rerun",
+                    self._session_id,
+                    self._runner_id,
+                    self._rerun_seq,
+                    rerun_data,
+                    self._user_info,
+                )
+            )
+            return True
+
+    def on_worker_event(
+        self,
+        event: ScriptRunnerEvent,
+        forward_msg: bytes | None,
+        exception: BaseException | None,
+        page_script_hash: str | None,
+        fragment_ids_this_run: list[str] | None,
+        pages: Any,
+    ) -> None:
+        """Emit an event sent by the worker's ScriptRunner."""
+        if page_script_hash is not None:
+            self._client_state.page_script_hash = page_script_hash
+
+        kwargs: dict[str, Any] = {}
+        if forward_msg is not None:
+            kwargs["forward_msg"] = ForwardMsg.FromString(forward_msg)
+        if exception is not None:
+            kwargs["exception"] = exception
+        if page_script_hash is not None:
+            kwargs["page_script_hash"] = page_script_hash
+        if fragment_ids_this_run is not None:
+            kwargs["fragment_ids_this_run"] = fragment_ids_this_run
+        if pages is not None:
+            kwargs["pages"] = pages
+        self.on_event.send(self, event=event, **kwargs)
+
+    def on_worker_idle(
+        self, rerun_seq: int, client_state: bytes, run_without_errors: bool | None
+    ) -> None:
+        """Handle the worker's ScriptRunner shutting down after handling the
+        requests up to `rerun_seq`.
+        """
+        if run_without_errors is not None:
+            self._session_state[SCRIPT_RUN_WITHOUT_ERRORS_KEY] = run_without_errors
+        with self._lock:
+            if rerun_seq != self._rerun_seq or self._shut_down:
+                # A later rerun request is pending: the worker starts a new
+                # ScriptRunner to handle it.
+                return
+            self._shut_down = True
+            self._client_state = ClientState.FromString(client_state)
+        self._worker.unregister_runner(self)
+        self.on_event.send(
+            self, event=ScriptRunnerEvent.SHUTDOWN, client_state=self._client_state
+        )
+
+    def on_worker_exited(self) -> None:
+        """Shut down, as if the script had stopped, after the worker exited."""
+        with self._lock:
+            if self._shut_down:
+                return
+            self._shut_down = True
+
+        import streamlit.elements.exception as exception_utils
+
+        msg = ForwardMsg()
+        exception_utils.marshall(
+            msg.delta.new_element.exception,
+            RuntimeError("The process running this app's script exited unexpectedly."),
+        )
+        self.on_event.send(
+            self, event=ScriptRunnerEvent.ENQUEUE_FORWARD_MSG, forward_msg=msg
+        )
+        self.on_event.send(self, event=ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS)
+        self.on_event.send(
+            self, event=ScriptRunnerEvent.SHUTDOWN, client_state=self._client_state
+        )
+
+
+class ScriptProcessPool(CacheStatsProvider):
+    """A pool of worker processes that run the app's scripts.
+
+    Each session is assigned to the worker running the fewest sessions, and
+    keeps using it until it's closed.
+
+    As a CacheStatsProvider, it reports the size of the sessions' SessionStates,
+    as their workers measured them at the end of their last script run.
+    """
+
+    def __init__(
+        self,
+        num_processes: int,
+        main_script_path: str,
+        media_file_storage: MediaFileStorage,
+        uploaded_file_mgr: UploadedFileManager,
+        component_registry: BaseComponentRegistry,
+        cache_storage_manager: CacheStorageManager,
+    ):
+        self._num_processes = num_processes
+        self._main_script_path = main_script_path
+        self._media_file_storage = media_file_storage
+        self._uploaded_file_mgr = uploaded_file_mgr
+        self._component_registry = component_registry
+        self._cache_storage_manager = cache_storage_manager
+
+        self._lock = threading.Lock()
+        self._workers: list[_Worker] = []
+        self._session_workers: dict[str, _Worker] = {}
+        # The workers using each media file, by file ID. A file is deleted once
+        # no worker uses it anymore.
+        self._media_file_workers: dict[str, set[int]] = {}
+        self._session_state_stats: dict[str, list[CacheStat]] = {}
+        self._stopping = False
+
+    def __repr__(self) -> str:
+        return util.repr_(self)
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        with self._lock:
+            self._workers = [self._start_worker(i) for i in range(self._num_processes)]
+        # Workers exit once the pipe to the server process is closed, which
+        # only happens when this process exits: make sure they're stopped
+        # before multiprocessing waits for them to exit.
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the worker processes, waiting for them to exit."""
+        with self._lock:
+            if self._stopping:
+                return
+            self._stopping = True
+            workers = list(self._workers)
+
+        atexit.unregister(self.stop)
+        for worker in workers:
+            worker.send(("exit",))
+        for worker in workers:
+            worker.join(_STOP_TIMEOUT_SECONDS)
+
+    def create_script_runner(
+        self,
+        session_id: str,
+        initial_rerun_data: RerunData,
+        user_info: dict[str, str | None],
+        session_state: SessionState,
+    ) -> RemoteScriptRunner:
+        """Create a RemoteScriptRunner running the session's scripts in its
+        worker. It won't send its initial rerun request until it's started.
+        """
+        with self._lock:
+            worker = self._session_workers.get(session_id)
+            if worker is None:
+                session_counts = {w: 0 for w in self._workers}
+                for w in self._session_workers.values():
+                    session_counts[w] += 1
+                worker = min(self._workers, key=lambda w: session_counts[w])
+                self._session_workers[session_id] = worker
+        return RemoteScriptRunner(
+            worker, session_id, initial_rerun_data, user_info, session_state
+        )
+
+    def close_session(self, session_id: str) -> None:
+        """Drop the state that the session's worker holds for it."""
+        with self._lock:
+            worker = self._session_workers.pop(session_id, None)
+            self._session_state_stats.pop(session_id, None)
+        if worker is not None:
+            worker.send(("close_session", session_id))
+
+    def clear_caches(self, session_id: str) -> None:
+        """Clear the st.cache_data and st.cache_resource caches of all
+        workers, and the session's SessionState.
+        """
+        self._broadcast(("clear_caches", session_id))
+
+    def clear_script_caches(self) -> None:
+        """Make workers reload the app's scripts, after they changed."""
+        self._broadcast(("clear_script_caches",))
+
+    def get_stats(self) -> list[CacheStat]:
+        with self._lock:
+            stats = [
+                stat
+                for session_stats in self._session_state_stats.values()
+                for stat in session_stats
+            ]
+        return group_stats(stats)
+
+    def on_session_state_stats(self, session_id: str, stats: list[CacheStat]) -> None:
+        """Store the stats of a session's SessionState, sent by its worker."""
+        with self._lock:
+            if session_id in self._session_workers:
+                self._session_state_stats[session_id] = stats
+
+    def _broadcast(self, message: tuple[Any, ...]) -> None:
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.send(message)
+
+    def _start_worker(self, index: int) -> _Worker:
+        config_options = {
+            key: (option.value, option.where_defined)
+            for key, option in config.get_config_options().items()
+            if option.where_defined != ConfigOption.DEFAULT_DEFINITION
+        }
+        worker = _Worker(
+            index,
+            self,
+            self._main_script_path,
+            config_options,
+            self._cache_storage_manager,
+        )
+        worker.start()
+        return worker
+
+    def on_worker_exited(self, worker: _Worker) -> None:
+        """Restart a worker that exited unexpectedly.
+
+        The sessions it ran lose their SessionState.
+        """
+        with self._lock:
+            if self._stopping:
+                return
+            _LOGGER.error(
+                "Script worker process %s exited unexpectedly, restarting it.",
+                worker.index,
+            )
+            for session_id, session_worker in list(self._session_workers.items()):
+                if session_worker is worker:
+                    del self._session_workers[session_id]
+                    self._session_state_stats.pop(session_id, None)
+            self._workers[worker.index] = self._start_worker(worker.index)
+            orphaned_file_ids = self._release_media_files(worker.index)
+
+        for file_id in orphaned_file_ids:
+            self._media_file_storage.delete_file(file_id)
+        for runner in worker.take_runners():
+            runner.on_worker_exited()
+
+    def handle_call(self, worker: _Worker, method: str, args: tuple[Any, ...]) -> Any:
+        """Handle a call made by a worker, and return its result."""
+        if method == "get_uploaded_files":
+            session_id, file_ids = args
+            return self._uploaded_file_mgr.get_files(session_id, file_ids)
+
+        if method == "load_media_file":
+            file_id = self._media_file_storage.load_and_get_id(*args)
+            with self._lock:
+                self._media_file_workers.setdefault(file_id, set()).add(worker.index)
+            return file_id, self._media_file_storage.get_url(file_id)
+
+        if method == "get_media_file_url":
+            (file_id,) = args
+            return self._media_file_storage.get_url(file_id)
+
+        if method == "delete_media_file":
+            (file_id,) = args
+            with self._lock:
+                workers = self._media_file_workers.get(file_id, set())
+                workers.discard(worker.index)
+                if workers:
+                    return None
+                self._media_file_workers.pop(file_id, None)
+            self._media_file_storage.delete_file(file_id)
+            return None
+
+        if method == "register_component":
+            (component,) = args
+            self._component_registry.register_component(component)
+            return None
+
+        raise ValueError(f"Unknown script worker call: {method}")
+
+    def _release_media_files(self, worker_index: int) -> list[str]:
+        """Forget the media files a worker uses, and return the ones no other
+        worker uses.
+        """
+        orphaned_file_ids = []
+        for file_id, workers in list(self._media_file_workers.items()):
+            workers.discard(worker_index)
+            if not workers:
+                del self._media_file_workers[file_id]
+                orphaned_file_ids.append(file_id)
+        return orphaned_file_ids
+
+
+class _Worker:
+    """The server process's side of a worker process."""
+
+    def __init__(
+        self,
+        index: int,
+        pool: ScriptProcessPool,
+        main_script_path: str,
+        config_options: dict[str, tuple[Any, str]],
+        cache_storage_manager: CacheStorageManager,
+    ):
+        self.index = index
+        self._pool = pool
+        self._connection, worker_connection = _MP_CONTEXT.Pipe()
+        # Not a daemon process, so that scripts can start processes themselves.
+        self._process = _MP_CONTEXT.Process(
+            target=run_worker,
+            args=(
+                worker_connection,
+                main_script_path,
+                config_options,
+                cache_storage_manager,
+            ),
+            name=f"ScriptProcessPool.worker-{index}",
+        )
+        self._worker_connection = worker_connection
+        self._send_lock = threading.Lock()
+        self._runners_lock = threading.Lock()
+        self._runners: dict[str, RemoteScriptRunner] = {}
+
+    def __repr__(self) -> str:
+        return util.repr_(self)
+
+    def start(self) -> None:
+        # "spawn" runs this process's __main__ module again in the worker,
+        # unless it has no file. Workers don't need it, and it may be a script
+        # that shouldn't run again, or that doesn't exist anymore.
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            self._process.start()
+        finally:
+            sys.modules["__main__"] = main_module
+        # The worker has its own copy of this end of the pipe.
+        self._worker_connection.close()
+        threading.Thread(
+            target=self._read_messages,
+            name=f"ScriptProcessPool.reader-{self.index}",
+            daemon=True,
+        ).start()
+
+    def join(self, timeout: float) -> None:
+        self._process.join(timeout)
+        if self._process.is_alive():
+            _LOGGER.warning(
+                "Script worker process %s didn't stop, terminating it.", self.index
+            )
+            self._process.terminate()
+            self._process.join()
+        self._connection.close()
+
+    def send(self, message: tuple[Any, ...]) -> None:
+        """Send a message to the worker. Safe to call from any thread."""
+        try:
+            with self._send_lock:
+                self._connection.send(message)
+        except (OSError, ValueError) as ex:
+            # The worker exited. We find out when reading its messages.
+            _LOGGER.debug("Failed to send a message to script worker: %s", ex)
+
+    def register_runner(self, runner: RemoteScriptRunner) -> None:
+        with self._runners_lock:
+            self._runners[runner.runner_id] = runner
+
+    def unregister_runner(self, runner: RemoteScriptRunner) -> None:
+        with self._runners_lock:
+            self._runners.pop(runner.runner_id, None)
+
+    def _get_runner(self, runner_id: str) -> RemoteScriptRunner | None:
+        with self._runners_lock:
+            return self._runners.get(runner_id)
+
+    def take_runners(self) -> list[RemoteScriptRunner]:
+        """Unregister all the runners, and return them."""
+        with self._runners_lock:
+            runners = list(self._runners.values())
+            self._runners.clear()
+        return runners
+
+    def _read_messages(self) -> None:
+        while True:
+            try:
+                message = self._connection.recv()
+            except (EOFError, OSError):
+                break
+
+            try:
+                self._handle_message(message)
+            except Exception:
+                _LOGGER.exception("Failed to handle a script worker message")
+
+        self._pool.on_worker_exited(self)
+
+    def _handle_message(self, message: tuple[Any, ...]) -> None:
+        message_type = message[0]
+
+        if message_type == "event":
+            _, runner_id, event_name, *event_args = message
+            runner = self._get_runner(runner_id)
+            if runner is not None:
+                runner.on_worker_event(ScriptRunnerEvent[event_name], *event_args)
+
+        elif message_type == "idle":
+            (
+                _,
+                session_id,
+                runner_id,
+                rerun_seq,
+                client_state,
+                run_without_errors,
+                session_state_stats,
+            ) = message
+            self._pool.on_session_state_stats(session_id, session_state_stats)
+            runner = self._get_runner(runner_id)
+            if runner is not None:
+                runner.on_worker_idle(rerun_seq, client_state, run_without_errors)
+
+        elif message_type == "call":
+            _, call_id, method, args = message
+            try:
+                result = self._pool.handle_call(self, method, args)
+            except Exception as ex:
+                if call_id is None:
+                    raise
+                self.send(("reply", call_id, None, _picklable_exception(ex)))
+            else:
+                if call_id is not None:
+                    self.send(("reply", call_id, result, None))
+
+        else:
+            _LOGGER.warning("Unknown script worker message: %s", message_type)
+
+
+def _picklable_exception(ex: BaseException) -> BaseException:
+    """Return the exception if it can be pickled, or a RuntimeError with its
+    message otherwise.
+    """
+    try:
+        pickle.dumps(ex)
+        return ex
+    except Exception:
+        return RuntimeError(f"{type(ex).__name__}: {ex}")
+
+
+# Worker process
+
+
+class _ServerProcessChannel:
+    """The worker's end of the pipe to the server process."""
+
+    def __init__(self, connection: Connection):
+        self._connection = connection
+        self._send_lock = threading.Lock()
+        self._call_ids = itertools.count()
+        self._calls: dict[int, Future[Any]] = {}
+
+    def send(self, message: tuple[Any, ...]) -> None:
+        with self._send_lock:
+            self._connection.send(message)
+
+    def call(self, method: str, *args: Any) -> Any:
+        """Call a ScriptProcessPool.handle_call method in the server process,
+        and return its result.
+        """
+        future: Future[Any] = Future()
+        call_id = next(self._call_ids)
+        self._calls[call_id] = future
+        self.send(("call", call_id, method, args))
+        return future.result()
+
+    def notify(self, method: str, *args: Any) -> None:
+        """Like `call`, without waiting for the call to complete.
+
+        The server process handles calls in order: a call made after this one
+        sees its effects.
+        """
+        self.send(("call", None, method, args))
+
+    def on_reply(
+        self, call_id: int, result: Any, exception: BaseException | None
+    ) -> None:
+        future = self._calls.pop(call_id, None)
+        if future is None:
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def cancel_calls(self) -> None:
+        for future in self._calls.values():
+            future.set_exception(EOFError("The server process exited."))
+        self._calls.clear()
+
+
+class _RemoteMediaFileStorage(MediaFileStorage):
+    """Stores the worker's media files in the server process, which serves
+    them.
+    """
+
+    def __init__(self, channel: _ServerProcessChannel):
+        self._channel = channel
+        self._urls: dict[str, str] = {}
+
+    def load_and_get_id(
+        self,
+        path_or_data: str | bytes,
+        mimetype: str,
+        kind: MediaFileKind,
+        filename: str | None = None,
+    ) -> str:
+        file_id: str
+        url: str
+        file_id, url = self._channel.call(
+            "load_media_file", path_or_data, mimetype, kind, filename
+        )
+        self._urls[file_id] = url
+        return file_id
+
+    def get_url(self, file_id: str) -> str:
+        url = self._urls.get(file_id)
+        if url is None:
+            url = self._channel.call("get_media_file_url", file_id)
+        return url
+
+    def delete_file(self, file_id: str) -> None:
+        self._urls.pop(file_id, None)
+        self._channel.notify("delete_media_file", file_id)
+
+
+class _RemoteUploadedFileManager(UploadedFileManager):
+    """Reads the files uploaded to the server process."""
+
+    def __init__(self, channel: _ServerProcessChannel):
+        self._channel = channel
+
+    def get_files(
+        self, session_id: str, file_ids: Sequence[str]
+    ) -> list[UploadedFileRec]:
+        files: list[UploadedFileRec] = self._channel.call(
+            "get_uploaded_files", session_id, list(file_ids)
+        )
+        return files
+
+    def remove_session_files(self, session_id: str) -> None:
+        # The server process removes them when the session is closed.
+        pass
+
+    def get_upload_urls(
+        self, session_id: str, file_names: Sequence[str]
+    ) -> list[UploadFileUrlInfo]:
+        # Upload URLs are requested by the browser, through the server process,
+        # never by scripts.
+        raise RuntimeError(
+            "Upload URLs are issued by the server process, and can't be "
+            "requested from a script worker process."
+        )
+
+    def get_stats(self) -> list[CacheStat]:
+        return []
+
+
+class _RemoteComponentRegistry(LocalComponentRegistry):
+    """Also registers the worker's components in the server process, which
+    serves their files.
+    """
+
+    def __init__(self, channel: _ServerProcessChannel):
+        super().__init__()
+        self._channel = channel
+
+    def register_component(self, component: BaseCustomComponent) -> None:
+        super().register_component(component)
+        self._channel.notify("register_component", component)
+
+
+class _WorkerSession:
+    """What a worker holds for a session assigned to it."""
+
+    def __init__(
+        self,
+        session_state: SessionState,
+        fragment_storage: FragmentStorage,
+        pages_manager: PagesManager,
+    ):
+        self.session_state = session_state
+        self.fragment_storage = fragment_storage
+        self.pages_manager = pages_manager
+        self.runner_ids: set[str] = set()
+
+
+class _RunnerSlot:
+    """The worker's side of a RemoteScriptRunner: runs the ScriptRunner that
+    handles its requests.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        runner_id: str,
+        session_state: SessionState,
+        channel: _ServerProcessChannel,
+        on_idle: Callable[[_RunnerSlot], None],
+    ):
+        self.session_id = session_id
+        self.runner_id = runner_id
+        self._session_state = session_state
+        self._channel = channel
+        self._on_idle = on_idle
+        self._lock = threading.Lock()
+        self._runner: ScriptRunner | None = None
+        self._rerun_seq = 0
+
+    def request_rerun(
+        self,
+        rerun_seq: int,
+        rerun_data: RerunData,
+        create_runner: Callable[[RerunData], ScriptRunner],
+    ) -> None:
+        with self._lock:
+            self._rerun_seq = rerun_seq
+            if self._runner is not None and self._runner.request_rerun(rerun_data):
+                return
+            # Our ScriptRunner is shutting down: the events of the one we start
+            # replace its own.
+            self._runner = create_runner(rerun_data)
+            self._runner.on_event.connect(self._on_runner_event, weak=False)
+            self._runner.start()
+
+    def request_stop(self) -> None:
+        with self._lock:
+            if self._runner is not None:
+                self._runner.request_stop()
+
+    def _on_runner_event(
+        self,
+        sender: ScriptRunner,
+        event: ScriptRunnerEvent,
+        forward_msg: ForwardMsg | None = None,
+        exception: BaseException | None = None,
+        client_state: ClientState | None = None,
+        page_script_hash: str | None = None,
+        fragment_ids_this_run: list[str] | None = None,
+        pages: Any = None,
+    ) -> None:
+        if event == ScriptRunnerEvent.SHUTDOWN:
+            with self._lock:
+                if sender is not self._runner:
+                    return
+                self._runner = None
+                rerun_seq = self._rerun_seq
+            self._on_idle(self)
+            assert client_state is not None
+            run_without_errors = (
+                self._session_state[SCRIPT_RUN_WITHOUT_ERRORS_KEY]
+                if SCRIPT_RUN_WITHOUT_ERRORS_KEY in self._session_state
+                else None
+            )
+            self._channel.send(
+                (
+                    "idle",
+                    self.session_id,
+                    self.runner_id,
+                    rerun_seq,
+                    client_state.SerializeToString(),
+                    run_without_errors,
+                    self._session_state.get_stats(),
+                )
+            )
+            return
+
+        self._channel.send(
+            (
+                "event",
+                self.runner_id,
+                event.name,
+                forward_msg.SerializeToString() if forward_msg is not None else None,
+                _picklable_exception(exception) if exception is not None else None,
+                page_script_hash,
+                fragment_ids_this_run,
+                pages,
+            )
+        )
+
+
+class _ScriptWorker:
+    """Runs the scripts of the sessions assigned to a worker process."""
+
+    def __init__(
+        self,
+        channel: _ServerProcessChannel,
+        connection: Connection,
+        main_script_path: str,
+        script_cache: ScriptCache,
+        uploaded_file_mgr: UploadedFileManager,
+    ):
+        self._channel = channel
+        self._connection = connection
+        self._main_script_path = main_script_path
+        self._script_cache = script_cache
+        self._uploaded_file_mgr = uploaded_file_mgr
+        self._lock = threading.Lock()
+        self._sessions: dict[str, _WorkerSession] = {}
+        self._slots: dict[str, _RunnerSlot] = {}
+
+    def run(self) -> None:
+        """Handle the server process's messages until it asks us to exit."""
+        while True:
+            try:
+                message = self._connection.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "exit":
+                break
+            try:
+                self._handle_message(message)
+            except Exception:
+                _LOGGER.exception("Failed to handle a script worker message")
+
+        self._channel.cancel_calls()
+        with self._lock:
+            slots = list(self._slots.values())
+        for slot in slots:
+            slot.request_stop()
+
+    def _handle_message(self, message: tuple[Any, ...]) -> None:
+        message_type = message[0]
+
+        if message_type == "reply":
+            _, call_id, result, exception = message
+            self._channel.on_reply(call_id, result, exception)
+
+        elif message_type == "rerun":
+            _, session_id, runner_id, rerun_seq, rerun_data, user_info = message
+            with self._lock:
+                session = self._get_or_create_session(session_id)
+                slot = self._slots.get(runner_id)
+                if slot is None:
+                    slot = _RunnerSlot(
+                        session_id,
+                        runner_id,
+                        session.session_state,
+                        self._channel,
+                        self._on_slot_idle,
+                    )
+                    self._slots[runner_id] = slot
+                    session.runner_ids.add(runner_id)
+
+            def create_runner(rerun_data: RerunData) -> ScriptRunner:
+                return ScriptRunner(
+                    session_id=session_id,
+                    main_script_path=self._main_script_path,
+                    session_state=session.session_state,
+                    uploaded_file_mgr=self._uploaded_file_mgr,
+                    script_cache=self._script_cache,
+                    initial_rerun_data=rerun_data,
+                    user_info=user_info,
+                    fragment_storage=session.fragment_storage,
+                    pages_manager=session.pages_manager,
+                )
+
+            slot.request_rerun(rerun_seq, rerun_data, create_runner)
+
+        elif message_type == "stop":
+            _, runner_id = message
+            with self._lock:
+                slot = self._slots.get(runner_id)
+            if slot is not None:
+                slot.request_stop()
+
+        elif message_type == "close_session":
+            _, session_id = message
+            self._close_session(session_id)
+
+        elif message_type == "clear_caches":
+            from streamlit.runtime import caching
+
+            _, session_id = message
+            caching.cache_data.clear()
+            caching.cache_resource.clear()
+            with self._lock:
+                session = self._sessions.get(session_id)
+            if session is not None:
+                session.session_state.clear()
+
+        elif message_type == "clear_script_caches":
+            self._script_cache.clear()
+
+        else:
+            _LOGGER.warning("Unknown script worker message: %s", message_type)
+
+    def _get_or_create_session(self, session_id: str) -> _WorkerSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            from streamlit.runtime.fragment import MemoryFragmentStorage
+            from streamlit.runtime.pages_manager import PagesManager
+            from streamlit.runtime.state import SessionState
+
+            session = _WorkerSession(
+                SessionState(),
+                MemoryFragmentStorage(),
+                # The server process watches the pages directory.
+                PagesManager(
+                    self._main_script_path, self._script_cache, setup_watcher=False
+                ),
+            )
+            self._sessions[session_id] = session
+        return session
+
+    def _on_slot_idle(self, slot: _RunnerSlot) -> None:
+        with self._lock:
+            self._slots.pop(slot.runner_id, None)
+            for session in self._sessions.values():
+                session.runner_ids.discard(slot.runner_id)
+
+    def _close_session(self, session_id: str) -> None:
+        from streamlit.runtime import get_instance
+
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            slots = [
+                self._slots[runner_id]
+                for runner_id in (session.runner_ids if session else ())
+                if runner_id in self._slots
+            ]
+        for slot in slots:
+            slot.request_stop()
+
+        media_file_mgr = get_instance().media_file_mgr
+        media_file_mgr.clear_session_refs(session_id)
+        media_file_mgr.remove_orphaned_files()
+
+
+def run_worker(
+    connection: Connection,
+    main_script_path: str,
+    config_options: dict[str, tuple[Any, str]],
+    cache_storage_manager: CacheStorageManager,
+) -> None:
+    """The entry point of worker processes."""
+    from streamlit import logger
+    from streamlit.runtime.runtime import Runtime, RuntimeConfig
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    for key, (value, where_defined) in config_options.items():
+        config.set_option(key, value, where_defined)
+    # Workers run scripts themselves.
+    config.set_option("runner.processPoolSize", 0, _DEFINED_BY_SERVER_PROCESS)
+    logger.set_log_level(config.get_option("logger.level"))
+    logger.update_formatter()
+
+    script_cache = ScriptCache()
+    channel = _ServerProcessChannel(connection)
+    uploaded_file_mgr = _RemoteUploadedFileManager(channel)
+    # The Runtime isn't started: it only gives scripts access to these.
+    Runtime(
+        RuntimeConfig(
+            script_path=main_script_path,
+            command_line=None,
+            media_file_storage=_RemoteMediaFileStorage(channel),
+            uploaded_file_manager=uploaded_file_mgr,
+            cache_storage_manager=cache_storage_manager,
+            component_registry=_RemoteComponentRegistry(channel),
+        )
+    )
+
+    _ScriptWorker(
+        channel,
+        connection,
+        main_script_path,
+        script_cache,
+        uploaded_file_mgr,
+    ).run()
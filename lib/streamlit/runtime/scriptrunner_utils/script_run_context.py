@@ -274,5 +274,7 @@ def enqueue_message(msg: ForwardMsg) -> None:
 
     if ctx.current_fragment_id and msg.WhichOneof("type") == "delta":
         msg.delta.fragment_id = ctx.current_fragment_id
+        # The message's payload changed, so a hash set beforehand is wrong.
+        msg.ClearField("hash")
 
     ctx.enqueue(msg)
@@ -19,8 +19,11 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Callable, Protocol, cast
 
 if TYPE_CHECKING:
+    import asyncio
+
     from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
     from streamlit.runtime.app_session import AppSession
+    from streamlit.runtime.runtime_util import SerializedForwardMsg
     from streamlit.runtime.script_data import ScriptData
     from streamlit.runtime.scriptrunner.script_cache import ScriptCache
     from streamlit.runtime.uploaded_file_manager import UploadedFileManager
@@ -42,6 +45,33 @@ class SessionClient(Protocol):
         """
         raise NotImplementedError
 
+    def write_serialized_forward_msgs(
+        self, msgs: list[SerializedForwardMsg]
+    ) -> asyncio.Future[None] | None:
+        """Deliver several already serialized ForwardMsgs to the client, in order.
+
+        Clients that send serialized messages (e.g. over a websocket) should
+        override this to send the serialized form they're given.
+
+        Clients that buffer outgoing messages may return a Future when their
+        buffer is full, that completes once it has been sent. The Runtime
+        doesn't send the client any more messages before then, so that a slow
+        client doesn't accumulate an unbounded backlog in server memory.
+
+        If the SessionClient has been disconnected, it should raise a
+        SessionClientDisconnectedError.
+        """
+        for msg in msgs:
+            self.write_forward_msg(msg.msg)
+        return None
+
+    @property
+    def buffered_bytes(self) -> int:
+        """The size of the messages written to the client that haven't been
+        sent yet.
+        """
+        return 0
+
 
 @dataclass
 class ActiveSessionInfo:
@@ -211,7 +241,7 @@ class SessionManager(Protocol):
         session_storage: SessionStorage,
         uploaded_file_manager: UploadedFileManager,
         script_cache: ScriptCache,
-        message_enqueued_callback: Callable[[], None] | None,
+        message_enqueued_callback: Callable[[str], None] | None,
     ) -> None:
         """Initialize a SessionManager with the given SessionStorage.
 
@@ -227,7 +257,8 @@ class SessionManager(Protocol):
             ScriptCache instance. Caches user script bytecode.
 
         message_enqueued_callback
-            A callback invoked after a message is enqueued to be sent to a web client.
+            A callback invoked with a session's ID after the session enqueued a
+            message to be sent to its web client.
         """
         raise NotImplementedError
 
@@ -65,6 +65,12 @@ class SafeSessionState:
             #  to a Lock.)
             self._state.on_script_will_rerun(latest_widget_states)
 
+    def yield_to_script_runner(self) -> None:
+        """Let the script runner handle a pending stop or rerun request, which
+        raises StopException or RerunException on its script thread.
+        """
+        self._yield_callback()
+
     def on_script_finished(self, widget_ids_this_run: set[str]) -> None:
         with self._lock:
             self._state.on_script_finished(widget_ids_this_run)
@@ -16,7 +16,7 @@ from __future__ import annotations
 
 import itertools
 from abc import abstractmethod
-from typing import TYPE_CHECKING, NamedTuple, Protocol, runtime_checkable
+from typing import TYPE_CHECKING, Literal, NamedTuple, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
     from streamlit.proto.openmetrics_data_model_pb2 import Metric as MetricProto
@@ -60,6 +60,65 @@ class CacheStat(NamedTuple):
         metric_point.gauge_value.int_value = self.byte_length
 
 
+class MetricStat(NamedTuple):
+    """Describes a single value of a metric, other than the memory footprint
+    of caches (see CacheStat).
+
+    Properties
+    ----------
+    family_name : str
+        The name of the metric family that the value belongs to - e.g.
+        "forward_msg_cache_evictions".
+    metric_type : "counter" or "gauge"
+        The type of the metric family. Counters only ever increase.
+    help : str
+        A human-readable description of the metric family.
+    value : int or float
+        The metric's value.
+    labels : tuple of (name, value) pairs
+        The labels that distinguish this value from the other values of the
+        same metric family, if any.
+    """
+
+    family_name: str
+    metric_type: Literal["counter", "gauge"]
+    help: str
+    value: int | float
+    labels: tuple[tuple[str, str], ...] = ()
+
+    def to_metric_str(self) -> str:
+        # OpenMetrics counter samples have a "_total" suffix.
+        name = (
+            f"{self.family_name}_total"
+            if self.metric_type == "counter"
+            else self.family_name
+        )
+        if not self.labels:
+            return f"{name} {self.value}"
+        labels = ",".join(
+            f'{label_name}="{label_value}"' for label_name, label_value in self.labels
+        )
+        return f"{name}{{{labels}}} {self.value}"
+
+    def marshall_metric_proto(self, metric: MetricProto) -> None:
+        """Fill an OpenMetrics `Metric` protobuf object."""
+        for name, value in self.labels:
+            label = metric.labels.add()
+            label.name = name
+            label.value = value
+
+        metric_point = metric.metric_points.add()
+        point_value = (
+            metric_point.counter_value
+            if self.metric_type == "counter"
+            else metric_point.gauge_value
+        )
+        if isinstance(self.value, int):
+            point_value.int_value = self.value
+        else:
+            point_value.double_value = self.value
+
+
 def group_stats(stats: list[CacheStat]) -> list[CacheStat]:
     """Group a list of CacheStats by category_name and cache_name and sum byte_length"""
 
@@ -89,9 +148,17 @@ class CacheStatsProvider(Protocol):
         raise NotImplementedError
 
 
+@runtime_checkable
+class MetricsProvider(Protocol):
+    @abstractmethod
+    def get_metrics(self) -> list[MetricStat]:
+        raise NotImplementedError
+
+
 class StatsManager:
     def __init__(self):
         self._cache_stats_providers: list[CacheStatsProvider] = []
+        self._metrics_providers: list[MetricsProvider] = []
 
     def register_provider(self, provider: CacheStatsProvider) -> None:
         """Register a CacheStatsProvider with the manager.
@@ -107,3 +174,18 @@ class StatsManager:
             all_stats.extend(provider.get_stats())
 
         return all_stats
+
+    def register_metrics_provider(self, provider: MetricsProvider) -> None:
+        """Register a MetricsProvider with the manager.
+        This function is not thread-safe. Call it immediately after
+        creation.
+        """
+        self._metrics_providers.append(provider)
+
+    def get_metrics(self) -> list[MetricStat]:
+        """Return a list containing all metrics from each registered provider."""
+        all_metrics: list[MetricStat] = []
+        for provider in self._metrics_providers:
+            all_metrics.extend(provider.get_metrics())
+
+        return all_metrics
@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import io
+import mmap
 from abc import abstractmethod
 from typing import TYPE_CHECKING, NamedTuple, Protocol, Sequence
 
@@ -26,12 +27,17 @@ if TYPE_CHECKING:
 
 
 class UploadedFileRec(NamedTuple):
-    """Metadata and raw bytes for an uploaded file. Immutable."""
+    """Metadata and raw bytes for an uploaded file. Immutable.
+
+    Large files can be stored on disk instead of in memory: their bytes are
+    in the file at `path`, and `data` is empty.
+    """
 
     file_id: str
     name: str
     type: str
     data: bytes
+    path: str | None = None
 
 
 class UploadFileUrlInfo(NamedTuple):
@@ -62,6 +68,14 @@ class UploadedFile(io.BytesIO):
     initialized with `bytes`.
     """
 
+    def __new__(cls, *args, **kwargs):
+        # Files stored on disk are mapped rather than read into memory.
+        # (copy.deepcopy calls __new__ without arguments.)
+        record = args[0] if args else kwargs.get("record")
+        if cls is UploadedFile and record is not None and record.path is not None:
+            cls = _MappedUploadedFile
+        return super().__new__(cls)
+
     def __init__(self, record: UploadedFileRec, file_urls: FileURLsProto):
         # BytesIO's copy-on-write semantics doesn't seem to be mentioned in
         # the Python docs - possibly because it's a CPython-only optimization
@@ -83,6 +97,102 @@ class UploadedFile(io.BytesIO):
         return util.repr_(self)
 
 
+class _MappedUploadedFile(UploadedFile):
+    """An uploaded file whose bytes are stored on disk.
+
+    The file is memory-mapped copy-on-write rather than read into memory, so
+    its pages are only loaded when they're read, and writes aren't written
+    back to disk. Like other UploadedFiles it can be written to, but not
+    past its end. Copies map the file again, so they don't include these
+    writes.
+    """
+
+    def __init__(self, record: UploadedFileRec, file_urls: FileURLsProto):
+        super().__init__(record._replace(data=b""), file_urls)
+        assert record.path is not None
+        self._record = record
+        with open(record.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.size = len(self._mmap)
+
+    def __reduce_ex__(self, protocol):
+        return _reopen_mapped_uploaded_file, (
+            self._record,
+            self._file_urls,
+            self.tell(),
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+        super().close()
+
+    def getvalue(self) -> bytes:
+        return self._mmap[:]
+
+    def getbuffer(self) -> memoryview:
+        return memoryview(self._mmap)
+
+    def read(self, size: int | None = -1) -> bytes:
+        return self._mmap.read(size)
+
+    read1 = read
+
+    def readinto(self, buffer) -> int:
+        data = self._mmap.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    readinto1 = readinto
+
+    def readline(self, size: int | None = -1) -> bytes:
+        line = self._mmap.readline()
+        if size is not None and 0 <= size < len(line):
+            self._mmap.seek(size - len(line), io.SEEK_CUR)
+            line = line[:size]
+        return line
+
+    def readlines(self, hint: int | None = -1) -> list[bytes]:
+        lines: list[bytes] = []
+        total = 0
+        while line := self.readline():
+            lines.append(line)
+            total += len(line)
+            if hint is not None and 0 < hint <= total:
+                break
+        return lines
+
+    def __next__(self) -> bytes:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._mmap.tell()
+        elif whence == io.SEEK_END:
+            pos += len(self._mmap)
+        self._mmap.seek(pos)
+        return pos
+
+    def tell(self) -> int:
+        return self._mmap.tell()
+
+    def write(self, data) -> int:
+        return self._mmap.write(data)
+
+    def truncate(self, size: int | None = None) -> int:
+        raise io.UnsupportedOperation("truncate")
+
+
+def _reopen_mapped_uploaded_file(
+    record: UploadedFileRec, file_urls: FileURLsProto, position: int
+) -> UploadedFile:
+    uploaded_file = UploadedFile(record, file_urls)
+    uploaded_file.seek(position)
+    return uploaded_file
+
+
 class UploadedFileManager(CacheStatsProvider, Protocol):
     """UploadedFileManager protocol, that should be implemented by the concrete
     uploaded file managers.
@@ -25,7 +25,13 @@ from streamlit.config import CONFIG_FILENAMES
 from streamlit.git_util import MIN_GIT_VERSION, GitRepo
 from streamlit.logger import get_logger
 from streamlit.watcher import report_watchdog_availability, watch_file
-from streamlit.web.server import Server, server_address_is_unix_socket, server_util
+from streamlit.web.server import (
+    Server,
+    server_address_is_unix_socket,
+    server_util,
+    worker_processes,
+)
+from streamlit.web.server.server import bind_tcp_sockets
 
 _LOGGER: Final = get_logger(__name__)
 
@@ -102,6 +108,10 @@ def _fix_sys_argv(main_script_path: str, args: list[str]) -> None:
 
 
 def _on_server_start(server: Server) -> None:
+    if worker_processes.get_worker_index() not in (None, 0):
+        # The first worker process does this for all of them.
+        return
+
     _maybe_print_old_git_warning(server.main_script_path)
     _maybe_print_static_folder_warning(server.main_script_path)
     _print_url(server.is_running_hello)
@@ -136,6 +146,26 @@ def _on_server_start(server: Server) -> None:
     asyncio.get_running_loop().call_soon(maybe_open_browser)
 
 
+def _maybe_fork_workers() -> None:
+    """Serve the app with several processes if `server.numWorkers` is set.
+
+    This returns in each worker process, where the app is run as usual. The
+    parent process exits once the workers have exited.
+    """
+    num_workers = config.get_option("server.numWorkers")
+    if num_workers <= 1:
+        return
+    if not worker_processes.is_supported() or server_address_is_unix_socket():
+        _LOGGER.warning(
+            "server.numWorkers is only supported on Linux and macOS, when "
+            "listening on a TCP port, and with a compatible version of Tornado. "
+            "Serving the app with a single process."
+        )
+        return
+
+    worker_processes.fork_workers(num_workers, bind_tcp_sockets())
+
+
 def _fix_pydeck_mapbox_api_warning() -> None:
     """Sets MAPBOX_API_KEY environment variable needed for PyDeck otherwise it will throw an exception"""
 
@@ -307,6 +337,7 @@ def run(
     _fix_tornado_crash()
     _fix_sys_argv(main_script_path, args)
     _fix_pydeck_mapbox_api_warning()
+    _maybe_fork_workers()
     _install_config_watchers(flag_options)
 
     # Create the server. It won't start running yet.
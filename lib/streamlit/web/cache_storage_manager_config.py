@@ -14,15 +14,22 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Final
 
+from streamlit import config
+from streamlit.logger import get_logger
 from streamlit.runtime.caching.storage.local_disk_cache_storage import (
     LocalDiskCacheStorageManager,
 )
+from streamlit.runtime.caching.storage.sqlite_cache_storage import (
+    SqliteCacheStorageManager,
+)
 
 if TYPE_CHECKING:
     from streamlit.runtime.caching.storage import CacheStorageManager
 
+_LOGGER: Final = get_logger(__name__)
+
 
 def create_default_cache_storage_manager() -> CacheStorageManager:
     """
@@ -35,4 +42,14 @@ def create_default_cache_storage_manager() -> CacheStorageManager:
         The cache storage manager.
 
     """
+    storage_type = config.get_option("global.dataCacheStorage")
+    if storage_type == "sqlite":
+        return SqliteCacheStorageManager(
+            config.get_option("global.dataCacheStoragePath")
+        )
+    if storage_type != "local":
+        _LOGGER.warning(
+            'Unknown global.dataCacheStorage value "%s", falling back to "local".',
+            storage_type,
+        )
     return LocalDiskCacheStorageManager()
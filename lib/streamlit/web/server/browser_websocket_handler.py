@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import base64
 import binascii
+import functools
 import json
 from typing import TYPE_CHECKING, Any, Awaitable, Final
 
@@ -24,20 +25,30 @@ import tornado.locks
 import tornado.netutil
 import tornado.web
 import tornado.websocket
-from tornado.websocket import WebSocketHandler
+from tornado.websocket import WebSocketHandler, WebSocketProtocol13
 
 from streamlit import config
 from streamlit.logger import get_logger
 from streamlit.proto.BackMsg_pb2 import BackMsg
 from streamlit.runtime import Runtime, SessionClient, SessionClientDisconnectedError
-from streamlit.runtime.runtime_util import serialize_forward_msg
+from streamlit.runtime.runtime_util import (
+    SerializedForwardMsg,
+    pack_forward_msg_frames,
+    serialize_forward_msg,
+)
 from streamlit.web.server.server_util import is_url_from_allowed_origins
 
 if TYPE_CHECKING:
+    import asyncio
+
     from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 
 _LOGGER: Final = get_logger(__name__)
 
+# The private attribute of Tornado's WebSocketProtocol13 that holds the
+# compressor of outgoing messages, see `_write_uncompressed_frame`.
+_TORNADO_COMPRESSOR_ATTR: Final = "_compressor"
+
 
 class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
     """Handles a WebSocket connection from the browser"""
@@ -45,6 +56,8 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
     def initialize(self, runtime: Runtime) -> None:
         self._runtime = runtime
         self._session_id: str | None = None
+        # Size of the frames written that haven't been sent yet.
+        self._buffered_bytes = 0
         # The XSRF cookie is normally set when xsrf_form_html is used, but in a
         # pure-Javascript application that does not use any regular forms we just
         # need to read the self.xsrf_token manually to set the cookie as a side
@@ -60,10 +73,78 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
     def write_forward_msg(self, msg: ForwardMsg) -> None:
         """Send a ForwardMsg to the browser."""
         try:
-            self.write_message(serialize_forward_msg(msg), binary=True)
+            self._write_frame(serialize_forward_msg(msg))
+        except tornado.websocket.WebSocketClosedError as e:
+            raise SessionClientDisconnectedError from e
+
+    def write_serialized_forward_msgs(
+        self, msgs: list[SerializedForwardMsg]
+    ) -> asyncio.Future[None] | None:
+        """Send several already serialized ForwardMsgs to the browser, batched
+        into as few websocket frames as possible.
+
+        If more than `server.websocketHighWaterMark` is buffered afterwards,
+        return the Future of the last frame's write, which completes once all
+        the frames have been sent.
+        """
+        future: asyncio.Future[None] | None = None
+        try:
+            for frame in pack_forward_msg_frames(msg.data for msg in msgs):
+                future = self._write_frame(frame)
         except tornado.websocket.WebSocketClosedError as e:
             raise SessionClientDisconnectedError from e
 
+        high_water_mark = config.get_option("server.websocketHighWaterMark") * 1024
+        if self._buffered_bytes > high_water_mark:
+            return future
+        return None
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    def _write_frame(self, frame: bytes) -> asyncio.Future[None]:
+        if len(frame) < config.get_option("server.websocketCompressionMinSize"):
+            future = self._write_uncompressed_frame(frame)
+        else:
+            future = self.write_message(frame, binary=True)
+        self._buffered_bytes += len(frame)
+        future.add_done_callback(functools.partial(self._on_frame_sent, len(frame)))
+        return future
+
+    def _write_uncompressed_frame(self, frame: bytes) -> asyncio.Future[None]:
+        """Write a frame without compressing it.
+
+        permessage-deflate lets each message be sent compressed or not, but
+        Tornado compresses all of them, and has no API to skip compression.
+        The connection's private compressor is taken off while the frame is
+        written, which doesn't affect the compression context of the other
+        frames. If Tornado no longer has this attribute, the frame is written
+        compressed.
+        """
+        connection = self.ws_connection
+        compressor = (
+            getattr(connection, _TORNADO_COMPRESSOR_ATTR, None)
+            if isinstance(connection, WebSocketProtocol13)
+            else None
+        )
+        if compressor is None:
+            return self.write_message(frame, binary=True)
+
+        setattr(connection, _TORNADO_COMPRESSOR_ATTR, None)
+        try:
+            return self.write_message(frame, binary=True)
+        finally:
+            setattr(connection, _TORNADO_COMPRESSOR_ATTR, compressor)
+
+    def _on_frame_sent(self, frame_size: int, future: asyncio.Future[None]) -> None:
+        self._buffered_bytes -= frame_size
+        if not future.cancelled():
+            # Retrieve the WebSocketClosedError of failed writes, so that it
+            # isn't logged as never retrieved. Closed connections are handled
+            # by on_close.
+            future.exception()
+
     def select_subprotocol(self, subprotocols: list[str]) -> str | None:
         """Return the first subprotocol in the given list.
 
@@ -139,13 +220,18 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
     def get_compression_options(self) -> dict[Any, Any] | None:
         """Enable WebSocket compression.
 
-        Returning an empty dict enables websocket compression. Returning
-        None disables it.
+        Returning a dict enables websocket compression with the given options.
+        Returning None disables it.
 
         (See the docstring in the parent class.)
         """
         if config.get_option("server.enableWebsocketCompression"):
-            return {}
+            return {
+                "compression_level": config.get_option(
+                    "server.websocketCompressionLevel"
+                ),
+                "mem_level": config.get_option("server.websocketCompressionMemLevel"),
+            }
         return None
 
     def on_message(self, payload: str | bytes) -> None:
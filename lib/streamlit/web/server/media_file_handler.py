@@ -14,11 +14,14 @@
 
 from __future__ import annotations
 
+import os
+from typing import TYPE_CHECKING
 from urllib.parse import quote
 
 import tornado.web
 
 from streamlit.logger import get_logger
+from streamlit.runtime.disk_media_file_storage import DiskFile, DiskMediaFileStorage
 from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorageError
 from streamlit.runtime.memory_media_file_storage import (
     MemoryMediaFileStorage,
@@ -26,15 +29,20 @@ from streamlit.runtime.memory_media_file_storage import (
 )
 from streamlit.web.server import allow_cross_origin_requests
 
+if TYPE_CHECKING:
+    from datetime import datetime
+
 _LOGGER = get_logger(__name__)
 
 
 class MediaFileHandler(tornado.web.StaticFileHandler):
-    _storage: MemoryMediaFileStorage
+    _storage: MemoryMediaFileStorage | DiskMediaFileStorage
 
     @classmethod
-    def initialize_storage(cls, storage: MemoryMediaFileStorage) -> None:
-        """Set the MemoryMediaFileStorage object used by instances of this
+    def initialize_storage(
+        cls, storage: MemoryMediaFileStorage | DiskMediaFileStorage
+    ) -> None:
+        """Set the MediaFileStorage object used by instances of this
         handler. Must be called on server startup.
         """
         # This is a class method, rather than an instance method, because
@@ -47,7 +55,12 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
             self.set_header("Access-Control-Allow-Origin", "*")
 
     def set_extra_headers(self, path: str) -> None:
-        """Add Content-Disposition header for downloadable files.
+        """Mark files as immutable, and add Content-Disposition header for
+        downloadable files.
+
+        Media file IDs are hashes of their content, so the content at a
+        media URL never changes, and browsers can cache it without
+        revalidating it.
 
         Set header value to "attachment" indicating that file should be saved
         locally instead of displaying inline in browser.
@@ -56,6 +69,8 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
         Used for serving downloadable files, like files stored via the
         `st.download_button` widget.
         """
+        self.set_header("Cache-Control", f"max-age={self.CACHE_MAX_AGE}, immutable")
+
         media_file = self._storage.get_file(path)
 
         if media_file and media_file.kind == MediaFileKind.DOWNLOADABLE:
@@ -85,11 +100,16 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
     # `validate_absolute_path`.
     def validate_absolute_path(self, root: str, absolute_path: str) -> str:
         try:
-            self._storage.get_file(absolute_path)
+            media_file = self._storage.get_file(absolute_path)
         except MediaFileStorageError:
             _LOGGER.error("MediaFileHandler: Missing file %s", absolute_path)
             raise tornado.web.HTTPError(404, "not found")
 
+        if isinstance(media_file, DiskFile) and media_file.is_modified():
+            # The file's URL refers to its content when it was added.
+            _LOGGER.error("MediaFileHandler: Modified file %s", media_file.path)
+            raise tornado.web.HTTPError(404, "not found")
+
         return absolute_path
 
     def get_content_size(self) -> int:
@@ -101,10 +121,22 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
         return media_file.content_size
 
     def get_modified_time(self) -> None:
-        # We do not track last modified time, but this can be improved to
-        # allow caching among files in the MediaFileManager
+        # We do not track last modified time. Files are cached by their ETag
+        # instead.
         return None
 
+    def compute_etag(self) -> str | None:
+        # The file ID is a hash of the file's content, so there's no need to
+        # hash the content again, as StaticFileHandler does.
+        if self.absolute_path is None:
+            return None
+        return f'"{os.path.splitext(self.absolute_path)[0]}"'
+
+    def get_cache_time(
+        self, path: str, modified: datetime | None, mime_type: str
+    ) -> int:
+        return self.CACHE_MAX_AGE
+
     @classmethod
     def get_absolute_path(cls, root: str, path: str) -> str:
         # All files are stored in memory, so the absolute path is just the
@@ -128,6 +160,11 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
             "MediaFileHandler: Sending %s file %s", media_file.mimetype, abspath
         )
 
+        # Files on disk are read and sent in chunks, rather than loaded into
+        # memory.
+        if isinstance(media_file, DiskFile):
+            return super().get_content(media_file.path, start, end)
+
         # If there is no start and end, just return the full content
         if start is None and end is None:
             return media_file.content
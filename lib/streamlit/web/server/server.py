@@ -19,9 +19,10 @@ import logging
 import os
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Awaitable, Final
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Final
 
 import tornado.concurrent
+import tornado.ioloop
 import tornado.locks
 import tornado.netutil
 import tornado.web
@@ -32,6 +33,8 @@ from streamlit import cli_util, config, file_util, util
 from streamlit.config_option import ConfigOption
 from streamlit.logger import get_logger
 from streamlit.runtime import Runtime, RuntimeConfig, RuntimeState
+from streamlit.runtime.disk_media_file_storage import DiskMediaFileStorage
+from streamlit.runtime.disk_uploaded_file_manager import DiskUploadedFileManager
 from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
 from streamlit.runtime.memory_session_storage import MemorySessionStorage
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
@@ -39,6 +42,7 @@ from streamlit.runtime.runtime_util import get_max_message_size_bytes
 from streamlit.web.cache_storage_manager_config import (
     create_default_cache_storage_manager,
 )
+from streamlit.web.server import worker_processes
 from streamlit.web.server.app_static_file_handler import AppStaticFileHandler
 from streamlit.web.server.browser_websocket_handler import BrowserWebSocketHandler
 from streamlit.web.server.component_request_handler import ComponentRequestHandler
@@ -53,9 +57,13 @@ from streamlit.web.server.routes import (
 )
 from streamlit.web.server.server_util import DEVELOPMENT_PORT, make_url_path_regex
 from streamlit.web.server.stats_request_handler import StatsRequestHandler
-from streamlit.web.server.upload_file_request_handler import UploadFileRequestHandler
+from streamlit.web.server.upload_file_request_handler import (
+    ChunkedUploads,
+    UploadFileRequestHandler,
+)
 
 if TYPE_CHECKING:
+    import socket
     from ssl import SSLContext
 
 _LOGGER: Final = get_logger(__name__)
@@ -83,6 +91,9 @@ MAX_PORT_SEARCH_RETRIES: Final = 100
 # to an unix socket.
 UNIX_SOCKET_PREFIX: Final = "unix://"
 
+# How often chunked uploads that stopped receiving chunks are discarded.
+CHUNKED_UPLOAD_SWEEP_INTERVAL_SECONDS: Final = 60
+
 MEDIA_ENDPOINT: Final = "/media"
 UPLOAD_FILE_ENDPOINT: Final = "/_stcore/upload_file"
 STREAM_ENDPOINT: Final = r"_stcore/stream"
@@ -126,7 +137,9 @@ def start_listening(app: tornado.web.Application) -> None:
         ssl_options=ssl_options,
     )
 
-    if server_address_is_unix_socket():
+    if worker_processes.get_worker_index() is not None:
+        worker_processes.receive_connections(http_server)
+    elif server_address_is_unix_socket():
         start_listening_unix_socket(http_server)
     else:
         start_listening_tcp_socket(http_server)
@@ -180,6 +193,23 @@ def start_listening_unix_socket(http_server: HTTPServer) -> None:
 
 
 def start_listening_tcp_socket(http_server: HTTPServer) -> None:
+    _listen_on_available_port(http_server.listen)
+
+
+def bind_tcp_sockets() -> list[socket.socket]:
+    """Bind the server's TCP port, like `start_listening_tcp_socket`, and
+    return the listening sockets, to accept connections for worker processes.
+    """
+    sockets: list[socket.socket] = []
+
+    def listen(port: int, address: str) -> None:
+        sockets.extend(tornado.netutil.bind_sockets(port, address))
+
+    _listen_on_available_port(listen)
+    return sockets
+
+
+def _listen_on_available_port(listen: Callable[[int, str], None]) -> None:
     call_count = 0
 
     port = None
@@ -196,7 +226,7 @@ def start_listening_tcp_socket(http_server: HTTPServer) -> None:
             )
 
         try:
-            http_server.listen(port, address)
+            listen(port, address)
             break  # It worked! So let's break out of the loop.
 
         except OSError as e:
@@ -235,10 +265,12 @@ class Server:
         self._main_script_path = main_script_path
 
         # Initialize MediaFileStorage and its associated endpoint
-        media_file_storage = MemoryMediaFileStorage(MEDIA_ENDPOINT)
+        media_file_storage = _create_media_file_storage()
         MediaFileHandler.initialize_storage(media_file_storage)
 
-        uploaded_file_mgr = MemoryUploadedFileManager(UPLOAD_FILE_ENDPOINT)
+        uploaded_file_mgr = _create_uploaded_file_manager()
+        self._chunked_uploads = ChunkedUploads(uploaded_file_mgr)
+        self._chunked_upload_sweep: tornado.ioloop.PeriodicCallback | None = None
 
         self._runtime = Runtime(
             RuntimeConfig(
@@ -274,6 +306,12 @@ class Server:
         app = self._create_app()
         start_listening(app)
 
+        self._chunked_upload_sweep = tornado.ioloop.PeriodicCallback(
+            self._chunked_uploads.discard_expired_uploads,
+            CHUNKED_UPLOAD_SWEEP_INTERVAL_SECONDS * 1000,
+        )
+        self._chunked_upload_sweep.start()
+
         port = config.get_option("server.port")
         _LOGGER.debug("Server started on port %s", port)
 
@@ -322,6 +360,7 @@ class Server:
                 {
                     "file_mgr": self._runtime.uploaded_file_mgr,
                     "is_active_session": self._runtime.is_active_session,
+                    "chunked_uploads": self._chunked_uploads,
                 },
             ),
             (
@@ -414,9 +453,25 @@ class Server:
 
     def stop(self) -> None:
         cli_util.print_to_cli("  Stopping...", fg="blue")
+        if self._chunked_upload_sweep is not None:
+            self._chunked_upload_sweep.stop()
         self._runtime.stop()
 
 
+def _create_media_file_storage() -> MemoryMediaFileStorage | DiskMediaFileStorage:
+    memory_budget = config.get_option("server.mediaFileMemoryBudget")
+    if memory_budget < 0:
+        return MemoryMediaFileStorage(MEDIA_ENDPOINT)
+    return DiskMediaFileStorage(MEDIA_ENDPOINT, memory_budget * 1024 * 1024)
+
+
+def _create_uploaded_file_manager() -> MemoryUploadedFileManager:
+    spool_size = config.get_option("server.uploadSpoolSize")
+    if spool_size < 0:
+        return MemoryUploadedFileManager(UPLOAD_FILE_ENDPOINT)
+    return DiskUploadedFileManager(UPLOAD_FILE_ENDPOINT, spool_size * 1024 * 1024)
+
+
 def _set_tornado_log_levels() -> None:
     if not config.get_option("global.developmentMode"):
         # Hide logs unless they're super important.
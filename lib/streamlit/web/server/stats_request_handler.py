@@ -23,7 +23,7 @@ from streamlit.web.server.server_util import emit_endpoint_deprecation_notice
 
 if TYPE_CHECKING:
     from streamlit.proto.openmetrics_data_model_pb2 import MetricSet as MetricSetProto
-    from streamlit.runtime.stats import CacheStat, StatsManager
+    from streamlit.runtime.stats import CacheStat, MetricStat, StatsManager
 
 
 class StatsRequestHandler(tornado.web.RequestHandler):
@@ -44,36 +44,44 @@ class StatsRequestHandler(tornado.web.RequestHandler):
             emit_endpoint_deprecation_notice(self, new_path="/_stcore/metrics")
 
         stats = self._manager.get_stats()
+        metrics = self._manager.get_metrics()
 
         # If the request asked for protobuf output, we return a serialized
         # protobuf. Else we return text.
         if "application/x-protobuf" in self.request.headers.get_list("Accept"):
-            self.write(self._stats_to_proto(stats).SerializeToString())
+            self.write(self._stats_to_proto(stats, metrics).SerializeToString())
             self.set_header("Content-Type", "application/x-protobuf")
             self.set_status(200)
         else:
-            self.write(self._stats_to_text(self._manager.get_stats()))
+            self.write(self._stats_to_text(stats, metrics))
             self.set_header("Content-Type", "application/openmetrics-text")
             self.set_status(200)
 
     @staticmethod
-    def _stats_to_text(stats: list[CacheStat]) -> str:
+    def _stats_to_text(stats: list[CacheStat], metrics: list[MetricStat]) -> str:
         metric_type = "# TYPE cache_memory_bytes gauge"
         metric_unit = "# UNIT cache_memory_bytes bytes"
         metric_help = "# HELP Total memory consumed by a cache."
         openmetrics_eof = "# EOF\n"
 
-        # Format: header, stats, EOF
+        # Format: header, stats, other metric families, EOF
         result = [metric_type, metric_unit, metric_help]
         result.extend(stat.to_metric_str() for stat in stats)
+        for family in _group_metrics(metrics):
+            first = family[0]
+            result.append(f"# TYPE {first.family_name} {first.metric_type}")
+            result.append(f"# HELP {first.family_name} {first.help}")
+            result.extend(metric.to_metric_str() for metric in family)
         result.append(openmetrics_eof)
 
         return "\n".join(result)
 
     @staticmethod
-    def _stats_to_proto(stats: list[CacheStat]) -> MetricSetProto:
+    def _stats_to_proto(
+        stats: list[CacheStat], metrics: list[MetricStat]
+    ) -> MetricSetProto:
         # Lazy load the import of this proto message for better performance:
-        from streamlit.proto.openmetrics_data_model_pb2 import GAUGE
+        from streamlit.proto.openmetrics_data_model_pb2 import COUNTER, GAUGE
         from streamlit.proto.openmetrics_data_model_pb2 import (
             MetricSet as MetricSetProto,
         )
@@ -92,4 +100,22 @@ class StatsRequestHandler(tornado.web.RequestHandler):
 
         metric_set = MetricSetProto()
         metric_set.metric_families.append(metric_family)
+
+        for family in _group_metrics(metrics):
+            first = family[0]
+            metric_family = metric_set.metric_families.add()
+            metric_family.name = first.family_name
+            metric_family.type = COUNTER if first.metric_type == "counter" else GAUGE
+            metric_family.help = first.help
+            for metric in family:
+                metric.marshall_metric_proto(metric_family.metrics.add())
+
         return metric_set
+
+
+def _group_metrics(metrics: list[MetricStat]) -> list[list[MetricStat]]:
+    """Group metrics by family, in the order their families first appear."""
+    families: dict[str, list[MetricStat]] = {}
+    for metric in metrics:
+        families.setdefault(metric.family_name, []).append(metric)
+    return list(families.values())
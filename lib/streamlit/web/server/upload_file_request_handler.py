@@ -14,19 +14,425 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable
+import email.message
+import io
+import os
+import re
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Callable, Final, Protocol
 
 import tornado.httputil
 import tornado.web
 
 from streamlit import config
+from streamlit.runtime.disk_uploaded_file_manager import DiskUploadedFileManager
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.runtime.uploaded_file_manager import UploadedFileRec
 from streamlit.web.server import routes, server_util
 
 if TYPE_CHECKING:
-    from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+    from streamlit.runtime.uploaded_file_manager import UploadedFileManager
 
 
+# Chunked uploads that receive no chunk for this long are discarded.
+_CHUNKED_UPLOAD_TTL_SECONDS: Final = 10 * 60
+
+# The most files a session can be uploading in chunks at once.
+_MAX_CHUNKED_UPLOADS_PER_SESSION: Final = 100
+
+_CONTENT_RANGE_RE: Final = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class _FilePart(Protocol):
+    """Receives the content of a file in a multipart/form-data request body."""
+
+    def write(self, data: bytes | bytearray) -> None: ...
+
+    def discard(self) -> None: ...
+
+
+class _UploadedFilePart:
+    """The content of a file in a multipart/form-data request body.
+
+    The content is kept in memory until it grows larger than the file
+    manager's spool size, and is then written to a file on disk.
+    """
+
+    def __init__(self, name: str, type: str, file_mgr: MemoryUploadedFileManager):
+        self.name = name
+        self.type = type
+        self._file_mgr = file_mgr
+        self._buffer: IO[bytes] = io.BytesIO()
+        self._path: str | None = None
+
+    def write(self, data: bytes | bytearray) -> None:
+        self._buffer.write(data)
+        if (
+            self._path is None
+            and isinstance(self._file_mgr, DiskUploadedFileManager)
+            and 0 <= self._file_mgr.spool_size < self._buffer.tell()
+        ):
+            assert isinstance(self._buffer, io.BytesIO)
+            memory_buffer = self._buffer
+            self._path, self._buffer = self._file_mgr.create_file()
+            self._buffer.write(memory_buffer.getbuffer())
+
+    def to_file_rec(self, file_id: str) -> UploadedFileRec:
+        """Return the part as an UploadedFileRec. If the part was written to
+        disk, the file is then owned by the record.
+        """
+        if self._path is None:
+            assert isinstance(self._buffer, io.BytesIO)
+            return UploadedFileRec(
+                file_id, self.name, self.type, self._buffer.getvalue()
+            )
+
+        self._buffer.close()
+        file_rec = UploadedFileRec(file_id, self.name, self.type, b"", self._path)
+        self._path = None
+        return file_rec
+
+    def discard(self) -> None:
+        """Delete the part's content, unless it's owned by an UploadedFileRec."""
+        self._buffer.close()
+        if self._path is not None:
+            os.remove(self._path)
+            self._path = None
+
+
+class _ChunkedUpload:
+    """A file uploaded in several requests, each with a chunk of its content.
+
+    Chunks are written at their offset as they arrive, in any order, to a
+    file on disk if the file is larger than the file manager's spool size,
+    and kept in memory until the file is complete otherwise. Only the chunks
+    received so far take up space, whatever the file's declared size.
+    """
+
+    def __init__(self, name: str, type: str, size: int, file_mgr: UploadedFileManager):
+        self.name = name
+        self.type = type
+        self.size = size
+        self.last_active = time.monotonic()
+        self.path: str | None = None
+        # The end offset of each chunk received, by start offset.
+        self._received: dict[int, int] = {}
+        # The content of each chunk received, by start offset, if the file
+        # is kept in memory.
+        self._chunks: dict[int, bytes | bytearray] = {}
+
+        if (
+            isinstance(file_mgr, DiskUploadedFileManager)
+            and 0 <= file_mgr.spool_size < size
+        ):
+            # Chunks are written at their offset, so the file grows as they
+            # arrive rather than being allocated upfront.
+            self.path, file = file_mgr.create_file()
+            file.close()
+
+    def add_chunk(
+        self, start: int, end: int, data: bytes | bytearray | None = None
+    ) -> None:
+        """Record that the bytes from start to end were received. If the file
+        is kept in memory, data is their content.
+        """
+        if end >= self._received.get(start, end):
+            self._received[start] = end
+            if data is not None:
+                self._chunks[start] = data
+        self.last_active = time.monotonic()
+
+    @property
+    def is_complete(self) -> bool:
+        received = 0
+        for start, end in sorted(self._received.items()):
+            if start > received:
+                return False
+            received = max(received, end)
+        return received == self.size
+
+    def to_file_rec(self, file_id: str) -> UploadedFileRec:
+        """Return the file as an UploadedFileRec, which then owns its file on
+        disk, if any.
+        """
+        if self.path is None:
+            data = bytearray(self.size)
+            for start, chunk in sorted(self._chunks.items()):
+                data[start : start + len(chunk)] = chunk
+            self._chunks = {}
+            return UploadedFileRec(file_id, self.name, self.type, bytes(data))
+        file_rec = UploadedFileRec(file_id, self.name, self.type, b"", self.path)
+        self.path = None
+        return file_rec
+
+    def discard(self) -> None:
+        """Delete the file's content, unless it's owned by an UploadedFileRec."""
+        self._chunks = {}
+        if self.path is not None:
+            os.remove(self.path)
+            self.path = None
+
+
+class _ChunkPart:
+    """Writes a chunk of a _ChunkedUpload from a multipart/form-data request
+    body.
+    """
+
+    def __init__(self, upload: _ChunkedUpload, start: int, end: int):
+        self.upload = upload
+        self.start = start
+        self.end = end
+        self._offset = start
+        self._file: IO[bytes] | None = None
+        # The chunk's content, if its file is kept in memory.
+        self.data: bytearray | None = None
+        if upload.path is None:
+            self.data = bytearray()
+        else:
+            self._file = open(upload.path, "r+b")
+            self._file.seek(start)
+
+    @property
+    def is_complete(self) -> bool:
+        return self._offset == self.end
+
+    def write(self, data: bytes | bytearray) -> None:
+        if self._offset + len(data) > self.end:
+            raise ValueError("Chunk is larger than its Content-Range")
+        if self._file is not None:
+            self._file.write(data)
+        elif self.data is not None:
+            self.data += data
+        self._offset += len(data)
+        self.upload.last_active = time.monotonic()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ChunkedUploads:
+    """Holds the files being uploaded in chunks, until all their chunks are
+    received.
+
+    Chunks are PUT to a file's upload URL with a Content-Range header, like
+    `bytes 0-1048575/4194304`. They can be sent in parallel and in any
+    order, and a failed chunk can be sent again.
+
+    Uploads are discarded when their session's files are removed, and when
+    they receive no chunk for a while. The server calls
+    `discard_expired_uploads` periodically for the latter.
+
+    This class can be used safely from multiple threads simultaneously.
+    """
+
+    def __init__(self, file_mgr: UploadedFileManager):
+        self._file_mgr = file_mgr
+        self._uploads: dict[tuple[str, str], _ChunkedUpload] = {}
+        self._lock = threading.Lock()
+        if isinstance(file_mgr, MemoryUploadedFileManager):
+            file_mgr.on_session_files_removed.connect(self._on_session_files_removed)
+
+    def get_upload(
+        self, session_id: str, file_id: str, name: str, type: str, size: int
+    ) -> _ChunkedUpload:
+        """Return a file's upload, starting it on its first chunk.
+
+        Raises
+        ------
+        ValueError
+            If the file's chunks don't agree on its size, or if its session
+            is already uploading too many files.
+        """
+        with self._lock:
+            self._discard_expired_uploads()
+            upload = self._uploads.get((session_id, file_id))
+            if upload is None:
+                num_session_uploads = sum(
+                    1 for key in self._uploads if key[0] == session_id
+                )
+                if num_session_uploads >= _MAX_CHUNKED_UPLOADS_PER_SESSION:
+                    raise ValueError("Too many files are being uploaded")
+                upload = _ChunkedUpload(name, type, size, self._file_mgr)
+                self._uploads[(session_id, file_id)] = upload
+            elif upload.size != size:
+                raise ValueError("Content-Range size doesn't match previous chunks")
+            return upload
+
+    def pop_upload(self, session_id: str, file_id: str) -> _ChunkedUpload | None:
+        """Remove a file's upload, and return it."""
+        with self._lock:
+            return self._uploads.pop((session_id, file_id), None)
+
+    def discard_upload(self, session_id: str, file_id: str) -> None:
+        """Remove a file's upload, and delete the chunks received so far."""
+        upload = self.pop_upload(session_id, file_id)
+        if upload is not None:
+            upload.discard()
+
+    def discard_session_uploads(self, session_id: str) -> None:
+        """Remove all uploads of a session, and delete their chunks."""
+        with self._lock:
+            uploads = [
+                self._uploads.pop(key)
+                for key in list(self._uploads)
+                if key[0] == session_id
+            ]
+        for upload in uploads:
+            upload.discard()
+
+    def discard_expired_uploads(self) -> None:
+        """Remove the uploads that received no chunk for a while, and delete
+        their chunks.
+        """
+        with self._lock:
+            self._discard_expired_uploads()
+
+    def _discard_expired_uploads(self) -> None:
+        expiry = time.monotonic() - _CHUNKED_UPLOAD_TTL_SECONDS
+        for key, upload in list(self._uploads.items()):
+            if upload.last_active < expiry:
+                del self._uploads[key]
+                upload.discard()
+
+    def _on_session_files_removed(self, session_id: str) -> None:
+        self.discard_session_uploads(session_id)
+
+
+class _MultipartParser:
+    """Incrementally parses a multipart/form-data request body, writing the
+    content of the files it contains to _FileParts.
+
+    Parts that aren't files are ignored.
+    """
+
+    # The body is parsed in these states.
+    _PREAMBLE: Final = 0
+    _HEADERS: Final = 1
+    _CONTENT: Final = 2
+    _EPILOGUE: Final = 3
+
+    # Part headers larger than this are rejected, so that their buffer
+    # stays small.
+    _MAX_HEADERS_SIZE: Final = 64 * 1024
+
+    def __init__(
+        self,
+        boundary: bytes,
+        create_part: Callable[[str, str], _FilePart],
+    ):
+        self._first_delimiter = b"--" + boundary + b"\r\n"
+        self._delimiter = b"\r\n--" + boundary
+        self._create_part = create_part
+        self._state = self._PREAMBLE
+        self._buffer = bytearray()
+        self._part: _FilePart | None = None
+        self.parts: list[_FilePart] = []
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the body.
+
+        Raises
+        ------
+        ValueError
+            If the body isn't valid.
+        """
+        self._buffer += data
+        while self._parse_next():
+            pass
+
+    def close(self) -> None:
+        """Finish parsing the body.
+
+        Raises
+        ------
+        ValueError
+            If the body is incomplete.
+        """
+        if self._state != self._EPILOGUE:
+            raise ValueError("Invalid multipart/form-data: incomplete body")
+
+    def _parse_next(self) -> bool:
+        """Parse as much of the buffer as the current state allows, and return
+        whether parsing can continue in a new state.
+        """
+        if self._state == self._PREAMBLE:
+            index = self._buffer.find(self._first_delimiter)
+            if index < 0:
+                # Keep enough bytes to find a delimiter split across chunks.
+                del self._buffer[: -len(self._first_delimiter)]
+                return False
+            del self._buffer[: index + len(self._first_delimiter)]
+            self._state = self._HEADERS
+            return True
+
+        if self._state == self._HEADERS:
+            index = self._buffer.find(b"\r\n\r\n")
+            if index < 0:
+                if len(self._buffer) > self._MAX_HEADERS_SIZE:
+                    raise ValueError("Invalid multipart/form-data: headers too large")
+                return False
+            headers = tornado.httputil.HTTPHeaders.parse(
+                self._buffer[:index].decode("utf-8")
+            )
+            del self._buffer[: index + 4]
+            self._part = self._create_part_from_headers(headers)
+            self._state = self._CONTENT
+            return True
+
+        if self._state == self._CONTENT:
+            index = self._buffer.find(self._delimiter)
+            if index < 0:
+                # Keep enough bytes to find a delimiter split across chunks.
+                content_end = max(len(self._buffer) - len(self._delimiter) + 1, 0)
+                self._write_content(content_end)
+                return False
+            self._write_content(index)
+            if len(self._buffer) < len(self._delimiter) + 2:
+                # Wait for the bytes that tell whether this is the last part.
+                return False
+            suffix = bytes(
+                self._buffer[len(self._delimiter) : len(self._delimiter) + 2]
+            )
+            del self._buffer[: len(self._delimiter) + 2]
+            self._part = None
+            if suffix == b"--":
+                self._state = self._EPILOGUE
+            elif suffix == b"\r\n":
+                self._state = self._HEADERS
+            else:
+                raise ValueError("Invalid multipart/form-data: invalid delimiter")
+            return True
+
+        # Ignore the epilogue.
+        self._buffer.clear()
+        return False
+
+    def _write_content(self, end: int) -> None:
+        if self._part is not None and end > 0:
+            self._part.write(self._buffer[:end])
+        del self._buffer[:end]
+
+    def _create_part_from_headers(
+        self, headers: tornado.httputil.HTTPHeaders
+    ) -> _FilePart | None:
+        message = email.message.Message()
+        message["Content-Disposition"] = headers.get("Content-Disposition", "")
+        if message.get_content_disposition() != "form-data":
+            raise ValueError("Invalid multipart/form-data: missing Content-Disposition")
+        filename = message.get_filename()
+        if filename is None:
+            return None
+        part = self._create_part(
+            filename, headers.get("Content-Type", "application/unknown")
+        )
+        self.parts.append(part)
+        return part
+
+
+@tornado.web.stream_request_body
 class UploadFileRequestHandler(tornado.web.RequestHandler):
     """Implements the POST /upload_file endpoint."""
 
@@ -34,6 +440,7 @@ class UploadFileRequestHandler(tornado.web.RequestHandler):
         self,
         file_mgr: MemoryUploadedFileManager,
         is_active_session: Callable[[str], bool],
+        chunked_uploads: ChunkedUploads | None = None,
     ):
         """
         Parameters
@@ -44,19 +451,26 @@ class UploadFileRequestHandler(tornado.web.RequestHandler):
         is_active_session:
             A function that returns true if a session_id belongs to an active
             session.
+        chunked_uploads:
+            The files being uploaded in chunks. If None, uploads with a
+            Content-Range header are rejected.
         """
         self._file_mgr = file_mgr
         self._is_active_session = is_active_session
+        self._chunked_uploads = chunked_uploads
 
     def set_default_headers(self):
         self.set_header("Access-Control-Allow-Methods", "PUT, OPTIONS, DELETE")
-        self.set_header("Access-Control-Allow-Headers", "Content-Type")
+        self.set_header("Access-Control-Allow-Headers", "Content-Type, Content-Range")
         if config.get_option("server.enableXsrfProtection"):
             self.set_header(
                 "Access-Control-Allow-Origin",
                 server_util.get_url(config.get_option("browser.serverAddress")),
             )
-            self.set_header("Access-Control-Allow-Headers", "X-Xsrftoken, Content-Type")
+            self.set_header(
+                "Access-Control-Allow-Headers",
+                "X-Xsrftoken, Content-Type, Content-Range",
+            )
             self.set_header("Vary", "Origin")
             self.set_header("Access-Control-Allow-Credentials", "true")
         elif routes.allow_cross_origin_requests():
@@ -82,55 +496,171 @@ class UploadFileRequestHandler(tornado.web.RequestHandler):
         self.set_status(204)
         self.finish()
 
-    def put(self, **kwargs):
-        """Receive an uploaded file and add it to our UploadedFileManager."""
-
-        args: dict[str, list[bytes]] = {}
-        files: dict[str, list[Any]] = {}
-
-        session_id = self.path_kwargs["session_id"]
-        file_id = self.path_kwargs["file_id"]
+    def prepare(self):
+        """Start parsing the body of PUT requests, which is streamed to
+        data_received() rather than buffered in memory.
+        """
+        self._parser: _MultipartParser | None = None
+        self._parse_error: str | None = None
 
-        tornado.httputil.parse_body_arguments(
-            content_type=self.request.headers["Content-Type"],
-            body=self.request.body,
-            arguments=args,
-            files=files,
-        )
+        if self.request.method != "PUT":
+            return
 
         try:
-            if not self._is_active_session(session_id):
+            if not self._is_active_session(self.path_kwargs["session_id"]):
                 raise Exception("Invalid session_id")
         except Exception as e:
             self.send_error(400, reason=str(e))
             return
 
-        uploaded_files: list[UploadedFileRec] = []
-
-        for _, flist in files.items():
-            for file in flist:
-                uploaded_files.append(
-                    UploadedFileRec(
-                        file_id=file_id,
-                        name=file["filename"],
-                        type=file["content_type"],
-                        data=file["body"],
-                    )
-                )
+        boundary = _get_multipart_boundary(self.request.headers.get("Content-Type", ""))
+        if boundary is None:
+            self.send_error(400, reason="Expected a multipart/form-data body")
+            return
 
-        if len(uploaded_files) != 1:
-            self.send_error(
-                400, reason=f"Expected 1 file, but got {len(uploaded_files)}"
+        content_range = self.request.headers.get("Content-Range")
+        if content_range is None:
+            self._parser = _MultipartParser(
+                boundary,
+                lambda name, type: _UploadedFilePart(name, type, self._file_mgr),
             )
             return
 
-        self._file_mgr.add_file(session_id=session_id, file=uploaded_files[0])
+        try:
+            start, end, size = self._parse_content_range(content_range)
+        except ValueError as e:
+            self.send_error(400, reason=str(e))
+            return
+
+        if size > config.get_option("server.maxUploadSize") * 1024 * 1024:
+            self.send_error(413, reason="File is larger than server.maxUploadSize")
+            return
+
+        def create_chunk_part(name: str, type: str) -> _ChunkPart:
+            assert self._chunked_uploads is not None
+            upload = self._chunked_uploads.get_upload(
+                self.path_kwargs["session_id"],
+                self.path_kwargs["file_id"],
+                name,
+                type,
+                size,
+            )
+            return _ChunkPart(upload, start, end)
+
+        self._parser = _MultipartParser(boundary, create_chunk_part)
+
+    def _parse_content_range(self, content_range: str) -> tuple[int, int, int]:
+        """Return the start and end offsets of a chunk, and the size of its
+        file, from a Content-Range header.
+        """
+        if self._chunked_uploads is None:
+            raise ValueError("Chunked uploads aren't supported")
+        match = _CONTENT_RANGE_RE.match(content_range)
+        if match is None:
+            raise ValueError("Invalid Content-Range")
+        start, last, size = (int(group) for group in match.groups())
+        if not start <= last < size:
+            raise ValueError("Invalid Content-Range")
+        return start, last + 1, size
+
+    def data_received(self, chunk: bytes) -> None:
+        if self._parser is None or self._parse_error is not None:
+            return
+        try:
+            self._parser.feed(chunk)
+        except ValueError as e:
+            self._parse_error = str(e)
+
+    def put(self, **kwargs):
+        """Receive an uploaded file and add it to our UploadedFileManager."""
+        assert self._parser is not None
+
+        session_id = self.path_kwargs["session_id"]
+        file_id = self.path_kwargs["file_id"]
+
+        if self._parse_error is None:
+            try:
+                self._parser.close()
+            except ValueError as e:
+                self._parse_error = str(e)
+        if self._parse_error is not None:
+            self.send_error(400, reason=self._parse_error)
+            return
+
+        parts = self._parser.parts
+        if len(parts) != 1:
+            self.send_error(400, reason=f"Expected 1 file, but got {len(parts)}")
+            return
+
+        part = parts[0]
+        if isinstance(part, _ChunkPart):
+            self._add_chunk(session_id, file_id, part)
+            return
+
+        assert isinstance(part, _UploadedFilePart)
+        self._file_mgr.add_file(session_id=session_id, file=part.to_file_rec(file_id))
+        self.set_status(204)
+
+    def _add_chunk(self, session_id: str, file_id: str, part: _ChunkPart) -> None:
+        """Record a received chunk, and add its file to our UploadedFileManager
+        if it was the last one.
+        """
+        assert self._chunked_uploads is not None
+        part.discard()
+        if not part.is_complete:
+            self.send_error(400, reason="Chunk is smaller than its Content-Range")
+            return
+
+        upload = part.upload
+        upload.add_chunk(part.start, part.end, part.data)
+        if upload.is_complete and (
+            self._chunked_uploads.pop_upload(session_id, file_id) is upload
+        ):
+            self._file_mgr.add_file(
+                session_id=session_id, file=upload.to_file_rec(file_id)
+            )
         self.set_status(204)
 
+    def on_finish(self):
+        self._discard_parts()
+
+    def on_connection_close(self):
+        self._discard_parts()
+
+    def _discard_parts(self) -> None:
+        """Delete the content of parts that weren't added to the file manager,
+        for instance because the upload was aborted.
+        """
+        parser = getattr(self, "_parser", None)
+        if parser is not None:
+            for part in parser.parts:
+                part.discard()
+            self._parser = None
+
     def delete(self, **kwargs):
         """Delete file request handler."""
         session_id = self.path_kwargs["session_id"]
         file_id = self.path_kwargs["file_id"]
 
+        if self._chunked_uploads is not None:
+            self._chunked_uploads.discard_upload(session_id, file_id)
         self._file_mgr.remove_file(session_id=session_id, file_id=file_id)
         self.set_status(204)
+
+
+def _get_multipart_boundary(content_type: str) -> bytes | None:
+    """Return the boundary of a multipart/form-data Content-Type header, or
+    None if it's another type.
+
+    Mirrors how tornado.httputil.parse_body_arguments parses it.
+    """
+    if not content_type.startswith("multipart/form-data"):
+        return None
+    for field in content_type.split(";"):
+        key, _, value = field.strip().partition("=")
+        if key == "boundary" and value:
+            boundary = value.encode("utf-8")
+            if boundary.startswith(b'"') and boundary.endswith(b'"'):
+                boundary = boundary[1:-1]
+            return boundary
+    return None
@@ -0,0 +1,288 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serves an app with several server processes ("workers"), to use more than
+one CPU core.
+
+The parent process binds the server's port, forks the workers, and accepts
+connections on their behalf. Each connection is handed to a worker over a Unix
+socket, chosen from the client's address. All the connections of a browser
+(its websocket, and its file upload and media requests) are then served by the
+worker that owns its session, which keeps these in memory.
+
+The parent process doesn't run any Streamlit code, and restarts the workers
+that exit unexpectedly. This is only supported on POSIX systems.
+"""
+
+from __future__ import annotations
+
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Final
+
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+
+from streamlit.logger import get_logger
+
+_LOGGER: Final = get_logger(__name__)
+
+# How long the parent process waits for workers to exit when stopping, in
+# seconds, before killing them.
+_STOP_TIMEOUT_SECONDS: Final = 10.0
+
+# How often the parent process checks for workers that exited, in seconds.
+_WORKER_CHECK_INTERVAL_SECONDS: Final = 1.0
+
+# The data sent along each connection's file descriptor.
+_CONNECTION_MARKER: Final = b"\x00"
+
+# The private method of Tornado's HTTPServer that serves an accepted
+# connection, see `receive_connections`.
+_TORNADO_HANDLE_CONNECTION_ATTR: Final = "_handle_connection"
+
+# In a worker process: its index, and its end of the Unix socket that the
+# parent process hands connections over.
+_worker_index: int | None = None
+_channel: socket.socket | None = None
+
+
+@dataclass
+class _Worker:
+    index: int
+    pid: int
+    channel: socket.socket
+
+
+def is_supported() -> bool:
+    """True if the server can run several worker processes on this system,
+    with this version of Tornado.
+    """
+    return (
+        hasattr(os, "fork")
+        and hasattr(socket, "send_fds")
+        and hasattr(HTTPServer, _TORNADO_HANDLE_CONNECTION_ATTR)
+    )
+
+
+def get_worker_index() -> int | None:
+    """Return the index of this worker process, or None if the server runs in
+    a single process.
+    """
+    return _worker_index
+
+
+def fork_workers(num_workers: int, listen_sockets: list[socket.socket]) -> None:
+    """Fork the worker processes, and hand them the connections accepted on
+    the given sockets until the server is stopped.
+
+    This returns in the worker processes only: the parent process exits once
+    all the workers have exited.
+
+    This must be called before the process starts any thread.
+    """
+    workers: dict[int, _Worker] = {}
+    for index in range(num_workers):
+        if not _start_worker(index, workers, listen_sockets):
+            return
+
+    # The stop signals received.
+    stop_signals: list[int] = []
+
+    def on_stop_signal(signal_number, stack_frame):
+        stop_signals.append(signal_number)
+
+    signal.signal(signal.SIGTERM, on_stop_signal)
+    signal.signal(signal.SIGINT, on_stop_signal)
+
+    with selectors.DefaultSelector() as selector:
+        for listen_socket in listen_sockets:
+            listen_socket.setblocking(False)
+            selector.register(listen_socket, selectors.EVENT_READ)
+
+        while not stop_signals:
+            for key, _ in selector.select(timeout=_WORKER_CHECK_INTERVAL_SECONDS):
+                listen_socket = key.fileobj
+                assert isinstance(listen_socket, socket.socket)
+                _route_connection(listen_socket, workers, num_workers)
+
+            for index in _reap_exited_workers(workers):
+                if stop_signals:
+                    continue
+                _LOGGER.error("Worker %s exited unexpectedly, restarting it.", index)
+                if not _start_worker(index, workers, listen_sockets):
+                    # We're the restarted worker.
+                    return
+
+    for listen_socket in listen_sockets:
+        listen_socket.close()
+    _stop_workers(workers)
+    sys.exit(0)
+
+
+def receive_connections(http_server: HTTPServer) -> None:
+    """Serve the connections handed to this worker process with the given
+    server.
+
+    Notes
+    -----
+    Threading: UNSAFE. Must be called on the eventloop thread.
+    """
+    channel = _channel
+    assert channel is not None, "Not in a worker process"
+    channel.setblocking(False)
+    io_loop = IOLoop.current()
+    handle_connection = getattr(http_server, _TORNADO_HANDLE_CONNECTION_ATTR)
+
+    def on_readable(fd: int, events: int) -> None:
+        while True:
+            try:
+                connection = receive_connection(channel)
+            except BlockingIOError:
+                return
+            if connection is None:
+                # The parent process exited: stop the server, as if the parent
+                # had stopped this worker.
+                _LOGGER.warning("The parent process exited, stopping the worker.")
+                io_loop.remove_handler(fd)
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+            try:
+                address = connection.getpeername()
+            except OSError:
+                # The client is already gone.
+                connection.close()
+                continue
+            # This is what HTTPServer does with the connections it accepts
+            # itself, including wrapping them with SSL if needed.
+            handle_connection(connection, address)
+
+    io_loop.add_handler(channel.fileno(), on_readable, IOLoop.READ)
+
+
+def send_connection(channel: socket.socket, connection: socket.socket) -> None:
+    """Hand a connection over to the process at the other end of a channel."""
+    socket.send_fds(channel, [_CONNECTION_MARKER], [connection.fileno()])
+
+
+def receive_connection(channel: socket.socket) -> socket.socket | None:
+    """Receive a connection sent with `send_connection`, or return None if the
+    other end of the channel was closed.
+
+    Raises
+    ------
+    BlockingIOError
+        Raised if the channel is non-blocking, and no connection was sent.
+    """
+    while True:
+        data, fds, _, _ = socket.recv_fds(channel, len(_CONNECTION_MARKER), 1)
+        if not data:
+            return None
+        if fds:
+            return socket.socket(fileno=fds[0])
+
+
+def worker_index_for_address(address: object, num_workers: int) -> int:
+    """Return the index of the worker that serves the client at this address.
+
+    The client's port isn't used: all the connections of a browser go to the
+    same worker.
+    """
+    host = address[0] if isinstance(address, tuple) else address
+    return zlib.crc32(str(host).encode()) % num_workers
+
+
+def _start_worker(
+    index: int, workers: dict[int, _Worker], listen_sockets: list[socket.socket]
+) -> bool:
+    """Fork a worker process. Return False in the worker, True in the parent."""
+    parent_channel, worker_channel = socket.socketpair()
+    pid = os.fork()
+    if pid == 0:
+        # Only keep what the worker needs.
+        global _worker_index, _channel
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        parent_channel.close()
+        for listen_socket in listen_sockets:
+            listen_socket.close()
+        for worker in workers.values():
+            worker.channel.close()
+        _worker_index = index
+        _channel = worker_channel
+        return False
+
+    worker_channel.close()
+    workers[index] = _Worker(index, pid, parent_channel)
+    _LOGGER.debug("Started worker %s (pid %s)", index, pid)
+    return True
+
+
+def _route_connection(
+    listen_socket: socket.socket, workers: dict[int, _Worker], num_workers: int
+) -> None:
+    try:
+        connection, address = listen_socket.accept()
+    except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+        return
+
+    with connection:
+        index = worker_index_for_address(address, num_workers)
+        # If the client's worker is being restarted, use the next one.
+        for offset in range(num_workers):
+            worker = workers.get((index + offset) % num_workers)
+            if worker is None:
+                continue
+            try:
+                send_connection(worker.channel, connection)
+                return
+            except OSError as ex:
+                _LOGGER.debug("Failed to hand a connection to worker: %s", ex)
+        _LOGGER.warning("No worker available, dropping a connection.")
+
+
+def _reap_exited_workers(workers: dict[int, _Worker]) -> list[int]:
+    """Forget the workers that exited, and return their indexes."""
+    exited = []
+    for index, worker in list(workers.items()):
+        pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+        if pid != 0:
+            worker.channel.close()
+            del workers[index]
+            exited.append(index)
+    return exited
+
+
+def _stop_workers(workers: dict[int, _Worker]) -> None:
+    for worker in workers.values():
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    deadline = time.monotonic() + _STOP_TIMEOUT_SECONDS
+    while workers and time.monotonic() < deadline:
+        _reap_exited_workers(workers)
+        time.sleep(0.1)
+
+    for worker in workers.values():
+        _LOGGER.warning("Worker %s didn't stop, killing it.", worker.index)
+        os.kill(worker.pid, signal.SIGKILL)
+        os.waitpid(worker.pid, 0)
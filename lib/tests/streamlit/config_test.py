@@ -383,11 +383,18 @@ class ConfigTest(unittest.TestCase):
                 "theme.textColor",
                 "theme.font",
                 "global.appTest",
+                "global.dataCacheArrowCompression",
+                "global.dataCacheArrowSerialization",
+                "global.dataCacheStorage",
+                "global.dataCacheStoragePath",
                 "global.developmentMode",
                 "global.disableWidgetStateDuplicationWarning",
                 "global.e2eTest",
                 "global.maxCachedMessageAge",
+                "global.maxCachedMessagesSize",
+                "global.maxSharedPayloadsSize",
                 "global.minCachedMessageSize",
+                "global.maxPersistedCacheSize",
                 "global.showWarningOnDirectExecution",
                 "global.storeCachedForwardMessagesInMemory",
                 "global.suppressDeprecationWarnings",
@@ -400,6 +407,8 @@ class ConfigTest(unittest.TestCase):
                 "runner.postScriptGC",
                 "runner.fastReruns",
                 "runner.enumCoercion",
+                "runner.maxConcurrentCacheComputations",
+                "runner.processPoolSize",
                 "magic.displayRootDocString",
                 "magic.displayLastExprIfNoSemicolon",
                 "mapbox.token",
@@ -409,6 +418,12 @@ class ConfigTest(unittest.TestCase):
                 "server.cookieSecret",
                 "server.scriptHealthCheckEnabled",
                 "server.enableWebsocketCompression",
+                "server.websocketCompressionLevel",
+                "server.websocketCompressionMemLevel",
+                "server.websocketCompressionMinSize",
+                "server.batchWebsocketMessages",
+                "server.websocketHighWaterMark",
+                "server.serializeMessagesInThreadPool",
                 "server.enableXsrfProtection",
                 "server.fileWatcherType",
                 "server.folderWatchBlacklist",
@@ -416,8 +431,11 @@ class ConfigTest(unittest.TestCase):
                 "server.address",
                 "server.allowRunOnSave",
                 "server.port",
+                "server.numWorkers",
                 "server.runOnSave",
                 "server.maxUploadSize",
+                "server.uploadSpoolSize",
+                "server.mediaFileMemoryBudget",
                 "server.maxMessageSize",
                 "server.enableStaticServing",
                 "server.enableArrowTruncation",
@@ -98,6 +98,7 @@ class AppSessionTest(unittest.TestCase):
             MemoryMediaFileStorage("/mock/media")
         )
         mock_runtime.cache_storage_manager = MemoryCacheStorageManager()
+        mock_runtime.script_process_pool = None
         Runtime._instance = mock_runtime
 
     def tearDown(self) -> None:
@@ -25,15 +25,20 @@ import unittest
 from typing import Any
 from unittest.mock import MagicMock, Mock, mock_open, patch
 
+import numpy as np
 from parameterized import parameterized
 
 import streamlit as st
 from streamlit import file_util
 from streamlit.errors import StreamlitAPIException
+from streamlit.logger import get_logger
 from streamlit.proto.Text_pb2 import Text as TextProto
 from streamlit.runtime import Runtime
-from streamlit.runtime.caching import cached_message_replay
-from streamlit.runtime.caching.cache_data_api import get_data_cache_stats_provider
+from streamlit.runtime.caching import cached_message_replay, hashing, serialization
+from streamlit.runtime.caching.cache_data_api import (
+    _data_caches,
+    get_data_cache_stats_provider,
+)
 from streamlit.runtime.caching.cache_errors import CacheError
 from streamlit.runtime.caching.cached_message_replay import (
     CachedResult,
@@ -119,6 +124,117 @@ class CacheDataTest(unittest.TestCase):
         self.assertEqual(r1, [1, 1])
         self.assertEqual(r2, [0, 1])
 
+    def test_copy_shallow(self):
+        """With copy="shallow", hits return copies of a kept value without
+        unpickling it, so mutating the returned value's top level doesn't affect
+        future accessors of the data."""
+
+        @st.cache_data(copy="shallow")
+        def f():
+            return [0, 1]
+
+        with patch(
+            "streamlit.runtime.caching.serialization.loads",
+            wraps=serialization.loads,
+        ) as loads:
+            r1 = f()
+            r1[0] = 1
+            r2 = f()
+            r2[1] = 2
+            r3 = f()
+
+            loads.assert_not_called()
+
+        self.assertEqual(r1, [1, 1])
+        self.assertEqual(r2, [0, 2])
+        self.assertEqual(r3, [0, 1])
+
+    def test_copy_none(self):
+        """With copy="none", hits return the kept value itself."""
+
+        @st.cache_data(copy="none")
+        def f():
+            return [0, 1]
+
+        r1 = f()
+        r2 = f()
+
+        self.assertIs(r1, r2)
+
+    def test_copy_none_clear(self):
+        """Clearing a function's cache also drops its kept values."""
+
+        @st.cache_data(copy="none")
+        def f(x):
+            return [x]
+
+        r1 = f(1)
+        r2 = f(2)
+        f.clear(1)
+        self.assertIsNot(f(1), r1)
+        self.assertIs(f(2), r2)
+
+        f.clear()
+        self.assertIsNot(f(2), r2)
+
+    def test_copy_none_from_storage(self):
+        """Values read from the storage are unpickled once, then kept."""
+
+        @st.cache_data(copy="none")
+        def f():
+            return [0, 1]
+
+        f()
+        # Forget the kept value, as if it had been read from a persistent
+        # storage by a new server process.
+        for cache in _data_caches._function_caches.values():
+            cache._live_results.clear()
+
+        with patch(
+            "streamlit.runtime.caching.serialization.loads",
+            wraps=serialization.loads,
+        ) as loads:
+            r1 = f()
+            r2 = f()
+
+            loads.assert_called_once()
+        self.assertIs(r1, r2)
+
+    def test_copy_none_hashed_once(self):
+        """Values returned with copy="none" are only hashed once when they're
+        passed to other cached functions."""
+
+        @st.cache_data(copy="none")
+        def get_data():
+            return np.arange(100)
+
+        @st.cache_data
+        def total(data):
+            return int(data.sum())
+
+        with patch(
+            "streamlit.runtime.caching.hashing._hash_buffers",
+            wraps=hashing._hash_buffers,
+        ) as hash_buffers:
+            self.assertEqual(total(get_data()), 4950)
+            self.assertEqual(total(get_data()), 4950)
+
+            hash_buffers.assert_called_once()
+
+    def test_bad_copy_value(self):
+        """Throw an error if an invalid value is passed to 'copy'."""
+        with self.assertRaises(StreamlitAPIException) as e:
+
+            @st.cache_data(copy="sometimes")
+            def foo():
+                pass
+
+        self.assertEqual(
+            "Unsupported copy option 'sometimes'. "
+            "Valid values are 'deep', 'shallow', or 'none'.",
+            str(e.exception),
+        )
+
     def test_cached_member_function_with_hash_func(self):
         """@st.cache_data can be applied to class member functions
         with corresponding hash_func.
@@ -300,8 +416,9 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
         foo()
         mock_write.assert_not_called()
 
+    @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace")
     @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_write")
-    def test_persist_path(self, mock_write):
+    def test_persist_path(self, mock_write, mock_replace):
         """Ensure we're writing to ~/.streamlit/cache/*.memo"""
 
         @st.cache_data(persist="disk")
@@ -310,10 +427,14 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
 
         foo()
         mock_write.assert_called_once()
+        mock_replace.assert_called_once()
 
+        # The value is written to a temporary file that replaces the cache file.
         write_path = mock_write.call_args[0][0]
+        self.assertEqual(write_path, mock_replace.call_args[0][0])
+        cache_path = mock_replace.call_args[0][1]
         match = re.fullmatch(
-            r"/mock/home/folder/.streamlit/cache/.*?\.memo", write_path
+            r"/mock/home/folder/.streamlit/cache/.*?\.memo", cache_path
         )
         self.assertIsNotNone(match)
 
@@ -478,6 +599,10 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
         "streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_write",
         MagicMock(),
     )
+    @patch(
+        "streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace",
+        MagicMock(),
+    )
     @patch(
         "streamlit.file_util.open",
         wraps=mock_open(read_data=pickle.dumps(1)),
@@ -501,6 +626,10 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
         "streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_write",
         MagicMock(),
     )
+    @patch(
+        "streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace",
+        MagicMock(),
+    )
     @patch(
         "streamlit.file_util.open",
         wraps=mock_open(read_data=pickle.dumps(1)),
@@ -514,9 +643,10 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
         # Executes normally, without raising any errors
         foo(1)
 
+    @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace")
     @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_write")
-    def test_warning_memo_ttl_persist(self, _):
-        """Using @st.cache_data with ttl and persist produces a warning."""
+    def test_no_warning_memo_ttl_persist(self, *_):
+        """Using @st.cache_data with ttl and persist doesn't produce a warning."""
         with self.assertLogs(
             "streamlit.runtime.caching.storage.local_disk_cache_storage",
             level=logging.WARNING,
@@ -528,11 +658,14 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
 
             st.write(user_function())
 
+            # assertLogs is being used as a context manager, but it also checks
+            # that some log output was captured, so we have to let it capture something
+            get_logger(
+                "streamlit.runtime.caching.storage.local_disk_cache_storage"
+            ).warning("irrelevant warning so assertLogs passes")
+
             output = "".join(logs.output)
-            self.assertIn(
-                "The cached function 'user_function' has a TTL that will be ignored.",
-                output,
-            )
+            self.assertNotIn("has a TTL that will be ignored", output)
 
     @parameterized.expand(
         [
@@ -542,6 +675,7 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
             ("False", False, False),
         ]
     )
+    @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace")
     @patch("streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_write")
     def test_persist_param_value(
         self,
@@ -549,6 +683,7 @@ class CacheDataPersistTest(DeltaGeneratorTestCase):
         persist_value: str | bool | None,
         should_persist: bool,
         mock_write: Mock,
+        mock_replace: Mock,
     ):
         """Passing "disk" or `True` enables persistence; `None` or `False` disables it."""
 
@@ -242,6 +242,21 @@ If you think this is actually a Streamlit bug, please
         # So the call to foo() should return the new value 2
         assert example_instance.foo(1) == 2
 
+    @parameterized.expand(
+        [
+            (ttl, refresh)
+            for ttl in (None, 0, 10)
+            for refresh in ("blocking", "background")
+        ]
+    )
+    def test_get_cache_reuses_cache(self, ttl, refresh):
+        """The cache of a function is reused while its params don't change."""
+        caches = cache_resource_api.ResourceCaches()
+        cache = caches.get_cache("key", "display_name", None, ttl, None, refresh)
+        self.assertIs(
+            cache, caches.get_cache("key", "display_name", None, ttl, None, refresh)
+        )
+
 
 class CacheResourceValidateTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -349,10 +364,76 @@ class CacheResourceStatsProviderTest(unittest.TestCase):
 
         # The order of these is non-deterministic, so check Set equality
         # instead of List equality
+        self.assertEqual(set(expected), set(self._wait_for_stats()))
+
+    def test_sizeof(self):
+        """A sizeof function replaces the size estimate."""
+
+        @st.cache_resource(sizeof=len)
+        def foo(count):
+            return [3.14] * count
+
+        foo(1)
+        foo(53)
+
+        self.assertEqual([54], [s.byte_length for s in self._wait_for_stats()])
+
+    def test_sizeof_error(self):
+        """Entries whose size can't be computed are left out of the stats."""
+
+        def sizeof(value):
+            if value == "bad":
+                raise RuntimeError("can't size this")
+            return 1
+
+        @st.cache_resource(sizeof=sizeof)
+        def foo(value):
+            return value
+
+        foo("good")
+        foo("bad")
+        self.assertEqual([1], [s.byte_length for s in self._wait_for_stats()])
+
+    def test_size_estimate_timeout(self):
+        """Entries that take too long to size are left out of the stats."""
+
+        @st.cache_resource
+        def foo(count):
+            return [[i] for i in range(count)]
+
+        foo(1)
+        stats = self._wait_for_stats()
+        self.assertEqual(1, len(stats))
+
+        with patch.object(cache_resource_api, "_SIZE_ESTIMATE_TIMEOUT_SECS", 0):
+            foo(10_000)
+            self.assertEqual(stats, self._wait_for_stats())
+
+    def test_cleared_entries_not_reported(self):
+        """Sizes of removed entries are not reported."""
+
+        @st.cache_resource(sizeof=len)
+        def foo(count):
+            return [3.14] * count
+
+        foo(1)
+        foo(53)
+        self._wait_for_stats()
+
+        foo.clear(53)
         self.assertEqual(
-            set(expected), set(get_resource_cache_stats_provider().get_stats())
+            [1],
+            [s.byte_length for s in get_resource_cache_stats_provider().get_stats()],
         )
 
+    def _wait_for_stats(self) -> list[CacheStat]:
+        """Wait for the sizes of all cached entries to be computed, and return
+        the stats.
+        """
+        # Sizes are computed in order, on a single thread.
+        cache_resource_api._get_sizing_executor().submit(lambda: None).result(5)
+        return get_resource_cache_stats_provider().get_stats()
+
 
 class CacheResourceMessageReplayTest(DeltaGeneratorTestCase):
     def setUp(self):
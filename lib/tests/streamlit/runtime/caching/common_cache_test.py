@@ -26,13 +26,18 @@ from unittest.mock import MagicMock, Mock, patch
 from parameterized import parameterized
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from streamlit.runtime import Runtime
-from streamlit.runtime.caching import cache_data, cache_resource
+from streamlit.runtime.caching import cache_data, cache_resource, cache_utils
 from streamlit.runtime.caching.cache_errors import CacheReplayClosureError
 from streamlit.runtime.caching.cache_utils import CachedResult
 from streamlit.runtime.caching.storage.dummy_cache_storage import (
     MemoryCacheStorageManager,
 )
+from streamlit.runtime.forward_msg_cache import (
+    compute_payload_hash,
+    serialize_msg_payload,
+)
 from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
 from streamlit.runtime.fragment import MemoryFragmentStorage
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
@@ -43,12 +48,13 @@ from streamlit.runtime.scriptrunner import (
     get_script_run_ctx,
 )
 from streamlit.runtime.scriptrunner_utils import script_run_context
+from streamlit.runtime.scriptrunner_utils.exceptions import StopException
 from streamlit.runtime.state import SafeSessionState, SessionState
 from streamlit.testing.v1.app_test import AppTest
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
 from tests.exception_capturing_thread import call_on_threads
 from tests.streamlit.elements.image_test import create_image
-from tests.testutil import create_mock_script_run_ctx
+from tests.testutil import create_mock_script_run_ctx, patch_config_options
 
 
 def get_text_or_block(delta):
@@ -335,6 +341,33 @@ class CommonCacheTest(DeltaGeneratorTestCase):
 
         assert text == ["1", "---", "1"]
 
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    def test_cached_st_function_replay_payload_hash(self, _, cache_decorator):
+        """Replayed elements come with the hash of their payload, which was
+        computed when the cached function ran.
+        """
+
+        @cache_decorator
+        def foo_replay(i):
+            st.text(i)
+            return i
+
+        foo_replay(1)
+        foo_replay(1)
+
+        first_msg, replayed_msg = (
+            msg
+            for msg in self.forward_msg_queue._queue
+            if msg.delta.new_element.WhichOneof("type") == "text"
+        )
+        self.assertEqual("", first_msg.hash)
+        self.assertEqual(
+            compute_payload_hash(serialize_msg_payload(replayed_msg)),
+            replayed_msg.hash,
+        )
+
     @parameterized.expand(
         [("cache_data", cache_data), ("cache_resource", cache_resource)]
     )
@@ -783,6 +816,163 @@ class CommonCacheTTLTest(unittest.TestCase):
         self.assertEqual([0, 0, 0], foo_vals)
         self.assertEqual([0, 0], bar_vals)
 
+    def _wait_for(self, condition) -> None:
+        """Wait for a background refresh to set `condition`."""
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "Refresh timed out")
+            time.sleep(0.01)
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh(self, _, cache_decorator, timer_patch: Mock):
+        """Expired entries are returned while they're refreshed in the background."""
+        foo_vals = []
+
+        @cache_decorator(ttl=10, refresh="background")
+        def foo(x):
+            foo_vals.append(x)
+            return len(foo_vals)
+
+        timer_patch.return_value = 0
+        self.assertEqual(1, foo(0))
+
+        # The expired value is returned, and refreshed in the background.
+        timer_patch.return_value = 15
+        self.assertEqual(1, foo(0))
+        self._wait_for(lambda: len(foo_vals) == 2)
+        self._wait_for(lambda: foo(0) == 2)
+
+        # The refreshed value expires 10 seconds after it was refreshed.
+        timer_patch.return_value = 24
+        self.assertEqual(2, foo(0))
+        self.assertEqual(2, len(foo_vals))
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh_max_staleness(
+        self, _, cache_decorator, timer_patch: Mock
+    ):
+        """Entries that are stale for longer than max_staleness are recomputed
+        in the foreground.
+        """
+        foo_vals = []
+
+        @cache_decorator(ttl=10, refresh="background", max_staleness=5)
+        def foo(x):
+            foo_vals.append(x)
+            return len(foo_vals)
+
+        timer_patch.return_value = 0
+        self.assertEqual(1, foo(0))
+
+        timer_patch.return_value = 16
+        self.assertEqual(2, foo(0))
+        self.assertEqual(2, len(foo_vals))
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh_st_commands(
+        self, _, cache_decorator, timer_patch: Mock
+    ):
+        """Functions that call Streamlit commands are refreshed in the foreground."""
+        foo_vals = []
+
+        @cache_decorator(ttl=10, refresh="background")
+        def foo(x):
+            foo_vals.append(x)
+            st.text("hello")
+            return len(foo_vals)
+
+        timer_patch.return_value = 0
+        self.assertEqual(1, foo(0))
+
+        timer_patch.return_value = 15
+        self.assertEqual(2, foo(0))
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh_mutated_args(
+        self, _, cache_decorator, timer_patch: Mock
+    ):
+        """Arguments mutated by the script after the call don't affect the
+        refreshed value.
+        """
+        refresh_started = threading.Event()
+        foo_vals = []
+
+        @cache_decorator(ttl=10, refresh="background")
+        def foo(values):
+            if foo_vals:
+                refresh_started.wait(5)
+            foo_vals.append(list(values))
+            return len(foo_vals), sum(values)
+
+        values = [1]
+        timer_patch.return_value = 0
+        self.assertEqual((1, 1), foo(values))
+
+        timer_patch.return_value = 15
+        self.assertEqual((1, 1), foo(values))
+        values.append(100)
+        refresh_started.set()
+
+        self._wait_for(lambda: len(foo_vals) == 2)
+        self.assertEqual([1], foo_vals[1])
+        self._wait_for(lambda: foo([1]) == (2, 1))
+        self.assertEqual(2, len(foo_vals))
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh_uncopyable_args(
+        self, _, cache_decorator, timer_patch: Mock
+    ):
+        """Functions whose arguments can't be copied are refreshed in the
+        foreground.
+        """
+        foo_vals = []
+
+        @cache_decorator(ttl=10, refresh="background")
+        def foo(x, _lock):
+            foo_vals.append(x)
+            return len(foo_vals)
+
+        lock = threading.Lock()
+        timer_patch.return_value = 0
+        self.assertEqual(1, foo(0, lock))
+
+        timer_patch.return_value = 15
+        self.assertEqual(2, foo(0, lock))
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    def test_bad_refresh_params(self, _, cache_decorator):
+        """Unknown refresh options, and max_staleness without background
+        refresh, are rejected.
+        """
+        with self.assertRaises(StreamlitAPIException):
+
+            @cache_decorator(ttl=10, refresh="sometimes")
+            def foo():
+                pass
+
+        with self.assertRaises(StreamlitAPIException):
+
+            @cache_decorator(ttl=10, max_staleness=5)
+            def bar():
+                pass
+
 
 class CommonCacheThreadingTest(unittest.TestCase):
     # The number of threads to run our tests on
@@ -909,6 +1099,156 @@ class CommonCacheThreadingTest(unittest.TestCase):
         # Sanity check: ensure we can still call our cached function.
         self.assertEqual(42, foo())
 
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch_config_options({"runner.maxConcurrentCacheComputations": 2})
+    def test_max_concurrent_computations(self, _, cache_decorator):
+        """No more than `runner.maxConcurrentCacheComputations` values are
+        computed at the same time.
+        """
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        @cache_decorator
+        def foo(x: int) -> int:
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return x
+
+        def call_foo(i: int) -> None:
+            self.assertEqual(i, foo(i))
+
+        call_on_threads(call_foo, num_threads=10, timeout=2)
+        self.assertEqual(2, max_running[0])
+
+    @parameterized.expand(
+        [("cache_data", cache_data), ("cache_resource", cache_resource)]
+    )
+    @patch_config_options({"runner.maxConcurrentCacheComputations": 1})
+    def test_max_concurrent_computations_nested(self, _, cache_decorator):
+        """Nested cached functions share the slot of the outer function, and
+        waiting for a value computed by another thread gives the slot back, so
+        a limit of 1 doesn't deadlock.
+        """
+
+        @cache_decorator
+        def inner(x: int) -> int:
+            time.sleep(0.01)
+            return x
+
+        @cache_decorator
+        def outer(x: int) -> int:
+            return inner(x % 2) + x
+
+        def call_funcs(i: int) -> None:
+            if i % 2 == 0:
+                self.assertEqual(i % 2, inner(i % 2))
+            else:
+                self.assertEqual(i % 2 + i, outer(i))
+
+        call_on_threads(call_funcs, num_threads=10, timeout=2)
+
+
+class ComputationWaitTest(unittest.TestCase):
+    @patch.object(cache_utils, "COMPUTE_WAIT_INTERVAL_SECS", 0.01)
+    def test_acquire_interruptibly(self):
+        """Waiting for a lock reports the waited time until the lock is free."""
+        lock = threading.Lock()
+        lock.acquire()
+        waited: list[float] = []
+
+        def on_waiting(waited_secs: float) -> None:
+            waited.append(waited_secs)
+            if len(waited) == 3:
+                lock.release()
+
+        cache_utils._acquire_interruptibly(lock, on_waiting)
+        self.assertEqual(3, len(waited))
+        self.assertEqual(sorted(waited), waited)
+        self.assertTrue(lock.locked())
+
+    def test_acquire_interruptibly_free_lock(self):
+        """A free lock is acquired without waiting."""
+        lock = threading.Lock()
+        on_waiting = MagicMock()
+        cache_utils._acquire_interruptibly(lock, on_waiting)
+        self.assertTrue(lock.locked())
+        on_waiting.assert_not_called()
+
+    @patch.object(cache_utils, "COMPUTE_WAIT_INTERVAL_SECS", 0.01)
+    def test_acquire_interruptibly_raises(self):
+        """An exception raised while waiting abandons the wait."""
+        lock = threading.Lock()
+        lock.acquire()
+
+        def on_waiting(_: float) -> None:
+            raise RuntimeError("stop")
+
+        with self.assertRaises(RuntimeError):
+            cache_utils._acquire_interruptibly(lock, on_waiting)
+
+    @patch.object(cache_utils, "COMPUTE_WAIT_INTERVAL_SECS", 0.01)
+    def test_acquire_interruptibly_handles_script_requests(self):
+        """Stop and rerun requests of the script abandon the wait, also
+        without a spinner to update.
+        """
+        lock = threading.Lock()
+        lock.acquire()
+        ctx = MagicMock()
+        ctx.session_state.yield_to_script_runner.side_effect = [
+            None,
+            None,
+            StopException(),
+        ]
+
+        with patch.object(
+            cache_utils, "get_script_run_ctx", return_value=ctx
+        ), self.assertRaises(StopException):
+            cache_utils._acquire_interruptibly(lock, lambda waited_secs: None)
+        self.assertEqual(3, ctx.session_state.yield_to_script_runner.call_count)
+
+    @patch.object(cache_utils, "COMPUTE_WAIT_INTERVAL_SECS", 0.01)
+    @patch_config_options({"runner.maxConcurrentCacheComputations": 1})
+    def test_computation_slots(self):
+        """Slots are released when the computation ends, also if it failed,
+        and while waiting for another value.
+        """
+        slots = cache_utils._ComputationSlots()
+        on_waiting = MagicMock()
+
+        with self.assertRaises(RuntimeError), slots.computing(on_waiting):
+            raise RuntimeError("failed")
+
+        with slots.computing(on_waiting):
+            semaphore = slots._get_semaphore()
+            assert semaphore is not None
+            # Nested computations reuse the slot.
+            with slots.computing(on_waiting):
+                self.assertFalse(semaphore.acquire(blocking=False))
+            self.assertFalse(semaphore.acquire(blocking=False))
+
+            with slots.released(on_waiting):
+                self.assertTrue(semaphore.acquire(blocking=False))
+                semaphore.release()
+            self.assertFalse(semaphore.acquire(blocking=False))
+
+        self.assertTrue(semaphore.acquire(blocking=False))
+        semaphore.release()
+        on_waiting.assert_not_called()
+
+    @patch_config_options({"runner.maxConcurrentCacheComputations": 0})
+    def test_computation_slots_unlimited(self):
+        """Computations aren't limited by default."""
+        slots = cache_utils._ComputationSlots()
+        with slots.computing(MagicMock()):
+            self.assertIsNone(slots._get_semaphore())
+
 
 def test_arrow_replay():
     """Regression test for https://github.com/streamlit/streamlit/issues/6103"""
@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import datetime
 import functools
+import gc
 import hashlib
 import os
 import re
@@ -29,21 +30,23 @@ import uuid
 from dataclasses import dataclass
 from enum import Enum, auto
 from io import BytesIO, StringIO
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 from parameterized import parameterized
 from PIL import Image
 
 from streamlit.proto.Common_pb2 import FileURLs
-from streamlit.runtime.caching import cache_data, cache_resource
+from streamlit.runtime.caching import cache_data, cache_resource, hashing
 from streamlit.runtime.caching.cache_errors import UnhashableTypeError
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.hashing import (
-    _NP_SIZE_LARGE,
-    _PANDAS_ROWS_LARGE,
+    _BUFFER_HASH_CHUNK_SIZE,
     UserHashError,
+    _buffer_digest,
+    immutable_value_hashes,
     update_hash,
 )
 from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
@@ -52,6 +55,9 @@ from streamlit.util import HASHLIB_KWARGS
 
 get_main_script_director = MagicMock(return_value=os.getcwd())
 
+# Large enough for the sampling that was used to hash big dataframes and arrays.
+_LARGE_SIZE = 1_000_000
+
 
 def get_hash(value, hash_funcs=None, cache_type=None):
     hasher = hashlib.new("md5", **HASHLIB_KWARGS)
@@ -258,13 +264,50 @@ class HashTest(unittest.TestCase):
         self.assertNotEqual(get_hash(p1), get_hash(p3))
 
     def test_pandas_large_dataframe(self):
-        df1 = pd.DataFrame(np.zeros((_PANDAS_ROWS_LARGE, 4)), columns=list("ABCD"))
-        df2 = pd.DataFrame(np.ones((_PANDAS_ROWS_LARGE, 4)), columns=list("ABCD"))
-        df3 = pd.DataFrame(np.zeros((_PANDAS_ROWS_LARGE, 4)), columns=list("ABCD"))
+        df1 = pd.DataFrame(np.zeros((_LARGE_SIZE, 4)), columns=list("ABCD"))
+        df2 = pd.DataFrame(np.ones((_LARGE_SIZE, 4)), columns=list("ABCD"))
+        df3 = pd.DataFrame(np.zeros((_LARGE_SIZE, 4)), columns=list("ABCD"))
 
         self.assertEqual(get_hash(df1), get_hash(df3))
         self.assertNotEqual(get_hash(df1), get_hash(df2))
 
+    def test_pandas_large_dataframe_single_change(self):
+        """All values of large dataframes are hashed, not just a sample."""
+        df1 = pd.DataFrame(
+            {
+                "int": np.arange(_LARGE_SIZE),
+                "str": np.arange(_LARGE_SIZE).astype(str).astype(object),
+                "date": pd.date_range("2024-01-01", periods=_LARGE_SIZE, freq="s"),
+                "cat": pd.Categorical(["a", "b"] * (_LARGE_SIZE // 2)),
+                "nullable": pd.array([1, None] * (_LARGE_SIZE // 2), dtype="Int64"),
+            }
+        )
+        original_hash = get_hash(df1)
+        self.assertEqual(original_hash, get_hash(df1.copy()))
+
+        for column, value in [
+            ("int", -1),
+            ("str", "changed"),
+            ("date", pd.Timestamp("2000-01-01")),
+            ("cat", "a"),
+            ("nullable", 3),
+        ]:
+            df2 = df1.copy()
+            df2.loc[12345, column] = value
+            self.assertNotEqual(original_hash, get_hash(df2), column)
+
+        df2 = df1.copy()
+        df2.index = df2.index + 1
+        self.assertNotEqual(original_hash, get_hash(df2))
+
+    def test_pandas_dataframe_unhashable_values(self):
+        """DataFrames with unhashable values are pickled instead."""
+        df1 = pd.DataFrame({"A": [[1], [2]]})
+        df2 = pd.DataFrame({"A": [[1], [3]]})
+
+        self.assertEqual(get_hash(df1), get_hash(df1.copy()))
+        self.assertNotEqual(get_hash(df1), get_hash(df2))
+
     @parameterized.expand(
         [
             (pd.DataFrame({"foo": [12]}), pd.DataFrame({"foo": [12]}), True),
@@ -350,10 +393,19 @@ class HashTest(unittest.TestCase):
         self.assertEqual(get_hash(series1), get_hash(series3))
         self.assertNotEqual(get_hash(series1), get_hash(series2))
 
-        series4 = pd.Series(range(_PANDAS_ROWS_LARGE))
-        series5 = pd.Series(range(_PANDAS_ROWS_LARGE))
+        series4 = pd.Series(range(_LARGE_SIZE))
+        series5 = pd.Series(range(_LARGE_SIZE))
+        series6 = series5.copy()
+        series6[12345] = -1
 
         self.assertEqual(get_hash(series4), get_hash(series5))
+        self.assertNotEqual(get_hash(series5), get_hash(series6))
+
+    def test_pandas_series_index(self):
+        series1 = pd.Series([1, 2], index=["a", "b"])
+        series2 = pd.Series([1, 2], index=["a", "c"])
+
+        self.assertNotEqual(get_hash(series1), get_hash(series2))
 
     def test_pandas_series_similar_dtypes(self):
         series1 = pd.Series([1, 2], dtype="UInt64")
@@ -369,10 +421,116 @@ class HashTest(unittest.TestCase):
         self.assertEqual(get_hash(np1), get_hash(np3))
         self.assertNotEqual(get_hash(np1), get_hash(np2))
 
-        np4 = np.zeros(_NP_SIZE_LARGE)
-        np5 = np.zeros(_NP_SIZE_LARGE)
+        np4 = np.zeros(_LARGE_SIZE)
+        np5 = np.zeros(_LARGE_SIZE)
+        np6 = np.zeros(_LARGE_SIZE)
+        np6[12345] = 1
 
         self.assertEqual(get_hash(np4), get_hash(np5))
+        self.assertNotEqual(get_hash(np5), get_hash(np6))
+
+    def test_numpy_non_contiguous(self):
+        arr = np.arange(100).reshape(10, 10)
+
+        self.assertEqual(get_hash(arr.T), get_hash(np.ascontiguousarray(arr.T)))
+        self.assertNotEqual(get_hash(arr[:, 0]), get_hash(arr[:, 1]))
+
+    def test_numpy_object_dtype(self):
+        """Object arrays are hashed by value, not by the addresses they hold."""
+        np1 = np.array(["a", 1], dtype=object)
+        np2 = np.array(["a", 1], dtype=object)
+        np3 = np.array(["a", 2], dtype=object)
+
+        self.assertEqual(get_hash(np1), get_hash(np2))
+        self.assertNotEqual(get_hash(np1), get_hash(np3))
+
+    def test_immutable_value_hashes(self):
+        """Registered values are only hashed once."""
+        arr = np.arange(100)
+        immutable_value_hashes.register(arr)
+
+        with patch(
+            "streamlit.runtime.caching.hashing._hash_buffers",
+            wraps=hashing._hash_buffers,
+        ) as hash_buffers:
+            arr_hash = get_hash(arr)
+            self.assertEqual(arr_hash, get_hash(arr))
+            # Also when nested in other values.
+            get_hash([arr, 1])
+            hash_buffers.assert_called_once()
+
+            # User-provided hash funcs bypass the memo.
+            get_hash(arr, hash_funcs={str: str})
+            self.assertEqual(hash_buffers.call_count, 2)
+
+        self.assertEqual(arr_hash, get_hash(np.arange(100)))
+
+    def test_immutable_value_hashes_collected(self):
+        """Hashes are dropped when their value is garbage collected."""
+        arr = np.arange(100)
+        immutable_value_hashes.register(arr)
+        get_hash(arr)
+        self.assertIsNotNone(immutable_value_hashes.get(arr))
+
+        arr_id = id(arr)
+        del arr
+        gc.collect()
+        self.assertNotIn(arr_id, immutable_value_hashes._entries)
+
+    def test_immutable_value_hashes_unregistered(self):
+        """Values that aren't registered are hashed every time."""
+        arr = np.arange(100)
+        arr_hash = get_hash(arr)
+        arr[0] = 1
+
+        self.assertNotEqual(arr_hash, get_hash(arr))
+        self.assertIsNone(immutable_value_hashes.get(arr))
+
+    def test_immutable_value_hashes_not_weakrefable(self):
+        """Values without weakref support can't be registered."""
+        value = [1, 2]
+        immutable_value_hashes.register(value)
+        get_hash(value)
+
+        self.assertIsNone(immutable_value_hashes.get(value))
+
+    def test_numpy_chunks(self):
+        """Buffers larger than a chunk are hashed in (possibly parallel) chunks."""
+        size = 3 * _BUFFER_HASH_CHUNK_SIZE + 1
+        np1 = np.zeros(size, dtype="u1")
+        np2 = np.zeros(size, dtype="u1")
+        np2[-1] = 1
+
+        self.assertEqual(get_hash(np1), get_hash(np1.copy()))
+        self.assertNotEqual(get_hash(np1), get_hash(np2))
+
+    def test_buffer_digest_is_stable(self):
+        """Buffer digests don't depend on the environment, since hashes are
+        persisted and shared between processes."""
+        self.assertEqual(
+            "c2472c0ac37a8dbdb25f05ada0d82643",
+            _buffer_digest(memoryview(bytes(range(256)))).hex(),
+        )
+
+    def test_arrow_table(self):
+        table1 = pa.table({"A": np.arange(_LARGE_SIZE), "B": ["x"] * _LARGE_SIZE})
+        table2 = pa.table({"A": np.arange(_LARGE_SIZE), "B": ["x"] * _LARGE_SIZE})
+        table3 = table2.set_column(
+            0, "A", pa.array(np.where(np.arange(_LARGE_SIZE) == 12345, -1, 0))
+        )
+
+        self.assertEqual(get_hash(table1), get_hash(table2))
+        self.assertNotEqual(get_hash(table1), get_hash(table3))
+        self.assertNotEqual(get_hash(table1), get_hash(table1.slice(1)))
+        self.assertNotEqual(
+            get_hash(table1), get_hash(table1.rename_columns(["A", "C"]))
+        )
+
+    def test_arrow_table_dictionary(self):
+        table1 = pa.table({"A": pa.array(["x", "y"]).dictionary_encode()})
+        table2 = pa.table({"A": pa.array(["x", "z"]).dictionary_encode()})
+
+        self.assertNotEqual(get_hash(table1), get_hash(table2))
 
     def test_numpy_similar_dtypes(self):
         np1 = np.ones(10, dtype="u8")
@@ -392,15 +550,15 @@ class HashTest(unittest.TestCase):
         self.assertEqual(get_hash(im1), get_hash(im3))
         self.assertNotEqual(get_hash(im1), get_hash(im2))
 
-        # Check for big PIL images, they converted to numpy array with size
-        # bigger than _NP_SIZE_LARGE
-        # 1000 * 1000 * 3 = 3_000_000 > _NP_SIZE_LARGE = 1_000_000
-        im4 = Image.new("RGB", (1000, 1000), (100, 20, 60))
-        im5 = Image.new("RGB", (1000, 1000), (100, 20, 60))
-        im6 = Image.new("RGB", (1000, 1000), (101, 21, 61))
+        # Check for big PIL images, they are converted to numpy arrays bigger
+        # than a hashing chunk.
+        im4 = Image.new("RGB", (2000, 1000), (100, 20, 60))
+        im5 = Image.new("RGB", (2000, 1000), (100, 20, 60))
+        im6 = im5.copy()
+        im6.putpixel((1234, 567), (101, 21, 61))
 
         im4_np_array = np.frombuffer(im4.tobytes(), dtype="uint8")
-        self.assertGreater(im4_np_array.size, _NP_SIZE_LARGE)
+        self.assertGreater(im4_np_array.size, _BUFFER_HASH_CHUNK_SIZE)
 
         self.assertEqual(get_hash(im4), get_hash(im5))
         self.assertNotEqual(get_hash(im5), get_hash(im6))
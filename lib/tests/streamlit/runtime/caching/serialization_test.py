@@ -0,0 +1,152 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""st.cache_data serialization unit tests."""
+
+from __future__ import annotations
+
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from streamlit.runtime.caching import serialization
+from tests.testutil import patch_config_options
+
+
+class SerializationTest(unittest.TestCase):
+    def test_small_values_are_plain_pickles(self):
+        """Values without large buffers are serialized as plain pickles."""
+        data = serialization.dumps({"a": [1, 2, 3]})
+        self.assertEqual(pickle.loads(data), {"a": [1, 2, 3]})
+        self.assertEqual(serialization.loads(data), {"a": [1, 2, 3]})
+
+    def test_reads_legacy_pickles(self):
+        """Entries pickled with the default protocol are still readable."""
+        self.assertEqual(serialization.loads(pickle.dumps("value")), "value")
+
+    def test_roundtrip_dataframe(self):
+        """Large frames roundtrip through the out-of-band layout."""
+        df = pd.DataFrame({"a": np.arange(100_000), "b": np.random.rand(100_000)})
+        data = serialization.dumps(df)
+        self.assertNotEqual(data[:1], pickle.dumps(df)[:1])
+        pd.testing.assert_frame_equal(serialization.loads(data), df)
+
+    def test_zero_copy_from_writable_buffer(self):
+        """Out-of-band buffers share memory with a writable source buffer."""
+        arr = np.arange(100_000, dtype=np.int64)
+        data = bytearray(serialization.dumps(arr))
+
+        loaded = serialization.loads(data)
+
+        np.testing.assert_array_equal(loaded, arr)
+        self.assertTrue(np.shares_memory(loaded, np.frombuffer(data, np.uint8)))
+
+    def test_read_only_source_produces_writable_values(self):
+        """Values loaded from immutable bytes can still be mutated."""
+        arr = np.arange(100_000, dtype=np.int64)
+        loaded = serialization.loads(serialization.dumps(arr))
+
+        self.assertTrue(loaded.flags.writeable)
+        loaded[0] = 42
+        self.assertEqual(loaded[0], 42)
+
+    def test_truncated_entry(self):
+        """A truncated out-of-band entry raises an UnpicklingError."""
+        data = serialization.dumps(np.arange(100_000, dtype=np.int64))
+        with self.assertRaises(pickle.UnpicklingError):
+            serialization.loads(data[:-100])
+
+
+class ArrowSerializationTest(unittest.TestCase):
+    def _assert_arrow_serialized(self, data: bytes, expected: bool = True):
+        self.assertEqual(b"load_arrow_ipc" in data, expected)
+
+    @patch_config_options({"global.dataCacheArrowSerialization": True})
+    def test_roundtrip_dataframe(self):
+        """pandas DataFrames are serialized as Arrow IPC streams."""
+        df = pd.DataFrame(
+            {
+                "int": np.arange(100_000),
+                "str": [str(i) for i in range(100_000)],
+                "cat": pd.Categorical(["a", "b"] * 50_000),
+                "date": pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(np.arange(100_000), unit="s"),
+                "nullable": pd.array([1, None] * 50_000, dtype="Int64"),
+            }
+        )
+        data = serialization.dumps({"df": df})
+
+        self._assert_arrow_serialized(data)
+        pd.testing.assert_frame_equal(serialization.loads(data)["df"], df)
+
+    @patch_config_options({"global.dataCacheArrowSerialization": True})
+    def test_roundtrip_arrow_table(self):
+        """PyArrow Tables are serialized as Arrow IPC streams."""
+        table = pa.table({"a": np.arange(100_000)})
+        data = serialization.dumps(table)
+
+        self._assert_arrow_serialized(data)
+        self.assertTrue(serialization.loads(data).equals(table))
+
+    @patch_config_options({"global.dataCacheArrowSerialization": True})
+    def test_zero_copy_from_writable_buffer(self):
+        """Uncompressed Arrow columns share memory with a writable source buffer."""
+        table = pa.table({"a": np.arange(100_000, dtype=np.int64)})
+        data = bytearray(serialization.dumps(table))
+
+        loaded = serialization.loads(data)
+
+        column = loaded.column("a").chunk(0).to_numpy()
+        self.assertTrue(np.shares_memory(column, np.frombuffer(data, np.uint8)))
+
+    @patch_config_options(
+        {
+            "global.dataCacheArrowSerialization": True,
+            "global.dataCacheArrowCompression": "zstd",
+        }
+    )
+    def test_compression(self):
+        """Arrow IPC streams are compressed if configured."""
+        df = pd.DataFrame({"a": np.zeros(100_000)})
+        data = serialization.dumps(df)
+
+        self._assert_arrow_serialized(data)
+        self.assertLess(len(data), df.memory_usage().sum() // 10)
+        pd.testing.assert_frame_equal(serialization.loads(data), df)
+
+    @patch_config_options({"global.dataCacheArrowSerialization": True})
+    def test_lossy_dataframes_are_pickled(self):
+        """DataFrames that don't roundtrip through Arrow are pickled."""
+        mixed = pd.DataFrame({"a": [1, "a", None]})
+        int_columns = pd.DataFrame({0: [1, 2, 3]})
+        with_freq = pd.DataFrame(
+            {"a": [1, 2, 3]}, index=pd.date_range("2024-01-01", periods=3)
+        )
+        with_attrs = pd.DataFrame({"a": [1, 2, 3]})
+        with_attrs.attrs["unit"] = "m"
+
+        for df in (mixed, int_columns, with_freq, with_attrs):
+            data = serialization.dumps(df)
+            self._assert_arrow_serialized(data, expected=False)
+            loaded = serialization.loads(data)
+            pd.testing.assert_frame_equal(loaded, df)
+            self.assertEqual(loaded.attrs, df.attrs)
+
+    def test_disabled(self):
+        """DataFrames are pickled if Arrow serialization is disabled."""
+        data = serialization.dumps(pd.DataFrame({"a": [1, 2, 3]}))
+        self._assert_arrow_serialized(data, expected=False)
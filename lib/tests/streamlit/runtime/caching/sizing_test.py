@@ -0,0 +1,34 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the size estimates of cached objects."""
+
+from __future__ import annotations
+
+import unittest
+
+from streamlit.runtime.caching.sizing import estimate_size
+from streamlit.vendor.pympler.asizeof import asizeof
+
+
+class EstimateSizeTest(unittest.TestCase):
+    def test_estimate_size(self):
+        """Objects are sized like with asizeof."""
+        obj = {"a": [1, 2, 3], "b": ["x" * 100]}
+        self.assertEqual(asizeof(obj), estimate_size(obj, timeout_secs=60))
+
+    def test_estimate_size_timeout(self):
+        """Objects that take too long to size have an unknown size."""
+        obj = [[i] for i in range(10_000)]
+        self.assertIsNone(estimate_size(obj, timeout_secs=0))
@@ -0,0 +1,174 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for LocalDiskCacheIndex"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from testfixtures import TempDirectory
+
+from streamlit.runtime.caching.storage.local_disk_cache_index import (
+    LocalDiskCacheIndex,
+)
+
+
+class LocalDiskCacheIndexTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def _write_file(self, file_name: str, content: bytes) -> None:
+        with open(os.path.join(self.tempdir.path, file_name), "wb") as f:
+            f.write(content)
+
+    def test_adopts_unindexed_files(self):
+        """Files that exist in the cache folder but not in the index are adopted."""
+        self._write_file("func-a.memo", b"12345")
+        self._write_file("unrelated.txt", b"12345")
+
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        entry = index.lookup("func-a.memo")
+
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.size, 5)
+        self.assertIsNone(index.lookup("unrelated.txt"))
+
+    def test_forgets_missing_files(self):
+        """Index entries whose files were removed are dropped on load."""
+        self._write_file("func-a.memo", b"a")
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        index.record("func-a.memo", 1)
+        index.record("func-b.memo", 1)
+        index.flush()
+
+        reloaded_index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        self.assertIsNotNone(reloaded_index.lookup("func-a.memo"))
+        self.assertIsNone(reloaded_index.lookup("func-b.memo"))
+
+    def test_rebuilds_corrupted_index(self):
+        """A corrupted index file is rebuilt from the cache folder contents."""
+        self._write_file("func-a.memo", b"a")
+        self._write_file("index.json", b"not json")
+
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        self.assertIsNotNone(index.lookup("func-a.memo"))
+        index.flush()
+
+        with open(os.path.join(self.tempdir.path, "index.json")) as f:
+            self.assertIn("func-a.memo", json.load(f)["entries"])
+
+    def test_evict_total_bytes(self):
+        """The least recently used entries of any prefix are evicted first."""
+        for file_name in ("a-1.memo", "b-1.memo", "a-2.memo"):
+            self._write_file(file_name, b"xx")
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        for file_name in ("a-1.memo", "b-1.memo", "a-2.memo"):
+            index.record(file_name, 2)
+
+        evicted = index.evict(
+            prefix="a-", ttl_seconds=math.inf, max_entries=math.inf, max_total_bytes=4
+        )
+
+        self.assertEqual(evicted, ["a-1.memo"])
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir.path, "a-1.memo")))
+
+    def test_index_file_removed_when_empty(self):
+        """The index file is removed once the index has no entries left."""
+        self._write_file("func-a.memo", b"a")
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        index.record("func-a.memo", 1)
+        index.flush()
+        self.assertTrue(os.path.exists(os.path.join(self.tempdir.path, "index.json")))
+
+        index.discard("func-a.memo")
+        index.flush()
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir.path, "index.json")))
+
+    def test_changes_are_flushed_later(self):
+        """Changes are written to the index file after a delay, rather than on
+        every change.
+        """
+        index_path = os.path.join(self.tempdir.path, "index.json")
+        self._write_file("func-a.memo", b"a")
+        index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+        index.record("func-a.memo", 1)
+        self.assertFalse(os.path.exists(index_path))
+        index.flush()
+        self.assertTrue(os.path.exists(index_path))
+
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_index._FLUSH_DELAY_SECONDS",
+            0,
+        ):
+            index.discard("func-a.memo")
+            self._write_file("func-b.memo", b"b")
+            index.record("func-b.memo", 1)
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            # The index may be flushed (and removed) while it's empty.
+            with contextlib.suppress(FileNotFoundError), open(index_path) as f:
+                if list(json.load(f)["entries"]) == ["func-b.memo"]:
+                    break
+            time.sleep(0.01)
+        else:
+            self.fail("The index wasn't flushed")
+        self.assertEqual(
+            [], [f for f in os.listdir(self.tempdir.path) if f.endswith(".tmp")]
+        )
+
+    def test_evict_expired_after_rewrite(self):
+        """An entry that was written again expires from its last write."""
+        now = 1000.0
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_index.DISK_CACHE_TIMER",
+            lambda: now,
+        ):
+            index = LocalDiskCacheIndex(self.tempdir.path, "memo")
+            index.record("func-a.memo", 1)
+            index.record("other-a.memo", 1)
+            now += 30
+            index.record("func-a.memo", 1)
+            index.record("func-b.memo", 1)
+            now += 31
+
+            evicted = index.evict(
+                prefix="func-",
+                ttl_seconds=60,
+                max_entries=math.inf,
+                max_total_bytes=math.inf,
+            )
+            self.assertEqual([], evicted)
+
+            now += 30
+            evicted = index.evict(
+                prefix="func-",
+                ttl_seconds=60,
+                max_entries=math.inf,
+                max_total_bytes=math.inf,
+            )
+            self.assertEqual(["func-a.memo", "func-b.memo"], sorted(evicted))
+            self.assertIsNotNone(index.lookup("other-a.memo"))
@@ -39,6 +39,7 @@ from streamlit.runtime.caching.storage.local_disk_cache_storage import (
     LocalDiskCacheStorage,
     LocalDiskCacheStorageManager,
 )
+from tests.testutil import patch_config_options
 
 
 class LocalDiskCacheStorageManagerTest(unittest.TestCase):
@@ -93,8 +94,9 @@ class LocalDiskCacheStorageManagerTest(unittest.TestCase):
         self.assertEqual(storage.max_entries, math.inf)
 
     def test_check_context_with_persist_and_ttl(self):
-        """Tests that LocalDiskCacheStorageManager.check_context() writes a warning
-        in logs when persist="disk" and ttl_seconds is not None
+        """Tests that LocalDiskCacheStorageManager.check_context() doesn't write
+        a warning in logs when persist="disk" and ttl_seconds is not None,
+        since persisted entries honor the TTL.
         """
         context = CacheStorageContext(
             function_key="func-key",
@@ -104,32 +106,6 @@ class LocalDiskCacheStorageManagerTest(unittest.TestCase):
             max_entries=100,
         )
 
-        with self.assertLogs(
-            "streamlit.runtime.caching.storage.local_disk_cache_storage",
-            level=logging.WARNING,
-        ) as logs:
-            manager = LocalDiskCacheStorageManager()
-            manager.check_context(context)
-
-            output = "".join(logs.output)
-            self.assertIn(
-                "The cached function 'func-display-name' has a TTL that will be "
-                "ignored. Persistent cached functions currently don't support TTL.",
-                output,
-            )
-
-    def test_check_context_without_persist(self):
-        """Tests that LocalDiskCacheStorageManager.check_context() does not
-        write a warning in logs when persist is None and ttl_seconds is NOT None.
-        """
-        context = CacheStorageContext(
-            function_key="func-key",
-            function_display_name="func-display-name",
-            persist=None,
-            ttl_seconds=60,
-            max_entries=100,
-        )
-
         with self.assertLogs(
             "streamlit.runtime.caching.storage.local_disk_cache_storage",
             level=logging.WARNING,
@@ -144,11 +120,7 @@ class LocalDiskCacheStorageManagerTest(unittest.TestCase):
             ).warning("irrelevant warning so assertLogs passes")
 
             output = "".join(logs.output)
-            self.assertNotIn(
-                "The cached function 'func-display-name' has a TTL that will be "
-                "ignored. Persistent cached functions currently don't support TTL.",
-                output,
-            )
+            self.assertNotIn("has a TTL that will be ignored", output)
 
     @patch("shutil.rmtree", wraps=shutil.rmtree)
     def test_clear_all(self, mock_rmtree):
@@ -275,3 +247,212 @@ class LocalDiskPersistCacheStorageTest(unittest.TestCase):
     def test_storage_close(self):
         """Test that storage.close() does not raise any exception."""
         self.storage.close()
+
+
+class LocalDiskCacheStorageLimitsTest(unittest.TestCase):
+    """Tests that LocalDiskCacheStorage enforces ttl, max_entries and the
+    global.maxPersistedCacheSize budget on disk."""
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+        self.patch_get_cache_folder_path = patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_storage.get_cache_folder_path",
+            return_value=self.tempdir.path,
+        )
+        self.patch_get_cache_folder_path.start()
+        self.now = 1000.0
+        self.patch_timer = patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_index.DISK_CACHE_TIMER",
+            lambda: self.now,
+        )
+        self.patch_timer.start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.patch_timer.stop()
+        self.patch_get_cache_folder_path.stop()
+        self.tempdir.cleanup()
+
+    def _create_storage(
+        self, function_key="func-key", ttl_seconds=None, max_entries=None
+    ) -> LocalDiskCacheStorage:
+        return LocalDiskCacheStorage(
+            CacheStorageContext(
+                function_key=function_key,
+                function_display_name="func-display-name",
+                persist="disk",
+                ttl_seconds=ttl_seconds,
+                max_entries=max_entries,
+            )
+        )
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.tempdir.path, file_name)
+
+    def test_expired_entry_is_not_read(self):
+        """An entry older than the TTL is removed from disk without being read."""
+        storage = self._create_storage(ttl_seconds=60)
+        storage.set("key", b"value")
+        self.now += 30
+        self.assertEqual(storage.get("key"), b"value")
+
+        self.now += 31
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_storage.streamlit_read"
+        ) as mock_read, self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+        mock_read.assert_not_called()
+        self.assertFalse(os.path.exists(self._path("func-key-key.memo")))
+
+    def test_expired_entries_are_removed_on_set(self):
+        """Writing a new entry removes the function's expired entries."""
+        storage = self._create_storage(ttl_seconds=60)
+        storage.set("old", b"value")
+        self.now += 61
+        storage.set("new", b"value")
+        self.assertFalse(os.path.exists(self._path("func-key-old.memo")))
+        self.assertTrue(os.path.exists(self._path("func-key-new.memo")))
+
+    def test_max_entries_evicts_least_recently_used(self):
+        """max_entries is enforced on disk, evicting the least recently used entry."""
+        storage = self._create_storage(max_entries=2)
+        storage.set("a", b"a")
+        self.now += 1
+        storage.set("b", b"b")
+        self.now += 1
+        # Access "a", so that "b" becomes the least recently used entry.
+        storage.get("a")
+        self.now += 1
+        storage.set("c", b"c")
+
+        self.assertTrue(os.path.exists(self._path("func-key-a.memo")))
+        self.assertFalse(os.path.exists(self._path("func-key-b.memo")))
+        self.assertTrue(os.path.exists(self._path("func-key-c.memo")))
+
+    def test_max_entries_is_per_function(self):
+        """max_entries of one function doesn't evict entries of another function."""
+        other_storage = self._create_storage(function_key="other-key")
+        other_storage.set("a", b"a")
+        storage = self._create_storage(max_entries=1)
+        storage.set("a", b"a")
+        storage.set("b", b"b")
+
+        self.assertTrue(os.path.exists(self._path("other-key-a.memo")))
+        self.assertFalse(os.path.exists(self._path("func-key-a.memo")))
+        self.assertTrue(os.path.exists(self._path("func-key-b.memo")))
+
+    @patch_config_options({"global.maxPersistedCacheSize": 1})
+    def test_global_size_budget(self):
+        """The total size of the cache folder is capped across functions."""
+        half_mb = b"x" * (512 * 1024)
+        storage = self._create_storage()
+        other_storage = self._create_storage(function_key="other-key")
+
+        other_storage.set("a", half_mb)
+        self.now += 1
+        storage.set("a", half_mb)
+        self.now += 1
+        storage.set("b", half_mb)
+
+        self.assertFalse(os.path.exists(self._path("other-key-a.memo")))
+        self.assertTrue(os.path.exists(self._path("func-key-a.memo")))
+        self.assertTrue(os.path.exists(self._path("func-key-b.memo")))
+
+    def test_index_survives_restart(self):
+        """Entries written by a previous process keep their creation time."""
+        storage = self._create_storage(ttl_seconds=60)
+        storage.set("key", b"value")
+        storage.close()
+
+        self.assertTrue(os.path.exists(self._path("index.json")))
+
+        # Simulate a new process by dropping the in-memory indexes.
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_index._indexes", {}
+        ):
+            self.now += 61
+            with self.assertRaises(CacheStorageKeyNotFoundError):
+                self._create_storage(ttl_seconds=60).get("key")
+
+
+class LocalDiskCacheStorageMemoryMapTest(unittest.TestCase):
+    """Tests that LocalDiskCacheStorage memory-maps large cache files."""
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+        self.patch_get_cache_folder_path = patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_storage.get_cache_folder_path",
+            return_value=self.tempdir.path,
+        )
+        self.patch_get_cache_folder_path.start()
+        self.context = CacheStorageContext(
+            function_key="func-key",
+            function_display_name="func-display-name",
+            persist="disk",
+        )
+        self.storage = LocalDiskCacheStorage(self.context)
+
+    def tearDown(self):
+        super().tearDown()
+        self.patch_get_cache_folder_path.stop()
+        self.tempdir.cleanup()
+
+    def test_small_file_is_read(self):
+        """Small cache files are read into bytes."""
+        self.storage.set("key", b"value")
+        self.assertIsInstance(self.storage.get("key"), bytes)
+
+    def test_large_file_is_memory_mapped(self):
+        """Large cache files are returned as a copy-on-write memory map."""
+        value = b"x" * (2 * 1024 * 1024)
+        self.storage.set("key", value)
+
+        mapped = self.storage.get("key")
+        self.assertIsInstance(mapped, memoryview)
+        self.assertEqual(mapped, value)
+
+        # Writing to the map doesn't change the file, or other readers' maps.
+        mapped[0] = ord("y")
+        self.assertEqual(self.storage.get("key"), value)
+        with open(os.path.join(self.tempdir.path, "func-key-key.memo"), "rb") as f:
+            self.assertEqual(f.read(1), b"x")
+
+    def test_rewriting_key_keeps_memory_mapped_value(self):
+        """Rewriting a key doesn't change, or truncate, values still mapped from
+        the previous cache file.
+        """
+        value = b"x" * (2 * 1024 * 1024)
+        self.storage.set("key", value)
+        mapped = self.storage.get("key")
+        self.assertIsInstance(mapped, memoryview)
+
+        # A truncated map would crash the process with SIGBUS when read.
+        self.storage.set("key", b"y")
+        self.assertEqual(mapped[-1], ord("x"))
+        self.assertEqual(mapped, value)
+        self.assertEqual(self.storage.get("key"), b"y")
+        self.assertNotIn(".tmp", "".join(os.listdir(self.tempdir.path)))
+
+    def test_failed_write_leaves_previous_value(self):
+        """A write that fails leaves the previous value, and no temporary file."""
+        self.storage.set("key", b"value")
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_storage.os.replace",
+            MagicMock(side_effect=OSError("mock exception")),
+        ):
+            with self.assertRaises(CacheStorageError):
+                self.storage.set("key", b"new-value")
+
+        self.assertEqual(self.storage.get("key"), b"value")
+        self.assertNotIn(".tmp", "".join(os.listdir(self.tempdir.path)))
+
+    def test_memory_mapped_values_not_kept_in_memory(self):
+        """The in-memory layer doesn't keep memory-mapped values."""
+        value = b"x" * (2 * 1024 * 1024)
+        self.storage.set("key", value)
+        wrapper = InMemoryCacheStorageWrapper(self.storage, self.context)
+
+        self.assertEqual(wrapper.get("key"), value)
+        self.assertEqual(wrapper.get_stats(), [])
@@ -0,0 +1,184 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for SqliteCacheStorage and SqliteCacheStorageManager"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import unittest
+from unittest.mock import patch
+
+from testfixtures import TempDirectory
+
+from streamlit.runtime.caching.storage import (
+    CacheStorageContext,
+    CacheStorageError,
+    CacheStorageKeyNotFoundError,
+)
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+from streamlit.runtime.caching.storage.sqlite_cache_storage import (
+    SqliteCacheStorage,
+    SqliteCacheStorageManager,
+)
+
+
+class SqliteCacheStorageTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+        self.database_path = os.path.join(self.tempdir.path, "cache", "db.sqlite")
+        self.manager = SqliteCacheStorageManager(self.database_path)
+        self.now = 1000.0
+        self.patch_timer = patch(
+            "streamlit.runtime.caching.storage.sqlite_cache_storage.SQLITE_CACHE_TIMER",
+            lambda: self.now,
+        )
+        self.patch_timer.start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.patch_timer.stop()
+        self.tempdir.cleanup()
+
+    def _create_storage(
+        self,
+        manager: SqliteCacheStorageManager | None = None,
+        function_key: str = "func-key",
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> SqliteCacheStorage:
+        return SqliteCacheStorage(
+            CacheStorageContext(
+                function_key=function_key,
+                function_display_name="func-display-name",
+                ttl_seconds=ttl_seconds,
+                max_entries=max_entries,
+            ),
+            manager=manager or self.manager,
+        )
+
+    def test_create(self):
+        """The manager wraps its storages with the in-memory layer."""
+        storage = self.manager.create(
+            CacheStorageContext(
+                function_key="func-key",
+                function_display_name="func-display-name",
+                ttl_seconds=60,
+                max_entries=100,
+            )
+        )
+        self.assertIsInstance(storage, InMemoryCacheStorageWrapper)
+        self.assertEqual(storage.ttl_seconds, 60)
+        self.assertEqual(storage.max_entries, 100)
+
+    def test_get_set(self):
+        storage = self._create_storage()
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+
+        storage.set("key", b"value")
+        self.assertEqual(storage.get("key"), b"value")
+        self.assertTrue(os.path.exists(self.database_path))
+
+        storage.set("key", b"new-value")
+        self.assertEqual(storage.get("key"), b"new-value")
+
+    def test_shared_between_managers(self):
+        """Values written through one manager (i.e. one process) are read by
+        another manager using the same database file."""
+        self._create_storage().set("key", b"value")
+
+        other_manager = SqliteCacheStorageManager(self.database_path)
+        self.assertEqual(self._create_storage(other_manager).get("key"), b"value")
+
+    def test_pickle(self):
+        """Pickled managers use the same database file, through their own
+        connections.
+        """
+        self._create_storage().set("key", b"value")
+
+        other_manager = pickle.loads(pickle.dumps(self.manager))
+        self.assertEqual(other_manager.database_path, self.database_path)
+        self.assertIsNot(other_manager.connection(), self.manager.connection())
+        self.assertEqual(self._create_storage(other_manager).get("key"), b"value")
+
+    def test_shared_between_threads(self):
+        """Every thread uses its own connection."""
+        storage = self._create_storage()
+        storage.set("key", b"value")
+        result = []
+
+        thread = threading.Thread(target=lambda: result.append(storage.get("key")))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(result, [b"value"])
+
+    def test_ttl(self):
+        storage = self._create_storage(ttl_seconds=60)
+        storage.set("key", b"value")
+        self.now += 61
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+
+    def test_max_entries(self):
+        """The oldest entries of the function are removed beyond max_entries."""
+        other_storage = self._create_storage(function_key="other-key")
+        other_storage.set("a", b"a")
+        storage = self._create_storage(max_entries=2)
+        for key in ("a", "b", "c"):
+            self.now += 1
+            storage.set(key, key.encode())
+
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("a")
+        self.assertEqual(storage.get("b"), b"b")
+        self.assertEqual(storage.get("c"), b"c")
+        self.assertEqual(other_storage.get("a"), b"a")
+
+    def test_delete_and_clear(self):
+        storage = self._create_storage()
+        other_storage = self._create_storage(function_key="other-key")
+        storage.set("a", b"a")
+        storage.set("b", b"b")
+        other_storage.set("a", b"a")
+
+        storage.delete("a")
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("a")
+
+        storage.clear()
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("b")
+        self.assertEqual(other_storage.get("a"), b"a")
+
+        self.manager.clear_all()
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            other_storage.get("a")
+
+    def test_unusable_database(self):
+        """Failing to open the database raises a CacheStorageError."""
+        with open(os.path.join(self.tempdir.path, "not-a-db"), "wb") as f:
+            f.write(b"x" * 1024)
+        storage = self._create_storage(
+            SqliteCacheStorageManager(os.path.join(self.tempdir.path, "not-a-db"))
+        )
+
+        with self.assertRaises(CacheStorageError):
+            storage.set("key", b"value")
@@ -0,0 +1,138 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for DiskMediaFileStorage"""
+
+from __future__ import annotations
+
+import gc
+import os
+import tempfile
+import unittest
+
+from streamlit.runtime.disk_media_file_storage import DiskFile, DiskMediaFileStorage
+from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorageError
+from streamlit.runtime.memory_media_file_storage import MemoryFile
+from streamlit.runtime.stats import CacheStat
+
+
+class DiskMediaFileStorageTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = DiskMediaFileStorage(
+            media_endpoint="/mock/media", memory_budget=10
+        )
+
+    def _load(self, data: bytes) -> str:
+        return self.storage.load_and_get_id(
+            data, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+        )
+
+    def test_memory_budget(self):
+        """Files are stored in memory until the budget is reached, and on disk
+        after that.
+        """
+        in_memory = self._load(b"123456")
+        on_disk = self._load(b"7890123")
+        also_in_memory = self._load(b"4567")
+
+        self.assertIsInstance(self.storage.get_file(in_memory), MemoryFile)
+        self.assertIsInstance(self.storage.get_file(also_in_memory), MemoryFile)
+
+        disk_file = self.storage.get_file(f"{on_disk}.mp4")
+        self.assertIsInstance(disk_file, DiskFile)
+        self.assertEqual(7, disk_file.content_size)
+        self.assertEqual(b"7890123", disk_file.content)
+        self.assertEqual(f"/mock/media/{on_disk}.mp4", self.storage.get_url(on_disk))
+
+        self.assertEqual(
+            [
+                CacheStat(
+                    category_name="st_disk_media_file_storage",
+                    cache_name="",
+                    byte_length=10,
+                )
+            ],
+            self.storage.get_stats(),
+        )
+
+    def test_delete_file(self):
+        """Deleting files frees their memory, or deletes them from disk."""
+        in_memory = self._load(b"1234567890")
+        on_disk = self._load(b"1")
+        path = self.storage.get_file(on_disk).path
+
+        self.storage.delete_file(on_disk)
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(MediaFileStorageError):
+            self.storage.get_file(on_disk)
+
+        self.storage.delete_file(in_memory)
+        self.assertIsInstance(self.storage.get_file(self._load(b"1")), MemoryFile)
+
+        # Deleting a file that doesn't exist isn't an error.
+        self.storage.delete_file(on_disk)
+
+    def test_directory_deleted_with_storage(self):
+        """The storage's temporary directory is deleted along with it."""
+        directory = self.storage._directory
+        self._load(b"12345678901")
+        self.assertEqual(1, len(os.listdir(directory)))
+
+        del self.storage
+        gc.collect()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_load_with_path(self):
+        """Files added by path are referred to rather than copied, and get a
+        new ID when they're modified.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "video.mp4")
+            with open(path, "wb") as f:
+                f.write(b"video")
+
+            file_id = self.storage.load_and_get_id(
+                path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            )
+            media_file = self.storage.get_file(file_id)
+            self.assertIsInstance(media_file, DiskFile)
+            self.assertEqual((path, 5), (media_file.path, media_file.content_size))
+            self.assertEqual([], os.listdir(self.storage._directory))
+            self.assertEqual([], self.storage.get_stats())
+            self.assertFalse(media_file.is_modified())
+
+            with open(path, "ab") as f:
+                f.write(b" 2")
+            self.assertTrue(media_file.is_modified())
+            self.assertNotEqual(
+                file_id,
+                self.storage.load_and_get_id(
+                    path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                ),
+            )
+
+            self.storage.delete_file(file_id)
+            self.assertTrue(os.path.exists(path))
+
+            with self.assertRaises(MediaFileStorageError):
+                self.storage.load_and_get_id(
+                    directory, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                )
+            with self.assertRaises(MediaFileStorageError):
+                self.storage.load_and_get_id(
+                    os.path.join(directory, "missing.mp4"),
+                    mimetype="video/mp4",
+                    kind=MediaFileKind.MEDIA,
+                )
@@ -0,0 +1,91 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for DiskUploadedFileManager"""
+
+from __future__ import annotations
+
+import copy
+import gc
+import os
+import unittest
+
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.disk_uploaded_file_manager import DiskUploadedFileManager
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+
+class DiskUploadedFileManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.mgr = DiskUploadedFileManager("/mock/upload", spool_size=0)
+
+    def _add_file(self, session_id: str, file_id: str, data: bytes) -> str:
+        path, f = self.mgr.create_file()
+        with f:
+            f.write(data)
+        self.mgr.add_file(
+            session_id,
+            UploadedFileRec(
+                file_id=file_id, name="name", type="type", data=b"", path=path
+            ),
+        )
+        return path
+
+    def test_remove_files(self):
+        """Files are deleted from disk when they're removed."""
+        path1 = self._add_file("session1", "id1", b"1")
+        path2 = self._add_file("session1", "id2", b"2")
+        path3 = self._add_file("session2", "id1", b"3")
+
+        self.mgr.remove_file("session1", "id1")
+        self.assertFalse(os.path.exists(path1))
+
+        self.mgr.remove_session_files("session1")
+        self.assertFalse(os.path.exists(path2))
+        self.assertTrue(os.path.exists(path3))
+
+        replacement = self._add_file("session2", "id1", b"4")
+        self.assertFalse(os.path.exists(path3))
+        self.assertTrue(os.path.exists(replacement))
+
+    def test_directory_deleted_with_manager(self):
+        """The manager's temporary directory is deleted along with it."""
+        directory = self.mgr._directory
+        self._add_file("session", "id", b"1")
+        del self.mgr
+        gc.collect()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_mapped_uploaded_file(self):
+        """UploadedFiles of files stored on disk behave like other ones."""
+        self._add_file("session", "id", b"line 1\nline 2\n")
+        (record,) = self.mgr.get_files("session", ["id"])
+        uploaded_file = UploadedFile(record, FileURLs())
+
+        self.assertEqual(14, uploaded_file.size)
+        self.assertEqual(b"line 1\nline 2\n", uploaded_file.getvalue())
+        self.assertEqual(b"li", uploaded_file.readline(2))
+        self.assertEqual([b"ne 1\n", b"line 2\n"], list(uploaded_file))
+
+        uploaded_file.seek(0)
+        uploaded_file.write(b"LINE")
+        self.assertEqual(b"LINE 1\n", uploaded_file.getvalue()[:7])
+        with open(record.path, "rb") as f:
+            self.assertEqual(b"line 1\n", f.read(7))
+
+        uploaded_file.seek(5)
+        copied = copy.deepcopy(uploaded_file)
+        self.assertIsNot(uploaded_file, copied)
+        self.assertEqual(uploaded_file, copied)
+        self.assertEqual(b"1\n", copied.readline())
@@ -20,12 +20,17 @@ import unittest
 from unittest.mock import MagicMock
 
 from streamlit import config
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime import app_session
 from streamlit.runtime.forward_msg_cache import (
     ForwardMsgCache,
+    ForwardMsgPayloadStore,
+    compute_payload_hash,
     create_reference_msg,
     populate_hash_if_needed,
+    serialize_msg_payload,
 )
+from streamlit.runtime.runtime_util import SerializedForwardMsg, serialize_forward_msg
 from streamlit.runtime.stats import CacheStat
 from streamlit.testing.v1.util import patch_config_options
 from tests.streamlit.message_mocks import create_dataframe_msg
@@ -53,6 +58,23 @@ class ForwardMsgCacheTest(unittest.TestCase):
         msg2 = create_dataframe_msg([1, 2, 3], 2)
         self.assertEqual(populate_hash_if_needed(msg1), populate_hash_if_needed(msg2))
 
+    def test_msg_payload(self):
+        """Test that a message's hash is computed from its payload, which
+        doesn't include its hash and metadata.
+        """
+        msg = create_dataframe_msg([1, 2, 3], 1)
+        msg.metadata.cacheable = True
+        payload = serialize_msg_payload(msg)
+
+        self.assertEqual(compute_payload_hash(payload), populate_hash_if_needed(msg))
+        self.assertEqual(payload, serialize_msg_payload(msg))
+        self.assertEqual(
+            payload, serialize_msg_payload(create_dataframe_msg([1, 2, 3], 2))
+        )
+        # The message itself is left untouched.
+        self.assertTrue(msg.metadata.cacheable)
+        self.assertEqual(1, msg.metadata.delta_path[-1])
+
     def test_reference_msg(self):
         """Test creation of 'reference' ForwardMsgs"""
         msg = create_dataframe_msg([1, 2, 3], 34)
@@ -65,7 +87,7 @@ class ForwardMsgCacheTest(unittest.TestCase):
         cache = ForwardMsgCache()
         session = _create_mock_session()
         msg = create_dataframe_msg([1, 2, 3])
-        cache.add_message(msg, session, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session, 0)
 
         self.assertTrue(cache.has_message_reference(msg, session, 0))
         self.assertFalse(cache.has_message_reference(msg, _create_mock_session(), 0))
@@ -78,8 +100,8 @@ class ForwardMsgCacheTest(unittest.TestCase):
 
         msg_hash = populate_hash_if_needed(msg)
 
-        cache.add_message(msg, session, 0)
-        self.assertEqual(msg, cache.get_message(msg_hash))
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session, 0)
+        self.assertEqual(serialize_forward_msg(msg), cache.get_message(msg_hash))
 
     def test_clear(self):
         """Test MessageCache.clear"""
@@ -89,8 +111,8 @@ class ForwardMsgCacheTest(unittest.TestCase):
         msg = create_dataframe_msg([1, 2, 3])
         msg_hash = populate_hash_if_needed(msg)
 
-        cache.add_message(msg, session, 0)
-        self.assertEqual(msg, cache.get_message(msg_hash))
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session, 0)
+        self.assertEqual(serialize_forward_msg(msg), cache.get_message(msg_hash))
 
         cache.clear()
         self.assertEqual(None, cache.get_message(msg_hash))
@@ -104,25 +126,25 @@ class ForwardMsgCacheTest(unittest.TestCase):
         # Only session1 has a ref to msg1.
         msg1 = create_dataframe_msg([1, 2, 3])
         populate_hash_if_needed(msg1)
-        cache.add_message(msg1, session1, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg1), session1, 0)
 
         # Only session2 has a ref to msg2.
         msg2 = create_dataframe_msg([1, 2, 3, 4])
         populate_hash_if_needed(msg2)
-        cache.add_message(msg2, session2, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg2), session2, 0)
 
         # Both session1 and session2 have a ref to msg3.
         msg3 = create_dataframe_msg([1, 2, 3, 4, 5])
         populate_hash_if_needed(msg2)
-        cache.add_message(msg3, session1, 0)
-        cache.add_message(msg3, session2, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg3), session1, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg3), session2, 0)
 
         cache.remove_refs_for_session(session1)
 
         cache_entries = list(cache._entries.values())
 
-        cached_msgs = [entry.msg for entry in cache_entries]
-        assert cached_msgs == [msg2, msg3]
+        cached_msgs = [entry.data for entry in cache_entries]
+        assert cached_msgs == [serialize_forward_msg(msg2), serialize_forward_msg(msg3)]
 
         sessions_with_refs = {
             s
@@ -142,7 +164,7 @@ class ForwardMsgCacheTest(unittest.TestCase):
         msg = create_dataframe_msg([1, 2, 3])
         msg_hash = populate_hash_if_needed(msg)
 
-        cache.add_message(msg, session1, runcount1)
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session1, runcount1)
 
         # Increment session1's run_count. This should not resolve in expiry.
         runcount1 += 1
@@ -157,7 +179,7 @@ class ForwardMsgCacheTest(unittest.TestCase):
         # Add another reference to the message
         session2 = _create_mock_session()
         runcount2 = 0
-        cache.add_message(msg, session2, runcount2)
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session2, runcount2)
 
         # Remove session1's expired entries. This should not remove the
         # entry from the cache, because session2 still has a reference to it.
@@ -181,7 +203,7 @@ class ForwardMsgCacheTest(unittest.TestCase):
         msg = create_dataframe_msg([1, 2, 3, 4, 5])
         msg_hash = populate_hash_if_needed(msg)
 
-        cache.add_message(msg, session, run_count)
+        cache.add_message(SerializedForwardMsg.from_msg(msg), session, run_count)
 
         run_count += 1
         # Cache should still count message references for messages.
@@ -202,18 +224,169 @@ class ForwardMsgCacheTest(unittest.TestCase):
 
         msg1 = create_dataframe_msg([1, 2, 3])
         populate_hash_if_needed(msg1)
-        cache.add_message(msg1, session, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg1), session, 0)
 
         msg2 = create_dataframe_msg([5, 4, 3, 2, 1, 0])
         populate_hash_if_needed(msg2)
-        cache.add_message(msg2, session, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg2), session, 0)
 
         # Test cache with messages
         expected = [
             CacheStat(
                 category_name="ForwardMessageCache",
                 cache_name="",
-                byte_length=msg1.ByteSize() + msg2.ByteSize(),
+                byte_length=len(serialize_forward_msg(msg1))
+                + len(serialize_forward_msg(msg2)),
             ),
         ]
         self.assertEqual(set(expected), set(cache.get_stats()))
+
+    @patch_config_options({"global.maxCachedMessagesSize": 1})
+    def test_evict_least_recently_used(self):
+        """Entries are evicted, least recently used first, when the cached
+        messages exceed global.maxCachedMessagesSize.
+        """
+        cache = ForwardMsgCache()
+        session = _create_mock_session()
+
+        msgs = [_create_large_msg(byte, 400_000) for byte in "abc"]
+        msg_hashes = [populate_hash_if_needed(msg) for msg in msgs]
+
+        cache.add_message(SerializedForwardMsg.from_msg(msgs[0]), session, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msgs[1]), session, 0)
+        # Use the first message again: the second one is now the least
+        # recently used.
+        cache.add_message(SerializedForwardMsg.from_msg(msgs[0]), session, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msgs[2]), session, 0)
+
+        self.assertIsNotNone(cache.get_message(msg_hashes[0]))
+        self.assertIsNone(cache.get_message(msg_hashes[1]))
+        self.assertIsNotNone(cache.get_message(msg_hashes[2]))
+        self.assertFalse(cache.has_message_reference(msgs[1], session, 0))
+        self.assertEqual({msg_hashes[0], msg_hashes[2]}, cache._session_hashes[session])
+
+        [evictions] = [
+            metric.value
+            for metric in cache.get_metrics()
+            if metric.family_name == "forward_msg_cache_evictions"
+        ]
+        self.assertEqual(1, evictions)
+
+    @patch_config_options({"global.maxCachedMessageAge": 1})
+    def test_session_hashes_index(self):
+        """Each session's references are indexed, and the index is kept up to
+        date when entries expire or are removed.
+        """
+        cache = ForwardMsgCache()
+        session1 = _create_mock_session()
+        session2 = _create_mock_session()
+
+        msg1 = create_dataframe_msg([1, 2, 3])
+        msg2 = create_dataframe_msg([4, 5, 6])
+        cache.add_message(SerializedForwardMsg.from_msg(msg1), session1, 0)
+        cache.add_message(SerializedForwardMsg.from_msg(msg2), session1, 1)
+        cache.add_message(SerializedForwardMsg.from_msg(msg2), session2, 0)
+        self.assertEqual({msg1.hash, msg2.hash}, cache._session_hashes[session1])
+        self.assertEqual({msg2.hash}, cache._session_hashes[session2])
+
+        cache.remove_expired_entries_for_session(session1, 2)
+        self.assertIsNone(cache.get_message(msg1.hash))
+        self.assertEqual({msg2.hash}, cache._session_hashes[session1])
+
+        cache.remove_refs_for_session(session1)
+        self.assertNotIn(session1, cache._session_hashes)
+        self.assertIsNotNone(cache.get_message(msg2.hash))
+
+        cache.remove_refs_for_session(session2)
+        self.assertIsNone(cache.get_message(msg2.hash))
+        self.assertEqual(0, cache._stored_bytes)
+
+    def test_metrics(self):
+        """The cache reports its hits, misses, hit ratio and saved bytes."""
+        cache = ForwardMsgCache()
+        session = _create_mock_session()
+        msg = create_dataframe_msg([1, 2, 3])
+        serialized = SerializedForwardMsg.from_msg(msg)
+
+        self.assertEqual(0.0, cache.hit_ratio)
+
+        self.assertFalse(cache.has_message_reference(msg, session, 0))
+        cache.add_message(serialized, session, 0)
+        self.assertTrue(cache.has_message_reference(msg, session, 0))
+        self.assertTrue(cache.has_message_reference(msg, session, 0))
+
+        self.assertAlmostEqual(2 / 3, cache.hit_ratio)
+        metrics = {
+            (metric.family_name, metric.labels): metric.value
+            for metric in cache.get_metrics()
+        }
+        self.assertEqual(
+            {
+                ("forward_msg_cache_lookups", (("result", "hit"),)): 2,
+                ("forward_msg_cache_lookups", (("result", "miss"),)): 1,
+                ("forward_msg_cache_hit_ratio", ()): cache.hit_ratio,
+                ("forward_msg_cache_saved_bytes", ()): 2 * len(serialized.data),
+                ("forward_msg_cache_evictions", ()): 0,
+            },
+            metrics,
+        )
+
+
+class ForwardMsgPayloadStoreTest(unittest.TestCase):
+    @patch_config_options({"global.minCachedMessageSize": 0})
+    def test_add_payload(self):
+        """Payloads are stored and looked up by their hash."""
+        store = ForwardMsgPayloadStore()
+        payload = serialize_msg_payload(create_dataframe_msg([1, 2, 3]))
+
+        payload_hash = store.add_payload(payload)
+
+        self.assertEqual(compute_payload_hash(payload), payload_hash)
+        self.assertEqual(payload, store.get_payload(payload_hash))
+        self.assertIsNone(store.get_payload("not_a_hash"))
+        self.assertEqual(
+            [CacheStat("ForwardMessagePayloadStore", "", len(payload))],
+            store.get_stats(),
+        )
+
+        store.clear()
+        self.assertIsNone(store.get_payload(payload_hash))
+        self.assertEqual([], store.get_stats())
+
+    def test_small_payloads_are_not_stored(self):
+        """Payloads under global.minCachedMessageSize are only hashed."""
+        store = ForwardMsgPayloadStore()
+        payload = serialize_msg_payload(_create_large_msg("a", 10))
+
+        with patch_config_options({"global.minCachedMessageSize": 1000}):
+            payload_hash = store.add_payload(payload)
+
+        self.assertEqual(compute_payload_hash(payload), payload_hash)
+        self.assertIsNone(store.get_payload(payload_hash))
+
+    @patch_config_options(
+        {"global.minCachedMessageSize": 0, "global.maxSharedPayloadsSize": 1}
+    )
+    def test_evict_least_recently_used(self):
+        """The least recently used payloads are evicted when the store exceeds
+        global.maxSharedPayloadsSize.
+        """
+        store = ForwardMsgPayloadStore()
+        payloads = [
+            serialize_msg_payload(_create_large_msg(char, 400 * 1024)) for char in "abc"
+        ]
+        hashes = [store.add_payload(payload) for payload in payloads[:2]]
+
+        # Use the first payload, so that the second one is evicted.
+        store.get_payload(hashes[0])
+        hashes.append(store.add_payload(payloads[2]))
+
+        self.assertEqual(payloads[0], store.get_payload(hashes[0]))
+        self.assertIsNone(store.get_payload(hashes[1]))
+        self.assertEqual(payloads[2], store.get_payload(hashes[2]))
+
+
+def _create_large_msg(char: str, size: int) -> ForwardMsg:
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = char * size
+    return msg
@@ -283,6 +283,34 @@ class MediaFileManagerTest(TestCase):
         # There should only be 1 session with registered files.
         self.assertEqual(len(self.media_file_manager._files_by_session_and_coord), 1)
 
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_replaced_file_is_orphaned(self):
+        """A file that's replaced at its only coordinates is orphaned, and
+        removed without clearing the session's references.
+        """
+        storage_delete_spy = MagicMock(side_effect=self.storage.delete_file)
+        self.storage.delete_file = storage_delete_spy
+
+        png, jpg = IMAGE_FIXTURES["png"], IMAGE_FIXTURES["jpg"]
+        png_id = _calculate_file_id(png["content"], png["mimetype"])
+        jpg_id = _calculate_file_id(jpg["content"], jpg["mimetype"])
+
+        self.media_file_manager.add(png["content"], png["mimetype"], "1.2")
+        self.media_file_manager.add(png["content"], png["mimetype"], "1.3")
+        self.media_file_manager.add(jpg["content"], jpg["mimetype"], "1.2")
+        self.assertEqual(set(), self.media_file_manager._orphaned_file_ids)
+
+        self.media_file_manager.add(jpg["content"], jpg["mimetype"], "1.3")
+        self.assertEqual({png_id}, self.media_file_manager._orphaned_file_ids)
+
+        self.media_file_manager.remove_orphaned_files()
+        storage_delete_spy.assert_called_once_with(png_id)
+        self.assertEqual([jpg_id], list(self.media_file_manager._file_metadata))
+        self.assertEqual({jpg_id: 2}, self.media_file_manager._ref_counts)
+
     @mock.patch(
         "streamlit.runtime.media_file_manager._get_session_id",
         MagicMock(return_value="mock_session_id"),
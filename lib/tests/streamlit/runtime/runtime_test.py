@@ -18,7 +18,10 @@ import asyncio
 import os
 import shutil
 import tempfile
+import threading
 import unittest
+from collections import deque
+from typing import TYPE_CHECKING
 from unittest.mock import ANY, MagicMock, call, patch
 
 import pytest
@@ -31,6 +34,7 @@ from streamlit.runtime import (
     RuntimeState,
     SessionClient,
     SessionClientDisconnectedError,
+    runtime_util,
 )
 from streamlit.runtime.caching.storage.local_disk_cache_storage import (
     LocalDiskCacheStorageManager,
@@ -40,6 +44,7 @@ from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
 from streamlit.runtime.memory_session_storage import MemorySessionStorage
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.runtime.runtime import AsyncObjects, RuntimeStoppedError
+from streamlit.runtime.session_manager import SessionInfo
 from streamlit.runtime.websocket_session_manager import WebsocketSessionManager
 from streamlit.watcher import event_based_path_watcher
 from tests.streamlit.message_mocks import (
@@ -49,6 +54,9 @@ from tests.streamlit.message_mocks import (
 from tests.streamlit.runtime.runtime_test_case import RuntimeTestCase
 from tests.testutil import patch_config_options
 
+if TYPE_CHECKING:
+    from streamlit.runtime.runtime_util import SerializedForwardMsg
+
 
 class MockSessionClient(SessionClient):
     """A SessionClient that captures all its ForwardMsgs into a list."""
@@ -425,8 +433,9 @@ class RuntimeTest(RuntimeTestCase):
             self.runtime.handle_backmsg("not_a_session_id", MagicMock())
 
     async def test_handle_session_client_disconnected(self):
-        """Runtime should gracefully handle `SessionClient.write_forward_msg`
-        raising a `SessionClientDisconnectedError`.
+        """Runtime should gracefully handle
+        `SessionClient.write_serialized_forward_msgs` raising a
+        `SessionClientDisconnectedError`.
         """
         await self.runtime.start()
 
@@ -437,12 +446,12 @@ class RuntimeTest(RuntimeTestCase):
         self.enqueue_forward_msg(session_id, create_dataframe_msg([1, 2, 3]))
         await self.tick_runtime_loop()
 
-        client.write_forward_msg.assert_called_once()
+        client.write_serialized_forward_msgs.assert_called_once()
         self.assertTrue(self.runtime.is_active_session(session_id))
 
         # Send another message - but this time the client will raise an error.
         raise_disconnected_error = MagicMock(side_effect=SessionClientDisconnectedError)
-        client.write_forward_msg = raise_disconnected_error
+        client.write_serialized_forward_msgs = raise_disconnected_error
         self.enqueue_forward_msg(session_id, create_dataframe_msg([1, 2, 3]))
         await self.tick_runtime_loop()
 
@@ -450,6 +459,149 @@ class RuntimeTest(RuntimeTestCase):
         raise_disconnected_error.assert_called_once()
         self.assertFalse(self.runtime.is_active_session(session_id))
 
+    async def test_batch_websocket_messages(self):
+        """With server.batchWebsocketMessages, a session's messages are written
+        to its client all at once.
+        """
+        with patch_config_options({"server.batchWebsocketMessages": True}):
+            await self.runtime.start()
+
+            client = MagicMock(spec=SessionClient)
+            session_id = self.runtime.connect_session(client, MagicMock())
+
+            msgs = [create_dataframe_msg([i], i) for i in range(3)]
+            for msg in msgs:
+                self.enqueue_forward_msg(session_id, msg)
+            await self.tick_runtime_loop()
+
+            client.write_serialized_forward_msgs.assert_called_once()
+            written = client.write_serialized_forward_msgs.call_args.args[0]
+            self.assertEqual(msgs, [msg.msg for msg in written])
+
+            # A disconnected client disconnects the session.
+            client.write_serialized_forward_msgs.side_effect = (
+                SessionClientDisconnectedError
+            )
+            self.enqueue_forward_msg(session_id, create_dataframe_msg([1, 2, 3]))
+            await self.tick_runtime_loop()
+
+            self.assertFalse(self.runtime.is_active_session(session_id))
+
+    @patch("streamlit.runtime.runtime._MAX_MESSAGES_PER_SESSION_PASS", new=2)
+    async def test_sessions_messages_are_interleaved(self):
+        """A session with lots of messages to send doesn't delay the messages of
+        other sessions.
+        """
+        await self.runtime.start()
+
+        sent: list[tuple[str, int]] = []
+
+        class RecordingSessionClient(SessionClient):
+            def __init__(self, name: str):
+                self.name = name
+
+            def write_forward_msg(self, msg: ForwardMsg) -> None:
+                sent.append((self.name, msg.metadata.delta_path[-1]))
+
+        chatty_id = self.runtime.connect_session(
+            RecordingSessionClient("chatty"), MagicMock()
+        )
+        quiet_id = self.runtime.connect_session(
+            RecordingSessionClient("quiet"), MagicMock()
+        )
+
+        for i in range(5):
+            self.enqueue_forward_msg(chatty_id, create_dataframe_msg([i], id=i))
+        self.enqueue_forward_msg(quiet_id, create_dataframe_msg([0], id=0))
+        await self.tick_runtime_loop()
+
+        self.assertEqual(
+            [
+                ("chatty", 0),
+                ("chatty", 1),
+                ("quiet", 0),
+                ("chatty", 2),
+                ("chatty", 3),
+                ("chatty", 4),
+            ],
+            sent,
+        )
+        self.assertEqual({}, self.runtime._send_buffers)
+
+    async def test_only_ready_sessions_are_flushed(self):
+        """Only the sessions that enqueued messages are visited when flushing."""
+        await self.runtime.start()
+
+        busy_id = self.runtime.connect_session(MockSessionClient(), MagicMock())
+        idle_id = self.runtime.connect_session(MockSessionClient(), MagicMock())
+        await self.tick_runtime_loop()
+
+        idle_session = self.runtime._session_mgr.get_session_info(idle_id).session
+        with patch.object(idle_session, "flush_browser_queue") as idle_flush:
+            self.enqueue_forward_msg(busy_id, create_dataframe_msg([1, 2, 3]))
+            await self.tick_runtime_loop()
+
+        idle_flush.assert_not_called()
+
+    async def test_wait_for_pending_writes(self):
+        """A session's messages aren't written to its client until the client's
+        previous write completed, and other sessions aren't held up meanwhile.
+        """
+        await self.runtime.start()
+
+        slow_client = MagicMock(spec=SessionClient)
+        write = asyncio.get_running_loop().create_future()
+        slow_client.write_serialized_forward_msgs.return_value = write
+        slow_id = self.runtime.connect_session(slow_client, MagicMock())
+        fast_client = MockSessionClient()
+        fast_id = self.runtime.connect_session(fast_client, MagicMock())
+
+        self.enqueue_forward_msg(slow_id, create_dataframe_msg([1], id=0))
+        await self.tick_runtime_loop()
+        slow_client.write_serialized_forward_msgs.assert_called_once()
+
+        # The slow client's write is pending: its next messages wait, and are
+        # composed in the session's queue.
+        self.enqueue_forward_msg(slow_id, create_dataframe_msg([2], id=1))
+        self.enqueue_forward_msg(slow_id, create_dataframe_msg([3], id=1))
+        self.enqueue_forward_msg(fast_id, create_dataframe_msg([1, 2, 3]))
+        await self.tick_runtime_loop()
+        slow_client.write_serialized_forward_msgs.assert_called_once()
+        self.assertEqual(1, len(fast_client.forward_msgs))
+
+        # Once the write completes, the waiting messages are sent.
+        slow_client.write_serialized_forward_msgs.return_value = None
+        write.set_result(None)
+        await self.tick_runtime_loop()
+        self.assertEqual(2, slow_client.write_serialized_forward_msgs.call_count)
+        written = slow_client.write_serialized_forward_msgs.call_args.args[0]
+        self.assertEqual(
+            [create_dataframe_msg([3], id=1).delta], [msg.msg.delta for msg in written]
+        )
+        self.assertEqual({}, self.runtime._pending_writes)
+
+    async def test_outbound_backlog_metrics(self):
+        """The Runtime reports the messages waiting to be sent to each session."""
+        await self.runtime.start()
+
+        session_id = self.runtime.connect_session(MockSessionClient(), MagicMock())
+        self.runtime._send_buffers[session_id] = deque([ForwardMsg(), ForwardMsg()])
+
+        metrics = [
+            metric
+            for metric in self.runtime.stats_mgr.get_metrics()
+            if metric.family_name.startswith("session_outbound_")
+        ]
+        self.assertEqual(
+            [
+                ("session_outbound_buffered_bytes", 0),
+                ("session_outbound_pending_messages", 2),
+            ],
+            [(metric.family_name, metric.value) for metric in metrics],
+        )
+        for metric in metrics:
+            self.assertEqual((("session_id", session_id),), metric.labels)
+
     async def test_stable_number_of_async_tasks(self):
         """Test that the number of async tasks remains stable.
 
@@ -544,6 +696,105 @@ class RuntimeTest(RuntimeTestCase):
             # And the same *metadata* as msg2:
             self.assertEqual(msg2.metadata, cached.metadata)
 
+    async def test_serialize_messages_in_thread_pool(self):
+        """With server.serializeMessagesInThreadPool, messages are serialized
+        off the eventloop thread, and cached messages are still sent as
+        references.
+        """
+        with patch_config_options(
+            {
+                "global.minCachedMessageSize": 0,
+                "server.serializeMessagesInThreadPool": True,
+            }
+        ):
+            await self.runtime.start()
+
+            written: list[SerializedForwardMsg] = []
+            serializing_threads: set[str] = set()
+
+            class SerializedSessionClient(MockSessionClient):
+                def write_serialized_forward_msgs(
+                    self, msgs: list[SerializedForwardMsg]
+                ) -> None:
+                    written.extend(msgs)
+                    super().write_serialized_forward_msgs(msgs)
+
+            def prepare_forward_msg(msg: ForwardMsg) -> SerializedForwardMsg:
+                serializing_threads.add(threading.current_thread().name)
+                return runtime_util.prepare_forward_msg(msg)
+
+            client = SerializedSessionClient()
+            session_id = self.runtime.connect_session(
+                client=client, user_info=MagicMock()
+            )
+
+            msg1 = create_dataframe_msg([1, 2, 3], 1)
+            msg2 = create_dataframe_msg([1, 2, 3], 123)
+            with patch(
+                "streamlit.runtime.runtime.prepare_forward_msg",
+                side_effect=prepare_forward_msg,
+            ):
+                self.enqueue_forward_msg(session_id, msg1)
+                await self.tick_runtime_loop()
+                self.enqueue_forward_msg(session_id, msg2)
+                await self.tick_runtime_loop()
+
+            self.assertEqual(1, len(serializing_threads))
+            self.assertNotEqual(
+                threading.current_thread().name, serializing_threads.pop()
+            )
+
+            self.assertIs(msg1, written[0].msg)
+            uncached, cached = client.forward_msgs
+            self.assertEqual("delta", uncached.WhichOneof("type"))
+            self.assertEqual(runtime_util.serialize_forward_msg(msg1), written[0].data)
+            self.assertEqual("ref_hash", cached.WhichOneof("type"))
+            self.assertEqual(msg1.hash, cached.ref_hash)
+            self.assertEqual(msg2.metadata, cached.metadata)
+
+    async def test_reconnect_while_serializing_messages(self):
+        """Messages serialized while their session reconnected are sent to its
+        new client, and the session stays connected.
+        """
+        with patch_config_options({"server.serializeMessagesInThreadPool": True}):
+            await self.runtime.start()
+
+            serializing = threading.Event()
+            reconnected = threading.Event()
+
+            def prepare_forward_msg(msg: ForwardMsg) -> SerializedForwardMsg:
+                serializing.set()
+                reconnected.wait(5)
+                return runtime_util.prepare_forward_msg(msg)
+
+            old_client = MockSessionClient()
+            session_id = self.runtime.connect_session(
+                client=old_client, user_info=MagicMock()
+            )
+            msg = create_dataframe_msg([1, 2, 3])
+            with patch(
+                "streamlit.runtime.runtime.prepare_forward_msg",
+                side_effect=prepare_forward_msg,
+            ):
+                self.enqueue_forward_msg(session_id, msg)
+                while not serializing.is_set():
+                    await asyncio.sleep(0.01)
+
+                # MockSessionManager can't reconnect sessions: replace the
+                # session's info as reconnecting it would.
+                new_client = MockSessionClient()
+                session_mgr = self.runtime._session_mgr
+                session_mgr._session_info_by_id[session_id] = SessionInfo(
+                    new_client, session_mgr.get_session_info(session_id).session
+                )
+                reconnected.set()
+                await self.tick_runtime_loop()
+                await self.tick_runtime_loop()
+
+            self.assertEqual([], old_client.forward_msgs)
+            self.assertEqual([msg], new_client.forward_msgs)
+            self.assertTrue(self.runtime._session_mgr.is_active_session(session_id))
+
     async def test_forwardmsg_cache_clearing(self):
         """Test that the ForwardMsgCache gets properly cleared when scripts
         finish running.
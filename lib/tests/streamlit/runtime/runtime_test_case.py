@@ -53,7 +53,7 @@ class MockSessionManager(SessionManager):
         session_storage: SessionStorage,
         uploaded_file_manager: UploadedFileManager,
         script_cache: ScriptCache,
-        message_enqueued_callback: Callable[[], None] | None,
+        message_enqueued_callback: Callable[[str], None] | None,
     ) -> None:
         self._uploaded_file_mgr = uploaded_file_manager
         self._script_cache = script_cache
@@ -135,10 +135,9 @@ class RuntimeTestCase(IsolatedAsyncioTestCase):
         """Sleep just long enough to guarantee that the Runtime's loop
         has a chance to run.
         """
-        # Our sleep time needs to be longer than the longest sleep time inside the
-        # Runtime loop, which is 0.01 + (1 tick * number of connected sessions).
-        # 0.03 is near-instant, and conservative enough that the tick will happen
-        # under our test circumstances.
+        # The Runtime loop yields for a tick per connected session (and per pass,
+        # for sessions with lots of messages to send). 0.03 is near-instant, and
+        # conservative enough that the loop will run under our test circumstances.
         await asyncio.sleep(0.03)
 
     def enqueue_forward_msg(self, session_id: str, msg: ForwardMsg) -> None:
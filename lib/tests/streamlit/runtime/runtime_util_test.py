@@ -16,11 +16,23 @@
 
 from __future__ import annotations
 
+import struct
 import unittest
+from unittest.mock import patch
 
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime import runtime_util
-from streamlit.runtime.runtime_util import is_cacheable_msg, serialize_forward_msg
+from streamlit.runtime.forward_msg_cache import (
+    get_payload_store,
+    serialize_msg_payload,
+)
+from streamlit.runtime.runtime_util import (
+    SerializedForwardMsg,
+    is_cacheable_msg,
+    pack_forward_msg_frames,
+    prepare_forward_msg,
+    serialize_forward_msg,
+)
 from tests.streamlit.message_mocks import create_dataframe_msg
 from tests.testutil import patch_config_options
 
@@ -57,3 +69,97 @@ class RuntimeUtilTest(unittest.TestCase):
                 "exceeds the message size limit"
                 in deserialized_msg.delta.new_element.exception.message
             )
+
+    def test_serialized_forward_msg(self):
+        """SerializedForwardMsg serializes a message's payload, followed by its
+        hash and metadata, which parses back to the same message.
+        """
+        msg = create_dataframe_msg([1, 2, 3], id=12)
+        serialized = SerializedForwardMsg.from_msg(msg)
+
+        self.assertNotEqual("", msg.hash)
+        self.assertTrue(serialized.data.startswith(serialize_msg_payload(msg)))
+        parsed = ForwardMsg()
+        parsed.ParseFromString(serialized.data)
+        self.assertEqual(msg, parsed)
+
+    def test_pack_single_forward_msg(self):
+        """A single message is packed into a plain frame."""
+        self.assertEqual([b"msg"], pack_forward_msg_frames([b"msg"]))
+        self.assertEqual([], pack_forward_msg_frames([]))
+
+    def test_pack_batched_forward_msgs(self):
+        """Several messages are packed into a single batched frame."""
+        msg_strs = [serialize_forward_msg(create_dataframe_msg([i])) for i in range(3)]
+        frames = pack_forward_msg_frames(msg_strs)
+
+        self.assertEqual(1, len(frames))
+        self.assertEqual(msg_strs, _split_frame(frames[0]))
+
+    def test_pack_forward_msgs_max_frame_size(self):
+        """Batched frames are kept under the max message size."""
+        msg_strs = [b"x" * 10 for _ in range(5)]
+
+        # Room for two messages per frame.
+        max_size = 1 + 2 * (4 + 10)
+        with patch.object(runtime_util, "_max_message_size_bytes", max_size):
+            frames = pack_forward_msg_frames(msg_strs)
+
+        self.assertEqual(3, len(frames))
+        self.assertTrue(all(len(frame) <= max_size for frame in frames))
+        self.assertEqual(msg_strs[:2], _split_frame(frames[0]))
+        self.assertEqual(msg_strs[2:4], _split_frame(frames[1]))
+        # The last frame contains a single message, so it isn't batched.
+        self.assertEqual(msg_strs[4], frames[2])
+
+    def test_prepare_forward_msg(self):
+        """prepare_forward_msg sets the cacheable flag and the hash of a
+        message, and serializes it.
+        """
+        with patch_config_options({"global.minCachedMessageSize": 0}):
+            msg = create_dataframe_msg([1, 2, 3])
+            prepared = prepare_forward_msg(msg)
+
+        self.assertIs(msg, prepared.msg)
+        self.assertTrue(msg.metadata.cacheable)
+        self.assertNotEqual("", msg.hash)
+        self.assertEqual(serialize_forward_msg(msg), prepared.data)
+
+        with patch_config_options({"global.minCachedMessageSize": 1000}):
+            msg = create_dataframe_msg([1, 2, 3])
+            prepared = prepare_forward_msg(msg)
+
+        self.assertFalse(msg.metadata.cacheable)
+        self.assertEqual(serialize_forward_msg(msg), prepared.data)
+
+    @patch_config_options({"global.minCachedMessageSize": 0})
+    def test_prepare_forward_msg_stored_payload(self):
+        """prepare_forward_msg doesn't serialize messages whose hash was set
+        beforehand, and whose payload is in the ForwardMsgPayloadStore.
+        """
+        msg = create_dataframe_msg([1, 2, 3])
+        payload = serialize_msg_payload(msg)
+        msg.hash = get_payload_store().add_payload(payload)
+
+        with patch(
+            "streamlit.runtime.runtime_util.serialize_msg_payload"
+        ) as serialize_payload:
+            prepared = prepare_forward_msg(msg)
+
+        serialize_payload.assert_not_called()
+        self.assertTrue(msg.metadata.cacheable)
+        self.assertEqual(serialize_forward_msg(msg), prepared.data)
+        get_payload_store().clear()
+
+
+def _split_frame(frame: bytes) -> list[bytes]:
+    """Split a batched frame into its messages, like the frontend does."""
+    assert frame[0] == 0
+    msgs = []
+    offset = 1
+    while offset < len(frame):
+        (length,) = struct.unpack_from("<I", frame, offset)
+        offset += 4
+        msgs.append(frame[offset : offset + length])
+        offset += length
+    return msgs
@@ -0,0 +1,221 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for script_process_pool.py."""
+
+from __future__ import annotations
+
+import os
+import threading
+import unittest
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+from testfixtures import TempDirectory
+
+from streamlit.components.lib.local_component_registry import LocalComponentRegistry
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.runtime.caching.storage.dummy_cache_storage import (
+    MemoryCacheStorageManager,
+)
+from streamlit.runtime.caching.storage.sqlite_cache_storage import (
+    SqliteCacheStorageManager,
+)
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunnerEvent
+from streamlit.runtime.scriptrunner.script_process_pool import (
+    RemoteScriptRunner,
+    ScriptProcessPool,
+)
+from streamlit.runtime.state import SCRIPT_RUN_WITHOUT_ERRORS_KEY, SessionState
+
+if TYPE_CHECKING:
+    from streamlit.runtime.caching.storage import CacheStorageManager
+
+# Spawning a worker and importing Streamlit in it takes a few seconds.
+_TIMEOUT_SECONDS = 60
+
+
+class RemoteScriptRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.worker = MagicMock()
+        self.session_state = SessionState()
+        self.runner = RemoteScriptRunner(
+            self.worker, "session_id", RerunData(), {}, self.session_state
+        )
+        self.events = []
+        self.runner.on_event.connect(
+            lambda sender, event, **kwargs: self.events.append(event), weak=False
+        )
+
+    def test_rerun_requests_are_sent_to_worker(self):
+        """Rerun requests are numbered, and refused once stopped."""
+        self.runner.start()
+        self.assertTrue(self.runner.request_rerun(RerunData(query_string="a=1")))
+
+        reruns = [c.args[0] for c in self.worker.send.call_args_list]
+        self.assertEqual([1, 2], [message[3] for message in reruns])
+        self.assertEqual("a=1", reruns[1][4].query_string)
+
+        self.runner.request_stop()
+        self.worker.send.assert_called_with(("stop", self.runner.runner_id))
+        self.assertFalse(self.runner.request_rerun(RerunData()))
+
+    def test_shutdown_waits_for_pending_reruns(self):
+        """The runner only shuts down once the worker handled all its
+        requests.
+        """
+        self.runner.start()
+        self.runner.request_rerun(RerunData())
+        client_state = ClientState(page_script_hash="page").SerializeToString()
+
+        self.runner.on_worker_idle(1, client_state, None)
+        self.assertEqual([], self.events)
+        self.assertTrue(self.runner.request_rerun(RerunData()))
+
+        self.runner.on_worker_idle(3, client_state, None)
+        self.assertEqual([ScriptRunnerEvent.SHUTDOWN], self.events)
+        self.assertFalse(self.runner.request_rerun(RerunData()))
+        self.worker.unregister_runner.assert_called_once_with(self.runner)
+
+    def test_run_without_errors_is_copied(self):
+        """Whether the worker's script run had errors is copied to the
+        server process's SessionState.
+        """
+        self.runner.start()
+        self.assertNotIn(SCRIPT_RUN_WITHOUT_ERRORS_KEY, self.session_state)
+
+        self.runner.on_worker_idle(1, ClientState().SerializeToString(), False)
+        self.assertFalse(self.session_state[SCRIPT_RUN_WITHOUT_ERRORS_KEY])
+
+    def test_worker_exited(self):
+        """The runner stops, and shows an error, if its worker exits."""
+        self.runner.start()
+        self.runner.on_worker_exited()
+
+        self.assertEqual(
+            [
+                ScriptRunnerEvent.ENQUEUE_FORWARD_MSG,
+                ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+                ScriptRunnerEvent.SHUTDOWN,
+            ],
+            self.events,
+        )
+        self.assertFalse(self.runner.request_rerun(RerunData()))
+
+
+class ScriptProcessPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.media_file_storage = MemoryMediaFileStorage("/mock/media")
+        self.pool = ScriptProcessPool(
+            1,
+            main_script_path=os.path.join(
+                os.path.dirname(__file__), "test_data", "session_state_counter.py"
+            ),
+            media_file_storage=self.media_file_storage,
+            uploaded_file_mgr=MemoryUploadedFileManager("/mock/upload"),
+            component_registry=LocalComponentRegistry(),
+            cache_storage_manager=self._create_cache_storage_manager(),
+        )
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def _create_cache_storage_manager(self) -> CacheStorageManager:
+        return MemoryCacheStorageManager()
+
+    def _run_script(self, session_state: SessionState | None = None) -> list:
+        """Run the script in the session's worker, and return the elements it
+        enqueued.
+        """
+        shutdown = threading.Event()
+        elements = []
+
+        def on_event(sender, event, forward_msg=None, **kwargs):
+            if event == ScriptRunnerEvent.SHUTDOWN:
+                shutdown.set()
+            elif forward_msg is not None and forward_msg.HasField("delta"):
+                elements.append(forward_msg.delta.new_element)
+
+        if session_state is None:
+            session_state = SessionState()
+        runner = self.pool.create_script_runner(
+            "session_id", RerunData(), {}, session_state
+        )
+        runner.on_event.connect(on_event, weak=False)
+        runner.start()
+        self.assertTrue(shutdown.wait(_TIMEOUT_SECONDS))
+        return elements
+
+    def test_run_script_in_worker(self):
+        """Scripts run in the worker, which keeps the session's state and
+        stores media files in the server process.
+        """
+        text, download_button = self._run_script()
+        self.assertEqual("count=1", text.text.body.split()[0])
+        self.assertNotEqual(f"pid={os.getpid()}", text.text.body.split()[1])
+
+        file_id = download_button.download_button.url.rpartition("/")[2]
+        self.assertEqual(
+            b"some data",
+            self.media_file_storage.get_file(file_id.partition(".")[0]).content,
+        )
+
+        text, _ = self._run_script()
+        self.assertEqual("count=2", text.text.body.split()[0])
+
+    def test_clear_caches(self):
+        """Clearing the caches clears the session's state in its worker."""
+        self._run_script()
+        self.pool.clear_caches("session_id")
+
+        text, _ = self._run_script()
+        self.assertEqual("count=1", text.text.body.split()[0])
+
+    def test_session_state_reported(self):
+        """The script run's result, and the size of the session's state, are
+        reported to the server process.
+        """
+        self.assertEqual([], self.pool.get_stats())
+        session_state = SessionState()
+        self._run_script(session_state)
+        self.assertTrue(session_state[SCRIPT_RUN_WITHOUT_ERRORS_KEY])
+
+        (stat,) = self.pool.get_stats()
+        self.assertEqual("st_session_state", stat.category_name)
+        self.assertGreater(stat.byte_length, 0)
+
+        self.pool.close_session("session_id")
+        self.assertEqual([], self.pool.get_stats())
+
+
+class ScriptProcessPoolSqliteCacheTest(ScriptProcessPoolTest):
+    """Runs the pool's tests with the SQLite cache storage manager, which is
+    sent to the workers.
+    """
+
+    def setUp(self):
+        self.tempdir = TempDirectory(create=True)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def _create_cache_storage_manager(self) -> CacheStorageManager:
+        return SqliteCacheStorageManager(
+            os.path.join(self.tempdir.path, "cache.sqlite")
+        )
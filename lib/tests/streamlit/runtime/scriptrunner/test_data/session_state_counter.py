@@ -0,0 +1,26 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A test script for ScriptProcessPoolTest that uses Session State and a media
+file.
+"""
+
+import os
+
+import streamlit as st
+
+st.session_state.setdefault("count", 0)
+st.session_state.count += 1
+st.text(f"count={st.session_state.count} pid={os.getpid()}")
+st.download_button("Download", b"some data", file_name="data.txt")
@@ -19,6 +19,8 @@ import unittest
 from streamlit.runtime.stats import (
     CacheStat,
     CacheStatsProvider,
+    MetricsProvider,
+    MetricStat,
     StatsManager,
     group_stats,
 )
@@ -32,6 +34,14 @@ class MockStatsProvider(CacheStatsProvider):
         return self.stats
 
 
+class MockMetricsProvider(MetricsProvider):
+    def __init__(self):
+        self.metrics: list[MetricStat] = []
+
+    def get_metrics(self) -> list[MetricStat]:
+        return self.metrics
+
+
 class StatsManagerTest(unittest.TestCase):
     def test_get_stats(self):
         """StatsManager.get_stats should return all providers' stats."""
@@ -57,6 +67,31 @@ class StatsManagerTest(unittest.TestCase):
 
         self.assertEqual(provider1.stats + provider2.stats, manager.get_stats())
 
+    def test_get_metrics(self):
+        """StatsManager.get_metrics should return all providers' metrics."""
+        manager = StatsManager()
+        provider1 = MockMetricsProvider()
+        provider2 = MockMetricsProvider()
+        manager.register_metrics_provider(provider1)
+        manager.register_metrics_provider(provider2)
+
+        self.assertEqual([], manager.get_metrics())
+
+        provider1.metrics = [MetricStat("foo", "counter", "Foo.", 1)]
+        provider2.metrics = [MetricStat("bar", "gauge", "Bar.", 0.5)]
+
+        self.assertEqual(provider1.metrics + provider2.metrics, manager.get_metrics())
+
+    def test_metric_str(self):
+        """Counter samples get a _total suffix, and labels are formatted."""
+        self.assertEqual(
+            'foo_total{a="1",b="2"} 3',
+            MetricStat(
+                "foo", "counter", "", 3, (("a", "1"), ("b", "2"))
+            ).to_metric_str(),
+        )
+        self.assertEqual("bar 0.5", MetricStat("bar", "gauge", "", 0.5).to_metric_str())
+
     def test_group_stats(self):
         """Should return stats grouped by category_name and cache_name.
         byte_length should be summed."""
@@ -16,7 +16,7 @@ from __future__ import annotations
 
 import time
 
-from streamlit.elements.spinner import spinner
+from streamlit.elements.spinner import spinner, updatable_spinner
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
 
 
@@ -66,3 +66,24 @@ class SpinnerTest(DeltaGeneratorTestCase):
         last_delta = self.get_delta_from_queue()
         self.assertTrue(last_delta.HasField("new_element"))
         self.assertEqual(last_delta.new_element.WhichOneof("type"), "empty")
+
+    def test_updatable_spinner(self):
+        """Test that the text of an updatable spinner can be changed."""
+        with updatable_spinner("some text", cache=True) as set_text:
+            # Changing the text before the spinner is displayed doesn't
+            # enqueue anything.
+            num_deltas = len(self.get_all_deltas_from_queue())
+            set_text("other text")
+            self.assertEqual(num_deltas, len(self.get_all_deltas_from_queue()))
+
+            time.sleep(0.7)
+            el = self.get_delta_from_queue().new_element
+            self.assertEqual(el.spinner.text, "other text")
+            self.assertTrue(el.spinner.cache)
+
+            set_text("more text")
+            el = self.get_delta_from_queue().new_element
+            self.assertEqual(el.spinner.text, "more text")
+            self.assertTrue(el.spinner.cache)
+        last_delta = self.get_delta_from_queue()
+        self.assertEqual(last_delta.new_element.WhichOneof("type"), "empty")
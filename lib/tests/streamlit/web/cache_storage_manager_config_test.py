@@ -0,0 +1,52 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from streamlit.runtime.caching.storage.local_disk_cache_storage import (
+    LocalDiskCacheStorageManager,
+)
+from streamlit.runtime.caching.storage.sqlite_cache_storage import (
+    SqliteCacheStorageManager,
+)
+from streamlit.web.cache_storage_manager_config import (
+    create_default_cache_storage_manager,
+)
+from tests.testutil import patch_config_options
+
+
+class CacheStorageManagerConfigTest(unittest.TestCase):
+    def test_default_is_local(self):
+        self.assertIsInstance(
+            create_default_cache_storage_manager(), LocalDiskCacheStorageManager
+        )
+
+    @patch_config_options(
+        {
+            "global.dataCacheStorage": "sqlite",
+            "global.dataCacheStoragePath": "/shared/cache.sqlite",
+        }
+    )
+    def test_sqlite(self):
+        manager = create_default_cache_storage_manager()
+        self.assertIsInstance(manager, SqliteCacheStorageManager)
+        self.assertEqual(manager.database_path, "/shared/cache.sqlite")
+
+    @patch_config_options({"global.dataCacheStorage": "unknown"})
+    def test_unknown_falls_back_to_local(self):
+        with self.assertLogs(
+            "streamlit.web.cache_storage_manager_config", level="WARNING"
+        ):
+            manager = create_default_cache_storage_manager()
+        self.assertIsInstance(manager, LocalDiskCacheStorageManager)
@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import ANY, MagicMock, patch
 
 import tornado.httpserver
@@ -24,6 +25,8 @@ import tornado.websocket
 from streamlit.proto.BackMsg_pb2 import BackMsg
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime import Runtime, SessionClientDisconnectedError
+from streamlit.runtime.runtime_util import SerializedForwardMsg
+from streamlit.web.server import browser_websocket_handler
 from streamlit.web.server.server import BrowserWebSocketHandler
 from tests.streamlit.web.server.server_test_case import ServerTestCase
 from tests.testutil import patch_config_options
@@ -94,6 +97,131 @@ class BrowserWebSocketHandlerTest(ServerTestCase):
 
                 write_message_mock.assert_called_once()
 
+                write_message_mock.reset_mock()
+                with self.assertRaises(SessionClientDisconnectedError):
+                    websocket_handler.write_serialized_forward_msgs(
+                        [SerializedForwardMsg.from_msg(msg)]
+                    )
+
+                write_message_mock.assert_called_once()
+
+    @tornado.testing.gen_test
+    async def test_write_serialized_forward_msgs_high_water_mark(self):
+        """`write_serialized_forward_msgs` returns the future of its last write
+        once more than `server.websocketHighWaterMark` is buffered, so that the
+        Runtime can wait for slow browsers.
+        """
+        with self._patch_app_session():
+            await self.server.start()
+            await self.ws_connect()
+
+            session_info = self.server._runtime._session_mgr.list_active_sessions()[0]
+            websocket_handler: BrowserWebSocketHandler = session_info.client
+
+            msg = ForwardMsg()
+            msg.script_finished = ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY
+            serialized_msg = SerializedForwardMsg.from_msg(msg)
+
+            self.assertIsNone(
+                websocket_handler.write_serialized_forward_msgs([serialized_msg])
+            )
+
+            with patch_config_options({"server.websocketHighWaterMark": 0}):
+                write = websocket_handler.write_serialized_forward_msgs(
+                    [serialized_msg]
+                )
+            self.assertIsNotNone(write)
+            self.assertGreater(websocket_handler.buffered_bytes, 0)
+
+            await write
+            await asyncio.sleep(0)
+            self.assertEqual(0, websocket_handler.buffered_bytes)
+
+    @tornado.testing.gen_test
+    async def test_websocket_compression_min_size(self):
+        """Only frames of at least `server.websocketCompressionMinSize` bytes
+        are compressed.
+        """
+        with self._patch_app_session(), patch_config_options(
+            {
+                "server.enableWebsocketCompression": True,
+                "server.websocketCompressionMinSize": 100,
+            }
+        ):
+            await self.server.start()
+            await tornado.websocket.websocket_connect(
+                self.get_ws_url("/_stcore/stream"), compression_options={}
+            )
+
+            session_info = self.server._runtime._session_mgr.list_active_sessions()[0]
+            websocket_handler: BrowserWebSocketHandler = session_info.client
+            connection = websocket_handler.ws_connection
+
+            with patch.object(
+                connection, "_write_frame", wraps=connection._write_frame
+            ) as write_frame:
+                websocket_handler._write_frame(b"x" * 99)
+                websocket_handler._write_frame(b"x" * 100)
+
+            self.assertIsNotNone(connection._compressor)
+            rsv1 = tornado.websocket.WebSocketProtocol13.RSV1
+            small_flags = write_frame.call_args_list[0].kwargs["flags"]
+            large_flags = write_frame.call_args_list[1].kwargs["flags"]
+            self.assertFalse(small_flags & rsv1)
+            self.assertTrue(large_flags & rsv1)
+
+    @tornado.testing.gen_test
+    async def test_websocket_compressor_attribute(self):
+        """Tornado still has the private compressor attribute that small frames
+        are sent without. If this fails, small frames are sent compressed.
+        """
+        with self._patch_app_session(), patch_config_options(
+            {"server.enableWebsocketCompression": True}
+        ):
+            await self.server.start()
+            await tornado.websocket.websocket_connect(
+                self.get_ws_url("/_stcore/stream"), compression_options={}
+            )
+
+            session_info = self.server._runtime._session_mgr.list_active_sessions()[0]
+            connection = session_info.client.ws_connection
+
+            self.assertIsInstance(connection, tornado.websocket.WebSocketProtocol13)
+            self.assertIsNotNone(
+                getattr(connection, browser_websocket_handler._TORNADO_COMPRESSOR_ATTR)
+            )
+
+    @tornado.testing.gen_test
+    async def test_websocket_compression_without_compressor_attribute(self):
+        """If Tornado no longer has the compressor attribute, small frames are
+        sent compressed.
+        """
+        with self._patch_app_session(), patch_config_options(
+            {
+                "server.enableWebsocketCompression": True,
+                "server.websocketCompressionMinSize": 100,
+            }
+        ), patch.object(
+            browser_websocket_handler, "_TORNADO_COMPRESSOR_ATTR", "_missing"
+        ):
+            await self.server.start()
+            await tornado.websocket.websocket_connect(
+                self.get_ws_url("/_stcore/stream"), compression_options={}
+            )
+
+            session_info = self.server._runtime._session_mgr.list_active_sessions()[0]
+            websocket_handler: BrowserWebSocketHandler = session_info.client
+            connection = websocket_handler.ws_connection
+
+            with patch.object(
+                connection, "_write_frame", wraps=connection._write_frame
+            ) as write_frame:
+                await websocket_handler._write_frame(b"x" * 99)
+
+            self.assertFalse(hasattr(connection, "_missing"))
+            rsv1 = tornado.websocket.WebSocketProtocol13.RSV1
+            self.assertTrue(write_frame.call_args.kwargs["flags"] & rsv1)
+
     @tornado.testing.gen_test
     async def test_backmsg_deserialization_exception(self):
         """If BackMsg deserialization raises an Exception, we should call the Runtime's
@@ -14,6 +14,8 @@
 
 from __future__ import annotations
 
+import os
+import tempfile
 from typing import Final
 from unittest import mock
 from unittest.mock import MagicMock
@@ -22,6 +24,7 @@ import tornado.testing
 import tornado.web
 from parameterized import parameterized
 
+from streamlit.runtime.disk_media_file_storage import DiskMediaFileStorage
 from streamlit.runtime.media_file_manager import MediaFileManager
 from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
 from streamlit.web.server.media_file_handler import MediaFileHandler
@@ -107,3 +110,74 @@ class MediaFileHandlerTest(tornado.testing.AsyncHTTPTestCase):
         url = f"{MOCK_ENDPOINT}/invalid_media_file.mp4"
         rsp = self.fetch(url, method="GET")
         self.assertEqual(404, rsp.code)
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_caching_headers(self) -> None:
+        """Media files are immutable, and their ETag is their file ID."""
+        url = self.media_file_manager.add(b"mock_data", "video/mp4", "mock_coords")
+        rsp = self.fetch(url, method="GET")
+
+        file_id = url.rpartition("/")[2].partition(".")[0]
+        self.assertEqual(f'"{file_id}"', rsp.headers["Etag"])
+        self.assertEqual(
+            f"max-age={MediaFileHandler.CACHE_MAX_AGE}, immutable",
+            rsp.headers["Cache-Control"],
+        )
+
+        rsp = self.fetch(url, method="GET", headers={"If-None-Match": f'"{file_id}"'})
+        self.assertEqual(304, rsp.code)
+
+
+class MediaFileHandlerDiskStorageTest(tornado.testing.AsyncHTTPTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        storage = DiskMediaFileStorage(MOCK_ENDPOINT, memory_budget=0)
+        self.media_file_manager = MediaFileManager(storage)
+        MediaFileHandler.initialize_storage(storage)
+
+    def get_app(self) -> tornado.web.Application:
+        return tornado.web.Application(
+            [(f"{MOCK_ENDPOINT}/(.*)", MediaFileHandler, {"path": ""})]
+        )
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_media_file_on_disk(self) -> None:
+        """Media files stored on disk are served whole, or in ranges."""
+        url = self.media_file_manager.add(b"mock_data", "video/mp4", "mock_coords")
+
+        rsp = self.fetch(url, method="GET")
+        self.assertEqual(200, rsp.code)
+        self.assertEqual(b"mock_data", rsp.body)
+        self.assertEqual(str(len(b"mock_data")), rsp.headers["Content-Length"])
+
+        rsp = self.fetch(url, method="GET", headers={"Range": "bytes=5-"})
+        self.assertEqual(206, rsp.code)
+        self.assertEqual(b"data", rsp.body)
+        self.assertEqual("bytes 5-8/9", rsp.headers["Content-Range"])
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_media_file_by_path(self) -> None:
+        """Media files added by path are served from it, until it's modified."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "video.mp4")
+            with open(path, "wb") as f:
+                f.write(b"mock_data")
+            url = self.media_file_manager.add(path, "video/mp4", "mock_coords")
+
+            rsp = self.fetch(url, method="GET", headers={"Range": "bytes=0-3"})
+            self.assertEqual(206, rsp.code)
+            self.assertEqual(b"mock", rsp.body)
+
+            with open(path, "wb") as f:
+                f.write(b"new_data")
+            rsp = self.fetch(url, method="GET")
+            self.assertEqual(404, rsp.code)
@@ -25,7 +25,7 @@ import tornado.web
 import tornado.websocket
 
 from streamlit.runtime.forward_msg_cache import ForwardMsgCache, populate_hash_if_needed
-from streamlit.runtime.runtime_util import serialize_forward_msg
+from streamlit.runtime.runtime_util import SerializedForwardMsg, serialize_forward_msg
 from streamlit.web.server.routes import _DEFAULT_ALLOWED_MESSAGE_ORIGINS
 from streamlit.web.server.server import (
     HEALTH_ENDPOINT,
@@ -114,7 +114,7 @@ class MessageCacheHandlerTest(tornado.testing.AsyncHTTPTestCase):
         # Create a new ForwardMsg and cache it
         msg = create_dataframe_msg([1, 2, 3])
         msg_hash = populate_hash_if_needed(msg)
-        self._cache.add_message(msg, MagicMock(), 0)
+        self._cache.add_message(SerializedForwardMsg.from_msg(msg), MagicMock(), 0)
 
         # Cache hit
         response = self.fetch("/_stcore/message?hash=%s" % msg_hash)
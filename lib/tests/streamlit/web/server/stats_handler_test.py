@@ -22,7 +22,7 @@ from google.protobuf.json_format import MessageToDict
 from tornado.httputil import HTTPHeaders
 
 from streamlit.proto.openmetrics_data_model_pb2 import MetricSet as MetricSetProto
-from streamlit.runtime.stats import CacheStat
+from streamlit.runtime.stats import CacheStat, MetricStat
 from streamlit.web.server.server import METRIC_ENDPOINT
 from streamlit.web.server.stats_request_handler import StatsRequestHandler
 
@@ -30,8 +30,12 @@ from streamlit.web.server.stats_request_handler import StatsRequestHandler
 class StatsHandlerTest(tornado.testing.AsyncHTTPTestCase):
     def get_app(self):
         self.mock_stats = []
+        self.mock_metrics = []
         mock_stats_manager = MagicMock()
         mock_stats_manager.get_stats = MagicMock(side_effect=lambda: self.mock_stats)
+        mock_stats_manager.get_metrics = MagicMock(
+            side_effect=lambda: self.mock_metrics
+        )
         return tornado.web.Application(
             [
                 (
@@ -161,3 +165,70 @@ class StatsHandlerTest(tornado.testing.AsyncHTTPTestCase):
         }
 
         self.assertEqual(expected, MessageToDict(metric_set))
+
+    def test_has_metrics(self):
+        """Metrics are listed after cache stats, grouped by family."""
+        self.mock_metrics = [
+            MetricStat("lookups", "counter", "Lookups.", 3, (("result", "hit"),)),
+            MetricStat("ratio", "gauge", "Ratio.", 0.75),
+            MetricStat("lookups", "counter", "Lookups.", 1, (("result", "miss"),)),
+        ]
+
+        response = self.fetch("/_stcore/metrics")
+        self.assertEqual(200, response.code)
+
+        expected_body = (
+            b"# TYPE cache_memory_bytes gauge\n"
+            b"# UNIT cache_memory_bytes bytes\n"
+            b"# HELP Total memory consumed by a cache.\n"
+            b"# TYPE lookups counter\n"
+            b"# HELP lookups Lookups.\n"
+            b'lookups_total{result="hit"} 3\n'
+            b'lookups_total{result="miss"} 1\n'
+            b"# TYPE ratio gauge\n"
+            b"# HELP ratio Ratio.\n"
+            b"ratio 0.75\n"
+            b"# EOF\n"
+        )
+
+        self.assertEqual(expected_body, response.body)
+
+    def test_protobuf_metrics(self):
+        """Metrics are returned in OpenMetrics protobuf format too."""
+        self.mock_metrics = [
+            MetricStat("lookups", "counter", "Lookups.", 3, (("result", "hit"),)),
+            MetricStat("ratio", "gauge", "Ratio.", 0.75),
+        ]
+
+        response = self.fetch(
+            "/_stcore/metrics", headers={"Accept": "application/x-protobuf"}
+        )
+        self.assertEqual(200, response.code)
+
+        metric_set = MetricSetProto()
+        metric_set.ParseFromString(response.body)
+
+        self.assertEqual(
+            [
+                {
+                    "name": "lookups",
+                    "type": "COUNTER",
+                    "help": "Lookups.",
+                    "metrics": [
+                        {
+                            "labels": [{"name": "result", "value": "hit"}],
+                            "metricPoints": [{"counterValue": {"intValue": "3"}}],
+                        }
+                    ],
+                },
+                {
+                    "name": "ratio",
+                    "type": "GAUGE",
+                    "help": "Ratio.",
+                    "metrics": [
+                        {"metricPoints": [{"gaugeValue": {"doubleValue": 0.75}}]}
+                    ],
+                },
+            ],
+            MessageToDict(metric_set)["metricFamilies"][1:],
+        )
@@ -16,7 +16,10 @@
 
 from __future__ import annotations
 
+import os
+import unittest
 from typing import NamedTuple
+from unittest.mock import patch
 
 import requests
 import tornado.testing
@@ -24,9 +27,15 @@ import tornado.web
 import tornado.websocket
 
 from streamlit.logger import get_logger
+from streamlit.runtime.disk_uploaded_file_manager import DiskUploadedFileManager
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.web.server.server import UPLOAD_FILE_ENDPOINT
-from streamlit.web.server.upload_file_request_handler import UploadFileRequestHandler
+from streamlit.web.server.upload_file_request_handler import (
+    ChunkedUploads,
+    UploadFileRequestHandler,
+    _MultipartParser,
+    _UploadedFilePart,
+)
 
 LOGGER = get_logger(__name__)
 
@@ -143,6 +152,257 @@ class UploadFileRequestHandlerTest(tornado.testing.AsyncHTTPTestCase):
         self.assertIn("Expected 1 file, but got 0", response.reason)
 
 
+class UploadFileRequestHandlerDiskTest(tornado.testing.AsyncHTTPTestCase):
+    """Tests the /upload_file endpoint with files stored on disk."""
+
+    def get_app(self):
+        self.file_mgr = DiskUploadedFileManager(
+            upload_endpoint=UPLOAD_FILE_ENDPOINT, spool_size=4
+        )
+        return tornado.web.Application(
+            [
+                (
+                    f"{UPLOAD_FILE_ENDPOINT}/(?P<session_id>[^/]+)/(?P<file_id>[^/]+)",
+                    UploadFileRequestHandler,
+                    dict(
+                        file_mgr=self.file_mgr,
+                        is_active_session=lambda session_id: True,
+                    ),
+                ),
+            ]
+        )
+
+    def _upload_files(self, files_body, session_id, file_id):
+        req = requests.Request(
+            method="PUT",
+            url=self.get_url(f"{UPLOAD_FILE_ENDPOINT}/{session_id}/{file_id}"),
+            files=files_body,
+        ).prepare()
+
+        return self.fetch(
+            req.url,
+            method=req.method,
+            headers=req.headers,
+            body=req.body,
+        )
+
+    def test_upload_files(self):
+        """Files larger than the spool size are stored on disk."""
+        for file in [MockFile("small", b"1234"), MockFile("large", b"12345")]:
+            response = self._upload_files(
+                {file.name: file.data}, session_id="session_id", file_id=file.name
+            )
+            self.assertEqual(204, response.code, response.reason)
+
+        small, large = self.file_mgr.get_files("session_id", ["small", "large"])
+        self.assertEqual((b"1234", None), (small.data, small.path))
+        self.assertEqual(b"", large.data)
+        with open(large.path, "rb") as f:
+            self.assertEqual(b"12345", f.read())
+
+    def test_upload_multiple_files_error(self):
+        """Files of rejected uploads are deleted."""
+        response = self._upload_files(
+            {"file1": b"123456", "file2": b"789012"},
+            session_id="session_id",
+            file_id="file_id",
+        )
+        self.assertEqual(400, response.code)
+        self.assertEqual([], os.listdir(self.file_mgr._directory))
+
+
+class UploadFileRequestHandlerChunkedTest(tornado.testing.AsyncHTTPTestCase):
+    """Tests the /upload_file endpoint with files uploaded in chunks."""
+
+    def get_app(self):
+        self.file_mgr = DiskUploadedFileManager(
+            upload_endpoint=UPLOAD_FILE_ENDPOINT, spool_size=4
+        )
+        self.chunked_uploads = ChunkedUploads(self.file_mgr)
+        return tornado.web.Application(
+            [
+                (
+                    f"{UPLOAD_FILE_ENDPOINT}/(?P<session_id>[^/]+)/(?P<file_id>[^/]+)",
+                    UploadFileRequestHandler,
+                    dict(
+                        file_mgr=self.file_mgr,
+                        is_active_session=lambda session_id: True,
+                        chunked_uploads=self.chunked_uploads,
+                    ),
+                ),
+            ]
+        )
+
+    def _upload_chunk(self, file_id, data, content_range, method="PUT"):
+        req = requests.Request(
+            method=method,
+            url=self.get_url(f"{UPLOAD_FILE_ENDPOINT}/session_id/{file_id}"),
+            files={"file.txt": ("file.txt", data, "text/plain")},
+            headers={"Content-Range": content_range},
+        ).prepare()
+
+        return self.fetch(
+            req.url,
+            method=req.method,
+            headers=req.headers,
+            body=req.body,
+        )
+
+    def _upload_chunks(self, file_id, chunks, size):
+        for start, data in chunks:
+            response = self._upload_chunk(
+                file_id, data, f"bytes {start}-{start + len(data) - 1}/{size}"
+            )
+            self.assertEqual(204, response.code, response.reason)
+
+    def test_upload_chunks(self):
+        """Chunks can be uploaded in any order, and the file is added once
+        they've all been received.
+        """
+        self._upload_chunks("large", [(6, b"789"), (0, b"123"), (3, b"456")], 9)
+        self._upload_chunks("small", [(2, b"3"), (0, b"12")], 3)
+
+        large, small = self.file_mgr.get_files("session_id", ["large", "small"])
+        self.assertEqual(("file.txt", "text/plain"), (large.name, large.type))
+        with open(large.path, "rb") as f:
+            self.assertEqual(b"123456789", f.read())
+        self.assertEqual((b"123", None), (small.data, small.path))
+
+    def test_retry_chunk(self):
+        """A chunk can be uploaded again, after it failed."""
+        response = self._upload_chunk("file_id", b"12", "bytes 0-2/6")
+        self.assertEqual(400, response.code)
+        self.assertIn("Chunk is smaller than its Content-Range", response.reason)
+
+        self._upload_chunks("file_id", [(0, b"123")], 6)
+        self.assertEqual([], self.file_mgr.get_files("session_id", ["file_id"]))
+
+        self._upload_chunks("file_id", [(0, b"123"), (3, b"456")], 6)
+        (file,) = self.file_mgr.get_files("session_id", ["file_id"])
+        with open(file.path, "rb") as f:
+            self.assertEqual(b"123456", f.read())
+
+    def test_invalid_chunks(self):
+        """Chunks whose Content-Range is invalid are rejected."""
+        self._upload_chunks("file_id", [(0, b"123")], 6)
+        for data, content_range, reason in [
+            (b"456", "bytes 3-5/7", "doesn't match previous chunks"),
+            (b"4567", "bytes 3-5/6", "Chunk is larger than its Content-Range"),
+            (b"456", "bytes 5-3/6", "Invalid Content-Range"),
+            (b"456", "3-5/6", "Invalid Content-Range"),
+        ]:
+            response = self._upload_chunk("file_id", data, content_range)
+            self.assertEqual(400, response.code)
+            self.assertIn(reason, response.reason)
+
+        response = self._upload_chunk(
+            "file_id", b"123", f"bytes 0-2/{300 * 1024 * 1024}"
+        )
+        self.assertEqual(413, response.code)
+
+    def test_delete_incomplete_upload(self):
+        """Deleting a file that's being uploaded deletes its chunks."""
+        self._upload_chunks("file_id", [(0, b"123")], 6)
+        self.assertEqual(1, len(os.listdir(self.file_mgr._directory)))
+
+        response = self.fetch(
+            f"{UPLOAD_FILE_ENDPOINT}/session_id/file_id", method="DELETE"
+        )
+        self.assertEqual(204, response.code)
+        self.assertEqual([], os.listdir(self.file_mgr._directory))
+
+    def test_file_grows_with_chunks(self):
+        """An upload's file isn't allocated to its declared size upfront."""
+        self._upload_chunks("file_id", [(0, b"123")], 1024 * 1024)
+        (path,) = os.listdir(self.file_mgr._directory)
+        self.assertEqual(
+            3, os.path.getsize(os.path.join(self.file_mgr._directory, path))
+        )
+
+    def test_remove_session_files(self):
+        """Removing a session's files, when it's closed, deletes the chunks
+        of its incomplete uploads.
+        """
+        self._upload_chunks("file_id", [(0, b"123")], 6)
+        self.file_mgr.remove_session_files("session_id")
+        self.assertEqual([], os.listdir(self.file_mgr._directory))
+
+        # The upload starts over if chunks are sent again.
+        self._upload_chunks("file_id", [(3, b"456")], 6)
+        self.assertEqual([], self.file_mgr.get_files("session_id", ["file_id"]))
+
+    def test_discard_expired_uploads(self):
+        """Uploads that stopped receiving chunks are discarded."""
+        self._upload_chunks("file_id", [(0, b"123")], 6)
+        self.chunked_uploads.discard_expired_uploads()
+        self.assertEqual(1, len(os.listdir(self.file_mgr._directory)))
+
+        with patch(
+            "streamlit.web.server.upload_file_request_handler._CHUNKED_UPLOAD_TTL_SECONDS",
+            -1,
+        ):
+            self.chunked_uploads.discard_expired_uploads()
+        self.assertEqual([], os.listdir(self.file_mgr._directory))
+
+    @patch(
+        "streamlit.web.server.upload_file_request_handler._MAX_CHUNKED_UPLOADS_PER_SESSION",
+        2,
+    )
+    def test_max_uploads_per_session(self):
+        """A session can only upload so many files in chunks at once."""
+        self._upload_chunks("file1", [(0, b"123")], 6)
+        self._upload_chunks("file2", [(0, b"123")], 6)
+        response = self._upload_chunk("file3", b"123", "bytes 0-2/6")
+        self.assertEqual(400, response.code)
+        self.assertIn("Too many files are being uploaded", response.reason)
+
+        # Uploads of files already being uploaded can continue.
+        self._upload_chunks("file1", [(3, b"456")], 6)
+        self._upload_chunks("file3", [(0, b"123")], 6)
+
+
+class MultipartParserTest(unittest.TestCase):
+    """Tests the streaming multipart/form-data parser."""
+
+    BODY = (
+        b"preamble\r\n--boundary\r\n"
+        b'Content-Disposition: form-data; name="field"\r\n\r\n'
+        b"value\r\n--boundary\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.txt"\r\n'
+        b"Content-Type: text/plain\r\n\r\n"
+        b"line 1\r\n--not the boundary\r\n\r\n--boundary--\r\nepilogue"
+    )
+
+    def _parse(self, chunks):
+        file_mgr = MemoryUploadedFileManager(upload_endpoint=UPLOAD_FILE_ENDPOINT)
+        parser = _MultipartParser(
+            b"boundary",
+            lambda name, type: _UploadedFilePart(name, type, file_mgr),
+        )
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        return [part.to_file_rec("file_id") for part in parser.parts]
+
+    def test_parse(self):
+        """Only file parts are parsed, however the body is chunked."""
+        for chunk_size in [1, 2, 7, len(self.BODY)]:
+            chunks = [
+                self.BODY[i : i + chunk_size]
+                for i in range(0, len(self.BODY), chunk_size)
+            ]
+            (file,) = self._parse(chunks)
+            self.assertEqual(
+                ("a.txt", "text/plain", b"line 1\r\n--not the boundary\r\n"),
+                (file.name, file.type, file.data),
+            )
+
+    def test_incomplete_body(self):
+        """An incomplete body is an error."""
+        with self.assertRaises(ValueError):
+            self._parse([self.BODY[:-20]])
+
+
 class UploadFileRequestHandlerInvalidSessionTest(tornado.testing.AsyncHTTPTestCase):
     """Tests the /upload_file endpoint."""
 
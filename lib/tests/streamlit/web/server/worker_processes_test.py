@@ -0,0 +1,163 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for worker_processes.py."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import socket
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tornado.httpserver import HTTPServer
+
+from streamlit.web.server import worker_processes
+
+_TIMEOUT_SECONDS = 5
+
+
+async def _wait_for(condition) -> bool:
+    """Wait until `condition()` is true, and return whether it became true."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _TIMEOUT_SECONDS
+    while not condition():
+        if loop.time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+class TornadoCompatibilityTest(unittest.TestCase):
+    def test_http_server_handles_connections(self):
+        """Tornado's HTTPServer has the private method used to serve the
+        connections handed to workers.
+        """
+        self.assertTrue(
+            hasattr(HTTPServer, worker_processes._TORNADO_HANDLE_CONNECTION_ATTR)
+        )
+
+    def test_not_supported_without_handle_connection(self):
+        """Several workers aren't supported if Tornado no longer has the
+        method.
+        """
+        with patch.object(
+            worker_processes, "_TORNADO_HANDLE_CONNECTION_ATTR", "_missing"
+        ):
+            self.assertFalse(worker_processes.is_supported())
+
+
+@unittest.skipUnless(worker_processes.is_supported(), "Requires fork and send_fds")
+class WorkerProcessesTest(unittest.TestCase):
+    def test_worker_index_for_address(self):
+        """All the connections of a client go to the same worker."""
+        index = worker_processes.worker_index_for_address(("10.0.0.1", 1234), 4)
+        self.assertIn(index, range(4))
+        self.assertEqual(
+            index, worker_processes.worker_index_for_address(("10.0.0.1", 5678), 4)
+        )
+
+        indexes = {
+            worker_processes.worker_index_for_address((f"10.0.0.{i}", 1234), 4)
+            for i in range(100)
+        }
+        self.assertEqual({0, 1, 2, 3}, indexes)
+
+    def test_send_and_receive_connection(self):
+        """A connection handed over a channel can be used on the other end."""
+        parent_channel, worker_channel = socket.socketpair()
+        client, server_side = socket.socketpair()
+        with parent_channel, worker_channel, client:
+            with server_side:
+                worker_processes.send_connection(parent_channel, server_side)
+
+            received = worker_processes.receive_connection(worker_channel)
+            self.assertIsNotNone(received)
+            with received:
+                client.sendall(b"ping")
+                self.assertEqual(b"ping", received.recv(4))
+
+            worker_channel.setblocking(False)
+            with self.assertRaises(BlockingIOError):
+                worker_processes.receive_connection(worker_channel)
+
+            parent_channel.close()
+            worker_channel.setblocking(True)
+            self.assertIsNone(worker_processes.receive_connection(worker_channel))
+
+    def test_receive_connections(self):
+        """The worker serves the connections handed over by the parent process,
+        and stops once the parent process exited.
+        """
+        parent_channel, worker_channel = socket.socketpair()
+        client, server_side = socket.socketpair()
+        http_server = MagicMock()
+
+        async def run():
+            worker_processes.receive_connections(http_server)
+            with server_side:
+                worker_processes.send_connection(parent_channel, server_side)
+            self.assertTrue(
+                await _wait_for(lambda: http_server._handle_connection.called)
+            )
+
+            parent_channel.close()
+            self.assertTrue(await _wait_for(lambda: kill.called))
+
+        with worker_channel, client, patch.object(
+            worker_processes, "_channel", worker_channel
+        ), patch.object(worker_processes.os, "kill") as kill:
+            try:
+                asyncio.run(run())
+            finally:
+                parent_channel.close()
+                for call in http_server._handle_connection.call_args_list:
+                    call.args[0].close()
+
+        kill.assert_called_once_with(os.getpid(), signal.SIGTERM)
+
+    def test_route_connection(self):
+        """Accepted connections go to the client's worker, or to the next one
+        if it's being restarted.
+        """
+        listen_socket = socket.create_server(("127.0.0.1", 0))
+        channels = [socket.socketpair() for _ in range(2)]
+        workers = {
+            index: worker_processes._Worker(index, 0, parent_channel)
+            for index, (parent_channel, _) in enumerate(channels)
+        }
+        client = socket.create_connection(listen_socket.getsockname())
+        try:
+            with patch.object(
+                worker_processes, "worker_index_for_address", return_value=1
+            ):
+                del workers[1]
+                worker_processes._route_connection(listen_socket, workers, 2)
+
+            received = worker_processes.receive_connection(channels[0][1])
+            self.assertIsNotNone(received)
+            with received:
+                self.assertEqual(client.getsockname(), received.getpeername())
+        finally:
+            client.close()
+            listen_socket.close()
+            for parent_channel, worker_channel in channels:
+                parent_channel.close()
+                worker_channel.close()
+
+    def test_get_worker_index(self):
+        """The server runs in a single process by default."""
+        self.assertIsNone(worker_processes.get_worker_index())